@@ -10,7 +10,7 @@ import numpy as np
 import ephem
 import pytz
 from datetime import datetime, timedelta
-from astropy.coordinates import EarthLocation, AltAz, SkyCoord
+from astropy.coordinates import EarthLocation, AltAz, SkyCoord, get_body
 from astropy.time import Time
 from astropy.utils import iers
 import astropy.units as u
@@ -497,11 +497,11 @@ def get_common_time_arrays(tz_name, local_date, sampling_interval_minutes=15):
     return times_local, times_utc
 
 
-def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_name, altitude_threshold,
-                                             sampling_interval_minutes=15, horizon_mask=None):
+def _dark_window_times(local_date, tz_name, lat, lon, sampling_interval_minutes=15):
     """
-    Calculates observable duration, max altitude, and start/end times,
-    now with support for a custom horizon mask.
+    Sample times (tz-aware, local) from dusk to dawn for the observing night,
+    plus the no_astro_night flag (sunset/sunrise used because the sun never
+    reaches -18°). Returns (None, False) when there is no darkness at all.
     """
     local_tz = pytz.timezone(tz_name)
     date_obj = datetime.strptime(local_date, "%Y-%m-%d")
@@ -524,7 +524,7 @@ def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_n
             dusk_dt = local_tz.localize(datetime.combine(date_obj, sunset_time))
             dawn_dt = local_tz.localize(datetime.combine(date_obj, sunrise_time))
         else:
-            return timedelta(0), 0, None, None  # True polar day — no darkness at all
+            return None, False  # True polar day — no darkness at all
     elif dusk_str == "N/A" and dawn_str != "N/A":
         # Dusk missing, dawn valid — substitute dusk with sunset (mid-latitude summer)
         if sunset_str and sunset_str != "N/A":
@@ -532,7 +532,7 @@ def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_n
             dusk_time = datetime.strptime(sunset_str, "%H:%M").time()
             dusk_dt = local_tz.localize(datetime.combine(date_obj, dusk_time))
         else:
-            return timedelta(0), 0, None, None
+            return None, False
         dawn_time = datetime.strptime(dawn_str, "%H:%M").time()
         dawn_dt = local_tz.localize(datetime.combine(date_obj, dawn_time))
     elif dawn_str == "N/A" and dusk_str != "N/A":
@@ -542,7 +542,7 @@ def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_n
             dawn_time = datetime.strptime(sunrise_str, "%H:%M").time()
             dawn_dt = local_tz.localize(datetime.combine(date_obj, dawn_time))
         else:
-            return timedelta(0), 0, None, None
+            return None, False
         dusk_time = datetime.strptime(dusk_str, "%H:%M").time()
         dusk_dt = local_tz.localize(datetime.combine(date_obj, dusk_time))
     else:
@@ -564,6 +564,16 @@ def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_n
         times.append(current)
         current += sample_interval
 
+    return times, no_astro_night
+
+
+def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_name, altitude_threshold,
+                                             sampling_interval_minutes=15, horizon_mask=None):
+    """
+    Calculates observable duration, max altitude, and start/end times,
+    now with support for a custom horizon mask.
+    """
+    times, no_astro_night = _dark_window_times(local_date, tz_name, lat, lon, sampling_interval_minutes)
     if not times:
         return timedelta(0), 0, None, None
 
@@ -625,6 +635,140 @@ def calculate_observable_duration_vectorized(ra, dec, lat, lon, local_date, tz_n
         observable_minutes = 0
     return timedelta(minutes=observable_minutes), max_altitude, observable_from, observable_to
 
+def horizon_min_altitudes(azimuths, horizon_mask, altitude_threshold):
+    """
+    Vectorized interpolate_horizon(): minimum altitude for an array of
+    azimuths (any shape), with the mask floored at altitude_threshold.
+    """
+    azimuths = np.asarray(azimuths, dtype=float)
+    if not horizon_mask or len(horizon_mask) < 2:
+        return np.full_like(azimuths, altitude_threshold)
+    sorted_mask = sorted(([float(az), max(float(alt), altitude_threshold)] for az, alt in horizon_mask),
+                         key=lambda p: p[0])
+    profile = ([[0, altitude_threshold], [sorted_mask[0][0] - 0.001, altitude_threshold]]
+               + sorted_mask
+               + [[sorted_mask[-1][0] + 0.001, altitude_threshold], [360, altitude_threshold]])
+    profile = np.array(sorted(profile, key=lambda p: p[0]))
+    return np.interp(azimuths, profile[:, 0], profile[:, 1])
+
+
+def calculate_observable_durations_batch(ras, decs, lat, lon, local_date, tz_name, altitude_threshold,
+                                         sampling_interval_minutes=15, horizon_mask=None, with_window=False):
+    """
+    calculate_observable_duration_vectorized() for many objects at once: one
+    AltAz transform over (objects x dark-window samples).
+
+    Returns (observable_minutes int array, max_altitude float array); with
+    with_window=True also the observable_from / observable_to lists
+    (datetime or None per object).
+    """
+    ras = np.asarray(ras, dtype=float)
+    decs = np.asarray(decs, dtype=float)
+    minutes = np.zeros(ras.shape, dtype=int)
+    max_alts = np.zeros(ras.shape, dtype=float)
+    times, no_astro_night = _dark_window_times(local_date, tz_name, lat, lon, sampling_interval_minutes)
+    if not times or ras.size == 0:
+        if with_window:
+            return minutes, max_alts, [None] * ras.size, [None] * ras.size
+        return minutes, max_alts
+
+    times_utc = Time([t.astimezone(pytz.utc).strftime('%Y-%m-%dT%H:%M:%S') for t in times],
+                     format='isot', scale='utc')
+    location_obj = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    sky_coords = SkyCoord(ra=ras[:, None] * u.hourangle, dec=decs[:, None] * u.deg)
+    altaz = sky_coords.transform_to(AltAz(obstime=times_utc[None, :], location=location_obj))
+    altitudes = altaz.alt.deg
+    azimuths = altaz.az.deg
+
+    max_alts = altitudes.max(axis=1)
+    mask = altitudes >= horizon_min_altitudes(azimuths, horizon_mask, altitude_threshold)
+    if not no_astro_night:
+        minutes = mask.sum(axis=1).astype(int) * int(sampling_interval_minutes)
+    if not with_window:
+        return minutes, max_alts
+
+    any_visible = mask.any(axis=1)
+    first = np.argmax(mask, axis=1)
+    last = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    observable_from = [times[i] if ok else None for i, ok in zip(first, any_visible)]
+    observable_to = [times[i] if ok else None for i, ok in zip(last, any_visible)]
+    return minutes, max_alts, observable_from, observable_to
+
+
+def calculate_night_series(ra, dec, lat, lon, tz_name, dates, altitude_threshold,
+                           sampling_interval_minutes=15, horizon_mask=None):
+    """
+    Per-night summaries for one object over a range of observing nights,
+    computed as one continuous series: a single AltAz transform over every
+    dark-window sample of every night and a single moon get_body() over the
+    per-night reference times, reduced per night with NumPy.
+
+    `dates` are 'YYYY-MM-DD' observing-night dates. Returns one dict per date:
+      date, observable_minutes, max_altitude, observable_from, observable_to
+        (as calculate_observable_duration_vectorized),
+      moon_separation (degrees at astronomical dusk, 20:00 when there is none),
+      midnight_altitude, midnight_moon_altitude (at local 00:00 of that date).
+    """
+    if not dates:
+        return []
+    local_tz = pytz.timezone(tz_name)
+    samples, windows = [], []
+    for date_str in dates:
+        times, no_astro_night = _dark_window_times(date_str, tz_name, lat, lon, sampling_interval_minutes)
+        times = times or []
+        windows.append((len(samples), len(samples) + len(times), no_astro_night))
+        samples.extend(times)
+    n_dark = len(samples)
+
+    # Two reference times per night: local midnight (monthly plot) and dusk (moon separation)
+    for date_str in dates:
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+        dusk_str = calculate_sun_events_cached(date_str, tz_name, lat, lon).get("astronomical_dusk")
+        if not dusk_str or dusk_str == "N/A":
+            dusk_str = "20:00"  # Fallback for high-latitude / no astronomical twilight
+        samples.append(local_tz.localize(day))
+        samples.append(local_tz.localize(datetime.combine(day.date(), datetime.strptime(dusk_str, "%H:%M").time())))
+
+    times_utc = Time([t.timestamp() for t in samples], format='unix')
+    location_obj = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    frame = AltAz(obstime=times_utc, location=location_obj)
+    obj_altaz = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg).transform_to(frame)
+    ref_frame = AltAz(obstime=times_utc[n_dark:], location=location_obj)
+    moon_altaz = get_body('moon', times_utc[n_dark:], location_obj).transform_to(ref_frame)
+    altitudes = obj_altaz.alt.deg
+    azimuths = obj_altaz.az.deg
+
+    obj_ref = obj_altaz[n_dark:]
+    midnight_alt = altitudes[n_dark::2]
+    midnight_moon_alt = moon_altaz.alt.deg[0::2]
+    dusk_sep = obj_ref[1::2].separation(moon_altaz[1::2]).deg
+
+    visible = altitudes[:n_dark] >= horizon_min_altitudes(azimuths[:n_dark], horizon_mask, altitude_threshold)
+
+    results = []
+    for k, (start, end, no_astro_night) in enumerate(windows):
+        night = {
+            "date": dates[k],
+            "observable_minutes": 0,
+            "max_altitude": 0,
+            "observable_from": None,
+            "observable_to": None,
+            "moon_separation": float(dusk_sep[k]),
+            "midnight_altitude": float(midnight_alt[k]),
+            "midnight_moon_altitude": float(midnight_moon_alt[k]),
+        }
+        if end > start:
+            night["max_altitude"] = float(altitudes[start:end].max())
+            observable = np.flatnonzero(visible[start:end])
+            if observable.size:
+                night["observable_from"] = samples[start + observable[0]]
+                night["observable_to"] = samples[start + observable[-1]]
+            if not no_astro_night:
+                night["observable_minutes"] = int(observable.size * sampling_interval_minutes)
+        results.append(night)
+    return results
+
+
 def interpolate_horizon(azimuth, horizon_mask, default_altitude, _presorted=False):
     if not horizon_mask:
         return default_altitude
@@ -3,6 +3,7 @@ import numpy as np
 import requests
 import time
 import re
+import threading
 from astroquery.simbad import Simbad
 from astroquery.vizier import Vizier
 
@@ -17,6 +18,35 @@ __all__ = [
 ]
 
 
+# Optional per-provider throttle, called with "simbad" / "vizier" / "hyperleda"
+# right before each remote query. Installed by nova.metadata_fetcher so that
+# concurrent fetches share one rate limit per provider; a no-op by default.
+_provider_throttle = None
+
+
+def set_provider_throttle(throttle):
+    """Install (or clear with None) the per-provider throttle callable."""
+    global _provider_throttle
+    _provider_throttle = throttle
+
+
+def _throttle(provider):
+    if _provider_throttle is not None:
+        _provider_throttle(provider)
+
+
+# Remote query failures (timeouts, service errors) seen during the current
+# thread's get_astronomical_data() call. They are returned under "errors" so
+# callers can tell "not found" apart from "could not ask" (and not cache it).
+_lookup_state = threading.local()
+
+
+def _record_error(provider, error):
+    errors = getattr(_lookup_state, "errors", None)
+    if errors is not None:
+        errors.append(f"{provider}: {error}")
+
+
 #############################
 #   Astroquery Functions    #
 #############################
@@ -31,6 +61,7 @@ def get_object_type_from_simbad(object_name):
     custom_simbad.add_votable_fields('otype', 'morph_type', 'otypedef')
 
     try:
+        _throttle("simbad")
         result_table = custom_simbad.query_object(object_name)
         if result_table is None or len(result_table) == 0:
             print(f"[DEBUG] SIMBAD query for '{object_name}' returned no result table.")
@@ -128,6 +159,7 @@ def get_object_type_from_simbad(object_name):
             print(f"[ERROR] SIMBAD field name error for '{object_name}': {e}. Check Simbad.list_votable_fields().")
         else:
             print(f"[ERROR] Failed query/process SIMBAD type for '{object_name}': {e}")
+        _record_error("simbad", e)
         return None
 
 
@@ -139,6 +171,7 @@ def get_magnitude_from_simbad(object_name):
     custom_simbad.ROW_LIMIT = 1
     custom_simbad.add_votable_fields('V')  # Corrected from 'flux(V)'
     try:
+        _throttle("simbad")
         result = custom_simbad.query_object(object_name)
         if result is None or len(result) == 0: return None
         mag_col_name = None
@@ -162,6 +195,7 @@ def get_magnitude_from_simbad(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed query SIMBAD magnitude for {object_name}: {e}")
+        _record_error("simbad", e)
         return None
 
 
@@ -173,6 +207,7 @@ def get_magnitude_from_vizier(object_name):
         "J/ApJS/227/24/opennNGC"
     ]
     try:
+        _throttle("vizier")
         vizier = Vizier(columns=['*'], catalog=vizier_catalogs, timeout=60)
         result_tables = vizier.query_object(object_name)
         if not result_tables or len(result_tables) == 0: return None
@@ -193,12 +228,14 @@ def get_magnitude_from_vizier(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed to query VizieR for magnitude of {object_name}: {e}")
+        _record_error("vizier", e)
         return None
 
 
 def get_magnitude_from_hyperleda(object_name):
     """Fetch magnitude from HyperLEDA (Bmag values) via VizieR."""
     try:
+        _throttle("hyperleda")
         vizier = Vizier(columns=['*'], catalog="VII/237", timeout=60)
         result_tables = vizier.query_object(object_name)
         if not result_tables or len(result_tables) == 0: return None
@@ -214,6 +251,7 @@ def get_magnitude_from_hyperleda(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed query HyperLEDA magnitude for {object_name}: {e}")
+        _record_error("hyperleda", e)
         return None
 
 
@@ -239,6 +277,7 @@ def get_angular_size_from_simbad(object_name):
     custom_simbad.ROW_LIMIT = 1
     custom_simbad.add_votable_fields('galdim_majaxis', 'dimensions')
     try:
+        _throttle("simbad")
         result = custom_simbad.query_object(object_name)
         if result is None or len(result) == 0: return None
         size_col_candidates = ['GALDIM_MAJAXIS', 'galdim_majaxis']
@@ -286,6 +325,7 @@ def get_angular_size_from_simbad(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed to query SIMBAD for angular size of {object_name}: {e}")
+        _record_error("simbad", e)
         return None
 
 
@@ -297,6 +337,7 @@ def get_angular_size_from_vizier(object_name):
         "J/ApJS/227/24/opennNGC"
     ]
     try:
+        _throttle("vizier")
         vizier = Vizier(columns=['*'], catalog=vizier_catalogs, timeout=60)
         result_tables = vizier.query_object(object_name)
         if not result_tables or len(result_tables) == 0: return None
@@ -331,12 +372,14 @@ def get_angular_size_from_vizier(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed to query VizieR for angular size of {object_name}: {e}")
+        _record_error("vizier", e)
         return None
 
 
 def get_angular_size_from_hyperleda(object_name):
     """Fetch angular size from HyperLEDA (using logd25 value) via VizieR."""
     try:
+        _throttle("hyperleda")
         vizier = Vizier(columns=['logd25'], catalog="VII/237", timeout=60)
         result_tables = vizier.query_object(object_name)
         if not result_tables or len(result_tables) == 0: return None
@@ -357,6 +400,7 @@ def get_angular_size_from_hyperleda(object_name):
         return None
     except Exception as e:
         print(f"[ERROR] Failed query HyperLEDA angular size for {object_name}: {e}")
+        _record_error("hyperleda", e)
         return None
 
 
@@ -465,8 +509,18 @@ def get_astronomical_data(object_name, stellarium_ip="localhost", port=8090):
     """
     Main function to retrieve astronomical data for a given object name.
     Queries SIMBAD, VizieR, and optionally Stellarium.
-    Returns a dictionary with the findings (Type, Mag, Size, SB).
+    Returns a dictionary with the findings (Type, Mag, Size, SB). Remote query
+    failures are listed under "errors" (empty when every provider answered),
+    so None fields mean "not found" only when "errors" is empty.
     """
+    _lookup_state.errors = []
+    try:
+        return _get_astronomical_data(object_name, stellarium_ip, port, _lookup_state.errors)
+    finally:
+        _lookup_state.errors = None
+
+
+def _get_astronomical_data(object_name, stellarium_ip, port, errors):
     print(f"\n{'=' * 10} Searching for: {object_name} {'=' * 10}")
     obj_type = get_object_type_from_simbad(object_name)
     type_source = "SIMBAD" if obj_type else None
@@ -496,6 +550,7 @@ def get_astronomical_data(object_name, stellarium_ip="localhost", port=8090):
         "magnitude": mag_data["value"], "mag_source": mag_data.get('source'),
         "size_arcmin": size_data["value"], "size_source": size_data.get('source'),
         "surface_brightness": sb,
+        "errors": list(errors),
     }
     if final_data["object_type"] is None: print(
         f"[DATA_MISSING] Object Type not found for {object_name} from any source.")
@@ -44,6 +44,7 @@ from pathlib import Path
 import platform
 import markdown
 import csv
+import click
 from math import atan, degrees
 from flask import render_template, jsonify, request, send_file, redirect, url_for, flash, g, current_app, make_response, Response, stream_with_context
 from flask_login import login_user, login_required, current_user, logout_user
@@ -109,7 +110,8 @@ import re
 from nova.models import (
     INSTANCE_PATH, DB_PATH, DB_URI, engine, SessionLocal, Base,
     DbUser, Project, SavedView, Location, SavedFraming, HorizonPoint,
-    AstroObject, Component, Rig, JournalSession, UiPref, UserCustomFilter
+    AstroObject, Component, Rig, JournalSession, UiPref, UserCustomFilter,
+    parse_magnitude, parse_size_arcmin
 )
 from nova.config import (
     APP_VERSION, TEMPLATE_DIR, CACHE_DIR, CONFIG_DIR, BACKUP_DIR,
@@ -120,7 +122,8 @@ from nova.config import (
     cache_worker_status, LATEST_VERSION_INFO,
     weather_cache, CATALOG_MANIFEST_CACHE,
     _telemetry_startup_once, TELEMETRY_DEBUG_STATE, TRANSLATION_STATUS,
-    AI_PROVIDER, AI_API_KEY, AI_MODEL, AI_BASE_URL, AI_ALLOWED_USERS
+    AI_PROVIDER, AI_API_KEY, AI_MODEL, AI_BASE_URL, AI_ALLOWED_USERS,
+    AI_CACHE_TTL_HOURS, AI_DAILY_QUOTA, AI_PROMPT_TOKEN_BUDGET, AI_BEST_OBJECTS_TOP_K
 )
 from nova.helpers import (
     get_db, get_user_log_string, allowed_file, _yaml_dump_pretty,
@@ -138,6 +141,9 @@ from nova.helpers import (
     get_outlook_cache_path,
 )
 from nova.config import DEFAULT_DITHER_MAIN_SHIFT_PX
+from nova.metadata_fetcher import fetch_object_metadata
+from nova.user_context import user_context_cache
+from nova.nightly_curves import NightlyCurve, shared_time_axis
 from nova.report_graphs import generate_session_charts
 from nova.workers.weather import weather_cache_worker
 from nova.workers.updates import check_for_updates
@@ -492,6 +498,29 @@ def _seed_new_user_from_yaml(db_session, user_to_seed: 'DbUser'):
         raise e
 
 
+# (index name, table, columns) -- see _run_schema_patches
+HOT_QUERY_INDEXES = (
+    ("ix_astro_objects_enabled", "astro_objects", ("enabled",)),  # declared on the model; missing on upgraded DBs
+    ("ix_astro_objects_user_enabled_name", "astro_objects", ("user_id", "enabled", "object_name")),
+    ("ix_astro_objects_user_active_project", "astro_objects", ("user_id", "active_project")),
+    ("ix_journal_user_object", "journal_sessions", ("user_id", "object_name")),
+    ("ix_saved_framings_user_object", "saved_framings", ("user_id", "object_name")),
+    # Shared catalog keyset pages (nova/shared_catalog.py)
+    ("ix_astro_objects_shared_name", "astro_objects", ("is_shared", "object_name", "id")),
+    ("ix_components_shared_name", "components", ("is_shared", "name", "id")),
+    ("ix_saved_views_shared_name", "saved_views", ("is_shared", "name", "id")),
+)
+
+
+def _has_covering_index(conn, table: str, columns) -> bool:
+    """True if an existing index on `table` starts with exactly these columns (e.g. a UNIQUE constraint)."""
+    for idx in conn.exec_driver_sql(f"PRAGMA index_list({table});").fetchall():
+        idx_cols = [r[2] for r in conn.exec_driver_sql(f"PRAGMA index_info('{idx[1]}');").fetchall()]
+        if tuple(idx_cols[:len(columns)]) == tuple(columns):
+            return True
+    return False
+
+
 def _run_schema_patches(conn):
     """
     Run all schema patches against an existing database connection.
@@ -806,6 +835,15 @@ def _run_schema_patches(conn):
         conn.exec_driver_sql("ALTER TABLE astro_objects ADD COLUMN description_source_link VARCHAR(500);")
         print("[DB PATCH] Added description curation columns")
 
+    if "magnitude_num" not in colnames_objects:
+        conn.exec_driver_sql("ALTER TABLE astro_objects ADD COLUMN magnitude_num FLOAT;")
+        conn.exec_driver_sql("ALTER TABLE astro_objects ADD COLUMN size_arcmin FLOAT;")
+        rows = conn.exec_driver_sql("SELECT id, magnitude, size FROM astro_objects;").fetchall()
+        params = [(parse_magnitude(mag), parse_size_arcmin(size), oid) for oid, mag, size in rows]
+        if params:
+            conn.exec_driver_sql("UPDATE astro_objects SET magnitude_num = ?, size_arcmin = ? WHERE id = ?;", params)
+        print(f"[DB PATCH] Added numeric magnitude/size columns (backfilled {len(params)} objects)")
+
     # --- Project Model Patches ---
     cols_projects = conn.exec_driver_sql("PRAGMA table_info(projects);").fetchall()
     colnames_projects = {row[1] for row in cols_projects}
@@ -860,6 +898,18 @@ def _run_schema_patches(conn):
     conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_astro_objects_object_name ON astro_objects(object_name);")
     conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_rigs_rig_name ON rigs(rig_name);")
 
+    # --- PERFORMANCE: Composite indexes for hot per-user lookups ---
+    # astro_objects / journal_sessions are shared by all users, so these keep
+    # the dashboard batch, outlook worker and session counts on index seeks.
+    for idx_name, table, columns in HOT_QUERY_INDEXES:
+        try:
+            if _has_covering_index(conn, table, columns):
+                continue
+            conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {idx_name} ON {table}({', '.join(columns)});")
+            print(f"[DB PATCH] Created performance index {idx_name} on {table}")
+        except Exception as idx_err:
+            print(f"[DB PATCH] Could not create index {idx_name}: {idx_err}")
+
     # --- User Custom Filters Table ---
     user_custom_filters_exists = conn.exec_driver_sql(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='user_custom_filters';"
@@ -915,8 +965,8 @@ def _run_schema_patches(conn):
 
 def ensure_db_initialized_unified():
     """
-    Create tables if missing, ensure schema patches (external_id column),
-    and set SQLite pragmas before any queries or migrations run.
+    Create tables if missing and ensure schema patches (external_id column).
+    SQLite pragmas are applied per connection by nova.db_pool.
     """
     lock_path = os.path.join(INSTANCE_PATH, "schema_patch.lock")
     with _FileLock(lock_path):
@@ -931,14 +981,6 @@ def ensure_db_initialized_unified():
                 except Exception:
                     pass  # column already exists
 
-        # Set pragmas BEFORE any transaction (SQLite restriction)
-        with engine.connect() as pragma_conn:
-            pragma_conn.exec_driver_sql("PRAGMA journal_mode=WAL;")
-            pragma_conn.exec_driver_sql("PRAGMA synchronous=NORMAL;")
-            pragma_conn.exec_driver_sql("PRAGMA cache_size = -20000;")    # 20MB page cache
-            pragma_conn.exec_driver_sql("PRAGMA temp_store = MEMORY;")    # temp tables in RAM
-            pragma_conn.exec_driver_sql("PRAGMA mmap_size = 30000000;")   # 30MB memory-mapped I/O
-
         with engine.begin() as conn:
             _run_schema_patches(conn)
 
@@ -1362,6 +1404,10 @@ app.config['AI_API_KEY'] = AI_API_KEY
 app.config['AI_MODEL'] = AI_MODEL
 app.config['AI_BASE_URL'] = AI_BASE_URL
 app.config['AI_ALLOWED_USERS'] = AI_ALLOWED_USERS
+app.config['AI_CACHE_TTL_HOURS'] = AI_CACHE_TTL_HOURS
+app.config['AI_DAILY_QUOTA'] = AI_DAILY_QUOTA
+app.config['AI_PROMPT_TOKEN_BUDGET'] = AI_PROMPT_TOKEN_BUDGET
+app.config['AI_BEST_OBJECTS_TOP_K'] = AI_BEST_OBJECTS_TOP_K
 
 # --- Internationalization (i18n) with Flask-Babel ---
 app.config['BABEL_DEFAULT_LOCALE'] = 'en'
@@ -1405,8 +1451,10 @@ def set_cache_headers(response):
         response.headers['Cache-Control'] = 'public, max-age=86400'  # 1 day
     elif path == '/favicon.ico':
         response.headers['Cache-Control'] = 'public, max-age=2592000'  # 30 days
-    elif response.content_type and 'application/json' in response.content_type:
-        response.headers['Cache-Control'] = 'no-store'
+    elif response.content_type and 'application/json' in response.content_type or response.status_code == 304:
+        if not response.headers.get('ETag'):
+            response.headers['Cache-Control'] = 'no-store'
+        # else: validator-backed responses keep the Cache-Control set by the view
     else:
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
@@ -1478,9 +1526,15 @@ def load_global_request_context():
         g.db_user = None
         return
 
-    # 4. Get DB user and UI preferences (FAST queries)
-    db = get_db()
+    # 4. Get DB user and UI preferences (cached per user; invalidated on DbUser/UiPref writes)
     try:
+        cached_context = user_context_cache.get(username)
+        if cached_context is not None:
+            g.db_user, g.user_config = cached_context
+            load_effective_settings()
+            return
+
+        db = get_db()
         # Get or create the user in app.db. This is the crucial line.
         # It handles provisioning/seeding if the user doesn't exist.
         app_db_user = get_or_create_db_user(db, username)
@@ -1490,13 +1544,15 @@ def load_global_request_context():
             return
 
         # --- Load UI Prefs (general settings) ---
-        g.user_config = {}
+        user_config = {}
         prefs = db.query(UiPref).filter_by(user_id=app_db_user.id).first()
         if prefs and prefs.json_blob:
             try:
-                g.user_config = json.loads(prefs.json_blob)
+                user_config = json.loads(prefs.json_blob)
             except json.JSONDecodeError:
-                pass  # g.user_config remains {}
+                pass  # user_config remains {}
+        g.db_user = user_context_cache.put(app_db_user, user_config)
+        g.user_config = dict(user_config)
 
         # 5. Load effective settings (depends on g.user_config)
         load_effective_settings()
@@ -2052,18 +2108,7 @@ def warm_main_cache(username, location_name, user_config, sampling_interval):
                     if max_culm < altitude_threshold:
                         # Object never rises above threshold. Cache immediately as impossible.
                         cache_key = f"{username}_{obj_name.lower().replace(' ', '_')}_{local_date}_{lat:.4f}_{lon:.4f}_{altitude_threshold}_{sampling_interval}"
-                        nightly_curves_cache[cache_key] = {
-                            "times_local": [],
-                            "altitudes": [],
-                            "azimuths": [],
-                            "transit_time": "N/A",
-                            "obs_duration_minutes": 0,
-                            "max_altitude": round(max_culm, 1),
-                            "alt_11pm": "N/A",
-                            "az_11pm": "N/A",
-                            "is_obstructed_at_11pm": False,
-                            "is_geometrically_impossible": True
-                        }
+                        nightly_curves_cache[cache_key] = NightlyCurve.impossible(round(max_culm, 1))
                         continue  # Skip adding to vectors
 
                 # If visible, add to lists for heavy calculation
@@ -2103,6 +2148,7 @@ def warm_main_cache(username, location_name, user_config, sampling_interval):
 
         # --- 5. PROCESS RESULTS & CACHE ---
         fixed_time_utc_str = get_utc_time_for_local_11pm(tz_name)
+        time_axis = shared_time_axis(tz_name, local_date, sampling_interval, times_utc)
 
         # Pre-calculate Vectorized Horizon Mask (xp, fp) to avoid Python looping
         mask_xp, mask_fp = None, None
@@ -2172,17 +2218,15 @@ def warm_main_cache(username, location_name, user_config, sampling_interval):
                 if alt_11pm >= altitude_threshold and alt_11pm < required_altitude_11pm:
                     is_obstructed_at_11pm = True
 
-            nightly_curves_cache[cache_key] = {
-                "times_local": times_local,
-                "altitudes": altitudes,
-                "azimuths": azimuths,
-                "transit_time": transit_time,
-                "obs_duration_minutes": int(obs_duration_minutes),
-                "max_altitude": round(float(max_alt), 1),
-                "alt_11pm": f"{alt_11pm:.2f}",
-                "az_11pm": f"{az_11pm:.2f}",
-                "is_obstructed_at_11pm": is_obstructed_at_11pm
-            }
+            nightly_curves_cache[cache_key] = NightlyCurve(
+                time_axis, altitudes, azimuths,
+                transit_time=transit_time,
+                obs_duration_minutes=int(obs_duration_minutes),
+                max_altitude=round(float(max_alt), 1),
+                alt_11pm=f"{alt_11pm:.2f}",
+                az_11pm=f"{az_11pm:.2f}",
+                is_obstructed_at_11pm=is_obstructed_at_11pm
+            )
 
         # --- 4. TRIGGER OUTLOOK CACHE (Unchanged) ---
         try:
@@ -2253,14 +2297,14 @@ def warm_main_cache(username, location_name, user_config, sampling_interval):
                 if alt_11pm >= altitude_threshold and alt_11pm < required_altitude_11pm:
                     is_obstructed_at_11pm = True
 
-            nightly_curves_cache[cache_key] = {
-                "times_local": times_local, "altitudes": altitudes, "azimuths": azimuths,
-                "transit_time": transit_time,
-                "obs_duration_minutes": int(obs_duration.total_seconds() / 60) if obs_duration else 0,
-                "max_altitude": round(max_alt, 1) if max_alt is not None else "N/A",
-                "alt_11pm": f"{alt_11pm:.2f}", "az_11pm": f"{az_11pm:.2f}",
-                "is_obstructed_at_11pm": is_obstructed_at_11pm
-            }
+            nightly_curves_cache[cache_key] = NightlyCurve(
+                shared_time_axis(tz_name, local_date, sampling_interval, times_utc), altitudes, azimuths,
+                transit_time=transit_time,
+                obs_duration_minutes=int(obs_duration.total_seconds() / 60) if obs_duration else 0,
+                max_altitude=round(max_alt, 1) if max_alt is not None else "N/A",
+                alt_11pm=f"{alt_11pm:.2f}", az_11pm=f"{az_11pm:.2f}",
+                is_obstructed_at_11pm=is_obstructed_at_11pm
+            )
 
         # --- 4. TRIGGER OUTLOOK CACHE (Unchanged) ---
         # Generate standard filename keys
@@ -2393,22 +2437,14 @@ def build_telemetry_payload(user_config, browser_user_agent: str = ''):
     feature_usage: dict = {}
     login_count_30d = 0
     try:
-        from nova.models import AnalyticsEvent, AnalyticsLogin
-        from sqlalchemy import func as sa_func
+        from nova.analytics import event_counts_since, login_counts_since
         cutoff = date.today() - timedelta(days=30)
         session = SessionLocal()
         try:
-            rows = session.query(
-                AnalyticsEvent.event_name,
-                sa_func.sum(AnalyticsEvent.count)
-            ).filter(AnalyticsEvent.date >= cutoff)\
-             .group_by(AnalyticsEvent.event_name).all()
-            feature_usage = {r[0]: int(r[1]) for r in rows}
-
-            login_count_30d = session.query(
-                sa_func.sum(AnalyticsLogin.login_count)
-            ).filter(AnalyticsLogin.date >= cutoff).scalar() or 0
-            login_count_30d = int(login_count_30d)
+            # Includes counts still sitting in the write-behind buffer
+            for (name, _day), count in event_counts_since(session, cutoff).items():
+                feature_usage[name] = feature_usage.get(name, 0) + int(count)
+            login_count_30d = int(sum(login_counts_since(session, cutoff).values()))
         finally:
             session.close()
     except Exception as e:
@@ -2840,7 +2876,7 @@ def check_and_fill_object_data(config_data):
             object_had_an_update_this_round = False
 
             try:
-                fetched_data = nova_data_fetcher.get_astronomical_data(object_name)
+                fetched_data = fetch_object_metadata(object_name)
 
                 for config_key, fetcher_key in fields_that_need_update.items():
                     new_value_from_fetcher = fetched_data.get(fetcher_key)
@@ -3623,6 +3659,31 @@ def reset_guest_from_template_command():
         traceback.print_exc()
 
 
+@app.cli.command("build-dso-index")
+@click.argument("sources", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+def build_dso_index_command(sources):
+    """
+    Rebuilds the bundled offline DSO index (nova/data/dso_index/).
+    Accepts catalog pack / config YAML files and OpenNGC CSV files; earlier
+    sources win when the same object appears twice. Defaults to the shipped
+    config_default.yaml.
+    """
+    from nova.dso_index import build_dso_index, entries_from_yaml_objects, entries_from_openngc_csv
+
+    sources = sources or (os.path.join(TEMPLATE_DIR, "config_default.yaml"),)
+
+    def _all_entries():
+        for path in sources:
+            print(f"Reading {path} ...")
+            if path.lower().endswith(".csv"):
+                yield from entries_from_openngc_csv(path)
+            else:
+                yield from entries_from_yaml_objects(path)
+
+    count = build_dso_index(_all_entries())
+    print(f"✅ DSO index rebuilt with {count} objects.")
+
+
 # =============================================================================
 # Register Blueprints (must be after all route definitions)
 # =============================================================================
@@ -0,0 +1,205 @@
+"""AI response cache and per-user quotas.
+
+Responses are stored in a SQLite file in the cache directory, keyed by a
+content hash of (provider, model, system prompt, user prompt, locale,
+max_tokens). Asking the same question again (e.g. repeated "Ask Nova" clicks
+for the same object and night) replays the stored answer instead of paying
+provider latency and tokens; streaming endpoints replay it as a stream.
+
+Only provider calls (cache misses) count against the per-user daily quota.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from nova.ai.service import AIServiceError, get_ai_response
+from nova.config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_PATH = os.path.join(CACHE_DIR, "ai_responses.sqlite")
+
+
+class AIQuotaExceeded(AIServiceError):
+    """Raised when a user has used up their daily AI provider calls."""
+    pass
+
+
+def ai_cache_key(provider: str, model: str, system: str, prompt: str, locale: str, max_tokens: int) -> str:
+    """Content hash identifying one AI request."""
+    blob = json.dumps([provider, model, system, prompt, locale, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """Persistent response store plus per-user daily call counters."""
+
+    def __init__(self, path: str = AI_CACHE_PATH):
+        self.path = path
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_response ("
+                " key TEXT PRIMARY KEY, username TEXT, response TEXT NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_usage ("
+                " username TEXT NOT NULL, day TEXT NOT NULL, calls INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (username, day))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit/rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str, now: float = None):
+        """Cached response text, or None if missing or expired."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM ai_response WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        with self._lock:
+            self.stats["hits" if row else "misses"] += 1
+        return row[0] if row else None
+
+    def put(self, key: str, response: str, ttl_s: float, username: str = None, now: float = None) -> None:
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_response (key, username, response, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, username, response, now, now + ttl_s)
+            )
+        with self._lock:
+            self.stats["stored"] += 1
+
+    def prune(self, now: float = None) -> int:
+        """Delete expired responses; returns the number removed."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM ai_response WHERE expires_at <= ?", (now,)).rowcount
+
+    @staticmethod
+    def _day(now: float = None) -> str:
+        return datetime.fromtimestamp(time.time() if now is None else now, timezone.utc).strftime("%Y-%m-%d")
+
+    def calls_today(self, username: str, now: float = None) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT calls FROM ai_usage WHERE username = ? AND day = ?", (username, self._day(now))
+            ).fetchone()
+        return row[0] if row else 0
+
+    def consume_quota(self, username: str, daily_limit: int, now: float = None) -> bool:
+        """Count one provider call for username; False (and nothing counted) if the limit is reached."""
+        day = self._day(now)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT calls FROM ai_usage WHERE username = ? AND day = ?", (username, day)
+            ).fetchone()
+            calls = row[0] if row else 0
+            if daily_limit and calls >= daily_limit:
+                return False
+            conn.execute(
+                "INSERT INTO ai_usage (username, day, calls) VALUES (?, ?, 1)"
+                " ON CONFLICT(username, day) DO UPDATE SET calls = calls + 1",
+                (username, day)
+            )
+        return True
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache() -> AIResponseCache:
+    """Process-wide AI response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AIResponseCache()
+        return _cache
+
+
+def set_ai_cache(cache):
+    """Install a cache (e.g. on a temporary file); returns the previous one."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+        return previous
+
+
+def _replay(text: str):
+    """Replay a cached response as a stream, one line per chunk."""
+    for line in text.splitlines(keepends=True):
+        yield line
+
+
+def get_cached_ai_response(prompt: str, system: str = None, stream: bool = False, max_tokens: int = 4000,
+                           timeout: int = 120, locale: str = None, username: str = None) -> str | object:
+    """get_ai_response() with the response cache and per-user quota in front of it.
+
+    Args:
+        prompt, system, stream, max_tokens, timeout: As for get_ai_response().
+        locale: Response language; part of the cache key.
+        username: User charged for provider calls (quota) and recorded with the entry.
+
+    Returns:
+        The response text, or a generator of text chunks if stream=True.
+
+    Raises:
+        AIQuotaExceeded: On a cache miss when the user's daily quota is used up.
+        AIServiceError: If the provider request fails (nothing is cached).
+    """
+    config = current_app.config
+    ttl_s = float(config.get("AI_CACHE_TTL_HOURS", 24)) * 3600
+    daily_limit = int(config.get("AI_DAILY_QUOTA", 0) or 0)
+    cache = get_ai_cache() if ttl_s > 0 else None
+
+    key = ai_cache_key(config.get("AI_PROVIDER", "").lower(), config.get("AI_MODEL") or "",
+                       system or "", prompt, locale or "", max_tokens)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return _replay(cached) if stream else cached
+
+    if username and daily_limit and not get_ai_cache().consume_quota(username, daily_limit):
+        raise AIQuotaExceeded(f"Daily AI request limit reached ({daily_limit})")
+
+    response = get_ai_response(prompt, system=system, stream=stream, max_tokens=max_tokens, timeout=timeout)
+    if cache is None:
+        return response
+    if not stream:
+        if response:
+            cache.put(key, response, ttl_s, username)
+        return response
+
+    def _record(chunks):
+        # Store the stream only once it completed; a provider error mid-stream caches nothing
+        parts = []
+        for chunk in chunks:
+            if chunk:
+                parts.append(chunk)
+            yield chunk
+        if parts:
+            cache.put(key, "".join(parts), ttl_s, username)
+    return _record(response)
@@ -0,0 +1,152 @@
+"""Server-side candidate selection for the AI best-objects ranking.
+
+Instead of the browser posting its whole object list, the candidates are
+built from the database: one column query over the user's objects (numeric
+magnitude / size from the magnitude_num / size_arcmin columns), duration and
+max altitude from the shared nightly snapshot, and moon separation for all
+objects in one vectorized pass. The filter stages (enabled, observable
+duration, max altitude, moon separation, size, magnitude) are applied as
+array masks, and only the top-K survivors (same ranking as
+budget_objects_for_prompt) are turned into prompt dicts.
+"""
+
+import math
+from datetime import datetime, time
+
+import numpy as np
+import pytz
+
+from nova.models import AstroObject
+from nova.nightly_curves import moon_separations
+from nova.nightly_snapshot import get_nightly_snapshot, nightly_settings
+
+DEFAULT_TOP_K = 150
+
+
+def limiting_magnitude(max_aperture_mm):
+    """Faintest magnitude reachable with the aperture (2.1 + 5 * log10(mm)), or None."""
+    if max_aperture_mm and max_aperture_mm > 0:
+        return 2.1 + 5 * math.log10(max_aperture_mm)
+    return None
+
+
+def filter_and_rank(enabled, minutes, max_alts, moon_seps, sizes, mags, user_settings, moon_illumination_pct,
+                    max_aperture_mm=None, top_k=None):
+    """
+    Best-objects pre-filter over per-object arrays (NaN = unknown) followed
+    by the ranking. Unknown moon separation, size or magnitude never filters
+    an object out.
+
+    Args:
+        enabled: bool array.
+        minutes, max_alts: Observable minutes / max altitude arrays.
+        moon_seps, sizes, mags: Moon separation (deg), size (arcmin) and magnitude arrays.
+        user_settings: Dict with min_observable_minutes / min_max_altitude.
+        moon_illumination_pct: Moon illumination (0-100).
+        max_aperture_mm: Largest rig aperture; None skips the magnitude stage.
+        top_k: Keep at most this many survivors (None keeps all).
+
+    Returns:
+        Tuple: (indices of the kept objects in rank order, counts_dict)
+    """
+    n = len(enabled)
+    keep = np.asarray(enabled, dtype=bool).copy()
+    counts = {"total_in": n, "enabled_count": int(keep.sum())}
+
+    keep &= minutes >= user_settings.get("min_observable_minutes", 60)
+    counts["after_obs"] = int(keep.sum())
+    keep &= max_alts >= user_settings.get("min_max_altitude", 30)
+    counts["after_alt"] = int(keep.sum())
+    keep &= np.isnan(moon_seps) | (moon_seps >= moon_illumination_pct * 0.55)
+    counts["after_moon"] = int(keep.sum())
+    keep &= np.isnan(sizes) | (sizes >= 3)
+    counts["after_size"] = int(keep.sum())
+    limiting_mag = limiting_magnitude(max_aperture_mm)
+    if limiting_mag is not None:
+        keep &= np.isnan(mags) | (mags <= limiting_mag)
+    counts["after_magnitude"] = int(keep.sum())
+    counts["total_out"] = counts["after_magnitude"]
+
+    idx = np.flatnonzero(keep)
+    # Observable duration, max altitude, moon separation (descending), then input order (name)
+    order = np.lexsort((idx, -np.nan_to_num(moon_seps[idx]), -max_alts[idx], -minutes[idx]))
+    ranked = idx[order]
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return ranked, counts
+
+
+def _nan_if_none(values):
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+
+def build_best_object_candidates(db, user_id, location, user_prefs, user_settings, moon_illumination_pct,
+                                 max_aperture_mm=None, local_date=None, top_k=DEFAULT_TOP_K):
+    """
+    Pre-filtered, ranked candidates for the best-objects prompt.
+
+    Args:
+        db: Session.
+        user_id: Owner of the objects.
+        location: Location (with horizon_points) to compute visibility for.
+        user_prefs: User config dict (altitude threshold / sampling defaults).
+        user_settings: Dict with min_observable_minutes / min_max_altitude.
+        moon_illumination_pct: Moon illumination (0-100).
+        max_aperture_mm: Largest rig aperture, or None.
+        local_date: 'YYYY-MM-DD' observing night (default: tonight at the location).
+        top_k: Maximum number of candidates returned (None for all survivors).
+
+    Returns:
+        Tuple: (candidate dicts in rank order, counts_dict). Candidate dicts use
+        the keys of compress_objects_for_prompt(), with numeric Magnitude / Size
+        (None when unknown).
+    """
+    tonight, altitude_threshold, sampling_interval, horizon_mask = nightly_settings(location, user_prefs or {})
+    local_date = local_date or tonight
+    tz_name = location.timezone or "UTC"
+    snapshot = get_nightly_snapshot(db, user_id, location.lat, location.lon, tz_name, local_date,
+                                    altitude_threshold, sampling_interval, horizon_mask)
+
+    rows = db.query(
+        AstroObject.object_name, AstroObject.common_name, AstroObject.type, AstroObject.constellation,
+        AstroObject.magnitude_num, AstroObject.size_arcmin, AstroObject.ra_hours, AstroObject.dec_deg,
+        AstroObject.enabled,
+    ).filter(AstroObject.user_id == user_id).order_by(AstroObject.object_name).all()
+
+    if not rows:
+        return [], {"total_in": 0, "enabled_count": 0, "after_obs": 0, "after_alt": 0, "after_moon": 0,
+                    "after_size": 0, "after_magnitude": 0, "total_out": 0}
+
+    names = [r.object_name for r in rows]
+    minutes, max_alts = snapshot.take(names)
+    mags = _nan_if_none(r.magnitude_num for r in rows)
+    sizes = _nan_if_none(r.size_arcmin for r in rows)
+
+    # Moon separation at 11 PM local of the observing night (matches the dashboard)
+    local_tz = pytz.timezone(tz_name)
+    time_11pm = local_tz.localize(datetime.combine(datetime.strptime(local_date, "%Y-%m-%d").date(), time(23, 0)))
+    moon_seps = moon_separations([r.ra_hours for r in rows], [r.dec_deg for r in rows],
+                                 location.lat, location.lon, time_11pm.timestamp())
+    if moon_seps is None:
+        moon_seps = np.full(len(rows), np.nan)
+
+    ranked, counts = filter_and_rank(
+        np.array([bool(r.enabled) for r in rows]), minutes, max_alts, moon_seps, sizes, mags,
+        user_settings, moon_illumination_pct or 0, max_aperture_mm, top_k)
+
+    candidates = []
+    for k in ranked:
+        row = rows[k]
+        candidates.append({
+            "Object": row.object_name,
+            "Common Name": row.common_name or "",
+            "Type": row.type,
+            "Constellation": row.constellation,
+            "Magnitude": None if np.isnan(mags[k]) else float(mags[k]),
+            "Size": None if np.isnan(sizes[k]) else float(sizes[k]),
+            "Observable Duration (min)": int(minutes[k]),
+            "Max Altitude (°)": round(float(max_alts[k]), 1),
+            "Angular Separation (°)": None if np.isnan(moon_seps[k]) else float(moon_seps[k]),
+            "enabled": True,
+        })
+    return candidates, counts
@@ -24,8 +24,9 @@ from nova.ai.prompts import (
     build_session_summary_prompt,
     build_best_objects_prompt,
 )
-from nova.ai.service import get_ai_response, AIServiceError
-import math
+from nova.ai.service import AIServiceError
+from nova.ai.cache import AIQuotaExceeded, get_cached_ai_response
+from nova.ai.candidates import DEFAULT_TOP_K, build_best_object_candidates
 
 from nova.helpers import get_db
 from nova.models import AstroObject, Location, Rig, JournalSession, SavedFraming
@@ -102,137 +103,48 @@ def compress_objects_for_prompt(objects: list[dict]) -> str:
     return "\n".join(lines)
 
 
-def pre_filter_objects(objects, user_settings, moon_illumination_pct, max_aperture_mm=None):
-    """Pre-filter objects based on user settings and conditions.
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting (~4 characters per token)."""
+    return (len(text) + 3) // 4
 
-    Filters are applied in order, fail-fast per object. Returns both filtered
-    objects and a counts dictionary for debugging/logging.
+
+def budget_objects_for_prompt(objects: list[dict], token_budget: int) -> list[dict]:
+    """Ranks objects and keeps the best ones whose compressed lines fit the token budget.
+
+    Objects are ranked by observable duration, then max altitude, then moon
+    separation (all descending), so truncation drops the weakest candidates.
 
     Args:
-        objects: List of object dicts with keys:
-            - Object (name)
-            - enabled (bool)
-            - Magnitude (string or float)
-            - Size (string representing arcmin)
-            - Observable Duration (min) (float)
-            - Max Altitude (°) (float)
-            - Angular Separation (°) (float)  # Note: typo preserved for compatibility
-        user_settings: Dict with keys:
-            - min_observable_minutes (int)
-            - min_max_altitude (float)
-        moon_illumination_pct: Float (0-100), moon illumination percentage
-        max_aperture_mm: Optional - largest aperture in mm from user's rigs. If None,
-                         skip magnitude filter entirely.
+        objects: Pre-filtered object dicts (see compress_objects_for_prompt).
+        token_budget: Maximum estimated tokens for the compressed object block.
+                      0 or less keeps everything (ranked).
 
     Returns:
-        Tuple: (filtered_objects, counts_dict)
-        filtered_objects: List of objects that pass all filters
-        counts_dict: Dict with filter stage counts
+        List of object dicts in rank order.
     """
-    # Calculate limiting magnitude if aperture is available
-    # Formula: limiting_mag = 2.1 + 5 * log10(aperture_mm)
-    limiting_mag = None
-    if max_aperture_mm and max_aperture_mm > 0:
-        limiting_mag = 2.1 + 5 * math.log10(max_aperture_mm)
-    # Initialize counts
-    counts = {
-        "total_in": len(objects),
-        "enabled_count": 0,
-        "after_obs": 0,
-        "after_alt": 0,
-        "after_moon": 0,
-        "after_size": 0,
-        "after_magnitude": 0,
-        "total_out": 0
-    }
-
-    # Extract settings with defaults
-    min_obs_duration = user_settings.get("min_observable_minutes", 60)
-    min_max_altitude = user_settings.get("min_max_altitude", 30)
-
-    # Helper to parse angular size from Size string
-    # Expected formats: "10'" (arcmin), "10x5'" (rectangular), "0.5°" (degrees)
-    def parse_angular_size(size_str):
-        if not size_str:
-            return None
+    def _num(value):
         try:
-            size_str = str(size_str).strip()
-            # Check for arcmin format (e.g., "10'", "10'", "10'")
-            if "'" in size_str:
-                # Remove the arcmin symbol and convert to float
-                size_str = size_str.replace("'", "").replace("′", "").replace("′", "")
-                # Handle rectangular format like "10x5"
-                if "x" in size_str.lower():
-                    parts = size_str.lower().split("x")
-                    # Average the dimensions
-                    values = [float(p) for p in parts if p]
-                    return sum(values) / len(values) if values else None
-                return float(size_str)
-            # Check for degree format (e.g., "0.5°")
-            elif "°" in size_str:
-                degrees = float(size_str.replace("°", ""))
-                return degrees * 60  # Convert to arcmin
-            else:
-                # Try direct float
-                return float(size_str)
-        except (ValueError, AttributeError):
-            return None
-
-    filtered = []
-    for obj in objects:
-        # Filter 1: enabled == True only
-        if not obj.get("enabled", True):
-            continue
-        counts["enabled_count"] += 1
-
-        # Filter 2: obs_duration >= user_settings.min_observable_duration
-        obs_duration = obj.get("Observable Duration (min)")
-        if obs_duration is None or obs_duration < min_obs_duration:
-            continue
-        counts["after_obs"] += 1
-
-        # Filter 3: max_altitude >= user_settings.min_max_altitude
-        max_altitude = obj.get("Max Altitude (°)")
-        if max_altitude is None or max_altitude < min_max_altitude:
-            continue
-        counts["after_alt"] += 1
-
-        # Filter 4: moon_separation >= moon_illumination_pct * 0.55
-        moon_sep = obj.get("Angular Separation (°)")
-        min_moon_sep = moon_illumination_pct * 0.55
-        if moon_sep is not None and moon_sep < min_moon_sep:
-            continue
-        counts["after_moon"] += 1
-
-        # Filter 5: angular_size >= 3 arcmin OR angular_size is null/0/unknown
-        angular_size = parse_angular_size(obj.get("Size"))
-        if angular_size is not None and angular_size < 3:
-            continue
-        counts["after_size"] += 1
-
-        # Filter 6: magnitude check
-        # If magnitude == 99 or null → keep
-        # Else keep only if within rig's aperture-based limiting magnitude
-        magnitude = obj.get("Magnitude")
-        if magnitude is not None:
-            try:
-                mag_val = float(magnitude)
-                if mag_val >= 90:  # Sentinel value for "unknown"
-                    # Keep - unknown magnitude
-                    pass
-                elif limiting_mag is not None and mag_val > limiting_mag:
-                    # Object is too faint for largest aperture
-                    continue
-                # Else: magnitude is known and within limits - keep
-            except (ValueError, TypeError):
-                # Invalid magnitude format - skip
-                continue
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    ranked = sorted(objects, key=lambda o: (-_num(o.get("Observable Duration (min)")),
+                                            -_num(o.get("Max Altitude (°)")),
+                                            -_num(o.get("Angular Separation (°)")),
+                                            str(o.get("Object", ""))))
+    if token_budget <= 0:
+        return ranked
+
+    kept = []
+    used = 0
+    for obj in ranked:
+        cost = estimate_tokens(compress_objects_for_prompt([obj])) + 1  # + newline
+        if used + cost > token_budget:
+            break
+        kept.append(obj)
+        used += cost
+    return kept
 
-        counts["after_magnitude"] += 1
-        filtered.append(obj)
-
-    counts["total_out"] = len(filtered)
-    return filtered, counts
 
 ai_bp = Blueprint("ai", __name__)
 
@@ -528,7 +440,8 @@ def generate_dso_notes():
         )
 
         # Get AI response
-        notes = get_ai_response(prompt["user"], system=prompt["system"], max_tokens=2500)
+        notes = get_cached_ai_response(prompt["user"], system=prompt["system"], max_tokens=2500,
+                                       locale=locale, username=username)
 
         import re
         notes = notes.strip()
@@ -571,6 +484,9 @@ def generate_dso_notes():
 
         return jsonify({"notes": notes})
 
+    except AIQuotaExceeded as e:
+        return jsonify({"error": str(e)}), 429
+
     except AIServiceError as e:
         logger.error(f"AIServiceError in /api/ai/notes: {str(e)}")
         return jsonify({"error": str(e)}), 503
@@ -809,7 +725,8 @@ def generate_session_summary():
             full_content = []
             buffer = ""
 
-            for chunk in get_ai_response(prompt["user"], system=prompt["system"], stream=True, max_tokens=5000):
+            for chunk in get_cached_ai_response(prompt["user"], system=prompt["system"], stream=True,
+                                                max_tokens=5000, locale=locale, username=username):
                 if not chunk:
                     continue
 
@@ -943,7 +860,8 @@ def generate_session_summary():
             full_content = []
             buffer = ""
 
-            for chunk in get_ai_response(prompt["user"], system=prompt["system"], stream=True, max_tokens=5000):
+            for chunk in get_cached_ai_response(prompt["user"], system=prompt["system"], stream=True,
+                                                max_tokens=5000, locale=locale, username=username):
                 if not chunk:
                     continue
 
@@ -1002,10 +920,6 @@ def get_best_objects():
 
     Request body:
         JSON: {
-            "object_list": list of object dicts with keys: Object, Common Name, Type,
-                     Magnitude, Size, Constellation, Altitude, Azimuth,
-                     Observable Duration (min), Max Altitude (°),
-                     Angular Separation (°), etc.
             "location_name": str, name of the observing location
             "sim_date": str or None, date in YYYY-MM-DD format (None for live mode)
         }
@@ -1032,13 +946,9 @@ def get_best_objects():
     if not data:
         return jsonify({"error": "Request body is required"}), 400
 
-    object_list = data.get("object_list", [])
     location_name = data.get("location_name")
     sim_date = data.get("sim_date")
 
-    if not object_list:
-        return jsonify({"error": "object_list is required"}), 400
-
     if not location_name:
         return jsonify({"error": "location_name is required"}), 400
 
@@ -1059,6 +969,7 @@ def get_best_objects():
 
     # Get moon illumination for date/location
     moon_phase = None
+    local_date = None
     try:
         # Safe fallback timezone (used for sim_mode)
         local_tz = pytz.timezone(location.timezone or "UTC")
@@ -1074,6 +985,7 @@ def get_best_objects():
                 date_obj = now_local.date() - timedelta(days=1)
             else:
                 date_obj = now_local.date()
+        local_date = date_obj.strftime("%Y-%m-%d")
 
         # Use 11 PM local for moon phase calculation (matches dashboard)
         time_11pm_local = local_tz.localize(
@@ -1136,12 +1048,11 @@ def get_best_objects():
             } if rig.camera else None,
         })
 
-    # Run pre_filter_objects on incoming object list
-    filtered_objects, counts = pre_filter_objects(
-        object_list,
-        user_settings,
-        moon_phase if moon_phase is not None else 0,
-        max_aperture_mm
+    # Pre-filter and rank the user's catalog server-side (top-K survivors only)
+    filtered_objects, counts = build_best_object_candidates(
+        db, g.db_user.id, location, getattr(g, "user_config", {}) or {}, user_settings,
+        moon_phase if moon_phase is not None else 0, max_aperture_mm, local_date=local_date,
+        top_k=int(current_app.config.get("AI_BEST_OBJECTS_TOP_K", DEFAULT_TOP_K) or 0) or None,
     )
 
     logger.info(f"Pre-filter counts: {counts}")
@@ -1156,7 +1067,9 @@ def get_best_objects():
             "debug_prompt_object_block": ""
         })
 
-    objects_for_prompt = filtered_objects
+    # Rank and truncate to the prompt token budget before building the prompt
+    objects_for_prompt = budget_objects_for_prompt(
+        filtered_objects, int(current_app.config.get("AI_PROMPT_TOKEN_BUDGET", 0) or 0))
 
     # Compress objects for AI prompt
     compressed_objects = compress_objects_for_prompt(objects_for_prompt)
@@ -1178,7 +1091,8 @@ def get_best_objects():
         )
 
         # Get AI response for ranking (increased timeout for large JSON response)
-        ranking_response = get_ai_response(ranking_prompt["user"], system=ranking_prompt["system"], max_tokens=6000, timeout=300)
+        ranking_response = get_cached_ai_response(ranking_prompt["user"], system=ranking_prompt["system"],
+                                                  max_tokens=6000, timeout=300, locale=locale, username=username)
 
         # Parse ranking response to extract ranked objects
         # Expected format: JSON array with objects having "Object" key
@@ -1256,6 +1170,9 @@ def get_best_objects():
             "debug_prompt_object_block": compressed_objects,
         })
 
+    except AIQuotaExceeded as e:
+        return jsonify({"error": str(e)}), 429
+
     except AIServiceError as e:
         logger.error(f"AIServiceError in /api/ai/best_objects: {str(e)}")
         return jsonify({"error": str(e)}), 503
@@ -1378,90 +1295,12 @@ def prefilter_debug():
             user_id=g.db_user.id
         ).first()
 
-    # Get all enabled objects from DB for this user
-    obj_records = db.query(AstroObject).filter_by(
-        user_id=g.db_user.id
-    ).all()
-
-    # Import calculation functions
-    from modules.astro_calculations import (
-        calculate_transit_time,
-        calculate_observable_duration_vectorized,
-    )
-
-    # Build object list with computed fields
-    all_objects = []
-    for obj_record in obj_records:
-        try:
-            if not location:
-                # Skip if no location available
-                continue
-
-            ra = obj_record.ra_hours
-            dec = obj_record.dec_deg
-            lat = location.lat
-            lon = location.lon
-            tz_name = location.timezone or "UTC"
-            altitude_threshold = location.altitude_threshold or 20
-
-            # Calculate observable duration and max altitude
-            obs_duration, max_altitude, _, _ = calculate_observable_duration_vectorized(
-                ra, dec, lat, lon, local_date_str, tz_name, altitude_threshold
-            )
-
-            # Calculate transit time (for 11 PM altitude reference)
-            transit_time = calculate_transit_time(
-                ra, dec, lat, lon, tz_name, local_date_str
-            )
-
-            # Calculate moon separation at 11 PM
-            angular_sep = None
-            try:
-                # Parse transit time for datetime conversion
-                if transit_time and transit_time != "N/A":
-                    time_11pm_local = pytz.timezone(tz_name).localize(
-                        datetime.combine(
-                            datetime.strptime(local_date_str, "%Y-%m-%d"),
-                            datetime.strptime(transit_time, "%H:%M").time()
-                        )
-                    )
-                    dt_11pm_utc = time_11pm_local.astimezone(pytz.utc)
-                    time_obj = Time(dt_11pm_utc)
-                    loc_obj = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
-                    obj_coord = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg)
-                    frame = AltAz(obstime=time_obj, location=loc_obj)
-                    moon_coord = get_body("moon", time_obj, loc_obj)
-                    angular_sep = round(obj_coord.transform_to(frame).separation(
-                        moon_coord.transform_to(frame)
-                    ).deg, 1)
-            except Exception as e:
-                logger.debug(f"Failed to calculate moon separation for {obj_record.object_name}: {e}")
-
-            obs_duration_min = int(obs_duration.total_seconds() / 60) if obs_duration else 0
-            max_altitude_val = round(max_altitude, 1) if max_altitude is not None else 0
-
-            all_objects.append({
-                "Object": obj_record.object_name,
-                "enabled": obj_record.enabled,
-                "Magnitude": obj_record.magnitude,
-                "Size": obj_record.size,
-                "Type": obj_record.type,
-                "Constellation": obj_record.constellation,
-                "Observable Duration (min)": obs_duration_min,
-                "Max Altitude (°)": max_altitude_val,
-                "Angular Separation (°)": angular_sep,
-            })
-        except Exception as e:
-            logger.debug(f"Failed to calculate data for {obj_record.object_name}: {e}")
-            continue
-
-    # Run pre-filter
-    filtered_objects, counts = pre_filter_objects(
-        all_objects,
-        user_settings,
-        moon_phase,
-        max_aperture_mm
-    )
+    # Same server-side candidate builder as /api/ai/best_objects, without the top-K cut
+    filtered_objects, counts = [], {"total_in": 0}
+    if location:
+        filtered_objects, counts = build_best_object_candidates(
+            db, g.db_user.id, location, getattr(g, "user_config", {}) or {}, user_settings,
+            moon_phase, max_aperture_mm, top_k=None)
 
     # Build surviving objects list with key values
     surviving_objects = [
@@ -1483,7 +1322,7 @@ def prefilter_debug():
         "user_settings": user_settings,
         "max_aperture_mm": max_aperture_mm,
         "surviving_objects": surviving_objects,
-        "total_catalog_size": len(all_objects),
+        "total_catalog_size": counts["total_in"],
     })
 
 
@@ -1,6 +1,7 @@
 """AI provider abstraction layer.
 
-Provides a unified interface for multiple AI providers (Anthropic, OpenAI, Ollama).
+Provides a unified interface for multiple AI providers (Anthropic, OpenAI, Ollama),
+plus a local "stub" provider for tests and offline development.
 """
 
 import requests
@@ -53,6 +54,10 @@ def get_ai_response(prompt: str, system: str = None, stream: bool = False, max_t
         if stream:
             return _stream_ollama(base_url, model, prompt, system)
         return _call_ollama(base_url, model, prompt, system)
+    elif provider == "stub":
+        if stream:
+            return _stream_stub(prompt, system)
+        return _call_stub(prompt, system)
     else:
         raise AIServiceError(f"Unsupported AI provider: {provider}")
 
@@ -208,3 +213,17 @@ def _stream_ollama(base_url: str, model: str, prompt: str, system: str = None):
                     yield chunk["response"]
     except Exception as e:
         raise AIServiceError(str(e))
+
+
+def _call_stub(prompt: str, system: str = None) -> str:
+    """Local stub provider: AI_STUB_RESPONSE if configured, else a short echo of the prompt size."""
+    response = current_app.config.get("AI_STUB_RESPONSE")
+    if response is not None:
+        return response
+    return f"Stub response for a {len(prompt)}-character prompt."
+
+
+def _stream_stub(prompt: str, system: str = None):
+    """Stream the stub response line by line."""
+    for line in _call_stub(prompt, system).splitlines(keepends=True):
+        yield line
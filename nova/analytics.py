@@ -8,7 +8,11 @@ GDPR-compliant analytics system for tracking feature usage and login activity.
 - Only runs in multi-user mode (SINGLE_USER_MODE=False)
 - Users can be excluded via ANALYTICS_EXCLUDE_USERS env var
 """
+import atexit
 import os
+import threading
+import time
+from collections import Counter
 from datetime import date
 from flask import current_app, request
 from flask_login import current_user
@@ -47,9 +51,117 @@ def _is_enabled() -> bool:
     return True
 
 
+# --- Write-behind counter buffer ---
+# Hot routes only bump in-memory counters; a daemon thread (and atexit) writes
+# them out as one INSERT ... ON CONFLICT DO UPDATE per table, so page views no
+# longer each take the SQLite write lock.
+ANALYTICS_FLUSH_SECONDS = int(os.getenv('ANALYTICS_FLUSH_SECONDS', '30'))
+
+_event_buffer = Counter()  # (event_name, date) -> count
+_login_buffer = Counter()  # date -> count
+_buffer_lock = threading.Lock()
+_flusher_started = False
+
+
+def _ensure_flusher() -> None:
+    global _flusher_started
+    if _flusher_started:
+        return
+    with _buffer_lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+    threading.Thread(target=_flush_loop, name="nova-analytics-flush", daemon=True).start()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(ANALYTICS_FLUSH_SECONDS)
+        flush_analytics()
+
+
+def flush_analytics() -> int:
+    """
+    Write buffered counters to the database in one batch per table.
+    Returns the number of (event, day) / (login, day) rows written. On failure
+    the counts are put back into the buffer for the next attempt.
+    """
+    with _buffer_lock:
+        events = dict(_event_buffer)
+        logins = dict(_login_buffer)
+        _event_buffer.clear()
+        _login_buffer.clear()
+    if not events and not logins:
+        return 0
+
+    from nova.db_pool import db_writer
+
+    def _upsert(session):
+        from nova.models import AnalyticsEvent, AnalyticsLogin
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        if events:
+            stmt = sqlite_insert(AnalyticsEvent).values([
+                {"event_name": name, "date": day, "count": n} for (name, day), n in events.items()
+            ])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[AnalyticsEvent.event_name, AnalyticsEvent.date],
+                set_={"count": AnalyticsEvent.count + stmt.excluded.count},
+            ))
+        if logins:
+            stmt = sqlite_insert(AnalyticsLogin).values([
+                {"date": day, "login_count": n} for day, n in logins.items()
+            ])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[AnalyticsLogin.date],
+                set_={"login_count": AnalyticsLogin.login_count + stmt.excluded.login_count},
+            ))
+
+    try:
+        db_writer.run(_upsert)  # serialized with the other background writers
+        return len(events) + len(logins)
+    except TimeoutError:
+        return 0  # still queued on the writer; it will be applied, so don't re-buffer
+    except Exception as e:
+        with _buffer_lock:
+            _event_buffer.update(events)
+            _login_buffer.update(logins)
+        print(f"[ANALYTICS] Flush failed, will retry: {e}")
+        return 0
+
+
+atexit.register(flush_analytics)
+
+
+def event_counts_since(session, since: date) -> dict:
+    """Persisted + still-buffered event counts as {(event_name, date): count}."""
+    from nova.models import AnalyticsEvent
+    counts = Counter({
+        (row.event_name, row.date): row.count
+        for row in session.query(AnalyticsEvent.event_name, AnalyticsEvent.date, AnalyticsEvent.count)
+                          .filter(AnalyticsEvent.date >= since)
+    })
+    with _buffer_lock:
+        counts.update({k: n for k, n in _event_buffer.items() if k[1] >= since})
+    return dict(counts)
+
+
+def login_counts_since(session, since: date) -> dict:
+    """Persisted + still-buffered login counts as {date: count}."""
+    from nova.models import AnalyticsLogin
+    counts = Counter({
+        row.date: row.login_count
+        for row in session.query(AnalyticsLogin.date, AnalyticsLogin.login_count)
+                          .filter(AnalyticsLogin.date >= since)
+    })
+    with _buffer_lock:
+        counts.update({d: n for d, n in _login_buffer.items() if d >= since})
+    return dict(counts)
+
+
 def record_event(event_name: str) -> None:
     """
-    Increment the daily counter for event_name.
+    Increment the daily counter for event_name (buffered; see flush_analytics).
     Silent no-op if analytics is disabled, user is excluded, or any error occurs.
 
     Args:
@@ -58,25 +170,9 @@ def record_event(event_name: str) -> None:
     if not _is_enabled() or _is_excluded() or _is_bot_request():
         return
     try:
-        from nova.models import AnalyticsEvent, SessionLocal
-        from sqlalchemy import select
-        today = date.today()
-        session = SessionLocal()
-
-        try:
-            stmt = select(AnalyticsEvent).where(
-                AnalyticsEvent.event_name == event_name,
-                AnalyticsEvent.date == today
-            )
-            row = session.execute(stmt).scalar_one_or_none()
-            if row:
-                row.count += 1
-            else:
-                row = AnalyticsEvent(event_name=event_name, date=today, count=1)
-                session.add(row)
-            session.commit()
-        finally:
-            session.close()
+        with _buffer_lock:
+            _event_buffer[(event_name, date.today())] += 1
+        _ensure_flusher()
     except Exception as e:
         try:
             current_app.logger.debug(f"[ANALYTICS] record_event failed: {e}")
@@ -86,28 +182,15 @@ def record_event(event_name: str) -> None:
 
 def record_login() -> None:
     """
-    Increment the daily login counter.
+    Increment the daily login counter (buffered; see flush_analytics).
     No user identifier stored — just a count per day.
     """
     if not _is_enabled() or _is_excluded() or _is_bot_request():
         return
     try:
-        from nova.models import AnalyticsLogin, SessionLocal
-        from sqlalchemy import select
-        today = date.today()
-        session = SessionLocal()
-
-        try:
-            stmt = select(AnalyticsLogin).where(AnalyticsLogin.date == today)
-            row = session.execute(stmt).scalar_one_or_none()
-            if row:
-                row.login_count += 1
-            else:
-                row = AnalyticsLogin(date=today, login_count=1)
-                session.add(row)
-            session.commit()
-        finally:
-            session.close()
+        with _buffer_lock:
+            _login_buffer[date.today()] += 1
+        _ensure_flusher()
     except Exception as e:
         try:
             current_app.logger.debug(f"[ANALYTICS] record_login failed: {e}")
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, redirect, url_for, render_template, flash
+from flask import Blueprint, request, redirect, url_for, render_template, flash, jsonify
 from flask_login import login_required, current_user
 from flask_babel import gettext as _
 
@@ -120,4 +120,25 @@ def admin_delete_user(user_id):
     db.session.delete(user)
     db.session.commit()
     flash(_("User '%(username)s' deleted.", username=uname), "success")
-    return redirect(url_for("admin.admin_users"))
\ No newline at end of file
+    return redirect(url_for("admin.admin_users"))
+
+
+@admin_bp.route("/admin/db-stats")
+@login_required
+def admin_db_stats():
+    guard = _admin_guard()
+    if guard:
+        return guard
+    from nova.db_pool import db_stats
+    return jsonify(db_stats())
+
+
+@admin_bp.route("/admin/cache-stats")
+@login_required
+def admin_cache_stats():
+    guard = _admin_guard()
+    if guard:
+        return guard
+    from nova.config import nightly_curves_cache
+    from nova.nightly_curves import curve_cache_stats
+    return jsonify({"nightly_curves": curve_cache_stats(nightly_curves_cache)})
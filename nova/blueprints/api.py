@@ -1,3 +1,4 @@
+import base64
 import json
 import os
 import csv, io, time
@@ -7,7 +8,7 @@ import traceback
 import re
 import requests
 import numpy as np
-from datetime import datetime, timedelta, UTC, timezone
+from datetime import datetime, date, timedelta, UTC, timezone
 
 from flask import (
     Blueprint, request, jsonify, g, url_for,
@@ -18,7 +19,7 @@ from flask_babel import gettext as _
 from sqlalchemy import and_, or_, func
 from sqlalchemy.orm import selectinload
 
-from astropy.coordinates import EarthLocation, SkyCoord, AltAz, get_body, search_around_sky, get_constellation
+from astropy.coordinates import EarthLocation, SkyCoord, AltAz, get_body, get_constellation
 from astropy import units as u
 from astropy.time import Time
 import ephem
@@ -26,23 +27,14 @@ import pytz
 
 from nova.config import (
     SINGLE_USER_MODE, TELEMETRY_DEBUG_STATE, LATEST_VERSION_INFO,
-    nightly_curves_cache, observable_objects_cache,
-    weather_cache, CACHE_DIR, DEFAULT_HTTP_TIMEOUT,
+    nightly_curves_cache,
+    weather_cache, CACHE_DIR, DEFAULT_HTTP_TIMEOUT, BoundedCache,
 )
 
 
-def _nearest_sg_alt(az, sg_data):
-    """Return the skyglow min_alt_deg for the nearest azimuth sector."""
-    sectors = sg_data.get("skyglow_horizon", [])
-    if not sectors:
-        return None
-    nearest = min(sectors, key=lambda s: abs(s["az_deg"] - az))
-    return nearest.get("min_alt_deg")
-
-
 from nova.helpers import (
-    get_db, load_full_astro_context, get_locale,
-    get_all_mobile_up_now_data, get_ra_dec, safe_float,
+    get_db, get_request_db_user, load_full_astro_context, get_locale,
+    get_ra_dec, safe_float,
     read_log_content, enable_user, disable_user, delete_user,
     bust_astro_context_cache,
 )
@@ -60,14 +52,35 @@ from modules.astro_calculations import (
     get_utc_time_for_local_11pm,
     interpolate_horizon,
     get_common_time_arrays,
+    calculate_night_series,
 )
 import modules.nova_data_fetcher as nova_data_fetcher
+from nova.metadata_fetcher import get_metadata_fetcher
+from nova.weather_client import get_weather_client
+from nova.weather_store import get_forecast_cache
+from nova.nightly_snapshot import get_nightly_snapshot, nightly_sampling_interval
+from nova.shared_catalog import (
+    MAX_PAGE_SIZE as MAX_SHARED_PAGE_SIZE, SHARED_KINDS, get_shared_item, list_shared_items, shared_catalog_cache
+)
+from nova.skyglow_lookup import below_floor, load_skyglow_horizon, skyglow_path as location_skyglow_path
+from nova.skyglow_service import get_skyglow_service, location_skyglow_params
+from nova.dso_index import get_dso_index
+from nova.spatial_index import get_user_spatial_index
+from nova.db_pool import db_writer
+from nova.mobile_feed import (
+    MOBILE_FEED_PAGE_DEFAULT, MOBILE_FEED_PAGE_MAX, MOBILE_FEED_POSITION_BUCKET_S,
+    decode_feed_cursor, encode_feed_cursor, feed_page_etag, get_mobile_feed, position_bucket_ts, render_rows,
+)
+from nova.nightly_curves import NightlyCurve, moon_separations, shared_time_axis
+from nova.http_cache import (
+    HTTP_CACHE_MAX_AGE, client_has, compute_etag, file_validator, seconds_until_noon, validated_response,
+)
 import markdown
 
 api_bp = Blueprint('api', __name__)
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-_scan_frame_cache = {}
+_scan_frame_cache = BoundedCache(256)  # SIMBAD box results, shared by all users
 
 
 # --- Telemetry diagnostics route ---
@@ -336,6 +349,122 @@ def get_journal_objects():
     return jsonify(result)
 
 
+# Sortable columns for /api/journal/sessions -> NULL placeholder used for keyset comparison
+JOURNAL_LIST_SORT_COLUMNS = {
+    'date_utc': (JournalSession.date_utc, None),
+    'object_name': (JournalSession.object_name, ''),
+    'location_name': (JournalSession.location_name, ''),
+    'calculated_integration_time_minutes': (JournalSession.calculated_integration_time_minutes, -1.0),
+    'session_rating_subjective': (JournalSession.session_rating_subjective, -1),
+}
+JOURNAL_LIST_MAX_LIMIT = 500
+
+
+def _encode_journal_cursor(sort_value, session_id):
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, session_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_journal_cursor(cursor, sort_key):
+    sort_value, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    if sort_key == 'date_utc':
+        sort_value = date.fromisoformat(sort_value)
+    return sort_value, int(session_id)
+
+
+@api_bp.route('/api/journal/sessions')
+def get_journal_sessions():
+    """
+    Lean, keyset-paginated journal list for the dashboard's Journal tab.
+
+    Query params:
+        sort: one of JOURNAL_LIST_SORT_COLUMNS (default date_utc)
+        order: 'asc' or 'desc' (default desc)
+        limit: page size (default 200, max 500)
+        cursor: 'next_cursor' from the previous page
+
+    Only the columns the table shows are selected; the raw log columns are never read.
+    """
+    # --- Manual Auth Check for Guest Support ---
+    if not (current_user.is_authenticated or SINGLE_USER_MODE or getattr(g, 'is_guest', False)):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    if not getattr(g, 'db_user', None):
+        return jsonify({'sessions': [], 'next_cursor': None})
+
+    sort_key = request.args.get('sort', 'date_utc')
+    if sort_key not in JOURNAL_LIST_SORT_COLUMNS:
+        return jsonify({'error': _('Invalid sort column')}), 400
+    descending = request.args.get('order', 'desc').lower() != 'asc'
+    try:
+        limit = min(JOURNAL_LIST_MAX_LIMIT, max(1, int(request.args.get('limit', 200))))
+        cursor = request.args.get('cursor')
+        after = _decode_journal_cursor(cursor, sort_key) if cursor else None
+    except (ValueError, TypeError):
+        return jsonify({'error': _('Invalid pagination parameters')}), 400
+
+    column, null_value = JOURNAL_LIST_SORT_COLUMNS[sort_key]
+    sort_expr = column if null_value is None else func.coalesce(column, null_value)
+    user_id = g.db_user.id
+
+    db = get_db()
+    query = db.query(
+        JournalSession.id, JournalSession.object_name, JournalSession.project_id,
+        JournalSession.date_utc, JournalSession.location_name, JournalSession.telescope_setup_notes,
+        JournalSession.telescope_name_snapshot, JournalSession.reducer_name_snapshot,
+        JournalSession.camera_name_snapshot, JournalSession.calculated_integration_time_minutes,
+        JournalSession.guiding_rms_avg_arcsec, JournalSession.seeing_observed_fwhm,
+        JournalSession.session_rating_subjective, JournalSession.draft,
+        AstroObject.common_name, Project.name.label('project_name'),
+        sort_expr.label('sort_value'),
+    ).outerjoin(
+        AstroObject,
+        and_(AstroObject.user_id == user_id, AstroObject.object_name == JournalSession.object_name)
+    ).outerjoin(
+        Project, Project.id == JournalSession.project_id
+    ).filter(JournalSession.user_id == user_id)
+
+    if after is not None:
+        after_value, after_id = after
+        if descending:
+            query = query.filter(or_(sort_expr < after_value,
+                                     and_(sort_expr == after_value, JournalSession.id < after_id)))
+        else:
+            query = query.filter(or_(sort_expr > after_value,
+                                     and_(sort_expr == after_value, JournalSession.id > after_id)))
+
+    if descending:
+        query = query.order_by(sort_expr.desc(), JournalSession.id.desc())
+    else:
+        query = query.order_by(sort_expr.asc(), JournalSession.id.asc())
+    rows = query.limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    sessions = [{
+        'id': r.id,
+        'object_name': r.object_name,
+        'target_common_name': r.common_name or r.object_name,
+        'project_id': r.project_id,
+        'project_name': (r.project_name or "Unknown Project") if r.project_id else "-",
+        'date_utc': r.date_utc.isoformat() if r.date_utc else None,
+        'location_name': r.location_name,
+        'telescope_setup_notes': r.telescope_setup_notes,
+        'telescope_name_snapshot': r.telescope_name_snapshot,
+        'reducer_name_snapshot': r.reducer_name_snapshot,
+        'camera_name_snapshot': r.camera_name_snapshot,
+        'calculated_integration_time_minutes': r.calculated_integration_time_minutes,
+        'guiding_rms_avg_arcsec': r.guiding_rms_avg_arcsec,
+        'seeing_observed_fwhm': r.seeing_observed_fwhm,
+        'session_rating_subjective': r.session_rating_subjective,
+        'draft': r.draft,
+    } for r in rows]
+
+    next_cursor = _encode_journal_cursor(rows[-1].sort_value, rows[-1].id) if has_more else None
+    return jsonify({'sessions': sessions, 'next_cursor': next_cursor})
+
+
 @api_bp.route('/api/bulk_update_objects', methods=['POST'])
 @login_required
 def bulk_update_objects():
@@ -544,106 +673,74 @@ def delete_saved_view():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
-@api_bp.route('/api/get_shared_items')
+@api_bp.route('/api/shared_items/summary')
 @login_required
-def get_shared_items():
+def get_shared_catalog_summary():
+    """Counts and filter facets of the shared catalog (cached until sharing changes)."""
     if SINGLE_USER_MODE:
-        return jsonify({"objects": [], "components": [], "views": [], "imported_object_ids": [], "imported_component_ids": [], "imported_view_ids": []})
+        return jsonify({})
+    return jsonify(shared_catalog_cache.summary(get_db()))
 
-    db = get_db()
-    try:
-        current_user_id = g.db_user.id
-
-        # --- 1. Get ALL Shared Objects (Including own) ---
-        shared_objects_db = db.query(AstroObject, DbUser.username).join(
-            DbUser, AstroObject.user_id == DbUser.id
-        ).filter(
-            AstroObject.is_shared == True
-            # Removed: AstroObject.user_id != current_user_id
-        ).all()
-
-        shared_objects_list = []
-        for obj, username in shared_objects_db:
-            shared_objects_list.append({
-                "id": obj.id,
-                "object_name": obj.object_name,
-                "common_name": obj.common_name,
-                "type": obj.type,
-                "constellation": obj.constellation,
-                "ra": obj.ra_hours,
-                "dec": obj.dec_deg,
-                "shared_by_user": username,
-                "shared_notes": obj.shared_notes or "",
-                # --- Inspiration Metadata ---
-                "image_url": obj.image_url,
-                "image_credit": obj.image_credit,
-                "image_source_link": obj.image_source_link,
-                "description_text": obj.description_text,
-                "description_credit": obj.description_credit,
-                "description_source_link": obj.description_source_link
-            })
-
-        # --- 2. Get ALL Shared Components (Including own) ---
-        shared_components_db = db.query(Component, DbUser.username).join(
-            DbUser, Component.user_id == DbUser.id
-        ).filter(
-            Component.is_shared == True
-            # Removed: Component.user_id != current_user_id
-        ).all()
 
-        shared_components_list = []
-        for comp, username in shared_components_db:
-            shared_components_list.append({
-                "id": comp.id,
-                "name": comp.name,
-                "kind": comp.kind,
-                "shared_by_user": username
-            })
+@api_bp.route('/api/shared_items/<kind>')
+@login_required
+def list_shared_catalog_items(kind):
+    """
+    One keyset page of shared items ('object' | 'component' | 'view').
 
-        # --- 3. Get ALL Shared Views (Including own) ---
-        shared_views_db = db.query(SavedView, DbUser.username).join(
-            DbUser, SavedView.user_id == DbUser.id
-        ).filter(
-            SavedView.is_shared == True
-            # Removed: SavedView.user_id != current_user_id
-        ).all()
+    Query args: cursor, limit, q, owner, status and type / constellation
+    (objects) or kind (components).
+    """
+    if SINGLE_USER_MODE:
+        return jsonify({"kind": kind, "items": [], "next_cursor": None})
+    try:
+        page = list_shared_items(get_db(), kind, g.db_user.id, filters=request.args,
+                                 cursor=request.args.get('cursor'), limit=request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
 
-        shared_views_list = []
-        for view, username in shared_views_db:
-            shared_views_list.append({
-                "id": view.id,
-                "name": view.name,
-                "description": view.description,
-                "shared_by_user": username
-            })
 
-        # --- 4. Get IDs of items ALREADY imported by CURRENT user ---
-        imported_objects = db.query(AstroObject.original_item_id).filter(
-            AstroObject.user_id == current_user_id,
-            AstroObject.original_item_id != None
-        ).all()
-        imported_object_ids = {item_id for (item_id,) in imported_objects}
+@api_bp.route('/api/shared_items/<kind>/<int:item_id>')
+@login_required
+def get_shared_catalog_item(kind, item_id):
+    """Full details (notes, description, specs) of one shared item."""
+    if SINGLE_USER_MODE:
+        return jsonify({"error": "Sharing is disabled in single-user mode"}), 404
+    try:
+        item = get_shared_item(get_db(), kind, item_id, g.db_user.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if item is None:
+        return jsonify({"error": "Shared item not found"}), 404
+    return jsonify(item)
 
-        imported_components = db.query(Component.original_item_id).filter(
-            Component.user_id == current_user_id,
-            Component.original_item_id != None
-        ).all()
-        imported_component_ids = {item_id for (item_id,) in imported_components}
 
-        imported_views = db.query(SavedView.original_item_id).filter(
-            SavedView.user_id == current_user_id,
-            SavedView.original_item_id != None
-        ).all()
-        imported_view_ids = {item_id for (item_id,) in imported_views}
+@api_bp.route('/api/get_shared_items')
+@login_required
+def get_shared_items():
+    """
+    Every shared item in one response, for API clients. Built from the same
+    lightweight list projections as /api/shared_items/<kind>; details such
+    as notes and descriptions come from /api/shared_items/<kind>/<id>.
+    """
+    if SINGLE_USER_MODE:
+        return jsonify({"objects": [], "components": [], "views": [], "imported_object_ids": [], "imported_component_ids": [], "imported_view_ids": []})
 
-        return jsonify({
-            "objects": shared_objects_list,
-            "components": shared_components_list,
-            "views": shared_views_list,
-            "imported_object_ids": list(imported_object_ids),
-            "imported_component_ids": list(imported_component_ids),
-            "imported_view_ids": list(imported_view_ids)
-        })
+    db = get_db()
+    try:
+        result = {}
+        for kind in SHARED_KINDS:
+            items, cursor = [], None
+            while True:
+                page = list_shared_items(db, kind, g.db_user.id, cursor=cursor, limit=MAX_SHARED_PAGE_SIZE)
+                items.extend(page["items"])
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            result[f"{kind}s"] = items
+            result[f"imported_{kind}_ids"] = [item["id"] for item in items if item["imported"]]
+        return jsonify(result)
     except Exception as e:
         print(f"ERROR in get_shared_items: {e}")
         import traceback
@@ -832,21 +929,9 @@ def save_framing():
         current_app.logger.error(f"[FRAMING API] Failed to save framing for '{object_name}': {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@api_bp.route('/api/scan_frame', methods=['POST'])
-@login_required
-def scan_frame():
-    try:
-        data = request.get_json()
-        ra        = float(data['ra'])
-        dec       = float(data['dec'])
-        fov_w     = float(data['fov_w'])
-        fov_h     = float(data['fov_h'])
-        mag_limit = float(data.get('mag_limit', 16.0))
-    except (KeyError, TypeError, ValueError) as e:
-        return jsonify({'status': 'error', 'message': f'Bad parameters: {e}'}), 200
-
+def _scan_frame_simbad(ra, dec, fov_w, fov_h, mag_limit):
+    """SIMBAD box query for the frame (cached for an hour); returns (objects, error_message)."""
     cache_key = (
-        g.db_user.username,
         round(ra, 2), round(dec, 2),
         round(fov_w, 3), round(fov_h, 3),
         round(mag_limit, 1),
@@ -855,7 +940,7 @@ def scan_frame():
     if cache_key in _scan_frame_cache:
         ts, cached = _scan_frame_cache[cache_key]
         if now - ts < 3600:
-            return jsonify(cached)
+            return [dict(o) for o in cached], None
         del _scan_frame_cache[cache_key]
 
     adql = (
@@ -875,9 +960,9 @@ def scan_frame():
             timeout=DEFAULT_HTTP_TIMEOUT,
         )
     except requests.exceptions.Timeout:
-        return jsonify({'status': 'error', 'message': 'SIMBAD timeout'}), 200
+        return None, 'SIMBAD timeout'
     except requests.exceptions.RequestException as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 200
+        return None, str(e)
 
     current_app.logger.debug('[SCAN] SIMBAD response: %s', r.text[:300])
     reader = csv.DictReader(io.StringIO(r.text))
@@ -903,9 +988,50 @@ def scan_frame():
             'size_arcmin': float(size_s) if size_s else None,
         })
 
-    resp = {'status': 'success', 'count': len(objects), 'objects': objects}
-    _scan_frame_cache[cache_key] = (now, resp)
-    return jsonify(resp)
+    _scan_frame_cache[cache_key] = (now, objects)
+    return [dict(o) for o in objects], None
+
+
+# Bundled index types that are stars rather than DSOs (the SIMBAD box query only asks for DSO types)
+_SCAN_SKIPPED_TYPES = {'*', '**', 'No*'}
+
+
+@api_bp.route('/api/scan_frame', methods=['POST'])
+@login_required
+def scan_frame():
+    try:
+        data = request.get_json()
+        ra        = float(data['ra'])
+        dec       = float(data['dec'])
+        fov_w     = float(data['fov_w'])
+        fov_h     = float(data['fov_h'])
+        mag_limit = float(data.get('mag_limit', 16.0))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Bad parameters: {e}'}), 200
+
+    # Frames are answered from the bundled catalog index (no network round trip);
+    # SIMBAD is only asked about frames the index has nothing in.
+    dso_index = get_dso_index()
+    local_hits = dso_index.box_search(ra, dec, fov_w, fov_h) if dso_index is not None else []
+    objects = [
+        {
+            'name':        h['name'],
+            'ra':          h['ra_hours'] * 15.0,
+            'dec':         h['dec_deg'],
+            'otype':       h['type'] or '',
+            'mag':         h['magnitude'],
+            'size_arcmin': h['size_arcmin'],
+        }
+        for h in local_hits
+        if h['type'] not in _SCAN_SKIPPED_TYPES and (h['magnitude'] is None or h['magnitude'] <= mag_limit)
+    ]
+    if objects:
+        return jsonify({'status': 'success', 'count': len(objects), 'objects': objects, 'source': 'local'})
+
+    objects, error = _scan_frame_simbad(ra, dec, fov_w, fov_h, mag_limit)
+    if error is not None:
+        return jsonify({'status': 'error', 'message': error}), 200
+    return jsonify({'status': 'success', 'count': len(objects), 'objects': objects, 'source': 'simbad'})
 
 @api_bp.route('/api/get_framing/<path:object_name>')
 @login_required
@@ -1533,7 +1659,7 @@ def get_session_log_analysis(session_id):
 
     username = "default" if SINGLE_USER_MODE else current_user.username
     db = get_db()
-    user = db.query(DbUser).filter_by(username=username).one_or_none()
+    user = get_request_db_user(db, username)
 
     if not user:
         return jsonify({'error': _('User not found')}), 404
@@ -1581,14 +1707,98 @@ def get_session_log_analysis(session_id):
         result['nina'] = parse_nina_log(nina_content)
         result['has_logs'] = True
 
-    # 3. Cache the result if parsing happened
+    # 3. Cache the result if parsing happened (written off the request thread)
     if result['has_logs']:
-        session.log_analysis_cache = json.dumps(result)
-        db.commit()
+        payload = json.dumps(result)
+        db_writer.submit(lambda s: s.query(JournalSession).filter_by(id=session_id)
+                         .update({'log_analysis_cache': payload}, synchronize_session=False))
 
     return jsonify(result)
 
 
+@api_bp.route('/api/log-analytics')
+@login_required
+def get_log_analytics():
+    """
+    Aggregate cached log analyses across many sessions.
+
+    Query params:
+        project_id: restrict to one project (optional)
+        start, end: inclusive YYYY-MM-DD date range on date_utc (optional)
+        page, per_page: pagination of the per-session trend rows (default 1 / 50)
+
+    The summary always covers the full selection; only 'sessions' is paged.
+    Sessions that have logs but no parse-once cache yet are listed in
+    'uncached_session_ids' instead of being parsed inline.
+    """
+    from nova.log_analytics import (
+        load_cached_metrics, aggregate_session_metrics, session_trend_row
+    )
+
+    username = "default" if SINGLE_USER_MODE else current_user.username
+    db = get_db()
+    user = get_request_db_user(db, username)
+    if not user:
+        return jsonify({'error': _('User not found')}), 404
+
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(200, max(1, int(request.args.get('per_page', 50))))
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else None
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': _('Invalid pagination or date parameters')}), 400
+
+    project_id = request.args.get('project_id')
+    if project_id and not db.query(Project.id).filter_by(id=project_id, user_id=user.id).first():
+        return jsonify({'error': _('Project not found')}), 404
+
+    filters = [JournalSession.user_id == user.id]
+    if project_id:
+        filters.append(JournalSession.project_id == project_id)
+    if start:
+        filters.append(JournalSession.date_utc >= start)
+    if end:
+        filters.append(JournalSession.date_utc <= end)
+
+    # Projection-only query: the raw log columns are never loaded here
+    cached_rows = db.query(
+        JournalSession.id, JournalSession.date_utc,
+        JournalSession.object_name, JournalSession.log_analysis_cache
+    ).filter(*filters, JournalSession.log_analysis_cache.isnot(None)) \
+     .order_by(JournalSession.date_utc.asc(), JournalSession.id.asc()).all()
+
+    uncached_ids = [row.id for row in db.query(JournalSession.id).filter(
+        *filters,
+        JournalSession.log_analysis_cache.is_(None),
+        or_(JournalSession.asiair_log_content.isnot(None),
+            JournalSession.phd2_log_content.isnot(None),
+            JournalSession.nina_log_content.isnot(None))
+    ).order_by(JournalSession.date_utc.asc()).all()]
+
+    metric_rows = []
+    trend_rows = []
+    for row in cached_rows:
+        metrics = load_cached_metrics(row.log_analysis_cache)
+        if metrics is None:
+            continue
+        date_iso = row.date_utc.isoformat() if row.date_utc else None
+        metric_rows.append(metrics)
+        trend_rows.append(session_trend_row(row.id, date_iso, row.object_name, metrics))
+
+    total = len(trend_rows)
+    offset = (page - 1) * per_page
+    return jsonify({
+        'summary': aggregate_session_metrics(metric_rows),
+        'sessions': trend_rows[offset:offset + per_page],
+        'uncached_session_ids': uncached_ids,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_more': offset + per_page < total,
+    })
+
+
 @api_bp.route('/api/bulk_fetch_details', methods=['POST'])
 @login_required
 def bulk_fetch_details():
@@ -1616,6 +1826,7 @@ def bulk_fetch_details():
         error_count = 0
         refetch_triggers = [None, "", "N/A", "Not Found", "Fetch Error"]
 
+        to_fetch = {}
         for obj in objects_to_check:
             needs_update = (
                 obj.type in refetch_triggers or
@@ -1625,23 +1836,24 @@ def bulk_fetch_details():
                 obj.constellation in refetch_triggers
             )
             if needs_update:
-                try:
-                    # Auto-calculate Constellation if missing
-                    if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
-                        coords = SkyCoord(ra=obj.ra_hours*u.hourangle, dec=obj.dec_deg*u.deg)
-                        obj.constellation = get_constellation(coords, short_name=True)
-
-                    # Fetch other details from external API
-                    fetched_data = nova_data_fetcher.get_astronomical_data(obj.object_name)
-                    if fetched_data.get("object_type"): obj.type = fetched_data["object_type"]
-                    if fetched_data.get("magnitude"): obj.magnitude = str(fetched_data["magnitude"])
-                    if fetched_data.get("size_arcmin"): obj.size = str(fetched_data["size_arcmin"])
-                    if fetched_data.get("surface_brightness"): obj.sb = str(fetched_data["surface_brightness"])
-                    updated_count += 1
-                    time.sleep(0.5)  # Be kind to external APIs
-                except Exception as e:
-                    print(f"Failed to fetch details for {obj.object_name}: {e}")
-                    error_count += 1
+                # Auto-calculate Constellation if missing
+                if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
+                    coords = SkyCoord(ra=obj.ra_hours*u.hourangle, dec=obj.dec_deg*u.deg)
+                    obj.constellation = get_constellation(coords, short_name=True)
+                to_fetch[obj.object_name] = obj
+
+        # Fetch other details concurrently (rate-limited, persistently cached)
+        for name, fetched_data, err in get_metadata_fetcher().iter_fetch(list(to_fetch)):
+            obj = to_fetch[name]
+            if err is not None:
+                print(f"Failed to fetch details for {name}: {err}")
+                error_count += 1
+                continue
+            if fetched_data.get("object_type"): obj.type = fetched_data["object_type"]
+            if fetched_data.get("magnitude"): obj.magnitude = str(fetched_data["magnitude"])
+            if fetched_data.get("size_arcmin"): obj.size = str(fetched_data["size_arcmin"])
+            if fetched_data.get("surface_brightness"): obj.sb = str(fetched_data["surface_brightness"])
+            updated_count += 1
 
         db.commit()
 
@@ -1664,41 +1876,24 @@ def find_duplicates():
     load_full_astro_context()
     user_id = g.db_user.id
 
-    # 1. Get all objects with valid coordinates
-    all_objects = [o for o in g.objects_list if o.get('RA (hours)') is not None and o.get('DEC (degrees)') is not None]
-
-    if len(all_objects) < 2:
-        return jsonify({"status": "success", "duplicates": []})
-
-    # 2. Create SkyCoord objects
-    ra_vals = [o['RA (hours)'] * 15.0 for o in all_objects]  # Convert to degrees
-    dec_vals = [o['DEC (degrees)'] for o in all_objects]
-
-    coords = SkyCoord(ra=ra_vals * u.deg, dec=dec_vals * u.deg)
-
-    # 3. Find matches within 2.5 arcminutes
-    # search_around_sky finds all pairs (i, j) where distance < limit
-    # This includes (i, i) self-matches and (i, j) + (j, i) duplicates
-    idx1, idx2, d2d, d3d = search_around_sky(coords, coords, seplimit=2.5 * u.arcmin)
-
-    potential_duplicates = []
-    seen_pairs = set()
+    # 1. Sync the user's spatial index (only new/moved objects are re-checked)
+    index = get_user_spatial_index(user_id)
+    index.sync(g.objects_list)
 
-    for i, j, dist in zip(idx1, idx2, d2d):
-        if i >= j: continue  # Skip self-matches and reverse duplicates
-
-        obj_a = all_objects[i]
-        obj_b = all_objects[j]
+    # 2. Resolve the close pairs back to object dicts, in objects-list order
+    by_name = {o['Object']: (pos, o) for pos, o in enumerate(g.objects_list)}
+    rows = []
+    for name_a, name_b, sep in index.close_pairs():
+        if name_a not in by_name or name_b not in by_name:
+            continue
+        (pos_a, obj_a), (pos_b, obj_b) = sorted((by_name[name_a], by_name[name_b]), key=lambda t: t[0])
+        rows.append((pos_a, pos_b, obj_a, obj_b, sep))
+    rows.sort(key=lambda r: (r[0], r[1]))
 
-        pair_key = tuple(sorted([obj_a['Object'], obj_b['Object']]))
-        if pair_key in seen_pairs: continue
-        seen_pairs.add(pair_key)
-
-        potential_duplicates.append({
-            "object_a": obj_a,
-            "object_b": obj_b,
-            "separation_arcmin": round(dist.to(u.arcmin).value, 2)
-        })
+    potential_duplicates = [
+        {"object_a": obj_a, "object_b": obj_b, "separation_arcmin": sep}
+        for _, _, obj_a, obj_b, sep in rows
+    ]
 
     return jsonify({"status": "success", "duplicates": potential_duplicates})
 
@@ -1779,7 +1974,7 @@ def merge_objects():
 @api_bp.route('/api/mobile_data_chunk')
 @login_required
 def api_mobile_data_chunk():
-    """Fetches a specific slice of object data for the mobile progress bar."""
+    """Fetches a specific slice of object data for the mobile progress bar (offset paging over the feed snapshot)."""
     load_full_astro_context()
 
     offset = int(request.args.get('offset', 0))
@@ -1794,27 +1989,16 @@ def api_mobile_data_chunk():
 
     if user and location_name:
         db = get_db()
-        # 1. Get Location
         location_db_obj = db.query(Location).options(
             selectinload(Location.horizon_points)
         ).filter_by(user_id=user.id, name=location_name).one_or_none()
 
         if location_db_obj:
-            # 2. Get All Objects (to count and slice)
-            all_objects_query = db.query(AstroObject).filter_by(user_id=user.id).order_by(AstroObject.id)
-            total_count = all_objects_query.count()
-
-            # 3. Get Slice
-            sliced_objects = all_objects_query.offset(offset).limit(limit).all()
-
-            # 4. Calculate Data for this slice
-            results = get_all_mobile_up_now_data(
-                user,
-                location_db_obj,
-                user_prefs,
-                sliced_objects,
-                db  # Pass DB session
-            )
+            snapshot = get_mobile_feed(db, user, location_db_obj, user_prefs)
+            total_count = len(snapshot)
+            end = min(offset + limit, total_count)
+            results = render_rows(snapshot, offset, end, position_bucket_ts(),
+                                  location_db_obj.lat, location_db_obj.lon)
 
     return jsonify({
         "data": results,
@@ -1824,6 +2008,61 @@ def api_mobile_data_chunk():
     })
 
 
+@api_bp.route('/api/mobile/up_now')
+@login_required
+def api_mobile_up_now():
+    """
+    Keyset-paginated Up Now feed for the selected location.
+
+    The whole night is computed once per user/location/object set (see
+    nova.mobile_feed); pages are slices of that snapshot in object-name order.
+
+    Query params:
+        cursor: next_cursor from the previous page (omit for the first page)
+        limit: page size (default 200, max 500)
+
+    Returns: {'data': [...], 'total': int, 'next_cursor': str | None}
+    Responses carry an ETag; If-None-Match answers 304 while the page is unchanged.
+    """
+    load_full_astro_context()
+
+    try:
+        limit = min(max(int(request.args.get('limit', MOBILE_FEED_PAGE_DEFAULT)), 1), MOBILE_FEED_PAGE_MAX)
+    except ValueError:
+        return jsonify({'error': _('Invalid limit')}), 400
+    cursor = request.args.get('cursor') or None
+    try:
+        after_name = decode_feed_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'error': _('Invalid cursor')}), 400
+
+    user = g.db_user
+    if not user or not g.selected_location:
+        return jsonify({"data": [], "total": 0, "next_cursor": None})
+
+    db = get_db()
+    location_db_obj = db.query(Location).options(
+        selectinload(Location.horizon_points)
+    ).filter_by(user_id=user.id, name=g.selected_location).one_or_none()
+    if not location_db_obj:
+        return jsonify({'error': _('Location not found')}), 404
+
+    snapshot = get_mobile_feed(db, user, location_db_obj, g.user_config or {})
+    bucket_ts = position_bucket_ts()
+    etag = feed_page_etag(snapshot, cursor, limit, bucket_ts)
+    max_age = max(int(bucket_ts + MOBILE_FEED_POSITION_BUCKET_S - time.time()), 0)
+
+    if client_has(etag):
+        return validated_response(etag, max_age)
+    start, end = snapshot.page_bounds(after_name, limit)
+    next_cursor = encode_feed_cursor(snapshot.names[end - 1]) if end < len(snapshot) else None
+    return validated_response(etag, max_age, {
+        "data": render_rows(snapshot, start, end, bucket_ts, location_db_obj.lat, location_db_obj.lon),
+        "total": len(snapshot),
+        "next_cursor": next_cursor,
+    })
+
+
 @api_bp.route('/api/mobile_status')
 @login_required
 def api_mobile_status():
@@ -1881,6 +2120,31 @@ def api_mobile_status():
     })
 
 
+@api_bp.route('/api/skyglow/status')
+@login_required
+def api_skyglow_status():
+    """Skyglow computation status for the user's locations plus the service queue."""
+    load_full_astro_context()
+    user = g.db_user
+    if not user:
+        return jsonify({"error": _("User not found")}), 404
+
+    service = get_skyglow_service(current_app.instance_path)
+    locations = []
+    for loc in get_db().query(Location).filter_by(user_id=user.id).order_by(Location.name).all():
+        if loc.lat is None or loc.lon is None:
+            continue
+        uid = loc.stable_uid or str(loc.id)
+        status = service.location_status(uid, *location_skyglow_params(loc))
+        locations.append(dict(status, name=loc.name))
+
+    return jsonify({
+        "enabled": bool(os.environ.get("NASA_EARTHDATA_TOKEN")),
+        "locations": locations,
+        "service": service.stats(),
+    })
+
+
 @api_bp.route('/api/get_moon_data')
 def get_moon_data_for_session():
     # --- Manual Auth Check for Guest Support ---
@@ -1988,26 +2252,20 @@ def get_monthly_plot_data(object_name):
     tz_name = request.args.get('plot_tz', g.tz_name)
     local_tz = pytz.timezone(tz_name)
 
-    num_days = calendar.monthrange(year, month)[1]
-    dates, obj_altitudes, moon_altitudes = [], [], []
-
-    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
-    sky_coord = SkyCoord(ra=data['RA (hours)'] * u.hourangle, dec=data['DEC (degrees)'] * u.deg)
-
-    for day in range(1, num_days + 1):
-        local_midnight = local_tz.localize(datetime(year, month, day, 0, 0))
-        time_astropy = Time(local_midnight.astimezone(pytz.utc))
-
-        altaz_frame = AltAz(obstime=time_astropy, location=location)
-        obj_alt = sky_coord.transform_to(altaz_frame).alt.deg
-        moon_coord = get_body('moon', time_astropy, location)
-        moon_alt = moon_coord.transform_to(altaz_frame).alt.deg
-
-        dates.append(local_midnight.strftime('%Y-%m-%d'))
-        obj_altitudes.append(obj_alt)
-        moon_altitudes.append(moon_alt)
+    # Fixed month, fixed inputs: the series never changes, only the object may be edited
+    etag = compute_etag('monthly_plot', data['RA (hours)'], data['DEC (degrees)'], year, month, lat, lon, tz_name)
+    if client_has(etag):
+        return validated_response(etag, HTTP_CACHE_MAX_AGE)
 
-    return jsonify({
+    num_days = calendar.monthrange(year, month)[1]
+    dates = [f"{year:04d}-{month:02d}-{day:02d}" for day in range(1, num_days + 1)]
+    nights = calculate_night_series(data['RA (hours)'], data['DEC (degrees)'], lat, lon, tz_name, dates,
+                                    g.user_config.get("altitude_threshold", 20),
+                                    getattr(g, 'sampling_interval', 15))
+    obj_altitudes = [n["midnight_altitude"] for n in nights]
+    moon_altitudes = [n["midnight_moon_altitude"] for n in nights]
+
+    return validated_response(etag, HTTP_CACHE_MAX_AGE, {
         "dates": dates,
         "object_alt": obj_altitudes,
         "moon_alt": moon_altitudes
@@ -2075,185 +2333,13 @@ def deprovision_user():
 
 
 
-def get_weather_data_single_attempt(url: str, lat: float, lon: float) -> dict | None:
-    """
-    Fetches weather data from a single URL with robust error handling.
-    Returns a dictionary on success, None on any failure.
-    """
-    try:
-        r = None
-        # Use a reasonable timeout (e.g., 10 seconds)
-        r = requests.get(url, timeout=DEFAULT_HTTP_TIMEOUT)
-
-        # --- 1. Check for HTTP errors (like 500, 502, 404, etc.) ---
-        if r.status_code != 200:
-            print(f"[Weather Func] ERROR: Received non-200 status code {r.status_code} for lat={lat}, lon={lon}")
-            # Log the error page content for debugging
-            print(f"[Weather Func] Response text (first 200 chars): {r.text[:200]}")
-            return None
-
-        # --- 2. Try to parse the JSON ---
-        # r.json() will automatically handle content-type and raise JSONDecodeError
-        data = r.json()
-        return data
-
-    except requests.exceptions.JSONDecodeError as e:
-        # This is the exact error from your logs!
-        print(f"[Weather Func] ERROR: Failed to decode JSON for lat={lat}, lon={lon}. Error: {e}")
-        # Log the problematic text that isn't JSON
-        response_text = getattr(r, 'text', '<no response object>')
-        print(f"[Weather Func] Response text (first 200 chars): {response_text[:200]}")
-        return None
-
-    except requests.exceptions.RequestException as e:
-        # This handles timeouts, DNS errors, connection errors, etc.
-        print(f"[Weather Func] ERROR: Request failed for lat={lat}, lon={lon}. Error: {e}")
-        return None
-
-    except Exception as e:
-        # Catch any other unexpected errors
-        print(f"[Weather Func] ERROR: An unexpected error occurred for lat={lat}, lon={lon}. Error: {e}")
-        return None
-
-
-def get_weather_data_with_retries(lat: float, lon: float, product: str = "meteo") -> dict | None:
-    """
-    Attempts to fetch weather data from 7Timer! with retries and exponential backoff.
-    Builds the URL and calls the single-attempt helper function.
-
-    product:
-      - "meteo": standard meteorological product (meteo.php, with profiles etc.)
-      - "astro": astronomical product (astro.php, includes seeing/transparency)
-    """
-
-    # --- Build the 7Timer! URL correctly depending on product ---
-    if product == "astro":
-        # ASTRO product uses astro.php; no separate 'product' parameter in the URL
-        base_url = "http://www.7timer.info/bin/astro.php"
-        url = f"{base_url}?lon={lon}&lat={lat}&ac=0&unit=metric&output=json"
-    else:
-        # Default / METEO product
-        base_url = "http://www.7timer.info/bin/meteo.php"
-        # Here the 'product' parameter is still useful (e.g. 'meteo')
-        url = f"{base_url}?lon={lon}&lat={lat}&product={product}&ac=0&unit=metric&output=json"
-
-    retries = 3
-    delay_seconds = 5  # Start with a 5-second delay
-
-    for i in range(retries):
-        # Call our robust single-attempt helper
-        data = get_weather_data_single_attempt(url, lat, lon)
-
-        if data is not None:
-            # Success!
-            # print(f"[Weather Func] Successfully fetched data for lat={lat}, lon={lon} on attempt {i + 1} (product={product})")
-            return data
-
-        # If data is None, it failed. Log and retry (if not the last attempt).
-        if i < retries - 1:
-            print(f"[Weather Func] WARN: Attempt {i + 1} for product='{product}' failed for lat={lat}, lon={lon}. "
-                  f"Retrying in {delay_seconds} seconds...")
-            time.sleep(delay_seconds)
-            delay_seconds *= 2  # Exponential backoff
-        else:
-            print(f"[Weather Func] ERROR: All attempts ({retries}) failed for product='{product}' at lat={lat}, lon={lon}.")
-
-    return None
-
-
-def get_open_meteo_data(lat: float, lon: float) -> dict | None:
+def _merge_hybrid_forecast(open_meteo_data, astro_data_7t, cache_key, report_error):
     """
-    Fetches weather data from Open-Meteo with basic error handling.
-    Returns parsed JSON data on success, None on failure.
+    Merge Open-Meteo (hourly clouds, temperature, humidity) with 7Timer! 'astro'
+    (seeing, transparency) into the {'init', 'dataseries'} hybrid format.
+    Either input may be None; returns None when neither produced any data.
+    Provider payloads are not modified (they may be shared by the client's cache).
     """
-    # print(f"[Weather Fallback] Attempting fetch from Open-Meteo for lat={lat}, lon={lon}")
-    try:
-        # Request cloud cover at different levels, temperature, and relative humidity
-        # We get hourly data for the next 7 days
-        base_url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "hourly": "temperature_2m,relative_humidity_2m,cloud_cover_low,cloud_cover_mid,cloud_cover_high",
-            "forecast_days": 7,
-            "timezone": "UTC"  # Request data in UTC for easier processing
-        }
-
-        r = requests.get(base_url, params=params, timeout=DEFAULT_HTTP_TIMEOUT)  # 10-second timeout
-
-        # --- Check for HTTP errors ---
-        if r.status_code != 200:
-            print(f"[Weather Fallback] ERROR (Open-Meteo): Received non-200 status code {r.status_code}")
-            print(f"[Weather Fallback] Response text (first 200 chars): {r.text[:200]}")
-            return None
-
-        # --- Try to parse the JSON ---
-        data = r.json()
-
-        # --- Basic validation ---
-        if not data or 'hourly' not in data or 'time' not in data['hourly']:
-            print(f"[Weather Fallback] ERROR (Open-Meteo): Invalid data structure received.")
-            return None
-
-        # print(f"[Weather Fallback] Successfully fetched data from Open-Meteo.")
-        return data
-
-    except requests.exceptions.RequestException as e:
-        # Handles timeouts, connection errors, etc.
-        print(f"[Weather Fallback] ERROR (Open-Meteo): Request failed. Error: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"[Weather Fallback] ERROR (Open-Meteo): Failed to decode JSON. Error: {e}")
-        print(f"[Weather Fallback] Response text (first 200 chars): {r.text[:200]}")
-        return None
-    except Exception as e:
-        # Catch any other unexpected errors
-        print(f"[Weather Fallback] ERROR (Open-Meteo): An unexpected error occurred. Error: {e}")
-        return None
-
-
-def get_hybrid_weather_forecast(lat, lon):
-    # --- Rounding and Cache Key (No change) ---
-    rounded_lat = round(lat, 5)
-    rounded_lon = round(lon, 5)
-    cache_key = f"hybrid_{rounded_lat}_{rounded_lon}"
-    # print(f"[Weather Func] Using cache key: '{cache_key}' for lat={lat}, lon={lon}")
-
-    # --- Cache Check (No change) ---
-    now = datetime.now(UTC)
-    entry = weather_cache.get(cache_key) or {}
-    last_good = entry.get('data')
-    last_err_ts = entry.get('last_err_ts')
-    if entry and 'expires' in entry:
-        expires_dt = entry['expires']
-        is_expired = False
-        try:
-            if expires_dt.tzinfo is not None:
-                if now >= expires_dt: is_expired = True
-            elif now.replace(tzinfo=None) >= expires_dt:
-                is_expired = True
-        except TypeError as te:
-            print(f"[Weather Func] WARN: Timezone comparison error for key '{cache_key}': {te}")
-            is_expired = True
-        if not is_expired:
-            return entry['data']
-
-    # --- Helper Functions (No change) ---
-    def _update_cache_ok(data, ttl_hours=3):
-        expiry_time = datetime.now(UTC) + timedelta(hours=ttl_hours)
-        weather_cache[cache_key] = {'data': data, 'expires': expiry_time, 'last_err_ts': None}
-        # print(f"[Weather Func] Cache UPDATED for '{cache_key}', expires {expiry_time.isoformat()}")
-
-    def _rate_limited_error(msg):
-        nonlocal last_err_ts
-        now_aware = datetime.now(UTC)
-        if not last_err_ts or (now_aware - last_err_ts) > timedelta(minutes=15):
-            print(msg)
-            weather_cache.setdefault(cache_key, {})['last_err_ts'] = now_aware
-
-    # --- START: NEW HYBRID FETCH LOGIC ---
-
-    final_data_to_cache = None
     base_dataseries = {}
 
     # --- FIX: Initialize init_time and init_str to None in the outer scope ---
@@ -2261,10 +2347,7 @@ def get_hybrid_weather_forecast(lat, lon):
     init_str = None
     # --- END FIX ---
 
-    # === 1. Always fetch Open-Meteo for reliable cloud data ===
-    # print(f"[Weather Func] Fetching base cloud data from Open-Meteo for key '{cache_key}'")
-    open_meteo_data = get_open_meteo_data(lat, lon)
-
+    # === 1. Open-Meteo for reliable cloud data ===
     if open_meteo_data and 'hourly' in open_meteo_data:
         # print(f"[Weather Func] Open-Meteo succeeded. Translating data...")
         try:
@@ -2335,17 +2418,14 @@ def get_hybrid_weather_forecast(lat, lon):
             # print(f"[Weather Func] Successfully translated {len(base_dataseries)} blocks from Open-Meteo.")
 
         except Exception as e:
-            _rate_limited_error(f"[Weather Func] ERROR: Failed to translate Open-Meteo data: {e}")
+            report_error(f"[Weather Func] ERROR: Failed to translate Open-Meteo data: {e}")
             # Continue with empty base_dataseries
 
     else:
-        _rate_limited_error(f"[Weather Func] ERROR: Open-Meteo (base) fetch failed for key '{cache_key}'.")
+        report_error(f"[Weather Func] ERROR: Open-Meteo (base) fetch failed for key '{cache_key}'.")
         # base_dataseries is still {}
 
-    # === 2. Attempt to fetch 7Timer! 'astro' for seeing/transparency ===
-    # print(f"[Weather Func] Fetching enhancement data (seeing) from 7Timer! 'astro' for key '{cache_key}'")
-    astro_data_7t = get_weather_data_with_retries(lat, lon, product="astro")
-
+    # === 2. 7Timer! 'astro' for seeing/transparency ===
     if astro_data_7t and astro_data_7t.get('dataseries'):
         # print("[DEBUG] 7Timer! RAW DATA (first 5 blocks):")
         # print(astro_data_7t['dataseries'][:5])
@@ -2357,7 +2437,7 @@ def get_hybrid_weather_forecast(lat, lon):
             # Get the 7Timer! init time as a datetime object
             astro_init_time = datetime.strptime(astro_init_str, "%Y%m%d%H").replace(tzinfo=UTC)
         except (ValueError, TypeError, AttributeError):
-            _rate_limited_error(
+            report_error(
                 f"[Weather Func] ERROR: 7Timer! 'astro' gave invalid init string: '{astro_init_str}'. Cannot merge seeing data.")
             astro_data_7t = None  # Treat as failed
         # --- END FIX ---
@@ -2397,28 +2477,63 @@ def get_hybrid_weather_forecast(lat, lon):
                     else:
                         # Open-Meteo failed, use 7Timer! block as a fallback
                         # Add cloudcover placeholder if it doesn't exist
-                        ablk.setdefault('cloudcover', 9)
-                        base_dataseries[tp] = ablk
+                        base_dataseries[tp] = {'cloudcover': 9, **ablk}
 
                 except Exception as e:
                     print(f"[Weather Func] WARN: Skipping 7Timer! block, could not align timepoints. Error: {e}")
 
         # print(f"[Weather Func] Merge complete.")
     else:
-        _rate_limited_error(
+        report_error(
             f"[Weather Func] WARN: 7Timer! 'astro' (enhancement) fetch failed for key '{cache_key}'. Seeing data will be unavailable.")
 
-    # --- END: NEW HYBRID FETCH LOGIC ---
+    if not base_dataseries:
+        return None
+    return {'init': init_str, 'dataseries': list(base_dataseries.values())}
 
-    # --- Cache Update or Return Stale ---
-    if base_dataseries:  # If we have *any* data (even just Open-Meteo)
-        final_data_to_cache = {'init': init_str, 'dataseries': list(base_dataseries.values())}
-        _update_cache_ok(final_data_to_cache, ttl_hours=3)
-        return final_data_to_cache
-    else:
-        # Both failed. Return last good data if available.
-        print(f"[Weather Func] All sources failed. Returning stale data (if available) for key '{cache_key}'.")
-        return last_good or None
+
+def _fetch_hybrid_forecast(lat, lon, cache_key, publish):
+    """
+    Fetch both providers for one forecast cell and merge them. Returns the
+    merged forecast or None; a provider that recovers on a background retry
+    is merged in later and handed to publish().
+    """
+    last_err_ts = (weather_cache.get(cache_key) or {}).get('last_err_ts')
+
+    def _rate_limited_error(msg):
+        nonlocal last_err_ts
+        now_aware = datetime.now(UTC)
+        if not last_err_ts or (now_aware - last_err_ts) > timedelta(minutes=15):
+            print(msg)
+            last_err_ts = now_aware
+            entry = weather_cache.get(cache_key)
+            if isinstance(entry, dict):
+                entry['last_err_ts'] = now_aware
+            else:
+                weather_cache[cache_key] = {'last_err_ts': now_aware}
+
+    results = {}
+
+    def _on_retry(provider_name, data):
+        # A provider recovered in the background: rebuild with the other provider's latest payload
+        results[provider_name] = data
+        merged = _merge_hybrid_forecast(results.get('open_meteo'), results.get('7timer_astro'),
+                                        cache_key, _rate_limited_error)
+        if merged:
+            publish(merged)
+
+    # Both providers concurrently; failures retry in the background (see _on_retry)
+    results.update(get_weather_client().fetch_many(['open_meteo', '7timer_astro'], lat, lon, on_retry=_on_retry))
+    return _merge_hybrid_forecast(results['open_meteo'], results['7timer_astro'], cache_key, _rate_limited_error)
+
+
+def get_hybrid_weather_forecast(lat, lon):
+    """
+    Hybrid forecast for a location, shared by every location in the same
+    forecast grid cell (nova.weather_store). Expired entries are returned at
+    once while the cell refreshes in the background.
+    """
+    return get_forecast_cache().get(lat, lon, _fetch_hybrid_forecast)
 
 
 # =============================================================================
@@ -2517,26 +2632,7 @@ def get_plot_data(object_name):
         local_date_obj = now_local
         local_date = now_local.strftime('%Y-%m-%d')
 
-    # --- 3) Build time grid and object series ---
-    sampling_interval = getattr(g, 'sampling_interval', 15)
-    times_local, times_utc = get_common_time_arrays(tz_name, local_date,
-                                                    sampling_interval_minutes=sampling_interval)
-    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
-    altaz_frame = AltAz(obstime=times_utc, location=location)
-    sky_coord = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg)
-    altaz_obj = sky_coord.transform_to(altaz_frame)
-    altitudes = altaz_obj.alt.deg
-    azimuths = (altaz_obj.az.deg + 360.0) % 360.0
-
-    # --- 4) Weather forecast section (DECOUPLED) ---
-    # Weather is now fetched asynchronously by the client after the chart loads.
-    # We just send an empty array so the data structure is consistent.
-    weather_forecast_series = []
-    is_offline = request.args.get('offline') == 'true'
-    print(f"[API Plot Data] Skipping weather fetch (will be loaded by client). Offline mode: {is_offline}")
-    # --- END Weather Section ---
-
-    # --- 5) Horizon mask (use g context for user config) ---
+    # --- 2b) Location config: horizon mask, threshold (use g context for user config) ---
     location_config = {}
     try:
         user_cfg = getattr(g, 'user_config', {}) or {}
@@ -2556,6 +2652,35 @@ def get_plot_data(object_name):
     if location_config.get("altitude_threshold") is not None:
         altitude_threshold = location_config.get("altitude_threshold")
 
+    # --- 2c) Conditional GET: the payload is a pure function of these inputs ---
+    sampling_interval = getattr(g, 'sampling_interval', 15)
+    db_id = location_config.get("db_id")
+    skyglow_path = location_skyglow_path(current_app.instance_path, db_id) if db_id else None
+    etag = compute_etag('plot_data', ra, dec, lat, lon, tz_name, local_date, sampling_interval,
+                        horizon_mask, altitude_threshold, skyglow_path and file_validator(skyglow_path))
+    max_age = seconds_until_noon(tz_name)
+    if client_has(etag):
+        return validated_response(etag, max_age)
+
+    # --- 3) Build time grid and object series ---
+    times_local, times_utc = get_common_time_arrays(tz_name, local_date,
+                                                    sampling_interval_minutes=sampling_interval)
+    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    altaz_frame = AltAz(obstime=times_utc, location=location)
+    sky_coord = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg)
+    altaz_obj = sky_coord.transform_to(altaz_frame)
+    altitudes = altaz_obj.alt.deg
+    azimuths = (altaz_obj.az.deg + 360.0) % 360.0
+
+    # --- 4) Weather forecast section (DECOUPLED) ---
+    # Weather is now fetched asynchronously by the client after the chart loads.
+    # We just send an empty array so the data structure is consistent.
+    weather_forecast_series = []
+    is_offline = request.args.get('offline') == 'true'
+    print(f"[API Plot Data] Skipping weather fetch (will be loaded by client). Offline mode: {is_offline}")
+    # --- END Weather Section ---
+
+    # --- 5) Horizon mask ---
     if horizon_mask and isinstance(horizon_mask, list) and len(horizon_mask) > 1:
         try:
             # Enforce the active threshold floor on the mask before processing
@@ -2571,16 +2696,10 @@ def get_plot_data(object_name):
     # --- 6b) Skyglow horizon overlay ---
     skyglow_alt = None
     try:
-        db_id = location_config.get("db_id")
-        if db_id:
-            import os, json as _json
-            skyglow_path = os.path.join(current_app.instance_path, 'skyglow', f'{db_id}.json')
-            if os.path.exists(skyglow_path):
-                with open(skyglow_path) as f:
-                    sg = _json.load(f)
-                sg_horizon = sg.get('skyglow_horizon', [])
-                if sg_horizon:
-                    skyglow_alt = [None] + [max(0.0, v) if (v := _nearest_sg_alt(az, sg)) is not None else None for az in azimuths] + [None]
+        sg_horizon = load_skyglow_horizon(skyglow_path)
+        if sg_horizon is not None and len(azimuths):
+            floors = np.maximum(sg_horizon.floor_at(azimuths), 0.0).round(2)
+            skyglow_alt = [None] + floors.tolist() + [None]
     except Exception as sg_err:
         print(f"[API Plot Data] WARN: Could not load skyglow data: {sg_err}")
 
@@ -2641,7 +2760,7 @@ def get_plot_data(object_name):
         "weather_forecast": weather_forecast_series # This is now always []
     }
 
-    return jsonify(plot_data)
+    return validated_response(etag, max_age, plot_data)
 
 
 @api_bp.route('/api/get_observable_objects')
@@ -2677,10 +2796,6 @@ def get_observable_objects():
         - Sorted by observable_minutes descending
         - Limited to top 20
     """
-    from nova import load_global_request_context
-    from modules.astro_calculations import calculate_observable_duration_vectorized, calculate_sun_events_cached
-
-    load_global_request_context()
     load_full_astro_context()
 
     # Get exclusion parameter
@@ -2758,7 +2873,7 @@ def get_observable_objects():
         else:
             username = "guest_user"
 
-        user = db.query(DbUser).filter_by(username=username).one_or_none()
+        user = get_request_db_user(db, username)
         if not user:
             return jsonify({"error": _("User not found"), "objects": []}), 401
 
@@ -2801,43 +2916,19 @@ def get_observable_objects():
                     horizon_mask = loc_details.get('horizon_mask')
                     break
 
-        # Cache key: username + date + location + threshold uniquely identify the computation
-        obs_cache_key = (
-            f"obs_objects:{username}:{calc_date}:{lat:.4f}:{lon:.4f}"
-            f":{altitude_threshold}"
-        )
-
-        if obs_cache_key in observable_objects_cache:
-            full_list = observable_objects_cache[obs_cache_key]
-        else:
-            full_list = []
-            for obj in active_objects:
-                try:
-                    duration_td, max_alt, _, _ = calculate_observable_duration_vectorized(
-                        ra=obj.ra_hours,
-                        dec=obj.dec_deg,
-                        lat=lat,
-                        lon=lon,
-                        local_date=calc_date,
-                        tz_name=tz_name,
-                        altitude_threshold=altitude_threshold,
-                        horizon_mask=horizon_mask
-                    )
-
-                    observable_minutes = int(duration_td.total_seconds() / 60)
-
-                    if observable_minutes > 0:
-                        full_list.append({
-                            "object_name": obj.object_name,
-                            "common_name": obj.common_name or obj.object_name,
-                            "observable_minutes": observable_minutes,
-                            "max_altitude": round(max_alt, 1)
-                        })
-                except Exception as e:
-                    print(f"[API Observable Objects] Error calculating "
-                          f"for {obj.object_name}: {e}")
-                    continue
-            observable_objects_cache[obs_cache_key] = full_list
+        sampling_interval = nightly_sampling_interval(user_cfg)
+        snapshot = get_nightly_snapshot(db, user.id, lat, lon, tz_name, calc_date, altitude_threshold,
+                                        sampling_interval, horizon_mask)
+        full_list = []
+        for obj in active_objects:
+            night = snapshot.get(obj.object_name)
+            if night and night["observable_minutes"] > 0:
+                full_list.append({
+                    "object_name": obj.object_name,
+                    "common_name": obj.common_name or obj.object_name,
+                    "observable_minutes": night["observable_minutes"],
+                    "max_altitude": round(night["max_altitude"], 1)
+                })
 
         # Post-filter: exclude primary object, sort, limit
         observable_list = [
@@ -2961,7 +3052,7 @@ def get_object_data(object_name):
     db = get_db()
     try:
         # --- 2. Get User Record (No change needed here) ---
-        user = db.query(DbUser).filter_by(username=username).one_or_none()
+        user = get_request_db_user(db, username)
         if not user:
             return jsonify({
                 'Object': object_name, 'Common Name': "Error: User not found.", 'error': True
@@ -3008,16 +3099,10 @@ def get_object_data(object_name):
         }
         # --- End Location Determination ---
 
-        # Load skyglow data for this location (single request)
-        sg_data = {}
+        # Compiled skyglow horizon for this location (cached, mtime-validated)
+        sg_horizon = None
         if os.environ.get("NASA_EARTHDATA_TOKEN"):
-            sg_path = os.path.join(
-                current_app.instance_path, "skyglow",
-                f"{selected_location.id}.json"
-            )
-            if os.path.exists(sg_path):
-                with open(sg_path) as f:
-                    sg_data = json.load(f)
+            sg_horizon = load_skyglow_horizon(location_skyglow_path(current_app.instance_path, selected_location.id))
 
         # --- 4. Query ONLY the specific object ---
         obj_record = db.query(AstroObject).filter_by(user_id=user.id, object_name=object_name).one_or_none()
@@ -3096,26 +3181,19 @@ def get_object_data(object_name):
                 if alt_11pm >= altitude_threshold and alt_11pm < required_altitude_11pm:
                     is_obstructed_at_11pm = True
 
-            nightly_curves_cache[cache_key] = {
-                "times_local": times_local, "altitudes": altitudes, "azimuths": azimuths, "transit_time": transit_time,
-                "obs_duration_minutes": int(obs_duration.total_seconds() / 60) if obs_duration else 0,
-                "max_altitude": round(max_alt, 1) if max_alt is not None else "N/A",
-                "alt_11pm": f"{alt_11pm:.2f}", "az_11pm": f"{az_11pm:.2f}",
-                "is_obstructed_at_11pm": is_obstructed_at_11pm
-            }
+            nightly_curves_cache[cache_key] = NightlyCurve(
+                shared_time_axis(tz_name, local_date, sampling_interval, times_utc), altitudes, azimuths,
+                transit_time=transit_time,
+                obs_duration_minutes=int(obs_duration.total_seconds() / 60) if obs_duration else 0,
+                max_altitude=round(max_alt, 1) if max_alt is not None else "N/A",
+                alt_11pm=f"{alt_11pm:.2f}", az_11pm=f"{az_11pm:.2f}",
+                is_obstructed_at_11pm=is_obstructed_at_11pm
+            )
 
         cached_night_data = nightly_curves_cache[cache_key]
 
         # Calculate current position and trend (logic remains similar)
-        now_utc = datetime.now(pytz.utc)
-        time_diffs = [abs((t - now_utc).total_seconds()) for t in cached_night_data["times_local"]]
-        current_index = np.argmin(time_diffs)
-        current_alt = cached_night_data["altitudes"][current_index]
-        current_az = cached_night_data["azimuths"][current_index]
-        next_index = min(current_index + 1, len(cached_night_data["altitudes"]) - 1)
-        next_alt = cached_night_data["altitudes"][next_index]
-        trend = '–'
-        if abs(next_alt - current_alt) > 0.01: trend = '↑' if next_alt > current_alt else '↓'
+        current_alt, current_az, trend = cached_night_data.position_at(datetime.now(pytz.utc).timestamp())
 
         # Check obstruction now
         is_obstructed_now = False
@@ -3125,19 +3203,14 @@ def get_object_data(object_name):
             if current_alt >= altitude_threshold and current_alt < required_altitude_now:
                 is_obstructed_now = True
 
-        # Below skyglow floor check (current)
-        is_below_skyglow = False
-        if sg_data and not is_obstructed_now:
-            sg_floor = _nearest_sg_alt(current_az, sg_data)
-            if sg_floor is not None and current_alt < sg_floor:
-                is_below_skyglow = True
-
-        # Below skyglow floor check (11PM)
-        is_below_skyglow_11pm = False
-        if sg_data and not is_obstructed_at_11pm:
-            sg_floor_11pm = _nearest_sg_alt(az_11pm, sg_data)
-            if sg_floor_11pm is not None and alt_11pm < sg_floor_11pm:
-                is_below_skyglow_11pm = True
+        # Below skyglow floor checks (current, 11PM)
+        alt_11, az_11 = safe_float(cached_night_data.alt_11pm), safe_float(cached_night_data.az_11pm)
+        below_now, below_11pm = below_floor(
+            sg_horizon,
+            [current_alt, alt_11 if alt_11 is not None else np.nan],
+            [current_az, az_11 if az_11 is not None else np.nan])
+        is_below_skyglow = bool(below_now) and not is_obstructed_now
+        is_below_skyglow_11pm = bool(below_11pm) and not cached_night_data.is_obstructed_at_11pm
 
         # Calculate Moon separation (logic remains similar)
         time_obj = Time(datetime.now(pytz.utc))
@@ -3147,7 +3220,7 @@ def get_object_data(object_name):
         frame = AltAz(obstime=time_obj, location=location_for_moon)
         angular_sep = obj_coord_sky.transform_to(frame).separation(moon_coord.transform_to(frame)).deg
 
-        is_obstructed_at_11pm = cached_night_data.get('is_obstructed_at_11pm', False)
+        is_obstructed_at_11pm = cached_night_data.is_obstructed_at_11pm
 
         # --- START OF NEW CALCULATIONS ---
         # 1. Calculate Best Month from RA
@@ -3170,11 +3243,11 @@ def get_object_data(object_name):
             'Altitude Current': f"{current_alt:.2f}",
             'Azimuth Current': f"{current_az:.2f}",
             'Trend': trend,
-            'Altitude 11PM': cached_night_data['alt_11pm'],
-            'Azimuth 11PM': cached_night_data['az_11pm'],
-            'Transit Time': cached_night_data['transit_time'],
-            'Observable Duration (min)': cached_night_data['obs_duration_minutes'],
-            'Max Altitude (°)': cached_night_data['max_altitude'],
+            'Altitude 11PM': cached_night_data.alt_11pm,
+            'Azimuth 11PM': cached_night_data.az_11pm,
+            'Transit Time': cached_night_data.transit_time,
+            'Observable Duration (min)': cached_night_data.obs_duration_minutes,
+            'Max Altitude (°)': cached_night_data.max_altitude,
             'Angular Separation (°)': round(angular_sep),
             'Time': current_datetime_local.strftime('%Y-%m-%d %H:%M:%S'),
             'is_obstructed_now': is_obstructed_now,
@@ -3279,16 +3352,10 @@ def get_desktop_data_batch():
         altitude_threshold = location_obj.altitude_threshold if location_obj.altitude_threshold is not None else g.user_config.get(
             "altitude_threshold", 20)
 
-        # Load skyglow data for this location (batch cache)
-        sg_data = {}
+        # Compiled skyglow horizon for this location (cached, mtime-validated)
+        sg_horizon = None
         if os.environ.get("NASA_EARTHDATA_TOKEN"):
-            sg_path = os.path.join(
-                current_app.instance_path, "skyglow",
-                f"{location_obj.id}.json"
-            )
-            if os.path.exists(sg_path):
-                with open(sg_path) as f:
-                    sg_data = json.load(f)
+            sg_horizon = load_skyglow_horizon(location_skyglow_path(current_app.instance_path, location_obj.id))
 
         try:
             local_tz = pytz.timezone(tz_name)
@@ -3316,15 +3383,15 @@ def get_desktop_data_batch():
         else:
             local_date = current_datetime_local.strftime('%Y-%m-%d')
 
-        sampling_interval = 15 if SINGLE_USER_MODE else int(os.environ.get('CALCULATION_PRECISION', 15))
+        sampling_interval = nightly_sampling_interval(g.user_config or {})
         fixed_time_utc_str = get_utc_time_for_local_11pm(tz_name)
 
-        # Moon / Ephem Prep
-        time_obj_now = Time(current_datetime_local.astimezone(pytz.utc))
+        # Ephem Prep (moon separations are computed for the whole batch after the loop)
+        now_ts = current_datetime_local.timestamp()
         loc_earth = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
-        moon_coord = get_body('moon', time_obj_now, loc_earth)
-        frame_now = AltAz(obstime=time_obj_now, location=loc_earth)
-        moon_in_frame = moon_coord.transform_to(frame_now)
+        pending_sep = []  # (item, ra, dec) awaiting 'Angular Separation (°)'
+        pending_sg = []   # (item, cur_alt, cur_az, alt_11pm, az_11pm) awaiting the skyglow floor flags
+        nightly = None    # shared nightly snapshot, fetched on the first curve-cache miss
         location_key = location_obj.name.lower().replace(' ', '_')
 
         # 5. Process Batch
@@ -3379,9 +3446,10 @@ def get_desktop_data_batch():
                 if cache_key in nightly_curves_cache:
                     cached = nightly_curves_cache[cache_key]
                 else:
-                    obs_duration, max_alt, _, _ = calculate_observable_duration_vectorized(
-                        ra, dec, lat, lon, local_date, tz_name, altitude_threshold, sampling_interval, horizon_mask
-                    )
+                    if nightly is None:
+                        nightly = get_nightly_snapshot(db, user.id, lat, lon, tz_name, local_date,
+                                                       altitude_threshold, sampling_interval, horizon_mask)
+                    night = nightly.get(obj.object_name) or {'observable_minutes': 0, 'max_altitude': 0.0}
                     transit = calculate_transit_time(ra, dec, lat, lon, tz_name, local_date)
                     alt_11, az_11 = ra_dec_to_alt_az(ra, dec, lat, lon, fixed_time_utc_str)
 
@@ -3397,57 +3465,24 @@ def get_desktop_data_batch():
                     alts = sky_c.transform_to(aa_frame).alt.deg
                     azs = sky_c.transform_to(aa_frame).az.deg
 
-                    cached = {
-                        "times_local": times_local, "altitudes": alts, "azimuths": azs,
-                        "transit_time": transit,
-                        "obs_duration_minutes": int(obs_duration.total_seconds() / 60) if obs_duration else 0,
-                        "max_altitude": round(max_alt, 1) if max_alt is not None else "N/A",
-                        "alt_11pm": f"{alt_11:.2f}", "az_11pm": f"{az_11:.2f}",
-                        "is_obstructed_at_11pm": is_obst_11
-                    }
+                    cached = NightlyCurve(
+                        shared_time_axis(tz_name, local_date, sampling_interval, times_utc), alts, azs,
+                        transit_time=transit,
+                        obs_duration_minutes=night['observable_minutes'],
+                        max_altitude=round(night['max_altitude'], 1),
+                        alt_11pm=f"{alt_11:.2f}", az_11pm=f"{az_11:.2f}",
+                        is_obstructed_at_11pm=is_obst_11
+                    )
                     nightly_curves_cache[cache_key] = cached
 
-                # Current Position (Fast Interpolation)
-                # Use the effective simulation time converted to UTC
-                now_utc = current_datetime_local.astimezone(pytz.utc)
-                idx = np.argmin([abs((t - now_utc).total_seconds()) for t in cached["times_local"]])
-                cur_alt = cached["altitudes"][idx]
-                cur_az = cached["azimuths"][idx]
-
-                next_idx = min(idx + 1, len(cached["altitudes"]) - 1)
-                trend = '–'
-                if abs(cached["altitudes"][next_idx] - cur_alt) > 0.01:
-                    trend = '↑' if cached["altitudes"][next_idx] > cur_alt else '↓'
+                # Current Position (grid index + linear interpolation at the effective simulation time)
+                cur_alt, cur_az, trend = cached.position_at(now_ts)
 
                 is_obst_now = False
                 if horizon_mask:
                     req = interpolate_horizon(cur_az, sorted(horizon_mask, key=lambda p: p[0]), altitude_threshold)
                     if cur_alt >= altitude_threshold and cur_alt < req: is_obst_now = True
 
-                # Below skyglow floor check (current)
-                is_below_skyglow = False
-                if sg_data and not is_obst_now:
-                    sg_floor = _nearest_sg_alt(cur_az, sg_data)
-                    if sg_floor is not None and cur_alt < sg_floor:
-                        is_below_skyglow = True
-
-                # Below skyglow floor check (11PM)
-                is_below_skyglow_11pm = False
-                if sg_data and not cached.get('is_obstructed_at_11pm', False):
-                    alt_11 = cached.get('alt_11pm')
-                    az_11 = cached.get('az_11pm')
-                    if alt_11 is not None and az_11 is not None:
-                        sg_floor_11pm = _nearest_sg_alt(float(az_11), sg_data)
-                        if sg_floor_11pm is not None and float(alt_11) < sg_floor_11pm:
-                            is_below_skyglow_11pm = True
-
-                sep = "N/A"
-                try:
-                    sky_c = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg)
-                    sep = round(sky_c.transform_to(frame_now).separation(moon_in_frame).deg)
-                except:
-                    pass
-
                 best_m = ["Oct", "Nov", "Dec", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep"][
                     int(ra / 2) % 12]
                 max_culm = 90.0 - abs(lat - dec)
@@ -3456,16 +3491,16 @@ def get_desktop_data_batch():
                     'Altitude Current': f"{cur_alt:.2f}",
                     'Azimuth Current': f"{cur_az:.2f}",
                     'Trend': trend,
-                    'Altitude 11PM': cached['alt_11pm'],
-                    'Azimuth 11PM': cached['az_11pm'],
-                    'Transit Time': cached['transit_time'],
-                    'Observable Duration (min)': cached['obs_duration_minutes'],
-                    'Max Altitude (°)': cached['max_altitude'],
-                    'Angular Separation (°)': sep,
+                    'Altitude 11PM': cached.alt_11pm,
+                    'Azimuth 11PM': cached.az_11pm,
+                    'Transit Time': cached.transit_time,
+                    'Observable Duration (min)': cached.obs_duration_minutes,
+                    'Max Altitude (°)': cached.max_altitude,
+                    'Angular Separation (°)': "N/A",
                     'is_obstructed_now': is_obst_now,
-                    'below_skyglow_floor': is_below_skyglow,
-                    'below_skyglow_floor_11pm': is_below_skyglow_11pm,
-                    'is_obstructed_at_11pm': cached['is_obstructed_at_11pm'],
+                    'below_skyglow_floor': False,
+                    'below_skyglow_floor_11pm': False,
+                    'is_obstructed_at_11pm': cached.is_obstructed_at_11pm,
                     'best_month_ra': best_m,
                     'max_culmination_alt': max_culm,
                     'error': False
@@ -3476,11 +3511,30 @@ def get_desktop_data_batch():
                     'session_count': session_map.get(obj.object_name, 0)
                 })
                 results.append(item)
+                pending_sep.append((item, ra, dec))
+                if sg_horizon is not None:
+                    pending_sg.append((item, cur_alt, cur_az, safe_float(cached.alt_11pm), safe_float(cached.az_11pm)))
 
             except Exception as e:
                 print(f"Batch Error {obj.object_name}: {e}")
                 results.append({'Object': obj.object_name, 'Common Name': 'Error: Calc failed', 'error': True})
 
+        # Moon separation for the whole batch in one vectorized call
+        if pending_sep:
+            seps = moon_separations([p[1] for p in pending_sep], [p[2] for p in pending_sep], lat, lon, now_ts)
+            if seps is not None:
+                for (item, _, _), sep in zip(pending_sep, seps):
+                    item['Angular Separation (°)'] = int(sep)
+
+        # Skyglow floor flags for the whole batch (now and 11 PM) in one lookup
+        if pending_sg:
+            alts = np.array([[p[1], p[3] if p[3] is not None else np.nan] for p in pending_sg], dtype=float)
+            azs = np.array([[p[2], p[4] if p[4] is not None else np.nan] for p in pending_sg], dtype=float)
+            below = below_floor(sg_horizon, alts, azs)
+            for (item, *_), (now_flag, late_flag) in zip(pending_sg, below):
+                item['below_skyglow_floor'] = bool(now_flag) and not item['is_obstructed_now']
+                item['below_skyglow_floor_11pm'] = bool(late_flag) and not item['is_obstructed_at_11pm']
+
         response_data = {
             "results": results,
             "total": total_count,
@@ -3539,14 +3593,18 @@ def get_yearly_heatmap_chunk():
         # Specific chunk filename
         chunk_cache_filename = os.path.join(CACHE_DIR, f"{base_cache_name}.part{chunk_idx}.json")
 
-        # 3. FAST PATH: Read existing chunk from disk
-        if os.path.exists(chunk_cache_filename):
-            mtime = os.path.getmtime(chunk_cache_filename)
-            if (time.time() - mtime) < 86400:  # 24 hours
+        # 3. FAST PATH: Read existing chunk from disk (or just revalidate it)
+        validator = file_validator(chunk_cache_filename)
+        if validator:
+            age = time.time() - validator[1] / 1e9
+            if age < 86400:  # 24 hours
+                etag = compute_etag('heatmap_chunk', validator)
+                if client_has(etag):
+                    return validated_response(etag, 86400 - age)
                 try:
                     with open(chunk_cache_filename, 'r') as f:
                         # print(f"[HEATMAP] Serving chunk {chunk_idx} from cache: {chunk_cache_filename}")
-                        return jsonify(json.load(f))
+                        return validated_response(etag, 86400 - age, json.load(f))
                 except Exception as e:
                     print(f"[HEATMAP] Error reading chunk cache: {e}")
 
@@ -3679,6 +3737,9 @@ def get_yearly_heatmap_chunk():
         except Exception as e:
             print(f"[HEATMAP] Failed to write cache file: {e}")
 
+        validator = file_validator(chunk_cache_filename)
+        if validator:
+            return validated_response(compute_etag('heatmap_chunk', validator), 86400, result_data)
         return jsonify(result_data)
 
     except Exception as e:
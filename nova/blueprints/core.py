@@ -41,7 +41,7 @@ import yaml
 from flask import abort, jsonify, redirect, Response, stream_with_context
 from flask_login import current_user, login_required
 from sqlalchemy import func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer_group
 import time
 from astropy.coordinates import SkyCoord, get_constellation, EarthLocation, AltAz, get_body
 from astropy.time import Time
@@ -49,8 +49,9 @@ import astropy.units as u
 import ephem
 
 from nova import SINGLE_USER_MODE  # Import from nova for test patching compatibility
-from nova.analytics import record_event, record_login
+from nova.analytics import record_event, record_login, event_counts_since
 from nova.config import CACHE_DIR, UPLOAD_FOLDER, cache_worker_status
+from nova.http_cache import client_has, compute_etag, file_validator, seconds_until_noon, validated_response
 from nova.helpers import (
     _parse_float_from_request,
     convert_to_native_python,
@@ -58,6 +59,7 @@ from nova.helpers import (
     get_db,
     get_outlook_cache_path,
     get_ra_dec,
+    get_request_db_user,
     get_user_log_string,
     load_full_astro_context,
     normalize_object_name,
@@ -74,6 +76,7 @@ from nova.models import (
     Location,
     Project,
     Rig,
+    SESSION_LOG_GROUP,
     SessionLocal,
     UiPref,
     UserCustomFilter,
@@ -81,9 +84,12 @@ from nova.models import (
 from datetime import date, datetime, timedelta
 import calendar
 
-from modules.astro_calculations import calculate_sun_events_cached, calculate_moon_phase_cached, calculate_observable_duration_vectorized
+from modules.astro_calculations import calculate_sun_events_cached, calculate_moon_phase_cached, calculate_observable_duration_vectorized, calculate_night_series
 import requests
 import modules.nova_data_fetcher as nova_data_fetcher
+from nova.nightly_snapshot import nightly_sampling_interval
+from nova.metadata_fetcher import get_metadata_fetcher, fetch_object_metadata
+from nova.skyglow_service import submit_locations as submit_skyglow_locations
 
 from ics import Calendar, Event
 import arrow
@@ -119,84 +125,6 @@ core_bp = Blueprint('core', __name__)
 # =============================================================================
 
 
-# =============================================================================
-# Skyglow Background Task Helpers
-# =============================================================================
-
-def _skyglow_needs_recompute(cache_path, lat, lon, elev, sqm):
-    """Return True if skyglow JSON is missing or location params have changed."""
-    if not os.path.exists(cache_path):
-        return True
-    try:
-        with open(cache_path) as f:
-            meta = json.load(f).get('_meta', {})
-        return (
-            abs(meta.get('lat', 0) - lat) > 0.0001 or
-            abs(meta.get('lon', 0) - lon) > 0.0001 or
-            abs(meta.get('elev_m', 0) - elev) > 1.0 or
-            abs(meta.get('sqm_zenith', 0) - sqm) > 0.01
-        )
-    except Exception:
-        return True
-
-
-def _run_skyglow_task(app, location_id, lat, lon, elevation, sqm_zenith, bortle_scale, cache_dir):
-    """Fire-and-forget background task: compute skyglow profile for a location."""
-    try:
-        token = os.environ.get('NASA_EARTHDATA_TOKEN')
-        if not token:
-            print(f"[SKYGLOW] No NASA_EARTHDATA_TOKEN found, skipping skyglow for location {location_id}")
-            return
-        BORTLE_TO_SQM = {1: 22.0, 2: 21.5, 3: 21.3, 4: 20.8, 5: 20.0,
-                         6: 19.1, 7: 18.4, 8: 17.0, 9: 15.5}
-        sqm = sqm_zenith if sqm_zenith is not None else BORTLE_TO_SQM.get(bortle_scale, 20.0)
-        elev = elevation if elevation is not None else 0.0
-        year = datetime.utcnow().year - 1
-        with app.app_context():
-            print(f"[SKYGLOW] Computing for location {location_id} (lat={lat}, lon={lon}, elev={elev}, sqm={sqm})")
-            from tools.skyglow.cache import get_or_download_tile
-            from tools.skyglow.garstang import compute_skyglow_profile, compute_skyglow_horizon
-            data, lats_g, lons_g = get_or_download_tile(lat, lon, year, token)
-            profile = compute_skyglow_profile(lat, lon, elev, data, lats_g, lons_g, sqm_zenith=sqm)
-            horizon = compute_skyglow_horizon(profile)
-            os.makedirs(cache_dir, exist_ok=True)
-            out_path = os.path.join(cache_dir, f"{location_id}.json")
-            horizon['_meta'] = {
-                'lat': lat,
-                'lon': lon,
-                'elev_m': elev,
-                'sqm_zenith': sqm,
-                'computed_at': datetime.utcnow().isoformat()
-            }
-            with open(out_path, 'w') as f:
-                json.dump(horizon, f)
-            print(f"[SKYGLOW] Saved profile to {out_path}")
-    except Exception:
-        print(f"[SKYGLOW] Error for location {location_id}:")
-        traceback.print_exc()
-
-
-def _fire_skyglow_for_locations(app, locations, instance_path):
-    """Launch fire-and-forget skyglow computation threads for a list of locations."""
-    cache_dir = os.path.join(instance_path, 'skyglow')
-    for loc in locations:
-        uid = loc.stable_uid or str(loc.id)
-        cache_path = os.path.join(cache_dir, f'{uid}.json')
-        BORTLE_TO_SQM = {1: 22.0, 2: 21.5, 3: 21.3, 4: 20.8, 5: 20.0,
-                         6: 19.1, 7: 18.4, 8: 17.0, 9: 15.5}
-        sqm = loc.sqm_zenith if loc.sqm_zenith is not None else BORTLE_TO_SQM.get(loc.bortle_scale, 20.0)
-        elev = loc.elevation if loc.elevation is not None else 0.0
-        if not _skyglow_needs_recompute(cache_path, loc.lat, loc.lon, elev, sqm):
-            print(f"[SKYGLOW] Skipping {uid} — params unchanged")
-            continue
-        t = threading.Thread(
-            target=_run_skyglow_task,
-            args=(app, uid, loc.lat, loc.lon, loc.elevation, loc.sqm_zenith, loc.bortle_scale, cache_dir),
-            daemon=True
-        )
-        t.start()
-
-
 @core_bp.route('/logout', methods=['POST'])
 def logout():
     logout_user()
@@ -448,7 +376,7 @@ def get_locations():
     db = get_db()
     try:
         # Find the user record in the application database
-        user = db.query(DbUser).filter_by(username=username).one_or_none()
+        user = get_request_db_user(db, username)
         if not user:
             # If the user doesn't exist in app.db, return empty lists
             return jsonify({"locations": [], "selected": None})
@@ -744,11 +672,7 @@ def config_form():
                 if location_written:
                     bust_nightly_curves_cache(g.user_config.get('username') or g.db_user.username)
                     if skyglow_locations:
-                        _fire_skyglow_for_locations(
-                            app=current_app._get_current_object(),
-                            locations=skyglow_locations,
-                            instance_path=current_app.instance_path
-                        )
+                        submit_skyglow_locations(skyglow_locations, current_app.instance_path)
                 flash(_("%(message)s updated successfully.", message=message or 'Configuration'), "success")
                 return redirect(url_for('core.config_form'))
             else:
@@ -888,12 +812,17 @@ def get_outlook_data():
         print(f"[OUTLOOK] Worker for {status_key} is '{worker_status}'. Telling client to wait.")
         return jsonify({"status": worker_status, "results": []})
 
-    if os.path.exists(cache_filename):
+    validator = file_validator(cache_filename)
+    if validator:
         try:
-            cache_mtime = os.path.getmtime(cache_filename)
-            is_stale = (datetime.now().timestamp() - cache_mtime) > 86400 # 1 day
+            cache_age = datetime.now().timestamp() - validator[1] / 1e9
+            is_stale = cache_age > 86400 # 1 day
 
             if not is_stale:
+                # The cache file is rewritten by the worker; revalidate without re-reading it
+                etag = compute_etag('outlook', validator)
+                if client_has(etag):
+                    return validated_response(etag, 0)
                 with open(cache_filename, 'r') as f:
                     data = json.load(f)
 
@@ -904,7 +833,7 @@ def get_outlook_data():
                     print(f"[OUTLOOK] Cache for {status_key} is missing 'has_framing'. Forcing update.")
                     # Fall through to trigger new worker
                 else:
-                    return jsonify({"status": "complete", "results": opportunities})
+                    return validated_response(etag, 0, {"status": "complete", "results": opportunities})
             else:
                 print(f"[OUTLOOK] Cache for {status_key} is stale. Will start new worker.")
         except (json.JSONDecodeError, IOError, OSError) as e:
@@ -1102,7 +1031,7 @@ def fetch_object_details():
         return jsonify({"status": "error", "message": _("No object specified.")}), 400
 
     try:
-        fetched = nova_data_fetcher.get_astronomical_data(object_name)
+        fetched = fetch_object_metadata(object_name)
 
         record_event('simbad_lookup')
         # --- FIX: Convert NumPy types to native Python types before sending to browser ---
@@ -1248,18 +1177,15 @@ def stream_fetch_details():
             objects_to_check = db.query(AstroObject).filter_by(user_id=app_db_user.id).all()
 
             total_count = len(objects_to_check)
-            modified_count = 0
+            modified = set()  # object names changed by either step, each counted once
 
             # Send initial open event
             yield f"data: {json.dumps({'progress': 0, 'message': 'Starting analysis...'})}\n\n"
 
             refetch_triggers = [None, "", "N/A", "Not Found", "Fetch Error"]
 
-            for i, obj in enumerate(objects_to_check):
-                # Calculate percentage
-                pct = int((i / total_count) * 100)
-                yield f"data: {json.dumps({'progress': pct, 'message': f'Checking {obj.object_name}...'})}\n\n"
-
+            to_fetch = {}
+            for obj in objects_to_check:
                 needs_update = (
                         obj.type in refetch_triggers or
                         obj.magnitude in refetch_triggers or
@@ -1267,47 +1193,51 @@ def stream_fetch_details():
                         obj.sb in refetch_triggers or
                         obj.constellation in refetch_triggers
                 )
-
                 if needs_update:
-                    item_modified = False
-                    try:
-                        # 1. Constellation Auto-Calc
-                        if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
-                            coords = SkyCoord(ra=obj.ra_hours * u.hourangle, dec=obj.dec_deg * u.deg)
-                            obj.constellation = get_constellation(coords, short_name=True)
-                            item_modified = True
-
-                        # 2. External API Fetch
-                        yield f"data: {json.dumps({'progress': pct, 'message': f'Fetching data for {obj.object_name}...'})}\n\n"
-                        fetched_data = nova_data_fetcher.get_astronomical_data(obj.object_name)
-
-                        if fetched_data.get("object_type"):
-                            obj.type = fetched_data["object_type"]
-                            item_modified = True
-                        if fetched_data.get("magnitude"):
-                            obj.magnitude = str(fetched_data["magnitude"])
-                            item_modified = True
-                        if fetched_data.get("size_arcmin"):
-                            obj.size = str(fetched_data["size_arcmin"])
-                            item_modified = True
-                        if fetched_data.get("surface_brightness"):
-                            obj.sb = str(fetched_data["surface_brightness"])
-                            item_modified = True
-
-                        if item_modified:
-                            modified_count += 1
-                            time.sleep(0.5)  # Polite delay
-
-                    except Exception as e:
-                        print(f"Failed details fetch for {obj.object_name}: {e}")
-                        # Continue stream despite individual object error
-
-            if modified_count > 0:
+                    # 1. Constellation Auto-Calc
+                    if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
+                        coords = SkyCoord(ra=obj.ra_hours * u.hourangle, dec=obj.dec_deg * u.deg)
+                        obj.constellation = get_constellation(coords, short_name=True)
+                        modified.add(obj.object_name)
+                    to_fetch[obj.object_name] = obj
+
+            yield f"data: {json.dumps({'progress': 0, 'message': f'Fetching data for {len(to_fetch)} of {total_count} objects...'})}\n\n"
+
+            # 2. External API Fetch (concurrent, rate-limited, persistently cached)
+            fetch_total = len(to_fetch)
+            for i, (name, fetched_data, err) in enumerate(get_metadata_fetcher().iter_fetch(list(to_fetch)), 1):
+                pct = int((i / fetch_total) * 100) if fetch_total else 100
+                if err is not None:
+                    # Continue stream despite individual object error
+                    print(f"Failed details fetch for {name}: {err}")
+                    yield f"data: {json.dumps({'progress': pct, 'message': f'Failed {name}'})}\n\n"
+                    continue
+
+                obj = to_fetch[name]
+                item_modified = False
+                if fetched_data.get("object_type"):
+                    obj.type = fetched_data["object_type"]
+                    item_modified = True
+                if fetched_data.get("magnitude"):
+                    obj.magnitude = str(fetched_data["magnitude"])
+                    item_modified = True
+                if fetched_data.get("size_arcmin"):
+                    obj.size = str(fetched_data["size_arcmin"])
+                    item_modified = True
+                if fetched_data.get("surface_brightness"):
+                    obj.sb = str(fetched_data["surface_brightness"])
+                    item_modified = True
+
+                if item_modified:
+                    modified.add(name)
+                yield f"data: {json.dumps({'progress': pct, 'message': f'Checked {name}'})}\n\n"
+
+            if modified:
                 yield f"data: {json.dumps({'progress': 99, 'message': 'Saving changes...'})}\n\n"
                 db.commit()
 
             # Send final done signal
-            yield f"data: {json.dumps({'progress': 100, 'message': 'Complete!', 'done': True, 'modified': modified_count})}\n\n"
+            yield f"data: {json.dumps({'progress': 100, 'message': 'Complete!', 'done': True, 'modified': len(modified)})}\n\n"
 
         except Exception as e:
             print(f"Stream Fetch Error: {e}")
@@ -1336,6 +1266,7 @@ def fetch_all_details():
         modified = False
         refetch_triggers = [None, "", "N/A", "Not Found", "Fetch Error"]
 
+        to_fetch = {}
         for obj in objects_to_check:
             needs_update = (
                 obj.type in refetch_triggers or
@@ -1345,23 +1276,24 @@ def fetch_all_details():
                 obj.constellation in refetch_triggers
             )
             if needs_update:
-                try:
-                    # Auto-calculate Constellation if missing
-                    if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
-                        coords = SkyCoord(ra=obj.ra_hours*u.hourangle, dec=obj.dec_deg*u.deg)
-                        obj.constellation = get_constellation(coords, short_name=True)
-                        modified = True
-
-                    # Fetch other details from external API
-                    fetched_data = nova_data_fetcher.get_astronomical_data(obj.object_name)
-                    if fetched_data.get("object_type"): obj.type = fetched_data["object_type"]
-                    if fetched_data.get("magnitude"): obj.magnitude = str(fetched_data["magnitude"])
-                    if fetched_data.get("size_arcmin"): obj.size = str(fetched_data["size_arcmin"])
-                    if fetched_data.get("surface_brightness"): obj.sb = str(fetched_data["surface_brightness"])
+                # Auto-calculate Constellation if missing
+                if obj.constellation in refetch_triggers and obj.ra_hours is not None and obj.dec_deg is not None:
+                    coords = SkyCoord(ra=obj.ra_hours*u.hourangle, dec=obj.dec_deg*u.deg)
+                    obj.constellation = get_constellation(coords, short_name=True)
                     modified = True
-                    time.sleep(0.5) # Be kind to external APIs
-                except Exception as e:
-                    print(f"Failed to fetch details for {obj.object_name}: {e}")
+                to_fetch[obj.object_name] = obj
+
+        # Fetch other details concurrently (rate-limited, persistently cached)
+        for name, fetched_data, err in get_metadata_fetcher().iter_fetch(list(to_fetch)):
+            if err is not None:
+                print(f"Failed to fetch details for {name}: {err}")
+                continue
+            obj = to_fetch[name]
+            if fetched_data.get("object_type"): obj.type = fetched_data["object_type"]
+            if fetched_data.get("magnitude"): obj.magnitude = str(fetched_data["magnitude"])
+            if fetched_data.get("size_arcmin"): obj.size = str(fetched_data["size_arcmin"])
+            if fetched_data.get("surface_brightness"): obj.sb = str(fetched_data["surface_brightness"])
+            modified = True
 
         if modified:
             db.commit()
@@ -1388,39 +1320,14 @@ def index():
 
     username = "default" if SINGLE_USER_MODE else current_user.username if current_user.is_authenticated else "guest_user"
     db = get_db()
-    user = db.query(DbUser).filter_by(username=username).one_or_none()
+    user = get_request_db_user(db, username)
     if not user:
         # Handle case where user is authenticated but not yet in app.db
-        return render_template('index.html', journal_sessions=[], hide_invisible=False,
+        return render_template('index.html', hide_invisible=False,
                                imaging_criteria={})
 
-    sessions = db.query(JournalSession).filter_by(user_id=user.id).order_by(JournalSession.date_utc.desc()).all()
-    all_projects = db.query(Project).filter_by(user_id=user.id).all()
-    project_map = {p.id: p.name for p in all_projects}
-    objects_from_db = db.query(AstroObject).filter_by(user_id=user.id).all()
-    object_names_lookup = {o.object_name: o.common_name for o in objects_from_db}
-
-    # --- THIS IS THE CRITICAL FIX ---
-    # Convert the list of objects into a list of JSON-safe dictionaries
-    sessions_for_template = []
-    for session in sessions:
-        # Create a dictionary from the database object's columns
-        session_dict = {c.name: getattr(session, c.name) for c in session.__table__.columns}
-
-        # Convert the date object to an ISO string for JavaScript
-        if isinstance(session_dict.get('date_utc'), (datetime, date)):
-            session_dict['date_utc'] = session_dict['date_utc'].isoformat()
-
-        # Add the common name for convenience in the template
-        session_dict['target_common_name'] = object_names_lookup.get(session.object_name, session.object_name)
-
-        if session.project_id:
-            session_dict['project_name'] = project_map.get(session.project_id, "Unknown Project")
-        else:
-            session_dict['project_name'] = "-"  # Or "Standalone"
-
-        sessions_for_template.append(session_dict)
-    # --- END OF FIX ---
+    # The journal tab is filled client-side from /api/journal/sessions (keyset-paginated),
+    # so the page itself no longer carries the session list.
 
     local_tz = pytz.timezone(g.tz_name or 'UTC')
     now_local = datetime.now(local_tz)
@@ -1441,7 +1348,6 @@ def index():
 
     record_event('dashboard_load')
     return render_template('index.html',
-                           journal_sessions=sessions_for_template,
                            selected_day=observing_date_for_calcs.day,
                            selected_month=observing_date_for_calcs.month,
                            selected_year=observing_date_for_calcs.year,
@@ -1527,6 +1433,13 @@ def sun_events():
             observing_date = now_local.date()
     local_date = observing_date.strftime('%Y-%m-%d')
 
+    # The payload only changes with the observing date and the displayed minute
+    now_hm = now_local.strftime('%H:%M')
+    etag = compute_etag('sun_events', lat, lon, tz_name, local_date, now_hm)
+    max_age = min(60 - now_local.second, seconds_until_noon(tz_name, now_local))
+    if client_has(etag):
+        return validated_response(etag, max_age)
+
     # Calculate sun events using determined variables
     events = calculate_sun_events_cached(local_date, tz_name, lat, lon)
 
@@ -1539,13 +1452,14 @@ def sun_events():
 
     # Add all data to the response JSON
     events["date"] = local_date
-    events["time"] = now_local.strftime('%H:%M')
+    events["time"] = now_hm
     events["phase"] = moon_phase # Use calculated (or N/A) phase
     # Add error field if moon phase calculation failed
     if moon_phase == "N/A":
         events["error"] = events.get("error","") + " Moon phase calculation failed."
+        return jsonify(events)
 
-    return jsonify(events)
+    return validated_response(etag, max_age, events)
 
 
 @core_bp.route('/update_project', methods=['POST'])
@@ -1637,36 +1551,21 @@ def analytics_dashboard():
         since = today - timedelta(days=90)
         days_count = 90
 
-        # Aggregate events: total count and active days per event name
+        # Persisted + still-buffered counts per (event, day); aggregated here so
+        # the dashboard never lags behind the write-behind buffer.
         from sqlalchemy import select, func as sql_func
-        stmt = select(
-            AnalyticsEvent.event_name,
-            sql_func.sum(AnalyticsEvent.count).label('total'),
-            sql_func.count(AnalyticsEvent.date).label('active_days')
-        ).where(
-            AnalyticsEvent.date >= since
-        ).group_by(
-            AnalyticsEvent.event_name
-        ).order_by(
-            sql_func.sum(AnalyticsEvent.count).desc()
-        )
-        events = session.execute(stmt).all()
+        event_counts = event_counts_since(session, since)
 
-        # Dashboard load data for chart (90 days) - build a map for quick lookup
-        dashboard_stmt = select(AnalyticsEvent).where(
-            AnalyticsEvent.event_name == 'dashboard_load',
-            AnalyticsEvent.date >= since
-        ).order_by(AnalyticsEvent.date)
-        dashboard_rows = session.execute(dashboard_stmt).scalars().all()
+        totals, active_days = {}, {}
+        for (name, day), count in event_counts.items():
+            totals[name] = totals.get(name, 0) + count
+            active_days[name] = active_days.get(name, 0) + 1
+        events = sorted(totals, key=totals.get, reverse=True)
 
         # Recurrence signal: dashboard loads in last 30 days
         last_30 = today - timedelta(days=30)
-        active_stmt = select(sql_func.count()).select_from(AnalyticsEvent).where(
-            AnalyticsEvent.event_name == 'dashboard_load',
-            AnalyticsEvent.date >= last_30,
-            AnalyticsEvent.count > 0
-        )
-        active_days_30 = session.execute(active_stmt).scalar() or 0
+        active_days_30 = sum(1 for (name, day), count in event_counts.items()
+                             if name == 'dashboard_load' and day >= last_30 and count > 0)
 
         # User registration stats from existing DbUser model
         user_stmt = select(sql_func.count()).select_from(DbUser)
@@ -1675,7 +1574,7 @@ def analytics_dashboard():
         session.close()
 
     # Build a complete 90-day dashboard load series with zeros for missing days
-    usage_map = {row.date: row.count for row in dashboard_rows}
+    usage_map = {day: count for (name, day), count in event_counts.items() if name == 'dashboard_load'}
     max_usage = max(usage_map.values()) if usage_map else 1
     login_series = []
     for i in range(days_count):
@@ -1694,12 +1593,12 @@ def analytics_dashboard():
 
     # Pre-format event data for template
     events_formatted = []
-    for event in events:
+    for name in events:
         events_formatted.append({
-            'event_name': event.event_name,
-            'total': event.total,
-            'total_formatted': "{:,}".format(event.total),
-            'active_days': event.active_days
+            'event_name': name,
+            'total': totals[name],
+            'total_formatted': "{:,}".format(totals[name]),
+            'active_days': active_days[name]
         })
 
     return render_template('analytics.html',
@@ -1939,7 +1838,7 @@ def graph_dashboard(object_name):
                 }
 
                 # --- NEW: Fetch all sessions for this project to explain the integration time ---
-                project_sessions_db = db.query(JournalSession).filter_by(
+                project_sessions_db = db.query(JournalSession).options(undefer_group(SESSION_LOG_GROUP)).filter_by(
                     project_id=selected_project_data_journal.id, user_id=user.id
                 ).order_by(JournalSession.date_utc.desc()).all()
 
@@ -1952,7 +1851,7 @@ def graph_dashboard(object_name):
 
         # (The rest of grouping logic is unchanged)
         all_projects_for_user = db.query(Project).filter_by(user_id=user.id).order_by(Project.name).all()
-        object_specific_sessions_db = db.query(JournalSession).filter_by(user_id=user.id,
+        object_specific_sessions_db = db.query(JournalSession).options(undefer_group(SESSION_LOG_GROUP)).filter_by(user_id=user.id,
                                                                          object_name=object_name).order_by(
             JournalSession.date_utc.desc()).all()
 
@@ -2348,13 +2247,11 @@ def get_imaging_opportunities(object_name):
     end_date = today + timedelta(days=months * 30)
     dates = [today + timedelta(days=i) for i in range((end_date - today).days)]
 
-    sun_events_cache = {}
     final_results = []
 
     # Get altitude threshold and sampling interval (from 'g')
     altitude_threshold = g.user_config.get("altitude_threshold", 20)
-    sampling_interval = (g.user_config.get('sampling_interval_minutes') or 15) if SINGLE_USER_MODE else int(
-        os.environ.get('CALCULATION_PRECISION', 15))
+    sampling_interval = nightly_sampling_interval(g.user_config)
 
     # --- Get Horizon Mask for the specific location ---
     # We need the location *name* to look up the mask.
@@ -2378,23 +2275,21 @@ def get_imaging_opportunities(object_name):
     # --- End Horizon Mask Lookup ---
 
 
-    for d in dates:
-        date_str = d.strftime('%Y-%m-%d')
-        # Check cache or compute sun events using determined lat, lon, tz_name
-        if date_str not in sun_events_cache:
-            sun_events_cache[date_str] = calculate_sun_events_cached(date_str, tz_name, lat, lon)
-        sun_events = sun_events_cache[date_str]
-        dusk = sun_events.get("astronomical_dusk", "20:00") # Default dusk if not found
+    # One continuous series over the whole search horizon, reduced per night
+    nights = calculate_night_series(
+        ra, dec, lat, lon, tz_name, [d.strftime('%Y-%m-%d') for d in dates],
+        altitude_threshold, sampling_interval,
+        horizon_mask=horizon_mask # Pass the looked-up mask
+    )
 
-        # Calculate observable duration using determined lat, lon, tz_name, threshold, interval, AND horizon_mask
-        obs_duration, max_altitude, obs_from, obs_to = calculate_observable_duration_vectorized(
-            ra, dec, lat, lon, date_str, tz_name,
-            altitude_threshold, sampling_interval,
-            horizon_mask=horizon_mask # Pass the looked-up mask
-        )
+    for d, night in zip(dates, nights):
+        date_str = night["date"]
+        obs_minutes = night["observable_minutes"]
+        max_altitude = night["max_altitude"]
+        obs_from, obs_to = night["observable_from"], night["observable_to"]
 
         # Apply basic thresholds
-        if obs_duration.total_seconds() / 60 < min_obs or max_altitude < min_alt:
+        if obs_minutes < min_obs or max_altitude < min_alt:
             continue
 
         # Calculate Moon phase using determined local_tz
@@ -2403,30 +2298,15 @@ def get_imaging_opportunities(object_name):
         if moon_phase > max_moon:
             continue
 
-        # Calculate separation using determined local_tz, lat, lon
-        if not dusk or dusk == "N/A":
-            dusk = "20:00"  # Fallback for high-latitude / no astronomical twilight
-        dusk_time_obj = datetime.strptime(dusk, "%H:%M").time()
-        dusk_dt_local = local_tz.localize(datetime.combine(d, dusk_time_obj))
-        dusk_utc = dusk_dt_local.astimezone(pytz.utc)
-
-        location_obj = EarthLocation(lat=lat * u.deg, lon=lon * u.deg) # Use determined lat, lon
-        time_for_sep = Time(dusk_utc)
-        frame = AltAz(obstime=time_for_sep, location=location_obj)
-        obj_coord = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg)
-        moon_coord = get_body('moon', time_for_sep, location=location_obj)
-        try:
-            separation = obj_coord.transform_to(frame).separation(moon_coord.transform_to(frame)).deg
-            if separation < min_sep:
-                continue
-        except Exception as sep_err:
-             print(f"Warning: Could not calculate separation for {object_name} on {date_str}: {sep_err}")
-             continue # Skip if separation calc fails
+        # Moon separation at dusk
+        separation = night["moon_separation"]
+        if separation < min_sep:
+            continue
 
         # Scoring logic (remains the same)
         MIN_ALTITUDE = 20
         score_alt = max(0, min((max_altitude - MIN_ALTITUDE) / (90 - MIN_ALTITUDE), 1))
-        score_duration = min(obs_duration.total_seconds() / SCORING_WINDOW_SECONDS, 1)
+        score_duration = min(obs_minutes * 60 / SCORING_WINDOW_SECONDS, 1)
         score_moon_illum = 1 - min(moon_phase / 100, 1)
         score_moon_sep_dynamic = (1 - (moon_phase / 100)) + (moon_phase / 100) * min(separation / 180, 1)
         composite_score = 100 * (0.20 * score_alt + 0.15 * score_duration + 0.45 * score_moon_illum + 0.20 * score_moon_sep_dynamic)
@@ -2436,9 +2316,11 @@ def get_imaging_opportunities(object_name):
         # Append results
         final_results.append({
             "date": date_str,
-            "obs_minutes": int(obs_duration.total_seconds() / 60),
+            "obs_minutes": obs_minutes,
             "from_time": obs_from.strftime('%H:%M') if obs_from else "N/A",
             "to_time": obs_to.strftime('%H:%M') if obs_to else "N/A",
+            "from_iso": obs_from.isoformat() if obs_from else None,
+            "to_iso": obs_to.isoformat() if obs_to else None,
             "max_alt": round(max_altitude, 1),
             "moon_illumination": round(moon_phase, 1),
             "moon_separation": round(separation, 1),
@@ -2459,6 +2341,9 @@ def generate_ics(object_name):
     lon = float(request.args.get('lon'))
     from_time_str = request.args.get('from_time')
     to_time_str = request.args.get('to_time')
+    # Full timestamps from get_imaging_opportunities (night series), when available
+    from_iso = request.args.get('from_iso')
+    to_iso = request.args.get('to_iso')
 
     # Optional parameters for description
     max_alt = request.args.get('max_alt', 'N/A')
@@ -2475,31 +2360,34 @@ def generate_ics(object_name):
         target_night_start_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         local_tz = pytz.timezone(tz_name)
 
-        from_time = datetime.strptime(from_time_str, "%H:%M").time()
-        to_time = datetime.strptime(to_time_str, "%H:%M").time()
-
-        # --- NEW LOGIC to determine the correct calendar date ---
-        # Calculate dusk on the "night of" date to use as a reference.
-        sun_events_today = calculate_sun_events_cached(date_str, tz_name, lat, lon)
-        dusk_str = sun_events_today.get("astronomical_dusk", "20:00")
-        dusk_time = datetime.strptime(dusk_str, "%H:%M").time()
-
-        # If the observation starts before that evening's dusk, it must be on the next calendar day.
-        start_date = target_night_start_date
-        if from_time < dusk_time:
-            start_date += timedelta(days=1)
-
-        # Determine the end date. If the 'to_time' is earlier than 'from_time', it crosses another midnight.
-        end_date = start_date
-        if to_time < from_time:
-            end_date += timedelta(days=1)
-        # --- END NEW LOGIC ---
-
-        start_time_local_naive = datetime.combine(start_date, from_time)
-        end_time_local_naive = datetime.combine(end_date, to_time)
-
-        start_time_local = local_tz.localize(start_time_local_naive)
-        end_time_local = local_tz.localize(end_time_local_naive)
+        if from_iso and to_iso:
+            # The night series already resolved the calendar dates of the window
+            start_time_local = datetime.fromisoformat(from_iso).astimezone(local_tz)
+            end_time_local = datetime.fromisoformat(to_iso).astimezone(local_tz)
+            start_date = start_time_local.date()
+        else:
+            from_time = datetime.strptime(from_time_str, "%H:%M").time()
+            to_time = datetime.strptime(to_time_str, "%H:%M").time()
+
+            # --- NEW LOGIC to determine the correct calendar date ---
+            # Calculate dusk on the "night of" date to use as a reference.
+            sun_events_today = calculate_sun_events_cached(date_str, tz_name, lat, lon)
+            dusk_str = sun_events_today.get("astronomical_dusk", "20:00")
+            dusk_time = datetime.strptime(dusk_str, "%H:%M").time()
+
+            # If the observation starts before that evening's dusk, it must be on the next calendar day.
+            start_date = target_night_start_date
+            if from_time < dusk_time:
+                start_date += timedelta(days=1)
+
+            # Determine the end date. If the 'to_time' is earlier than 'from_time', it crosses another midnight.
+            end_date = start_date
+            if to_time < from_time:
+                end_date += timedelta(days=1)
+            # --- END NEW LOGIC ---
+
+            start_time_local = local_tz.localize(datetime.combine(start_date, from_time))
+            end_time_local = local_tz.localize(datetime.combine(end_date, to_time))
 
         # --- 3. Get Object's Common Name ---
         object_details = get_ra_dec(object_name)
@@ -32,7 +32,7 @@ from nova.models import (
     DbUser, AstroObject, SavedFraming, Rig, Project, JournalSession, UserCustomFilter
 )
 from nova.helpers import (
-    get_db, load_full_astro_context, safe_float, safe_int, generate_session_id, _compute_rig_metrics_from_components
+    get_db, get_request_db_user, load_full_astro_context, safe_float, safe_int, generate_session_id, _compute_rig_metrics_from_components
 )
 from nova.analytics import record_event
 from uuid import uuid4
@@ -99,7 +99,7 @@ def mobile_edit_notes(object_name):
         username = current_user.username
 
     db = get_db()
-    user = db.query(DbUser).filter_by(username=username).one_or_none()
+    user = get_request_db_user(db, username)
     if not user:
         flash(_("User not found."), "error")
         return redirect(url_for('mobile.mobile_up_now'))
@@ -501,7 +501,7 @@ def mobile_journal_new():
     else:
         username = current_user.username
 
-    user = db.query(DbUser).filter_by(username=username).one_or_none()
+    user = get_request_db_user(db, username)
     if not user:
         flash(_("User not found."), "error")
         return redirect(url_for('mobile.mobile_up_now'))
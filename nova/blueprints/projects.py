@@ -23,6 +23,7 @@ from flask import (
 from flask_login import login_required, current_user
 from flask_babel import gettext as _
 from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
 
 # =============================================================================
 # Nova Package Imports (no circular import)
@@ -30,7 +31,7 @@ from sqlalchemy import func
 from nova import SINGLE_USER_MODE  # Import from nova for test patching compatibility
 from nova.config import UPLOAD_FOLDER
 from nova.models import (
-    DbUser, Project, JournalSession, AstroObject
+    DbUser, Project, JournalSession, AstroObject, SESSION_LOG_GROUP
 )
 from nova.helpers import (
     get_db, load_full_astro_context, read_log_content
@@ -250,8 +251,8 @@ def show_project_report_page(project_id):
         return "Project not found", 404
 
     # 2. Fetch Sessions
-    sessions = db.query(JournalSession).filter_by(project_id=project.id, user_id=g.db_user.id).order_by(
-        JournalSession.date_utc.asc()).all()
+    sessions = db.query(JournalSession).options(undefer_group(SESSION_LOG_GROUP)).filter_by(
+        project_id=project.id, user_id=g.db_user.id).order_by(JournalSession.date_utc.asc()).all()
 
     # 3. Calculate Stats
     total_min = sum(s.calculated_integration_time_minutes or 0 for s in sessions)
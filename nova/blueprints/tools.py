@@ -3,20 +3,21 @@ import json
 import os
 import uuid
 import zipfile
+import queue
 import threading
 import traceback
 
 import yaml
 from flask import (
     Blueprint, request, jsonify, redirect, url_for,
-    flash, send_file
+    flash, send_file, Response, stream_with_context
 )
 from flask_login import login_required, current_user
 from flask_babel import gettext as _
 from math import atan, degrees
 from datetime import datetime, UTC
 from sqlalchemy import func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer_group
 
 from nova.config import (
     SINGLE_USER_MODE, UPLOAD_FOLDER, INSTANCE_PATH,
@@ -34,7 +35,7 @@ from nova.helpers import (
 from nova.models import (
     DbUser, AstroObject, Component, Rig, Location,
     JournalSession, Project, UserCustomFilter,
-    SavedFraming, SavedView, UiPref,
+    SavedFraming, SavedView, UiPref, SESSION_LOG_GROUP,
 )
 from nova.migration import (
     _upsert_user,
@@ -510,7 +511,8 @@ def download_journal():
         ]
 
         # --- 2. Load Sessions ---
-        sessions = db.query(JournalSession).filter_by(user_id=u.id).order_by(JournalSession.date_utc.asc()).all()
+        sessions = db.query(JournalSession).options(undefer_group(SESSION_LOG_GROUP)).filter_by(
+            user_id=u.id).order_by(JournalSession.date_utc.asc()).all()
         sessions_list = []
 
         for s in sessions:
@@ -840,6 +842,7 @@ def import_catalog(pack_id):
 
         created, enriched, skipped = import_catalog_pack_for_user(db, user, catalog_data, pack_id)
         db.commit()
+        bust_astro_context_cache(user.id)
 
         pack_name = (meta or {}).get("name") or pack_id
         msg = f"Catalog '{pack_name}': {created} new, {enriched} enriched (updated), {skipped} skipped."
@@ -851,6 +854,70 @@ def import_catalog(pack_id):
 
     return redirect(url_for('core.config_form'))
 
+@tools_bp.route('/import_catalog/<pack_id>/stream')
+@login_required
+def stream_import_catalog(pack_id):
+    """
+    Streams progress of a catalog pack import via Server-Sent Events (SSE).
+
+    The bulk import runs in a worker thread with its own DB session and one
+    transaction; progress callbacks are relayed to the client through a queue.
+    """
+    username = "default" if SINGLE_USER_MODE else current_user.username
+
+    @stream_with_context
+    def generate():
+        catalog_data, meta = load_catalog_pack(pack_id)
+        if not catalog_data or not isinstance(catalog_data, dict):
+            yield f"data: {json.dumps({'error': _('Catalog pack not found or invalid.')})}\n\n"
+            return
+
+        events = queue.Queue()
+        result = {}
+
+        def _progress(done, total, message):
+            pct = int((done / total) * 100) if total else 0
+            events.put({'progress': min(pct, 99), 'message': message})
+
+        def _run_import():
+            db = get_db()
+            try:
+                user = _upsert_user(db, username)
+                result['counts'] = import_catalog_pack_for_user(
+                    db, user, catalog_data, pack_id, progress_callback=_progress
+                )
+                db.commit()
+                bust_astro_context_cache(user.id)
+            except Exception as e:
+                db.rollback()
+                print(f"[CATALOG IMPORT] Error importing catalog pack '{pack_id}': {e}")
+                result['error'] = str(e)
+            finally:
+                db.close()
+                events.put(None)
+
+        yield f"data: {json.dumps({'progress': 0, 'message': 'Starting import...'})}\n\n"
+        threading.Thread(target=_run_import, daemon=True).start()
+
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield f"data: {json.dumps(event)}\n\n"
+
+        if 'error' in result:
+            yield f"data: {json.dumps({'error': _('Catalog import failed due to an internal error.')})}\n\n"
+            return
+
+        created, enriched, skipped = result['counts']
+        pack_name = (meta or {}).get("name") or pack_id
+        yield f"data: {json.dumps({'progress': 100, 'message': 'Complete!', 'done': True, 'pack': pack_name, 'created': created, 'enriched': enriched, 'skipped': skipped})}\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers["X-Accel-Buffering"] = "no"  # Disable Nginx buffering
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @tools_bp.route('/download_rig_config')
 @login_required
 def download_rig_config():
@@ -0,0 +1,31 @@
+"""
+Nova DSO Tracker - Cross-Worker Cache Stamps
+
+In-memory caches (nova/user_context.py, nova/shared_catalog.py) tell the other
+gunicorn workers to drop their copies through a small stamp file in CACHE_DIR:
+invalidating bumps the file, and every lookup compares its stat() with the
+value seen last time.
+"""
+import os
+
+STAMP_MAX_BYTES = 4096
+
+
+def read_stamp(path: str):
+    """Current (inode, size, mtime) of the stamp file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+        return st.st_ino, st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+def bump_stamp(path: str) -> None:
+    """Change the stamp file so read_stamp() returns a new value in every process."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mode = "w" if os.path.exists(path) and os.path.getsize(path) >= STAMP_MAX_BYTES else "a"
+        with open(path, mode) as f:
+            f.write(".")  # size grows on every bump, even within one mtime tick
+    except OSError:
+        pass
@@ -90,6 +90,10 @@ AI_API_KEY = config('AI_API_KEY', default='')
 AI_MODEL = config('AI_MODEL', default='claude-sonnet-4-20250514')
 AI_BASE_URL = config('AI_BASE_URL', default='')
 AI_ALLOWED_USERS = config('AI_ALLOWED_USERS', default='')
+AI_CACHE_TTL_HOURS = config('AI_CACHE_TTL_HOURS', default=24, cast=float)  # 0 disables the response cache
+AI_DAILY_QUOTA = config('AI_DAILY_QUOTA', default=0, cast=int)  # provider calls per user per day, 0 = unlimited
+AI_PROMPT_TOKEN_BUDGET = config('AI_PROMPT_TOKEN_BUDGET', default=0, cast=int)  # object block of best-objects prompts, 0 = unlimited
+AI_BEST_OBJECTS_TOP_K = config('AI_BEST_OBJECTS_TOP_K', default=150, cast=int)  # candidates ranked server-side, 0 = all
 
 # --- Telemetry state ---
 _telemetry_startup_once = threading.Event()
@@ -0,0 +1,216 @@
+"""
+Nova DSO Tracker - SQLite Connection Layer
+
+- configure_sqlite_engine() applies the per-connection pragmas on every
+  new pooled connection (the old one-shot PRAGMA block in
+  ensure_db_initialized_unified only ever reached a single connection).
+- Request threads keep using the engine's QueuePool through SessionLocal.
+- Background writers (analytics flush, parsed-log cache, ...) hand their
+  work to DbWriter, a single thread that applies jobs one at a time in its
+  own session, so cache warmers never fight each other for the SQLite write
+  lock and retry politely when a user edit holds it.
+- db_stats() reports pool usage, "database is locked" errors and writer
+  queue / lock-wait timings.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-20000"),     # 20MB page cache
+    ("temp_store", "MEMORY"),     # temp tables in RAM
+    ("mmap_size", "30000000"),    # 30MB memory-mapped I/O
+    ("busy_timeout", str(SQLITE_BUSY_TIMEOUT_MS)),
+)
+
+_metrics_lock = threading.Lock()
+_engine_metrics = {"connects": 0, "checkouts": 0, "locked_errors": 0}
+
+
+def _bump(key: str, n: int = 1) -> None:
+    with _metrics_lock:
+        _engine_metrics[key] += n
+
+
+def _is_locked_error(exc) -> bool:
+    return "database is locked" in str(exc) or "database is busy" in str(exc)
+
+
+def configure_sqlite_engine(engine) -> None:
+    """Attach pragma + metrics listeners to a SQLite engine (idempotent)."""
+    if getattr(engine, "_nova_configured", False):
+        return
+    engine._nova_configured = True
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+        _bump("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _count_checkout(dbapi_conn, connection_record, connection_proxy):
+        _bump("checkouts")
+
+    @event.listens_for(engine, "handle_error")
+    def _count_locked(context):
+        if _is_locked_error(context.original_exception):
+            _bump("locked_errors")
+
+
+class DbWriter:
+    """
+    Single-threaded, serialized DB writer.
+
+    submit(fn) queues fn(session) and returns a Future; the writer commits
+    after fn returns, retries with backoff on "database is locked" and rolls
+    back on any other error (which is then set on the Future).
+    """
+
+    def __init__(self, session_factory=None, max_retries: int = 5, retry_delay: float = 0.2):
+        self._session_factory = session_factory
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "jobs_done": 0, "jobs_failed": 0, "lock_retries": 0,
+            "queue_wait_total_s": 0.0, "queue_wait_max_s": 0.0,
+            "lock_wait_total_s": 0.0, "lock_wait_max_s": 0.0,
+        }
+
+    def _new_session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from nova.models import SessionLocal
+        return SessionLocal.session_factory()  # own session, never a request's
+
+    def _ensure_thread(self) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                thread = threading.Thread(target=self._run, name="nova-db-writer", daemon=True)
+                try:
+                    thread.start()
+                except RuntimeError:
+                    return False  # interpreter shutting down (atexit flushes)
+                self._thread = thread
+        return True
+
+    def submit(self, fn) -> Future:
+        future = Future()
+        if not self._ensure_thread():
+            future.set_running_or_notify_cancel()
+            self._execute(fn, future, 0.0)
+            return future
+        self._queue.put((fn, future, time.monotonic()))
+        return future
+
+    def run(self, fn, timeout: float = 30.0):
+        """Submit fn and wait for its result (re-raises the job's exception)."""
+        return self.submit(fn).result(timeout=timeout)
+
+    def _record(self, **updates) -> None:
+        with self._stats_lock:
+            for key, value in updates.items():
+                if key.endswith("_max_s"):
+                    self._stats[key] = max(self._stats[key], value)
+                else:
+                    self._stats[key] += value
+
+    def _run(self) -> None:
+        while True:
+            fn, future, enqueued = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    self._execute(fn, future, time.monotonic() - enqueued)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, fn, future: Future, queue_wait: float) -> None:
+        self._record(queue_wait_total_s=queue_wait, queue_wait_max_s=queue_wait)
+        locked_since = None
+        for attempt in range(self._max_retries + 1):
+            session = None
+            try:
+                session = self._new_session()
+                result = fn(session)
+                session.commit()
+                if locked_since is not None:
+                    waited = time.monotonic() - locked_since
+                    self._record(lock_wait_total_s=waited, lock_wait_max_s=waited)
+                self._record(jobs_done=1)
+                future.set_result(result)
+                return
+            except OperationalError as e:
+                if session is not None:
+                    session.rollback()
+                if _is_locked_error(e) and attempt < self._max_retries:
+                    locked_since = locked_since or time.monotonic()
+                    self._record(lock_retries=1)
+                    time.sleep(self._retry_delay * (2 ** attempt))
+                    continue
+                self._record(jobs_failed=1)
+                future.set_exception(e)
+                return
+            except Exception as e:
+                if session is not None:
+                    session.rollback()
+                self._record(jobs_failed=1)
+                future.set_exception(e)
+                return
+            finally:
+                if session is not None:
+                    session.close()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until queued jobs are done (or timeout); True if the queue drained."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["queue_depth"] = self._queue.qsize()
+        out["running"] = bool(self._thread and self._thread.is_alive())
+        return out
+
+
+db_writer = DbWriter()
+
+
+def db_stats(engine=None) -> dict:
+    """Pool, lock-error and writer metrics for the admin stats endpoint."""
+    if engine is None:
+        from nova.models import engine
+    pool = engine.pool
+    with _metrics_lock:
+        out = {"engine": dict(_engine_metrics)}
+    out["pool"] = {
+        "class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+    }
+    out["writer"] = db_writer.stats()
+    return out
@@ -0,0 +1,306 @@
+"""
+Nova DSO Tracker - Local Offline DSO Coordinate Index
+
+A bundled, memory-mapped catalog of deep-sky objects answered without any
+network round trip: get_ra_dec() resolves names here first and queries SIMBAD
+only when the index has no entry, and the frame scan lists the index hits
+inside the frame, asking SIMBAD only for frames the index leaves empty.
+
+The shipped index is built from OpenNGC (NGC.csv + addendum.csv: the NGC and
+IC catalogs, all Messier and Caldwell objects and the addendum's Melotte,
+Collinder, ... entries) followed by config_default.yaml for the seeded
+objects OpenNGC does not list (e.g. Sh2 regions):
+    flask build-dso-index NGC.csv addendum.csv config_templates/config_default.yaml
+Names are matched on a canonical key (normalize_object_name() without
+catalog-number padding and the space after the catalog prefix), so "NGC0224",
+"NGC 224" and "ngc224" or "C 020" and "C20" resolve to the same object.
+
+On-disk layout (nova/data/dso_index/, plain .npy files so they can be mmapped):
+    records.npy    structured array, one row per object, sorted by Dec
+    names.npy      sorted normalized names + aliases (bytes)
+    name_rows.npy  row in records.npy for each entry of names.npy
+
+Name lookups are a binary search over names.npy (O(log n)); cone searches
+narrow to a Dec band with searchsorted and then test the unit vectors of
+that band only.
+
+Build a new index from catalog pack / config YAML or OpenNGC CSV files with
+    flask build-dso-index <source> [<source> ...]
+"""
+import csv
+import logging
+import math
+import os
+import re
+import threading
+
+import numpy as np
+import yaml
+from astropy import units as u
+from astropy.coordinates import SkyCoord, get_constellation
+
+from nova.helpers import normalize_object_name
+from modules.astro_calculations import hms_to_hours, dms_to_degrees
+
+logger = logging.getLogger(__name__)
+
+DSO_INDEX_DIR = os.path.join(os.path.dirname(__file__), "data", "dso_index")
+
+NAME_BYTES = 40
+RECORD_DTYPE = np.dtype([
+    ("name", f"S{NAME_BYTES}"),
+    ("common_name", "S64"),
+    ("type", "S16"),
+    ("constellation", "S4"),
+    ("ra_hours", "f8"),
+    ("dec_deg", "f8"),
+    ("magnitude", "f4"),   # NaN when unknown
+    ("size_arcmin", "f4"),  # NaN when unknown
+    ("xyz", "f8", (3,)),   # unit vector for cone searches
+])
+
+
+def _to_bytes(value, width):
+    raw = str(value or "").encode("utf-8")[:width]
+    return raw.decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _from_bytes(value):
+    return value.decode("utf-8", errors="ignore")
+
+
+def _unit_vectors(ra_hours, dec_deg):
+    ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15.0)
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+_PADDED_NUMBER = re.compile(r"^([A-Z]+ ?)0+(?=\d+[A-Z]?$)")
+_PREFIX_SPACE = re.compile(r"^([A-Z]+) (?=\d)")
+
+
+def _display_name(name):
+    """normalize_object_name() without catalog-number padding: NGC0224 -> NGC 224, M031 -> M31."""
+    name = normalize_object_name(name)
+    return _PADDED_NUMBER.sub(r"\1", name) if name else None
+
+
+def _index_key(name):
+    name = _display_name(name)
+    key = _PREFIX_SPACE.sub(r"\1", name) if name else None  # "NGC 224" and "NGC224" share a key
+    return key.encode("utf-8")[:NAME_BYTES] if key else None
+
+
+class DsoIndex:
+    """Read-only view over the .npy index files (memory-mapped by default)."""
+
+    def __init__(self, index_dir: str = DSO_INDEX_DIR, mmap: bool = True):
+        mode = "r" if mmap else None
+        self.records = np.load(os.path.join(index_dir, "records.npy"), mmap_mode=mode)
+        self.names = np.load(os.path.join(index_dir, "names.npy"), mmap_mode=mode)
+        self.name_rows = np.load(os.path.join(index_dir, "name_rows.npy"), mmap_mode=mode)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _row_to_dict(self, row):
+        rec = self.records[row]
+        mag = float(rec["magnitude"])
+        size = float(rec["size_arcmin"])
+        return {
+            "name": _from_bytes(rec["name"]),
+            "common_name": _from_bytes(rec["common_name"]) or None,
+            "type": _from_bytes(rec["type"]) or None,
+            "constellation": _from_bytes(rec["constellation"]) or None,
+            "ra_hours": float(rec["ra_hours"]),
+            "dec_deg": float(rec["dec_deg"]),
+            "magnitude": None if np.isnan(mag) else round(mag, 2),
+            "size_arcmin": None if np.isnan(size) else round(size, 2),
+        }
+
+    def lookup(self, name):
+        """Find an object by any name or alias; returns a dict or None."""
+        key = _index_key(name)
+        if not key or not len(self.names):
+            return None
+        pos = int(np.searchsorted(self.names, key))
+        if pos < len(self.names) and self.names[pos] == key:
+            return self._row_to_dict(int(self.name_rows[pos]))
+        return None
+
+    def cone_search(self, ra_hours, dec_deg, radius_deg, limit=None):
+        """All objects within radius_deg of (ra_hours, dec_deg), nearest first."""
+        if not len(self.records):
+            return []
+        dec_col = self.records["dec_deg"]
+        lo = int(np.searchsorted(dec_col, dec_deg - radius_deg, side="left"))
+        hi = int(np.searchsorted(dec_col, dec_deg + radius_deg, side="right"))
+        if hi <= lo:
+            return []
+        band = np.asarray(self.records["xyz"][lo:hi])
+        center = _unit_vectors(ra_hours, dec_deg)
+        cos_sep = np.clip(band @ center, -1.0, 1.0)
+        hits = np.nonzero(cos_sep >= np.cos(np.radians(radius_deg)))[0]
+        order = hits[np.argsort(-cos_sep[hits])]
+        if limit is not None:
+            order = order[:limit]
+        results = []
+        for i in order:
+            entry = self._row_to_dict(lo + int(i))
+            entry["separation_deg"] = round(float(np.degrees(np.arccos(cos_sep[i]))), 4)
+            results.append(entry)
+        return results
+
+    def box_search(self, ra_deg, dec_deg, width_deg, height_deg):
+        """Objects inside a width x height (degrees) frame centred on (ra_deg, dec_deg)."""
+        radius = math.hypot(width_deg / 2.0, height_deg / 2.0)
+        cos_dec = max(math.cos(math.radians(dec_deg)), 1e-6)
+        hits = []
+        for entry in self.cone_search(ra_deg / 15.0, dec_deg, radius):
+            d_ra = ((entry["ra_hours"] * 15.0 - ra_deg + 180.0) % 360.0) - 180.0
+            if abs(d_ra) * cos_dec <= width_deg / 2.0 and abs(entry["dec_deg"] - dec_deg) <= height_deg / 2.0:
+                hits.append(entry)
+        return hits
+
+
+def build_dso_index(entries, index_dir: str = DSO_INDEX_DIR) -> int:
+    """
+    Write a new index from dicts with keys:
+        name, aliases (list), common_name, type, ra_hours, dec_deg, magnitude, size_arcmin
+    Later entries whose name is already indexed (as a name or an alias, e.g. a
+    config "M31" after OpenNGC's NGC 224) are ignored. Returns the object count.
+    """
+    rows = []
+    seen = set()
+    for e in entries:
+        key = _index_key(e.get("name"))
+        if not key or key in seen or e.get("ra_hours") is None or e.get("dec_deg") is None:
+            continue
+        seen.update(k for k in map(_index_key, [e["name"], *(e.get("aliases") or [])]) if k)
+        rows.append(e)
+
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    for i, e in enumerate(rows):
+        records[i]["name"] = _to_bytes(_display_name(e["name"]), NAME_BYTES)
+        records[i]["common_name"] = _to_bytes(e.get("common_name"), 64)
+        records[i]["type"] = _to_bytes(e.get("type"), 16)
+        records[i]["ra_hours"] = float(e["ra_hours"]) % 24.0
+        records[i]["dec_deg"] = float(e["dec_deg"])
+        records[i]["magnitude"] = _safe_float(e.get("magnitude"))
+        records[i]["size_arcmin"] = _safe_float(e.get("size_arcmin"))
+
+    order = np.argsort(records["dec_deg"], kind="stable")
+    records = records[order]
+    rows = [rows[i] for i in order]
+    records["xyz"] = _unit_vectors(records["ra_hours"], records["dec_deg"])
+    if len(records):
+        coords = SkyCoord(ra=records["ra_hours"] * u.hourangle, dec=records["dec_deg"] * u.deg)
+        records["constellation"] = np.asarray(get_constellation(coords, short_name=True), dtype="S4")
+
+    name_to_row = {}
+    for row, e in enumerate(rows):
+        for alias in [e["name"], e.get("common_name"), *(e.get("aliases") or [])]:
+            key = _index_key(alias)
+            if key and key not in name_to_row:
+                name_to_row[key] = row
+    names_sorted = sorted(name_to_row)
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "records.npy"), records)
+    np.save(os.path.join(index_dir, "names.npy"), np.array(names_sorted, dtype=f"S{NAME_BYTES}"))
+    np.save(os.path.join(index_dir, "name_rows.npy"),
+            np.array([name_to_row[k] for k in names_sorted], dtype=np.int32))
+    return len(records)
+
+
+def _safe_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def entries_from_yaml_objects(path: str):
+    """Yield index entries from a catalog pack / config YAML ('objects' list)."""
+    with open(path, "r", encoding="utf-8") as f:
+        doc = yaml.safe_load(f) or {}
+    for o in doc.get("objects") or []:
+        name = o.get("Object") or o.get("object") or o.get("object_name")
+        ra = o.get("RA (hours)") if o.get("RA (hours)") is not None else o.get("RA")
+        dec = o.get("DEC (degrees)") if o.get("DEC (degrees)") is not None else o.get("DEC")
+        if not name or ra is None or dec is None:
+            continue
+        yield {
+            "name": name,
+            "common_name": o.get("Common Name") or o.get("Name"),
+            "type": o.get("Type"),
+            "ra_hours": float(ra),
+            "dec_deg": float(dec),
+            "magnitude": o.get("Magnitude"),
+            "size_arcmin": o.get("Size"),
+        }
+
+
+# OpenNGC object types -> the SIMBAD object types SIMBAD lookups and the seeded objects use
+OPENNGC_TYPES = {
+    "*": "*", "**": "**", "*Ass": "As*", "OCl": "OpC", "GCl": "GlC", "Cl+N": "Cl*", "G": "G", "GPair": "GiP",
+    "GTrpl": "GrG", "GGroup": "GrG", "PN": "PN", "HII": "HII", "DrkN": "DNe", "EmN": "GNe", "Neb": "GNe",
+    "RfN": "RNe", "SNR": "SNR", "Nova": "No*", "Other": "?",
+}
+
+_CALDWELL = re.compile(r"^C ?(\d{1,3})$")
+# Survey designations nobody types; SIMBAD still resolves them
+_SKIPPED_IDENTIFIERS = ("2MASX", "SDSS")
+
+
+def entries_from_openngc_csv(path: str):
+    """Yield index entries from an OpenNGC semicolon-separated catalog (NGC.csv / addendum.csv)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=";"):
+            if not row.get("RA") or not row.get("Dec") or row.get("Type") in ("Dup", "NonEx"):
+                continue
+            aliases = []
+            if row.get("M"):
+                aliases.append(f"M{int(row['M'])}")
+            for cat in ("NGC", "IC"):
+                for num in filter(None, (row.get(cat) or "").split(",")):
+                    aliases.append(f"{cat}{num.strip()}")
+            aliases.extend(a for a in (a.strip() for a in (row.get("Identifiers") or "").split(","))
+                           if a and not a.startswith(_SKIPPED_IDENTIFIERS))
+            # Caldwell numbers ("C 020" identifiers, addendum names like "C009") also as "Caldwell 20"
+            for designation in (row["Name"], *aliases):
+                caldwell = _CALDWELL.match(designation)
+                if caldwell:
+                    aliases.append(f"Caldwell {int(caldwell.group(1))}")
+            common = (row.get("Common names") or "").split(",")[0].strip() or None
+            yield {
+                "name": row["Name"],
+                "aliases": aliases,
+                "common_name": common,
+                "type": OPENNGC_TYPES.get(row.get("Type"), row.get("Type")),
+                "ra_hours": hms_to_hours(row["RA"]),
+                "dec_deg": dms_to_degrees(row["Dec"]),
+                "magnitude": row.get("V-Mag") or row.get("B-Mag"),
+                "size_arcmin": row.get("MajAx"),
+            }
+
+
+_dso_index = None
+_dso_index_lock = threading.Lock()
+_dso_index_missing = False
+
+
+def get_dso_index():
+    """Process-wide index, loaded lazily; returns None if no index is bundled."""
+    global _dso_index, _dso_index_missing
+    if _dso_index is not None or _dso_index_missing:
+        return _dso_index
+    with _dso_index_lock:
+        if _dso_index is None and not _dso_index_missing:
+            try:
+                _dso_index = DsoIndex()
+            except (OSError, ValueError) as e:
+                logger.warning("[DSO INDEX] Local index unavailable, using SIMBAD only: %s", e)
+                _dso_index_missing = True
+    return _dso_index
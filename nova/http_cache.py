@@ -0,0 +1,67 @@
+"""
+Nova DSO Tracker - Conditional GET Helpers
+
+Computed JSON endpoints (plot data, monthly plot, heatmap chunks, sun
+events, outlook) are deterministic for a given set of inputs. Views build a
+strong ETag from those inputs (object coordinates, location, date, horizon,
+relevant settings) *before* doing the expensive work, answer a matching
+If-None-Match with 304 and otherwise send the payload with the same ETag.
+
+Freshness is `private, max-age` up to the endpoint's natural validity (the
+next local noon rollover for nightly data), capped at HTTP_CACHE_MAX_AGE so
+edits to objects or horizons show up after a cheap revalidation rather than
+at the next rollover.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, time, timedelta
+
+import pytz
+from flask import jsonify, make_response, request
+
+from nova.config import APP_VERSION
+
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 300))
+
+
+def compute_etag(*parts) -> str:
+    """Strong ETag over the inputs of a response (salted with the app version)."""
+    blob = json.dumps([APP_VERSION, *parts], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def file_validator(path):
+    """(path, mtime_ns, size) of a cache file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+def seconds_until_noon(tz_name, now=None) -> int:
+    """Seconds until the next local noon (the observing-night rollover) in tz_name."""
+    try:
+        tz = pytz.timezone(tz_name or 'UTC')
+    except pytz.UnknownTimeZoneError:
+        tz = pytz.utc
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    noon_date = now.date() if now.hour < 12 else now.date() + timedelta(days=1)
+    noon = tz.localize(datetime.combine(noon_date, time(12, 0)))
+    return max(int((noon - now).total_seconds()), 0)
+
+
+def client_has(etag) -> bool:
+    return etag in request.if_none_match
+
+
+def validated_response(etag, max_age, payload=None):
+    """
+    304 (payload None) or JSON response carrying etag and
+    `private, max-age=min(max_age, HTTP_CACHE_MAX_AGE)`.
+    """
+    response = make_response('', 304) if payload is None else jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={max(min(int(max_age), HTTP_CACHE_MAX_AGE), 0)}'
+    return response
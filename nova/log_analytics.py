@@ -0,0 +1,251 @@
+"""
+nova/log_analytics.py - Multi-session log analytics.
+
+Aggregates the parse-once ``log_analysis_cache`` artifacts of many journal
+sessions (ASIAIR, PHD2, NINA) into project- or date-range-level trends.
+Raw logs are never re-parsed here: sessions without a cached analysis are
+reported back as ``uncached`` so the caller can warm them on demand via
+``/api/session/<id>/log-analysis``.
+
+Each cached artifact is first reduced to a compact per-session metrics row
+(``extract_session_metrics``).  The rows are then pivoted into NumPy columns
+and reduced in one pass (``aggregate_session_metrics``).
+"""
+import json
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+
+# Percentiles reported for the dither settle distribution
+SETTLE_PERCENTILES = (50, 90, 95)
+
+# Upper bin edges (seconds) for the settle-time histogram; last bin is open-ended
+SETTLE_HISTOGRAM_EDGES = (5, 10, 15, 20, 30, 45, 60, 90, 120)
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        if value is None:
+            return None
+        f = float(value)
+        return f if np.isfinite(f) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_session_metrics(cached: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce one session's cached log analysis to scalar metrics.
+
+    Args:
+        cached: Parsed ``log_analysis_cache`` JSON ({'asiair', 'phd2', 'nina'})
+
+    Returns:
+        {
+            'rms_total_as': float | None,   # imaging-only RMS if available
+            'rms_ra_as': float | None,
+            'rms_dec_as': float | None,
+            'guide_frames': int,
+            'exposure_sec': float,          # summed light exposure time
+            'session_sec': float,           # wall-clock autorun time
+            'efficiency': float | None,     # exposure_sec / session_sec
+            'settle_durations': [float],    # successful dither settles (s)
+            'settle_timeouts': int,
+            'af_points': [[temp_c, focus_pos], ...]
+        }
+    """
+    asiair = cached.get('asiair') or {}
+    phd2 = cached.get('phd2') or {}
+    nina = cached.get('nina') or {}
+
+    metrics = {
+        'rms_total_as': None,
+        'rms_ra_as': None,
+        'rms_dec_as': None,
+        'guide_frames': 0,
+        'exposure_sec': 0.0,
+        'session_sec': 0.0,
+        'efficiency': None,
+        'settle_durations': [],
+        'settle_timeouts': 0,
+        'af_points': [],
+    }
+
+    # --- Guiding RMS (prefer imaging-only stats that exclude settle windows) ---
+    phd2_stats = phd2.get('stats') or {}
+    rms_source = phd2_stats.get('imaging') or phd2_stats
+    if phd2_stats.get('total_frames'):
+        metrics['rms_total_as'] = _as_float(rms_source.get('total_rms_as'))
+        metrics['rms_ra_as'] = _as_float(rms_source.get('ra_rms_as'))
+        metrics['rms_dec_as'] = _as_float(rms_source.get('dec_rms_as'))
+        metrics['guide_frames'] = int(phd2_stats.get('total_frames') or 0)
+
+    # --- Dither settles: PHD2 is authoritative, ASIAIR is the fallback ---
+    settles = phd2.get('settle') or asiair.get('dithers') or []
+    for s in settles:
+        dur = _as_float(s.get('dur'))
+        if s.get('ok'):
+            if dur is not None:
+                metrics['settle_durations'].append(dur)
+        else:
+            metrics['settle_timeouts'] += 1
+
+    # --- Exposure efficiency (ASIAIR autorun) ---
+    asiair_stats = asiair.get('stats') or {}
+    metrics['exposure_sec'] = _as_float(asiair_stats.get('total_exposure_time_sec')) or 0.0
+    metrics['session_sec'] = (_as_float(asiair_stats.get('total_time_min')) or 0.0) * 60.0
+    if metrics['session_sec'] > 0:
+        metrics['efficiency'] = round(min(metrics['exposure_sec'] / metrics['session_sec'], 1.0), 4)
+
+    # --- Autofocus position vs temperature ---
+    for run in asiair.get('af_runs') or []:
+        temp = _as_float(run.get('temp'))
+        pos = _as_float(run.get('focus_pos'))
+        if temp is not None and pos is not None:
+            metrics['af_points'].append([temp, pos])
+    for run in nina.get('autofocus_runs') or []:
+        if run.get('status') != 'success':
+            continue
+        temp = _as_float(run.get('temperature'))
+        pos = _as_float(run.get('final_position'))
+        if temp is not None and pos is not None:
+            metrics['af_points'].append([temp, pos])
+
+    return metrics
+
+
+def load_cached_metrics(cache_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a ``log_analysis_cache`` string; returns None if absent, corrupt or empty."""
+    if not cache_json:
+        return None
+    try:
+        cached = json.loads(cache_json)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or not cached.get('has_logs'):
+        return None
+    return extract_session_metrics(cached)
+
+
+def _nan_column(rows: List[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([np.nan if r[key] is None else r[key] for r in rows], dtype=np.float64)
+
+
+def _round_or_none(value, ndigits: int = 3):
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), ndigits)
+
+
+def aggregate_session_metrics(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Columnar aggregation over per-session metric rows.
+
+    Args:
+        rows: Dicts from ``extract_session_metrics`` (only the metric keys
+              are read). Order is preserved for the trend fit (callers pass
+              them date-ascending).
+
+    Returns:
+        {
+            'session_count': int,
+            'rms': {'mean_as', 'median_as', 'best_as', 'worst_as', 'trend_as_per_session'},
+            'autofocus': {'point_count', 'slope_steps_per_c', 'intercept_steps', 'temp_range_c'},
+            'dither_settle': {'count', 'timeouts', 'mean_sec', 'p50_sec', 'p90_sec', 'p95_sec', 'histogram'},
+            'efficiency': {'mean', 'weighted', 'total_exposure_hours', 'total_session_hours'}
+        }
+    """
+    rows = list(rows)
+    summary = {
+        'session_count': len(rows),
+        'rms': {'mean_as': None, 'median_as': None, 'best_as': None, 'worst_as': None,
+                'trend_as_per_session': None},
+        'autofocus': {'point_count': 0, 'slope_steps_per_c': None, 'intercept_steps': None,
+                      'temp_range_c': None},
+        'dither_settle': {'count': 0, 'timeouts': 0, 'mean_sec': None,
+                          **{f'p{p}_sec': None for p in SETTLE_PERCENTILES},
+                          'histogram': []},
+        'efficiency': {'mean': None, 'weighted': None, 'total_exposure_hours': 0.0,
+                       'total_session_hours': 0.0},
+    }
+    if not rows:
+        return summary
+
+    # --- RMS trend ---
+    rms = _nan_column(rows, 'rms_total_as')
+    valid = ~np.isnan(rms)
+    if valid.any():
+        rms_v = rms[valid]
+        summary['rms'].update({
+            'mean_as': _round_or_none(rms_v.mean()),
+            'median_as': _round_or_none(np.median(rms_v)),
+            'best_as': _round_or_none(rms_v.min()),
+            'worst_as': _round_or_none(rms_v.max()),
+        })
+        if valid.sum() >= 2:
+            # Slope of RMS against session ordinal (negative = improving)
+            x = np.nonzero(valid)[0].astype(np.float64)
+            slope, _ = np.polyfit(x, rms_v, 1)
+            summary['rms']['trend_as_per_session'] = _round_or_none(slope, 4)
+
+    # --- Autofocus drift vs temperature ---
+    af = [p for r in rows for p in r['af_points']]
+    if af:
+        af_arr = np.asarray(af, dtype=np.float64)
+        temps, positions = af_arr[:, 0], af_arr[:, 1]
+        summary['autofocus']['point_count'] = int(len(af_arr))
+        summary['autofocus']['temp_range_c'] = [_round_or_none(temps.min(), 1),
+                                                _round_or_none(temps.max(), 1)]
+        if len(af_arr) >= 2 and np.ptp(temps) > 0:
+            slope, intercept = np.polyfit(temps, positions, 1)
+            summary['autofocus']['slope_steps_per_c'] = _round_or_none(slope, 2)
+            summary['autofocus']['intercept_steps'] = _round_or_none(intercept, 1)
+
+    # --- Dither settle distribution ---
+    settle = np.fromiter((d for r in rows for d in r['settle_durations']), dtype=np.float64)
+    summary['dither_settle']['timeouts'] = int(sum(r['settle_timeouts'] for r in rows))
+    summary['dither_settle']['count'] = int(settle.size)
+    if settle.size:
+        summary['dither_settle']['mean_sec'] = _round_or_none(settle.mean(), 1)
+        for p, v in zip(SETTLE_PERCENTILES, np.percentile(settle, SETTLE_PERCENTILES)):
+            summary['dither_settle'][f'p{p}_sec'] = _round_or_none(v, 1)
+        edges = np.array(SETTLE_HISTOGRAM_EDGES, dtype=np.float64)
+        counts = np.bincount(np.searchsorted(edges, settle, side='left'), minlength=len(edges) + 1)
+        summary['dither_settle']['histogram'] = [
+            {'le_sec': float(edges[i]) if i < len(edges) else None, 'count': int(c)}
+            for i, c in enumerate(counts)
+        ]
+
+    # --- Exposure efficiency ---
+    exposure = np.array([r['exposure_sec'] for r in rows], dtype=np.float64)
+    wall = np.array([r['session_sec'] for r in rows], dtype=np.float64)
+    eff = _nan_column(rows, 'efficiency')
+    summary['efficiency']['total_exposure_hours'] = round(float(exposure.sum()) / 3600.0, 2)
+    summary['efficiency']['total_session_hours'] = round(float(wall.sum()) / 3600.0, 2)
+    if not np.isnan(eff).all():
+        summary['efficiency']['mean'] = _round_or_none(np.nanmean(eff), 4)
+    if wall.sum() > 0:
+        summary['efficiency']['weighted'] = _round_or_none(min(exposure.sum() / wall.sum(), 1.0), 4)
+
+    return summary
+
+
+def session_trend_row(session_id: int, date_iso: Optional[str], object_name: Optional[str],
+                      metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact per-session row for the paginated trend table (no raw arrays)."""
+    settle = metrics['settle_durations']
+    return {
+        'session_id': session_id,
+        'date': date_iso,
+        'object_name': object_name,
+        'rms_total_as': metrics['rms_total_as'],
+        'rms_ra_as': metrics['rms_ra_as'],
+        'rms_dec_as': metrics['rms_dec_as'],
+        'guide_frames': metrics['guide_frames'],
+        'efficiency': metrics['efficiency'],
+        'exposure_hours': round(metrics['exposure_sec'] / 3600.0, 2),
+        'settle_median_sec': round(float(np.median(settle)), 1) if settle else None,
+        'settle_timeouts': metrics['settle_timeouts'],
+        'af_count': len(metrics['af_points']),
+    }
@@ -0,0 +1,212 @@
+"""
+Nova DSO Tracker - External Object Metadata Fetcher
+
+Parallel, rate-limited front-end for modules.nova_data_fetcher.get_astronomical_data
+(type / magnitude / size / surface brightness from SIMBAD, VizieR and HyperLEDA).
+
+- A bounded ThreadPoolExecutor runs several object lookups concurrently.
+- Each provider has its own token bucket, shared by all workers, so the
+  combined request rate per provider stays polite without fixed sleeps.
+- Results are kept in a persistent on-disk cache (SQLite file in CACHE_DIR)
+  keyed by the normalized object name and shared across users and restarts.
+  Negative results ("nothing found") are cached too, with a shorter TTL.
+  Lookups in which a provider failed (timeout, service error) are returned
+  but never cached, so the next call asks the providers again.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from nova.config import CACHE_DIR
+from nova.helpers import normalize_object_name
+import modules.nova_data_fetcher as nova_data_fetcher
+
+METADATA_CACHE_PATH = os.path.join(CACHE_DIR, "object_metadata_cache.sqlite")
+METADATA_FETCH_WORKERS = 4
+POSITIVE_TTL_SECONDS = 90 * 86400   # catalog values practically never change
+NEGATIVE_TTL_SECONDS = 7 * 86400    # retry "not found" objects weekly
+
+# Sustained requests/second and burst size per provider (shared by all workers)
+PROVIDER_RATES = {
+    "simbad": (4.0, 4),
+    "vizier": (3.0, 3),
+    "hyperleda": (2.0, 2),
+}
+
+RESULT_FIELDS = ("object_type", "type_source", "magnitude", "mag_source",
+                 "size_arcmin", "size_source", "surface_brightness")
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class MetadataCache:
+    """Persistent name -> metadata cache with TTL, safe across threads and processes."""
+
+    def __init__(self, path: str = METADATA_CACHE_PATH,
+                 positive_ttl: int = POSITIVE_TTL_SECONDS,
+                 negative_ttl: int = NEGATIVE_TTL_SECONDS):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS object_metadata ("
+                " name TEXT PRIMARY KEY, data TEXT, found INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit/rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, name: str):
+        """Return the cached result dict (negative results included) or None if missing/expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, found, fetched_at FROM object_metadata WHERE name = ?", (name,)
+            ).fetchone()
+        if not row:
+            return None
+        data, found, fetched_at = row
+        ttl = self.positive_ttl if found else self.negative_ttl
+        if time.time() - fetched_at > ttl:
+            return None
+        return json.loads(data)
+
+    def put(self, name: str, data: dict) -> None:
+        found = any(data.get(k) is not None for k in ("object_type", "magnitude", "size_arcmin"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO object_metadata (name, data, found, fetched_at) VALUES (?, ?, ?, ?)",
+                (name, json.dumps(data), 1 if found else 0, time.time())
+            )
+
+
+class MetadataFetcher:
+    """Bounded worker pool + per-provider rate limits + persistent cache."""
+
+    def __init__(self, fetch_fn=None, cache: MetadataCache = None,
+                 max_workers: int = METADATA_FETCH_WORKERS, rates: dict = None):
+        self._fetch_fn = fetch_fn or nova_data_fetcher.get_astronomical_data
+        self._cache = cache
+        self.max_workers = max_workers
+        self.buckets = {p: TokenBucket(r, c) for p, (r, c) in (rates or PROVIDER_RATES).items()}
+
+    @property
+    def cache(self) -> MetadataCache:
+        if self._cache is None:
+            self._cache = MetadataCache()
+        return self._cache
+
+    def throttle(self, provider: str) -> None:
+        bucket = self.buckets.get(provider)
+        if bucket is not None:
+            bucket.acquire()
+
+    def fetch(self, object_name: str, use_cache: bool = True) -> dict:
+        """
+        Fetch metadata for one object, serving from the persistent cache when fresh.
+
+        The result carries the provider failures under "errors"; only clean
+        lookups (no errors) are written to the cache.
+        """
+        key = normalize_object_name(object_name) or str(object_name)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, object_name=object_name, cached=True, errors=[])
+
+        raw = self._fetch_fn(object_name) or {}
+        data = {k: raw.get(k) for k in RESULT_FIELDS}
+        errors = list(raw.get("errors") or [])
+        if not errors:
+            self.cache.put(key, data)
+        return dict(data, object_name=object_name, cached=False, errors=errors)
+
+    def iter_fetch(self, object_names, use_cache: bool = True):
+        """
+        Fetch many objects concurrently; yields (object_name, data, error) as each completes.
+
+        Cached names are yielded first without touching the pool. Errors are
+        yielded (not raised) so a single failure never aborts a bulk run.
+        """
+        pending = []
+        for name in dict.fromkeys(object_names):
+            if use_cache:
+                cached = self.cache.get(normalize_object_name(name) or str(name))
+                if cached is not None:
+                    yield name, dict(cached, object_name=name, cached=True, errors=[]), None
+                    continue
+            pending.append(name)
+
+        if not pending:
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nova-meta")
+        try:
+            futures = {pool.submit(self.fetch, name, False): name for name in pending}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    yield name, future.result(), None
+                except Exception as e:
+                    yield name, None, e
+        finally:
+            # Consumer may stop early (e.g. SSE client disconnect): drop queued lookups
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_metadata_fetcher() -> MetadataFetcher:
+    """Process-wide fetcher; installs its token buckets as the provider throttle."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = MetadataFetcher()
+            nova_data_fetcher.set_provider_throttle(_fetcher.throttle)
+        return _fetcher
+
+
+def fetch_object_metadata(object_name: str) -> dict:
+    """Cached, rate-limited replacement for nova_data_fetcher.get_astronomical_data."""
+    return get_metadata_fetcher().fetch(object_name)
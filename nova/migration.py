@@ -6,7 +6,9 @@ from datetime import datetime
 
 import yaml
 import requests
+import numpy as np
 from flask import current_app
+from sqlalchemy import insert, update
 from sqlalchemy.orm import selectinload
 from astropy.coordinates import SkyCoord, get_constellation
 import astropy.units as u
@@ -24,6 +26,7 @@ from nova.models import (
     DbUser, Location, HorizonPoint, AstroObject,
     SavedFraming, SavedView, Component, Rig,
     JournalSession, Project, UserCustomFilter, UiPref,
+    parse_magnitude, parse_size_arcmin,
 )
 
 def load_catalog_pack(pack_id: str) -> tuple[dict | None, dict | None]:
@@ -1258,10 +1261,44 @@ def import_user_from_yaml(username: str,
         return False
 
 
-def import_catalog_pack_for_user(db, user: DbUser, catalog_config: dict, pack_id: str) -> tuple[int, int, int]:
+CATALOG_IMPORT_BATCH_SIZE = 500
+
+
+def _catalog_str(o: dict, key: str, alt_key: str) -> str | None:
+    """Pack values like Magnitude may be numeric; stored as non-empty strings or None."""
+    val = o.get(key) if o.get(key) is not None else o.get(alt_key)
+    return str(val) if val not in (None, "") else None
+
+
+def _bulk_constellations(ra_hours: list[float], dec_deg: list[float]) -> list[str | None]:
+    """Resolve constellations for many coordinates with one vectorized get_constellation call."""
+    if not ra_hours:
+        return []
+    try:
+        coords = SkyCoord(ra=np.asarray(ra_hours, dtype=float) * u.hourangle,
+                          dec=np.asarray(dec_deg, dtype=float) * u.deg)
+        return [str(c) for c in np.atleast_1d(get_constellation(coords))]
+    except Exception as e:
+        print(f"[CATALOG IMPORT] Vectorized constellation lookup failed: {e}")
+        return [None] * len(ra_hours)
+
+
+def import_catalog_pack_for_user(db, user: DbUser, catalog_config: dict, pack_id: str,
+                                 progress_callback=None) -> tuple[int, int, int]:
     """
     Import a catalog pack. Returns (created_count, enriched_count, skipped_count).
     Enrichment is NON-DESTRUCTIVE: it only fills missing (empty) fields.
+
+    Runs as a set-based pipeline inside the caller's transaction:
+      1. parse + normalize every pack row (duplicates within the pack collapse to the first),
+      2. prefetch all of the user's existing objects in one projection query,
+      3. compute missing constellations in one vectorized call,
+      4. write with ORM bulk INSERT / bulk UPDATE-by-primary-key in batches.
+    The caller is responsible for committing.
+
+    progress_callback, if given, is called as progress_callback(done, total, message),
+    where done / total count rows written in step 4 (total is 0 before the writes
+    are known).
     """
     created = 0
     enriched = 0
@@ -1269,6 +1306,10 @@ def import_catalog_pack_for_user(db, user: DbUser, catalog_config: dict, pack_id
 
     objs = (catalog_config or {}).get("objects", []) or []
 
+    def _report(done, total, message):
+        if progress_callback:
+            progress_callback(done, total, message)
+
     def _merge_sources(current: str | None, new_id: str) -> str:
         if not new_id: return current or ""
         if not current: return new_id
@@ -1276,123 +1317,139 @@ def import_catalog_pack_for_user(db, user: DbUser, catalog_config: dict, pack_id
         parts.add(new_id)
         return ",".join(sorted(parts))
 
+    # --- 1. Parse & normalize all pack rows ---
+    parsed = {}  # object_name -> pack row (first occurrence wins)
     for o in objs:
         try:
-            # --- 1. Parse Common Data ---
-            ra_val = o.get("RA") if o.get("RA") is not None else o.get("RA (hours)")
-            dec_val = o.get("DEC") if o.get("DEC") is not None else o.get("DEC (degrees)")
-
             raw_obj_name = o.get("Object") or o.get("object") or o.get("object_name")
             if not raw_obj_name or not str(raw_obj_name).strip():
                 skipped += 1
                 continue
-
             object_name = normalize_object_name(raw_obj_name)
+            if object_name in parsed:
+                skipped += 1
+                continue
+            parsed[object_name] = (o, raw_obj_name)
+        except Exception as e:
+            print(f"[CATALOG IMPORT] Error processing '{o}': {e}")
+            skipped += 1
+    _report(0, 0, "Parsed catalog pack")
+
+    # --- 2. Prefetch existing objects (one query, projection only) ---
+    existing_rows = {
+        row.object_name: row for row in db.query(
+            AstroObject.id, AstroObject.object_name, AstroObject.image_url,
+            AstroObject.description_text, AstroObject.catalog_sources,
+        ).filter(AstroObject.user_id == user.id).all()
+    }
 
-            # --- 2. Check for Existing Object ---
-            existing = db.query(AstroObject).filter_by(
-                user_id=user.id,
-                object_name=object_name
-            ).one_or_none()
+    inserts = []
+    updates = []
+    needs_constellation = []  # indexes into inserts
 
-            # --- 3. Extract Curation Data from Pack ---
+    for object_name, (o, raw_obj_name) in parsed.items():
+        try:
             pack_img_url = o.get("image_url")
-            pack_img_credit = o.get("image_credit")
-            pack_img_link = o.get("image_source_link")
             pack_desc_text = o.get("description_text")
-            pack_desc_credit = o.get("description_credit")
-            pack_desc_link = o.get("description_source_link")
+            existing = existing_rows.get(object_name)
 
             if existing:
-                # --- UPDATE LOGIC (Authoritative for Inspiration) ---
-                was_enriched = False
-
-                # Force update Inspiration fields if the pack provides them.
-                # We assume the catalog is the master source for these fields,
-                # while preserving user-specific data like Project Notes.
-                if pack_img_url:
-                    # Check if actually different to avoid unnecessary writes/counts
-                    if not existing.image_url:
-                        existing.image_url = pack_img_url
-                        existing.image_credit = pack_img_credit
-                        existing.image_source_link = pack_img_link
-                        was_enriched = True
-
-                if pack_desc_text:
-                    if not existing.description_text:
-                        existing.description_text = pack_desc_text
-                        existing.description_credit = pack_desc_credit
-                        existing.description_source_link = pack_desc_link
-                        was_enriched = True
-
+                # --- UPDATE LOGIC (Authoritative for Inspiration, fill-only) ---
                 # Always update source tracking
-                existing.catalog_sources = _merge_sources(existing.catalog_sources, pack_id)
-
+                params = {
+                    "id": existing.id,
+                    "catalog_sources": _merge_sources(existing.catalog_sources, pack_id),
+                }
+                was_enriched = False
+                if pack_img_url and not existing.image_url:
+                    params.update(image_url=pack_img_url,
+                                  image_credit=o.get("image_credit"),
+                                  image_source_link=o.get("image_source_link"))
+                    was_enriched = True
+                if pack_desc_text and not existing.description_text:
+                    params.update(description_text=pack_desc_text,
+                                  description_credit=o.get("description_credit"),
+                                  description_source_link=o.get("description_source_link"))
+                    was_enriched = True
+                updates.append(params)
                 if was_enriched:
                     enriched += 1
                 else:
                     skipped += 1
                 continue
 
-            # --- 4. Create New Object ---
-            # (Only if RA/DEC exist)
+            # --- Create New Object (only if RA/DEC exist) ---
+            ra_val = o.get("RA") if o.get("RA") is not None else o.get("RA (hours)")
+            dec_val = o.get("DEC") if o.get("DEC") is not None else o.get("DEC (degrees)")
             ra_f = float(ra_val) if ra_val is not None else None
             dec_f = float(dec_val) if dec_val is not None else None
-
             if (ra_f is None) or (dec_f is None):
                 skipped += 1
                 continue
 
-            # Basic Fields
-            common_name = o.get("Common Name") or o.get("Name") or o.get("common_name") or str(raw_obj_name).strip()
-            obj_type = o.get("Type") or o.get("type")
             constellation = o.get("Constellation") or o.get("constellation")
-            magnitude = str(o.get("Magnitude") if o.get("Magnitude") is not None else o.get("magnitude") or "")
-            size = str(o.get("Size") if o.get("Size") is not None else o.get("size") or "")
-            sb = str(o.get("SB") if o.get("SB") is not None else o.get("sb") or "")
+            if not constellation:
+                needs_constellation.append(len(inserts))
 
-            # Constellation Calc
-            if (not constellation) and (ra_f is not None) and (dec_f is not None):
-                try:
-                    coords = SkyCoord(ra=ra_f * u.hourangle, dec=dec_f * u.deg)
-                    constellation = get_constellation(coords)
-                except Exception:
-                    constellation = None
-
-            new_object = AstroObject(
-                user_id=user.id,
-                object_name=object_name,
-                common_name=common_name,
-                ra_hours=ra_f,
-                dec_deg=dec_f,
-                type=obj_type,
-                constellation=constellation,
-                magnitude=magnitude if magnitude else None,
-                size=size if size else None,
-                sb=sb if sb else None,
-                active_project=False,
-                project_name=None,
-                is_shared=False,
-                shared_notes=None,
-                original_user_id=None,
-                original_item_id=None,
-                catalog_sources=pack_id,
-                catalog_info=o.get("catalog_info"),
+            inserts.append({
+                "user_id": user.id,
+                "object_name": object_name,
+                "common_name": o.get("Common Name") or o.get("Name") or o.get("common_name") or str(raw_obj_name).strip(),
+                "ra_hours": ra_f,
+                "dec_deg": dec_f,
+                "type": o.get("Type") or o.get("type"),
+                "constellation": constellation or None,
+                "magnitude": _catalog_str(o, "Magnitude", "magnitude"),
+                "size": _catalog_str(o, "Size", "size"),
+                # Bulk inserts bypass the ORM listeners that keep these in sync
+                "magnitude_num": parse_magnitude(_catalog_str(o, "Magnitude", "magnitude")),
+                "size_arcmin": parse_size_arcmin(_catalog_str(o, "Size", "size")),
+                "sb": _catalog_str(o, "SB", "sb"),
+                "active_project": False,
+                "project_name": None,
+                "is_shared": False,
+                "shared_notes": None,
+                "original_user_id": None,
+                "original_item_id": None,
+                "catalog_sources": pack_id,
+                "catalog_info": o.get("catalog_info"),
+                "enabled": True,
                 # Curation
-                image_url=pack_img_url,
-                image_credit=pack_img_credit,
-                image_source_link=pack_img_link,
-                description_text=pack_desc_text,
-                description_credit=pack_desc_credit,
-                description_source_link=pack_desc_link,
-            )
-            db.add(new_object)
+                "image_url": pack_img_url,
+                "image_credit": o.get("image_credit"),
+                "image_source_link": o.get("image_source_link"),
+                "description_text": pack_desc_text,
+                "description_credit": o.get("description_credit"),
+                "description_source_link": o.get("description_source_link"),
+            })
             created += 1
-
         except Exception as e:
             print(f"[CATALOG IMPORT] Error processing '{o}': {e}")
             skipped += 1
 
+    # --- 3. Vectorized constellation lookup for new objects missing one ---
+    if needs_constellation:
+        _report(0, 0, f"Resolving {len(needs_constellation)} constellations")
+        names = _bulk_constellations([inserts[i]["ra_hours"] for i in needs_constellation],
+                                     [inserts[i]["dec_deg"] for i in needs_constellation])
+        for i, name in zip(needs_constellation, names):
+            inserts[i]["constellation"] = name
+
+    # --- 4. Batched bulk writes (same transaction; caller commits) ---
+    db.flush()
+    total_writes = len(inserts) + len(updates)
+    done = 0
+    for stmt, rows in ((insert(AstroObject), inserts), (update(AstroObject), updates)):
+        for batch_start in range(0, len(rows), CATALOG_IMPORT_BATCH_SIZE):
+            batch = rows[batch_start:batch_start + CATALOG_IMPORT_BATCH_SIZE]
+            db.execute(stmt, batch)
+            done += len(batch)
+            _report(done, total_writes, f"Saved {done} of {total_writes} objects")
+
+    # Bulk statements bypass the identity map; expire any AstroObject already loaded
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, AstroObject):
+            db.expire(obj)
     return (created, enriched, skipped)
 
 
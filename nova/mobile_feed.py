@@ -0,0 +1,195 @@
+"""
+Nova DSO Tracker - Mobile "Up Now" Feed
+
+Computes the whole observing night for a user/location in one batched pass
+(one AltAz transform over objects x time grid, one dusk-to-dawn pass for
+duration / max altitude) and keeps the result as a compact snapshot:
+
+- float32 altitude/azimuth matrices on a fixed grid (start epoch + interval),
+  so "current position" is index arithmetic plus linear interpolation;
+- the per-object static fields (name, type, framing flag, duration, ...).
+
+Pages are served from the snapshot in object-name order with opaque keyset
+cursors. Positions are evaluated at the start of a short time bucket, so a
+page is deterministic within the bucket and can carry a strong ETag.
+"""
+import base64
+import bisect
+import hashlib
+import json
+import threading
+import time
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+
+from modules.astro_calculations import calculate_observable_durations_batch, get_common_time_arrays
+from nova.config import BoundedCache
+from nova.models import AstroObject, SavedFraming
+from nova.nightly_snapshot import get_nightly_snapshot, nightly_settings
+from nova.nightly_curves import curve_time_axis, interpolate_position, moon_separations
+
+MOBILE_FEED_PAGE_DEFAULT = 200
+MOBILE_FEED_PAGE_MAX = 500
+MOBILE_FEED_POSITION_BUCKET_S = 60  # "current" alt/az/moon are evaluated once per bucket
+
+mobile_feed_cache = BoundedCache(64)  # (user_id, location_id) -> MobileFeedSnapshot
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+class MobileFeedSnapshot:
+    """One observing night of Up Now data for one user/location/object set."""
+
+    def __init__(self, version, local_date, t0, interval_s, altitudes, azimuths, ras, decs, rows):
+        self.version = version          # content hash of inputs (objects, framing, settings)
+        self.local_date = local_date
+        self.t0 = t0                    # unix seconds of grid sample 0
+        self.interval_s = interval_s
+        self.altitudes = altitudes      # float32 (N, T)
+        self.azimuths = azimuths        # float32 (N, T)
+        self.ras = ras                  # float64 (N,) hours
+        self.decs = decs                # float64 (N,) degrees
+        self.rows = rows                # static per-object fields, sorted by object name
+        self.names = [r["Object"] for r in rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def positions_at(self, ts, start=0, end=None):
+        """Interpolated (alt, az, trend) for rows[start:end] at unix time ts."""
+        cur_alt, cur_az, next_alt = interpolate_position(self.altitudes[start:end], self.azimuths[start:end],
+                                                         self.t0, self.interval_s, ts)
+        trend = np.where(np.abs(next_alt - cur_alt) > 0.01, np.where(next_alt > cur_alt, '↑', '↓'), '–')
+        return cur_alt, cur_az, trend
+
+    def page_bounds(self, after_name, limit):
+        """[start, end) of the page that follows after_name (None for the first page)."""
+        start = 0 if after_name is None else bisect.bisect_right(self.names, after_name)
+        return start, min(start + limit, len(self.rows))
+
+
+def feed_settings(location, user_prefs):
+    """(local_date, altitude_threshold, sampling_interval, horizon_mask) as used by the mobile views."""
+    return nightly_settings(location, user_prefs)
+
+
+def build_mobile_feed(objects, framed_names, lat, lon, tz_name, local_date, altitude_threshold,
+                      sampling_interval, horizon_mask, version="", nightly=None):
+    """
+    Batched night computation for `objects` (AstroObject rows or objects with the
+    same attributes). Objects without coordinates are skipped. Duration and max
+    altitude come from `nightly` (a NightlySnapshot) when given.
+    """
+    objects = sorted((o for o in objects if o.ra_hours is not None and o.dec_deg is not None),
+                     key=lambda o: o.object_name)
+    ras = np.array([float(o.ra_hours) for o in objects], dtype=float)
+    decs = np.array([float(o.dec_deg) for o in objects], dtype=float)
+
+    _, times_utc = get_common_time_arrays(tz_name, local_date, sampling_interval)
+    if objects:
+        location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+        coords = SkyCoord(ra=ras[:, None] * u.hourangle, dec=decs[:, None] * u.deg)
+        altaz = coords.transform_to(AltAz(obstime=times_utc[None, :], location=location))
+        altitudes = altaz.alt.deg.astype(np.float32)
+        azimuths = altaz.az.deg.astype(np.float32)
+    else:
+        altitudes = azimuths = np.zeros((0, len(times_utc)), dtype=np.float32)
+
+    if nightly is not None:
+        minutes, max_alts = nightly.take([o.object_name for o in objects])
+    else:
+        minutes, max_alts = calculate_observable_durations_batch(
+            ras, decs, lat, lon, local_date, tz_name, altitude_threshold, sampling_interval,
+            horizon_mask=horizon_mask
+        )
+
+    rows = [{
+        "Object": o.object_name,
+        "Common Name": o.common_name or o.object_name,
+        "ActiveProject": o.active_project,
+        "has_framing": o.object_name in framed_names,
+        'Observable Duration (min)': int(minutes[k]),
+        'Max Altitude (°)': round(float(max_alts[k]), 1),
+        "Type": o.type or "N/A",
+        "Constellation": o.constellation or "",
+    } for k, o in enumerate(objects)]
+
+    t0, interval_s = curve_time_axis(times_utc, sampling_interval)
+    return MobileFeedSnapshot(version, local_date, t0, interval_s, altitudes, azimuths, ras, decs, rows)
+
+
+def render_rows(snapshot, start, end, ts, lat, lon):
+    """Rows[start:end] with current position, trend and moon separation at ts (Up Now dict shape)."""
+    if end <= start:
+        return []
+    cur_alt, cur_az, trend = snapshot.positions_at(ts, start, end)
+    seps = moon_separations(snapshot.ras[start:end], snapshot.decs[start:end], lat, lon, ts)
+    out = []
+    for k, row in enumerate(snapshot.rows[start:end]):
+        item = dict(row)
+        item['Altitude Current'] = f"{cur_alt[k]:.2f}"
+        item['Azimuth Current'] = f"{cur_az[k]:.2f}"
+        item['Trend'] = str(trend[k])
+        item['Angular Separation (°)'] = int(seps[k]) if seps is not None else "N/A"
+        out.append(item)
+    return out
+
+
+def position_bucket_ts(now_ts=None):
+    now_ts = time.time() if now_ts is None else now_ts
+    return float(int(now_ts // MOBILE_FEED_POSITION_BUCKET_S) * MOBILE_FEED_POSITION_BUCKET_S)
+
+
+def get_mobile_feed(db, user, location, user_prefs):
+    """Cached snapshot for the user's objects at `location`; rebuilt when inputs change."""
+    local_date, altitude_threshold, sampling_interval, horizon_mask = feed_settings(location, user_prefs)
+
+    objects = db.query(AstroObject.object_name, AstroObject.common_name, AstroObject.ra_hours,
+                       AstroObject.dec_deg, AstroObject.type, AstroObject.constellation,
+                       AstroObject.active_project) \
+        .filter(AstroObject.user_id == user.id).order_by(AstroObject.object_name).all()
+    framed = {r[0] for r in db.query(SavedFraming.object_name).filter_by(user_id=user.id).all()}
+
+    settings = (user.id, location.lat, location.lon, location.timezone, local_date,
+                altitude_threshold, sampling_interval, horizon_mask)
+    digest = hashlib.sha1(repr((settings, [tuple(o) for o in objects], sorted(framed))).encode()).hexdigest()
+    cache_key = (user.id, location.id)
+
+    cached = mobile_feed_cache.get(cache_key)
+    if cached is not None and cached.version == digest:
+        return cached
+
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(cache_key, threading.Lock())
+    with lock:
+        cached = mobile_feed_cache.get(cache_key)
+        if cached is not None and cached.version == digest:
+            return cached  # built by a concurrent request
+        nightly = get_nightly_snapshot(db, user.id, location.lat, location.lon, location.timezone, local_date,
+                                       altitude_threshold, sampling_interval, horizon_mask)
+        snapshot = build_mobile_feed(objects, framed, location.lat, location.lon, location.timezone,
+                                     local_date, altitude_threshold, sampling_interval, horizon_mask,
+                                     version=digest, nightly=nightly)
+        mobile_feed_cache[cache_key] = snapshot
+        return snapshot
+
+
+def encode_feed_cursor(object_name: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps(object_name).encode()).decode()
+
+
+def decode_feed_cursor(cursor: str) -> str:
+    """Raises ValueError for malformed cursors."""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(value, str):
+        raise ValueError("invalid cursor")
+    return value
+
+
+def feed_page_etag(snapshot, cursor, limit, bucket_ts) -> str:
+    return hashlib.sha1(f"{snapshot.version}|{cursor or ''}|{limit}|{int(bucket_ts)}".encode()).hexdigest()
@@ -2,10 +2,12 @@ import os
 from datetime import datetime
 
 from sqlalchemy import (
-    create_engine, Column, Integer, Float, String, Boolean, Date,
+    create_engine, event, Column, Integer, Float, String, Boolean, Date,
     ForeignKey, Text, UniqueConstraint, CheckConstraint
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session, deferred
+
+from nova.db_pool import configure_sqlite_engine
 
 # --- DB path setup ---
 INSTANCE_PATH = os.environ.get("INSTANCE_PATH") or os.path.join(os.getcwd(), "instance")
@@ -14,6 +16,7 @@ DB_PATH = os.path.join(INSTANCE_PATH, 'app.db')
 DB_URI = f"sqlite:///{DB_PATH}"
 
 engine = create_engine(DB_URI, echo=False, future=True)
+configure_sqlite_engine(engine)  # pragmas on every pooled connection
 SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False))
 Base = declarative_base()
 
@@ -146,6 +149,40 @@ class HorizonPoint(Base):
     alt_min_deg = Column(Float, nullable=False)
     location = relationship("Location", back_populates="horizon_points")
 
+def parse_magnitude(value):
+    """Magnitude as float, or None when missing, unparsable or the 90+/99 'unknown' sentinel."""
+    if value is None:
+        return None
+    try:
+        mag = float(str(value).strip())
+    except ValueError:
+        return None
+    return mag if mag < 90 else None
+
+
+def parse_size_arcmin(value):
+    """
+    Angular size in arcmin from "10", "10'", "10x5'" (mean of the axes) or
+    "0.5°"; None when missing, unparsable or not positive.
+    """
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    try:
+        if "°" in text:
+            size = float(text.replace("°", "")) * 60
+        else:
+            text = text.replace("'", "").replace("′", "")
+            if "x" in text:
+                parts = [float(p) for p in text.split("x") if p.strip()]
+                size = sum(parts) / len(parts) if parts else None
+            else:
+                size = float(text)
+    except ValueError:
+        return None
+    return size if size and size > 0 else None
+
+
 class AstroObject(Base):
     __tablename__ = 'astro_objects'
     id = Column(Integer, primary_key=True)
@@ -159,6 +196,9 @@ class AstroObject(Base):
     magnitude = Column(String(32), nullable=True)
     size = Column(String(64), nullable=True)
     sb = Column(String(64), nullable=True)
+    # Numeric forms of magnitude / size, kept in sync on insert/update (NULL = unknown)
+    magnitude_num = Column(Float, nullable=True)
+    size_arcmin = Column(Float, nullable=True)
     active_project = Column(Boolean, nullable=False, default=False)
     project_name = Column(Text, nullable=True)
     is_shared = Column(Boolean, nullable=False, default=False, index=True)
@@ -225,6 +265,13 @@ class AstroObject(Base):
         }
 
 
+@event.listens_for(AstroObject, "before_insert")
+@event.listens_for(AstroObject, "before_update")
+def _sync_numeric_magnitude_size(mapper, connection, target):
+    target.magnitude_num = parse_magnitude(target.magnitude)
+    target.size_arcmin = parse_size_arcmin(target.size)
+
+
 class Component(Base):
     __tablename__ = 'components'
     id = Column(Integer, primary_key=True)
@@ -277,6 +324,10 @@ class Rig(Base):
     __table_args__ = (UniqueConstraint('user_id', 'rig_name', name='uq_user_rig_name'),)
 
 
+# Deferred column group for JournalSession's raw logs + parse cache
+SESSION_LOG_GROUP = "session_logs"
+
+
 class JournalSession(Base):
     __tablename__ = 'journal_sessions'
     id = Column(Integer, primary_key=True)
@@ -353,10 +404,12 @@ class JournalSession(Base):
     external_id = Column(String(64), nullable=True, index=True)
 
     # --- Log content stored directly in database ---
-    asiair_log_content = Column(Text, nullable=True)     # Raw ASIAIR autorun log
-    phd2_log_content = Column(Text, nullable=True)       # Raw PHD2 guide log
-    nina_log_content = Column(Text, nullable=True)        # Raw NINA log
-    log_analysis_cache = Column(Text, nullable=True)     # Cached JSON from parse-once
+    # Deferred (multi-MB): loaded together on first access of any of them, or
+    # up front with .options(undefer_group(SESSION_LOG_GROUP)).
+    asiair_log_content = deferred(Column(Text, nullable=True), group=SESSION_LOG_GROUP)  # Raw ASIAIR autorun log
+    phd2_log_content = deferred(Column(Text, nullable=True), group=SESSION_LOG_GROUP)    # Raw PHD2 guide log
+    nina_log_content = deferred(Column(Text, nullable=True), group=SESSION_LOG_GROUP)    # Raw NINA log
+    log_analysis_cache = deferred(Column(Text, nullable=True), group=SESSION_LOG_GROUP)  # Cached JSON from parse-once
 
     # --- Draft session support ---
     draft = Column(Boolean, nullable=False, default=False, index=True)
@@ -0,0 +1,175 @@
+"""
+Nova DSO Tracker - Nightly Curve Helpers
+
+Entries in nightly_curves_cache sample an object's altitude/azimuth on a
+fixed grid (get_common_time_arrays: noon to noon, every `sampling_interval`
+minutes). Each entry is a compact NightlyCurve record: float32 alt/az
+arrays plus a reference to the CurveTimeAxis shared by every entry for the
+same (timezone, observing date, interval). The axis is just a start epoch
+and interval, so "where is it now" is index arithmetic and linear
+interpolation instead of a search over tz-aware datetimes.
+"""
+import sys
+from datetime import datetime
+
+import astropy.units as u
+import numpy as np
+import pytz
+from astropy.coordinates import EarthLocation, get_body
+from astropy.time import Time
+
+from nova.config import BoundedCache
+
+_moon_cache = BoundedCache(64)  # (lat, lon, unix second) -> (ra_deg, dec_deg) or None
+_time_axes = BoundedCache(256)  # (tz_name, local_date, sampling_interval) -> CurveTimeAxis
+
+
+def curve_time_axis(times_utc, sampling_interval):
+    """(t0 unix seconds, interval seconds) for a get_common_time_arrays() grid."""
+    return float(times_utc[0].unix), float(sampling_interval) * 60.0
+
+
+def interpolate_position(altitudes, azimuths, t0, interval_s, ts):
+    """
+    Alt/az at unix time ts from curves sampled on (t0, interval_s).
+
+    altitudes / azimuths are (T,) or (N, T); returns (alt, az, next_alt)
+    with the sample axis removed. Times outside the grid clamp to its ends.
+    """
+    altitudes = np.asarray(altitudes)
+    azimuths = np.asarray(azimuths)
+    n_samples = altitudes.shape[-1]
+    if n_samples == 0:
+        raise ValueError("empty nightly curve")
+    pos = min(max((ts - t0) / interval_s, 0.0), n_samples - 1)
+    i = int(pos)
+    j = min(i + 1, n_samples - 1)
+    frac = pos - i
+    alt_i, alt_j = altitudes[..., i], altitudes[..., j]
+    az_i, az_j = azimuths[..., i], azimuths[..., j]
+    alt = alt_i + (alt_j - alt_i) * frac
+    d_az = (az_j - az_i + 180.0) % 360.0 - 180.0  # shortest way round north
+    az = (az_i + d_az * frac) % 360.0
+    return alt, az, alt_j
+
+
+def trend_symbol(current_alt, next_alt):
+    if abs(next_alt - current_alt) > 0.01:
+        return '↑' if next_alt > current_alt else '↓'
+    return '–'
+
+
+class CurveTimeAxis:
+    """Sample grid shared by all curves for one (timezone, observing date, interval)."""
+
+    __slots__ = ("tz_name", "local_date", "t0", "interval_s", "n_samples")
+
+    def __init__(self, tz_name, local_date, t0, interval_s, n_samples):
+        self.tz_name = tz_name
+        self.local_date = local_date
+        self.t0 = t0                  # unix seconds of sample 0
+        self.interval_s = interval_s
+        self.n_samples = n_samples
+
+    def times_local(self):
+        """Tz-aware datetimes of the samples (built on demand, not stored)."""
+        tz = pytz.timezone(self.tz_name)
+        return [datetime.fromtimestamp(self.t0 + k * self.interval_s, tz) for k in range(self.n_samples)]
+
+
+def shared_time_axis(tz_name, local_date, sampling_interval, times_utc):
+    """Interned CurveTimeAxis for a get_common_time_arrays() grid."""
+    key = (tz_name, local_date, sampling_interval)
+    axis = _time_axes.get(key)
+    if axis is None or axis.n_samples != len(times_utc):
+        t0, interval_s = curve_time_axis(times_utc, sampling_interval)
+        axis = _time_axes[key] = CurveTimeAxis(tz_name, local_date, t0, interval_s, len(times_utc))
+    return axis
+
+
+class NightlyCurve:
+    """
+    One nightly_curves_cache entry: float32 alt/az samples on a shared axis plus
+    the per-night summary fields shown in the dashboard. Geometrically impossible
+    objects have no axis and empty arrays.
+    """
+
+    __slots__ = ("axis", "altitudes", "azimuths", "transit_time", "obs_duration_minutes", "max_altitude",
+                 "alt_11pm", "az_11pm", "is_obstructed_at_11pm", "is_geometrically_impossible")
+
+    def __init__(self, axis, altitudes, azimuths, transit_time="N/A", obs_duration_minutes=0,
+                 max_altitude="N/A", alt_11pm="N/A", az_11pm="N/A", is_obstructed_at_11pm=False,
+                 is_geometrically_impossible=False):
+        self.axis = axis
+        self.altitudes = np.asarray(altitudes, dtype=np.float32)
+        self.azimuths = np.asarray(azimuths, dtype=np.float32)
+        self.transit_time = transit_time
+        self.obs_duration_minutes = obs_duration_minutes
+        self.max_altitude = max_altitude
+        self.alt_11pm = alt_11pm
+        self.az_11pm = az_11pm
+        self.is_obstructed_at_11pm = is_obstructed_at_11pm
+        self.is_geometrically_impossible = is_geometrically_impossible
+
+    @classmethod
+    def impossible(cls, max_altitude):
+        """Entry for an object that never clears the altitude threshold."""
+        return cls(None, (), (), max_altitude=max_altitude, is_geometrically_impossible=True)
+
+    def position_at(self, ts):
+        """(alt, az, trend) at unix time ts; ValueError for an empty curve."""
+        if self.axis is None:
+            raise ValueError("empty nightly curve")
+        alt, az, next_alt = interpolate_position(self.altitudes, self.azimuths,
+                                                 self.axis.t0, self.axis.interval_s, ts)
+        return float(alt), float(az), trend_symbol(float(alt), float(next_alt))
+
+    def nbytes(self):
+        """Approximate memory held by this entry (the shared axis is not counted)."""
+        size = sys.getsizeof(self) + self.altitudes.nbytes + self.azimuths.nbytes
+        for name in ("transit_time", "max_altitude", "alt_11pm", "az_11pm"):
+            size += sys.getsizeof(getattr(self, name))
+        return size
+
+
+def curve_cache_stats(cache):
+    """Entry count and memory use of a nightly curve cache, for the admin stats endpoint."""
+    curves = [c for c in list(cache.values()) if isinstance(c, NightlyCurve)]
+    total = sum(c.nbytes() for c in curves)
+    axes = list(_time_axes.values())
+    return {
+        "entries": len(curves),
+        "max_entries": getattr(cache, "_maxsize", None),
+        "bytes_total": total,
+        "bytes_per_entry": round(total / len(curves)) if curves else 0,
+        "time_axes": len(axes),
+        "time_axes_bytes": sum(sys.getsizeof(a) for a in axes),
+    }
+
+
+def moon_radec_at(lat, lon, ts):
+    """Topocentric moon (ra_deg, dec_deg) at unix time ts, or None if it cannot be computed."""
+    key = (round(lat, 4), round(lon, 4), int(ts))
+    if key not in _moon_cache:
+        try:
+            moon = get_body('moon', Time(ts, format='unix'), EarthLocation(lat=lat * u.deg, lon=lon * u.deg))
+            _moon_cache[key] = (float(moon.ra.deg), float(moon.dec.deg))
+        except Exception:
+            _moon_cache[key] = None
+    return _moon_cache[key]
+
+
+def angular_separation_deg(ra1_deg, dec1_deg, ra2_deg, dec2_deg):
+    """Great-circle separation in degrees; broadcasts over NumPy arrays."""
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1_deg, dec1_deg, ra2_deg, dec2_deg))
+    cos_sep = np.sin(dec1) * np.sin(dec2) + np.cos(dec1) * np.cos(dec2) * np.cos(ra1 - ra2)
+    return np.degrees(np.arccos(np.clip(cos_sep, -1.0, 1.0)))
+
+
+def moon_separations(ra_hours, dec_deg, lat, lon, ts):
+    """Rounded moon separation (deg) for arrays of objects at ts, or None if the moon is unavailable."""
+    moon = moon_radec_at(lat, lon, ts)
+    if moon is None:
+        return None
+    return np.round(angular_separation_deg(np.asarray(ra_hours, dtype=float) * 15.0,
+                                           np.asarray(dec_deg, dtype=float), *moon))
@@ -0,0 +1,149 @@
+"""
+Nova DSO Tracker - Shared Nightly Visibility Snapshot
+
+Per-object numbers for one observing night - observable duration, max
+altitude and the observable window - for every object of a user at one
+location, computed in one batched pass (calculate_observable_durations_batch:
+a single AltAz transform over objects x dark-window samples).
+
+The observable-objects dropdown, the desktop dashboard batch, the mobile
+Up Now feed and the AI pre-filter all read the same snapshot instead of
+each running its own per-object loop.
+
+Snapshots live in observable_objects_cache, keyed by user, location
+(coordinates, timezone, threshold, sampling, horizon mask) and night, and
+carry a version hash of the user's object coordinates: editing a location
+changes the key, editing/adding/removing an object changes the version,
+and either way the next read rebuilds.
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from modules.astro_calculations import calculate_observable_durations_batch
+from nova.config import SINGLE_USER_MODE, observable_objects_cache
+from nova.models import AstroObject
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+class NightlySnapshot:
+    """Duration / max altitude / window per object name for one user, location and night."""
+
+    def __init__(self, version, local_date, names, minutes, max_alts, observable_from, observable_to):
+        self.version = version
+        self.local_date = local_date
+        self.names = names                      # object names, sorted
+        self.index = {name: k for k, name in enumerate(names)}
+        self.minutes = minutes                  # int array (N,)
+        self.max_alts = max_alts                # float array (N,) degrees
+        self.observable_from = observable_from  # datetime or None per object
+        self.observable_to = observable_to
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def get(self, name):
+        """{'observable_minutes', 'max_altitude', 'observable_from', 'observable_to'} or None."""
+        k = self.index.get(name)
+        if k is None:
+            return None
+        return {
+            "observable_minutes": int(self.minutes[k]),
+            "max_altitude": float(self.max_alts[k]),
+            "observable_from": self.observable_from[k],
+            "observable_to": self.observable_to[k],
+        }
+
+    def take(self, names):
+        """(minutes, max_alts) arrays for names, in that order (0 for unknown names)."""
+        idx = np.array([self.index.get(n, -1) for n in names], dtype=int)
+        minutes = np.zeros(idx.shape, dtype=int)
+        max_alts = np.zeros(idx.shape, dtype=float)
+        known = idx >= 0
+        minutes[known] = self.minutes[idx[known]]
+        max_alts[known] = self.max_alts[idx[known]]
+        return minutes, max_alts
+
+
+def observing_night(tz_name, now=None) -> str:
+    """'YYYY-MM-DD' of the observing night (noon to noon) containing now."""
+    now_local = now.astimezone(pytz.timezone(tz_name)) if now else datetime.now(pytz.timezone(tz_name))
+    if now_local.hour < 12:
+        return (now_local - timedelta(days=1)).strftime('%Y-%m-%d')
+    return now_local.strftime('%Y-%m-%d')
+
+
+def nightly_sampling_interval(user_prefs):
+    """Sampling interval (minutes) the nightly snapshot is computed at for these user prefs."""
+    if SINGLE_USER_MODE:
+        return user_prefs.get('sampling_interval_minutes') or 15
+    return int(os.environ.get('CALCULATION_PRECISION', 15))
+
+
+def nightly_settings(location, user_prefs):
+    """(local_date, altitude_threshold, sampling_interval, horizon_mask) for a Location and user prefs."""
+    local_date = observing_night(location.timezone)
+
+    altitude_threshold = user_prefs.get("altitude_threshold", 20)
+    if location.altitude_threshold is not None:
+        altitude_threshold = location.altitude_threshold
+
+    sampling_interval = nightly_sampling_interval(user_prefs)
+
+    horizon_mask = [[hp.az_deg, hp.alt_min_deg] for hp in sorted(location.horizon_points, key=lambda p: p.az_deg)]
+    return local_date, altitude_threshold, sampling_interval, horizon_mask
+
+
+def compute_nightly_snapshot(objects, lat, lon, tz_name, local_date, altitude_threshold, sampling_interval,
+                             horizon_mask=None, version=""):
+    """
+    One batched pass over `objects` ((name, ra_hours, dec_deg) tuples);
+    objects without coordinates are skipped.
+    """
+    objects = sorted((o for o in objects if o[1] is not None and o[2] is not None), key=lambda o: o[0])
+    names = [o[0] for o in objects]
+    ras = np.array([float(o[1]) for o in objects], dtype=float)
+    decs = np.array([float(o[2]) for o in objects], dtype=float)
+    minutes, max_alts, obs_from, obs_to = calculate_observable_durations_batch(
+        ras, decs, lat, lon, local_date, tz_name, altitude_threshold, sampling_interval,
+        horizon_mask=horizon_mask, with_window=True
+    )
+    return NightlySnapshot(version, local_date, names, minutes, max_alts, obs_from, obs_to)
+
+
+def get_nightly_snapshot(db, user_id, lat, lon, tz_name, local_date, altitude_threshold, sampling_interval,
+                         horizon_mask=None):
+    """Cached snapshot for all of the user's objects; rebuilt when objects or location settings change."""
+    objects = db.query(AstroObject.object_name, AstroObject.ra_hours, AstroObject.dec_deg) \
+        .filter(AstroObject.user_id == user_id).order_by(AstroObject.object_name).all()
+    objects = [tuple(o) for o in objects]
+    mask = sorted([float(az), float(alt)] for az, alt in (horizon_mask or []))
+    cache_key = ("nightly", user_id, round(float(lat), 5), round(float(lon), 5), tz_name, local_date,
+                 float(altitude_threshold), int(sampling_interval), hashlib.sha1(repr(mask).encode()).hexdigest())
+    version = hashlib.sha1(repr(objects).encode()).hexdigest()
+
+    cached = observable_objects_cache.get(cache_key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(cache_key, threading.Lock())
+    with lock:
+        cached = observable_objects_cache.get(cache_key)
+        if cached is not None and cached.version == version:
+            return cached  # built by a concurrent request
+        snapshot = compute_nightly_snapshot(objects, lat, lon, tz_name, local_date, altitude_threshold,
+                                            sampling_interval, horizon_mask, version=version)
+        observable_objects_cache[cache_key] = snapshot
+    with _build_locks_guard:
+        _build_locks.pop(cache_key, None)
+    return snapshot
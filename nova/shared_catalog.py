@@ -0,0 +1,318 @@
+"""
+Nova DSO Tracker - Shared Catalog
+
+Community catalog of the objects, components and views users have shared.
+
+List pages are lightweight projections (no description text, notes or
+settings) read with keyset pagination on (name, id), which the
+(is_shared, name, id) indexes serve without a scan or sort. Pages can be
+filtered server-side by type / constellation / component kind, owner,
+import status and a name search. Full details of one item are fetched on
+demand.
+
+The catalog summary (item counts and facet values for the filters) is
+materialized once and cached until a commit flips is_shared on an item,
+edits or deletes a shared item, or renames / deletes a user. As in
+nova/user_context.py, invalidation is collected by session events, applied
+on commit and announced to other gunicorn workers through a stamp file in
+CACHE_DIR (nova/cache_stamp.py).
+"""
+import base64
+import json
+import os
+import threading
+
+from sqlalchemy import and_, event, func, inspect, or_
+from sqlalchemy.orm import Session
+
+from nova.cache_stamp import bump_stamp, read_stamp
+from nova.config import CACHE_DIR
+from nova.models import AstroObject, Component, DbUser, SavedView
+
+SHARED_CATALOG_STAMP_PATH = os.path.join(CACHE_DIR, "shared_catalog.stamp")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SHARED_KINDS = {"object": AstroObject, "component": Component, "view": SavedView}
+
+
+def _sort_column(kind):
+    return AstroObject.object_name if kind == "object" else SHARED_KINDS[kind].name
+
+
+def _list_columns(kind):
+    if kind == "object":
+        return (AstroObject.id, AstroObject.object_name, AstroObject.common_name, AstroObject.type,
+                AstroObject.constellation, AstroObject.ra_hours, AstroObject.dec_deg, AstroObject.image_url,
+                (func.coalesce(func.length(AstroObject.shared_notes), 0) > 0).label("has_notes"))
+    if kind == "component":
+        return Component.id, Component.name, Component.kind
+    return SavedView.id, SavedView.name, SavedView.description
+
+
+def _filter_columns(kind):
+    """Filter parameter -> columns matched (case-insensitive substring, any column)."""
+    owner = {"owner": (DbUser.username,)}
+    if kind == "object":
+        return {"q": (AstroObject.object_name, AstroObject.common_name), "type": (AstroObject.type,),
+                "constellation": (AstroObject.constellation,), **owner}
+    if kind == "component":
+        return {"q": (Component.name,), "kind": (Component.kind,), **owner}
+    return {"q": (SavedView.name, SavedView.description), **owner}
+
+
+def _row_to_item(kind, row, username, imported):
+    if kind == "object":
+        item = {
+            "id": row.id,
+            "object_name": row.object_name,
+            "common_name": row.common_name,
+            "type": row.type,
+            "constellation": row.constellation,
+            "ra": row.ra_hours,
+            "dec": row.dec_deg,
+            "image_url": row.image_url,
+            "has_notes": bool(row.has_notes),
+        }
+    elif kind == "component":
+        item = {"id": row.id, "name": row.name, "kind": row.kind}
+    else:
+        item = {"id": row.id, "name": row.name, "description": row.description}
+    item["shared_by_user"] = username
+    item["imported"] = imported
+    return item
+
+
+def encode_cursor(name, item_id) -> str:
+    return base64.urlsafe_b64encode(json.dumps([name, item_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """(name, id) from a page cursor; raises ValueError if it is malformed."""
+    try:
+        name, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(name, str) or not isinstance(item_id, int):
+        raise ValueError("Invalid cursor")
+    return name, item_id
+
+
+def _imported_ids_query(db, model, user_id):
+    return db.query(model.original_item_id).filter(
+        model.user_id == user_id, model.original_item_id.isnot(None))
+
+
+def list_shared_items(db, kind, user_id, filters=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of shared items of `kind` ('object' | 'component' | 'view') as seen by user_id.
+
+    Args:
+        filters: Dict of filter parameters ('q', 'owner', 'type', 'constellation'
+                 for objects, 'kind' for components, 'status' = 'imported' |
+                 'unimported'); unknown keys and empty values are ignored.
+        cursor: next_cursor of the previous page, or None for the first page.
+        limit: Page size (capped at MAX_PAGE_SIZE).
+
+    Returns:
+        {"kind", "items": [...], "next_cursor": str or None}
+
+    Raises:
+        ValueError: Unknown kind or malformed cursor.
+    """
+    if kind not in SHARED_KINDS:
+        raise ValueError(f"Unknown shared item kind '{kind}'")
+    model = SHARED_KINDS[kind]
+    sort_col = _sort_column(kind)
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    filters = filters or {}
+
+    query = db.query(*_list_columns(kind), DbUser.username).join(DbUser, model.user_id == DbUser.id) \
+        .filter(model.is_shared == True)
+    for param, columns in _filter_columns(kind).items():
+        value = (filters.get(param) or "").strip()
+        if value:
+            query = query.filter(or_(*(col.ilike(f"%{value}%") for col in columns)))
+    status = filters.get("status")
+    if status in ("imported", "unimported"):
+        imported = model.id.in_(_imported_ids_query(db, model, user_id))
+        query = query.filter(imported if status == "imported" else ~imported)
+    if cursor:
+        last_name, last_id = decode_cursor(cursor)
+        query = query.filter(sort_col >= last_name, or_(sort_col > last_name, and_(sort_col == last_name,
+                                                                                   model.id > last_id)))
+
+    rows = query.order_by(sort_col, model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    ids = [row.id for row in rows]
+    imported_ids = {item_id for (item_id,) in _imported_ids_query(db, model, user_id)
+                    .filter(model.original_item_id.in_(ids))} if ids else set()
+
+    items = [_row_to_item(kind, row, row.username, row.id in imported_ids) for row in rows]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.object_name if kind == "object" else last.name, last.id)
+    return {"kind": kind, "items": items, "next_cursor": next_cursor}
+
+
+def get_shared_item(db, kind, item_id, user_id):
+    """Full details of one shared item, or None if it does not exist or is not shared."""
+    if kind not in SHARED_KINDS:
+        raise ValueError(f"Unknown shared item kind '{kind}'")
+    model = SHARED_KINDS[kind]
+    row = db.query(model, DbUser.username).join(DbUser, model.user_id == DbUser.id) \
+        .filter(model.id == item_id, model.is_shared == True).one_or_none()
+    if row is None:
+        return None
+    item, username = row
+
+    if kind == "object":
+        details = {
+            "id": item.id,
+            "object_name": item.object_name,
+            "common_name": item.common_name,
+            "type": item.type,
+            "constellation": item.constellation,
+            "ra": item.ra_hours,
+            "dec": item.dec_deg,
+            "magnitude": item.magnitude,
+            "size": item.size,
+            "shared_notes": item.shared_notes or "",
+            "image_url": item.image_url,
+            "image_credit": item.image_credit,
+            "image_source_link": item.image_source_link,
+            "description_text": item.description_text,
+            "description_credit": item.description_credit,
+            "description_source_link": item.description_source_link,
+        }
+    elif kind == "component":
+        details = {
+            "id": item.id,
+            "name": item.name,
+            "kind": item.kind,
+            "aperture_mm": item.aperture_mm,
+            "focal_length_mm": item.focal_length_mm,
+            "sensor_width_mm": item.sensor_width_mm,
+            "sensor_height_mm": item.sensor_height_mm,
+            "pixel_size_um": item.pixel_size_um,
+            "factor": item.factor,
+        }
+    else:
+        details = {"id": item.id, "name": item.name, "description": item.description}
+
+    details["shared_by_user"] = username
+    details["imported"] = _imported_ids_query(db, model, user_id) \
+        .filter(model.original_item_id == item.id).first() is not None
+    return details
+
+
+def build_shared_catalog_summary(db) -> dict:
+    """Item counts and facet values (types, constellations, kinds, owners) of the shared catalog."""
+    summary = {}
+    for kind, model in SHARED_KINDS.items():
+        owners = db.query(DbUser.username, func.count(model.id)).join(model, model.user_id == DbUser.id) \
+            .filter(model.is_shared == True).group_by(DbUser.username).order_by(DbUser.username).all()
+        entry = {"count": sum(n for _, n in owners), "owners": [name for name, _ in owners]}
+        if kind == "object":
+            for facet, column in (("types", AstroObject.type), ("constellations", AstroObject.constellation)):
+                entry[facet] = [value for (value,) in db.query(column).filter(
+                    AstroObject.is_shared == True, column.isnot(None), column != "").distinct().order_by(column)]
+        elif kind == "component":
+            entry["kinds"] = dict(db.query(Component.kind, func.count(Component.id))
+                                  .filter(Component.is_shared == True).group_by(Component.kind).all())
+        summary[kind] = entry
+    return summary
+
+
+class SharedCatalogCache:
+    """
+    The materialized catalog summary, rebuilt after invalidation (here or in another worker).
+
+    The summary is built outside the lock; every invalidation bumps a
+    generation counter, and a build that raced one is returned but not stored.
+    """
+
+    def __init__(self, stamp_path: str = SHARED_CATALOG_STAMP_PATH):
+        self._stamp_path = stamp_path
+        self._summary = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._seen_stamp = read_stamp(self._stamp_path)
+        self.stats = {"hits": 0, "builds": 0, "invalidations": 0}
+
+    def summary(self, db) -> dict:
+        with self._lock:
+            stamp = read_stamp(self._stamp_path)
+            if stamp != self._seen_stamp:
+                self._summary = None
+                self._generation += 1
+                self._seen_stamp = stamp
+            if self._summary is not None:
+                self.stats["hits"] += 1
+                return self._summary
+            generation = self._generation
+        summary = build_shared_catalog_summary(db)
+        with self._lock:
+            if self._generation == generation:
+                self._summary = summary
+            self.stats["builds"] += 1
+        return summary
+
+    def invalidate(self) -> None:
+        """Drop the summary here and in other worker processes."""
+        with self._lock:
+            self._summary = None
+            self._generation += 1
+            self.stats["invalidations"] += 1
+        bump_stamp(self._stamp_path)
+        with self._lock:
+            self._seen_stamp = read_stamp(self._stamp_path)  # our own bump needs no second rebuild
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summary = None
+            self._generation += 1
+
+
+shared_catalog_cache = SharedCatalogCache()
+
+_PENDING_KEY = "nova_shared_catalog_dirty"
+
+
+def _affects_catalog(obj) -> bool:
+    if isinstance(obj, (AstroObject, Component, SavedView)):
+        return bool(obj.is_shared) or inspect(obj).attrs.is_shared.history.has_changes()
+    if isinstance(obj, DbUser):
+        return inspect(obj).attrs.username.history.has_changes()
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_shared_catalog_writes(session, flush_context):
+    if any(_affects_catalog(obj) for obj in (*session.new, *session.dirty)) or \
+            any(isinstance(obj, (AstroObject, Component, SavedView, DbUser)) and
+                (isinstance(obj, DbUser) or obj.is_shared) for obj in session.deleted):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_shared_catalog_writes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    if any(m.class_ in (AstroObject, Component, SavedView, DbUser) for m in orm_execute_state.all_mappers):
+        orm_execute_state.session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_shared_catalog_invalidation(session):
+    if session.info.pop(_PENDING_KEY, None):
+        shared_catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_shared_catalog_writes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,92 @@
+"""
+Nova DSO Tracker - Skyglow Horizon Lookup
+
+A location's skyglow horizon (instance/skyglow/<id>.json, written by
+nova.skyglow_service) lists the minimum useful altitude per azimuth sector.
+The dashboard and plot endpoints need that floor for many azimuths per
+request, so each file is compiled once into a 360-entry float32 table
+(one-degree bins, circular linear interpolation between sector centres) and
+kept in a small cache validated by the file's mtime and size. Lookups are
+vectorized: a whole batch of objects or plot samples is one NumPy call.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+from nova.config import BoundedCache
+
+_horizons = BoundedCache(64)  # path -> (mtime_ns, size, SkyglowHorizon or None)
+_horizons_lock = threading.Lock()
+
+
+def skyglow_path(instance_path, location_id) -> str:
+    return os.path.join(instance_path, "skyglow", f"{location_id}.json")
+
+
+class SkyglowHorizon:
+    """Skyglow floor (degrees) at any azimuth, from a 360 one-degree-bin table."""
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = np.asarray(table, dtype=np.float32)
+
+    @classmethod
+    def from_sectors(cls, sectors):
+        """Compile the skyglow_horizon sector list; sector az_deg is the sector's start."""
+        az = np.array([float(s["az_deg"]) for s in sectors])
+        alt = np.array([float(s["min_alt_deg"]) for s in sectors])
+        order = np.argsort(az)
+        az, alt = az[order], alt[order]
+        width = 360.0 / len(az)
+        centres = (az + width / 2.0) % 360.0
+        order = np.argsort(centres)
+        table = np.interp(np.arange(360.0), centres[order], alt[order], period=360.0)
+        return cls(table)
+
+    def floor_at(self, az_deg):
+        """Interpolated floor for a scalar or array of azimuths (degrees)."""
+        pos = np.mod(np.asarray(az_deg, dtype=float), 360.0)
+        i = pos.astype(int) % 360
+        frac = pos - np.floor(pos)
+        lo = self.table[i]
+        hi = self.table[(i + 1) % 360]
+        return lo + (hi - lo) * frac
+
+
+def load_skyglow_horizon(path):
+    """Compiled SkyglowHorizon for a skyglow JSON file, or None if missing/empty."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _horizons_lock:
+        cached = _horizons.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    try:
+        with open(path) as f:
+            sectors = json.load(f).get("skyglow_horizon") or []
+        horizon = SkyglowHorizon.from_sectors(sectors) if sectors else None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[SKYGLOW] WARN: Could not load {path}: {e}")
+        horizon = None
+    with _horizons_lock:
+        _horizons[path] = (st.st_mtime_ns, st.st_size, horizon)
+    return horizon
+
+
+def below_floor(horizon, altitudes, azimuths):
+    """Boolean array: altitude below the skyglow floor at the matching azimuth (NaN inputs -> False)."""
+    alts = np.asarray(altitudes, dtype=float)
+    if horizon is None:
+        return np.zeros(alts.shape, dtype=bool)
+    azs = np.asarray(azimuths, dtype=float)
+    ok = np.isfinite(alts) & np.isfinite(azs)
+    floors = horizon.floor_at(np.where(ok, azs, 0.0))
+    return ok & (alts < floors)
@@ -0,0 +1,307 @@
+"""
+Nova DSO Tracker - Skyglow Computation Service
+
+Computes per-location skyglow horizons (VIIRS tiles + Garstang model,
+tools/skyglow) in the background:
+
+- A bounded ThreadPoolExecutor (SKYGLOW_WORKERS) runs the jobs, so a bulk
+  location import queues work instead of starting one thread per location,
+  each holding its own tile arrays. Tile downloads are serialized per tile
+  by tools.skyglow.cache and loaded windows are shared through its LRU.
+- Results are content-addressed: the key hashes the VIIRS year, quantized
+  lat/lon, elevation, zenith SQM and model parameters, and the result lives
+  in instance/skyglow/by_hash/<key>.json. Identical sites (also across
+  users) share one computation; a job for a key already in flight gets the
+  locations attached instead of being queued again.
+- Each location still gets instance/skyglow/<uid>.json (what the dashboard
+  and plot read), written from the shared result with the key in `_meta`.
+
+Per-location status (queued / running / done / failed) is kept in memory
+for the status API.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+SKYGLOW_WORKERS = int(os.environ.get("SKYGLOW_WORKERS", 2))
+SKYGLOW_MODEL_VERSION = 1
+
+# Skyglow horizon resolution for the plot overlay (5° azimuth sectors, 1° altitude steps)
+SKYGLOW_SECTORS = 72
+SKYGLOW_ALT_STEPS = tuple(range(0, 91))
+SKYGLOW_RADIUS_KM = 150.0
+SKYGLOW_K = 0.35
+
+BORTLE_TO_SQM = {1: 22.0, 2: 21.5, 3: 21.3, 4: 20.8, 5: 20.0,
+                 6: 19.1, 7: 18.4, 8: 17.0, 9: 15.5}
+
+# Quantization of the cache key: 0.001° is ~100 m, well below a 15" VIIRS pixel
+LATLON_DECIMALS = 3
+
+
+def location_skyglow_params(loc):
+    """(lat, lon, elevation m, zenith SQM) for a Location row, with the Bortle fallback."""
+    sqm = loc.sqm_zenith if loc.sqm_zenith is not None else BORTLE_TO_SQM.get(loc.bortle_scale, 20.0)
+    elev = loc.elevation if loc.elevation is not None else 0.0
+    return float(loc.lat), float(loc.lon), float(elev), float(sqm)
+
+
+def skyglow_year(now=None) -> int:
+    """Latest complete VIIRS annual composite year."""
+    return (now or datetime.utcnow()).year - 1
+
+
+def skyglow_result_key(year, lat, lon, elev, sqm) -> str:
+    """Content hash identifying one skyglow computation."""
+    params = {
+        "v": SKYGLOW_MODEL_VERSION,
+        "year": int(year),
+        "lat": round(lat, LATLON_DECIMALS),
+        "lon": round(lon, LATLON_DECIMALS),
+        "elev_m": round(elev),
+        "sqm": round(sqm, 2),
+        "radius_km": SKYGLOW_RADIUS_KM,
+        "k": SKYGLOW_K,
+        "n_sectors": SKYGLOW_SECTORS,
+        "alt_steps": list(SKYGLOW_ALT_STEPS),
+    }
+    blob = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode()).hexdigest()[:24]
+
+
+def compute_skyglow(lat, lon, elev, sqm, year, token):
+    """Download/load the VIIRS window and run the Garstang model; returns the horizon dict."""
+    from tools.skyglow.cache import get_or_download_tile
+    from tools.skyglow.garstang import compute_skyglow_horizon, compute_skyglow_profile
+
+    data, lats_g, lons_g = get_or_download_tile(lat, lon, year, token, radius_km=SKYGLOW_RADIUS_KM)
+    profile = compute_skyglow_profile(lat, lon, elev, data, lats_g, lons_g, radius_km=SKYGLOW_RADIUS_KM,
+                                      n_sectors=SKYGLOW_SECTORS, alt_steps=SKYGLOW_ALT_STEPS,
+                                      k=SKYGLOW_K, sqm_zenith=sqm)
+    return compute_skyglow_horizon(profile)
+
+
+def _write_json(path, payload) -> None:
+    """Atomic JSON write (readers never see a partial file)."""
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+class SkyglowJob:
+    """One computation (one result key) and the locations waiting on it."""
+
+    __slots__ = ("key", "lat", "lon", "elev", "sqm", "year", "uids", "state", "error",
+                 "queued_at", "started_at", "finished_at")
+
+    def __init__(self, key, lat, lon, elev, sqm, year):
+        self.key = key
+        self.lat, self.lon, self.elev, self.sqm, self.year = lat, lon, elev, sqm, year
+        self.uids = set()
+        self.state = "queued"
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "key": self.key,
+            "error": self.error,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class SkyglowService:
+    """Bounded worker pool + in-flight dedup + content-addressed result cache."""
+
+    def __init__(self, cache_dir, max_workers: int = SKYGLOW_WORKERS, compute_fn=None):
+        self.cache_dir = cache_dir
+        self.results_dir = os.path.join(cache_dir, "by_hash")
+        self.max_workers = max_workers
+        self._compute_fn = compute_fn or compute_skyglow
+        self._pool = None
+        self._lock = threading.Lock()
+        self._inflight = {}   # result key -> SkyglowJob
+        self._status = {}     # location uid -> SkyglowJob (latest)
+        self._stats = {"submitted": 0, "deduplicated": 0, "cache_hits": 0, "computed": 0, "failed": 0}
+
+    def location_path(self, uid) -> str:
+        return os.path.join(self.cache_dir, f"{uid}.json")
+
+    def result_path(self, key) -> str:
+        return os.path.join(self.results_dir, f"{key}.json")
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nova-skyglow")
+        return self._pool
+
+    @staticmethod
+    def _stored_key(path):
+        try:
+            with open(path) as f:
+                return json.load(f).get("_meta", {}).get("key")
+        except (OSError, ValueError):
+            return None
+
+    def _publish(self, uid, key, lat, lon, elev, sqm, horizon=None) -> None:
+        """Write the location's JSON from the shared result."""
+        if horizon is None:
+            with open(self.result_path(key)) as f:
+                horizon = json.load(f)
+        horizon = dict(horizon)
+        horizon["_meta"] = dict(horizon.get("_meta", {}), lat=lat, lon=lon, elev_m=elev, sqm_zenith=sqm, key=key)
+        _write_json(self.location_path(uid), horizon)
+
+    def _set_latest(self, uid, job=None) -> None:
+        """
+        Record job (None: no job) as the uid's latest submission; an earlier
+        job still in flight no longer publishes to this uid. Caller holds _lock.
+        """
+        previous = self._status.get(uid)
+        if previous is not None and previous is not job:
+            previous.uids.discard(uid)
+        if job is None:
+            self._status.pop(uid, None)
+        else:
+            job.uids.add(uid)
+            self._status[uid] = job
+
+    def submit(self, uid, lat, lon, elev, sqm, year=None, token=None):
+        """
+        Ensure instance/skyglow/<uid>.json is up to date for these parameters.
+        Returns "current", "cached" (published from a shared result), "queued"
+        or "attached" (joined an in-flight job). The latest submission for a
+        uid wins: older jobs for it finish, but do not overwrite its file.
+        """
+        year = year or skyglow_year()
+        key = skyglow_result_key(year, lat, lon, elev, sqm)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        if self._stored_key(self.location_path(uid)) == key:
+            with self._lock:
+                self._set_latest(uid)
+            return "current"
+        if os.path.exists(self.result_path(key)):
+            with self._lock:
+                self._set_latest(uid)
+                self._stats["cache_hits"] += 1
+            self._publish(uid, key, lat, lon, elev, sqm)
+            return "cached"
+
+        with self._lock:
+            self._stats["submitted"] += 1
+            job = self._inflight.get(key)
+            if job is not None:
+                self._set_latest(uid, job)
+                self._stats["deduplicated"] += 1
+                return "attached"
+            job = self._inflight[key] = SkyglowJob(key, lat, lon, elev, sqm, year)
+            self._set_latest(uid, job)
+        self._executor().submit(self._run, job, token)
+        return "queued"
+
+    def _run(self, job, token) -> None:
+        with self._lock:
+            job.state = "running"
+            job.started_at = time.time()
+        try:
+            print(f"[SKYGLOW] Computing {job.key} (lat={job.lat}, lon={job.lon}, elev={job.elev}, sqm={job.sqm})")
+            horizon = self._compute_fn(job.lat, job.lon, job.elev, job.sqm, job.year, token)
+            horizon["_meta"] = {
+                "lat": job.lat, "lon": job.lon, "elev_m": job.elev, "sqm_zenith": job.sqm,
+                "year": job.year, "key": job.key, "computed_at": datetime.utcnow().isoformat(),
+            }
+            _write_json(self.result_path(job.key), horizon)
+        except Exception as e:
+            print(f"[SKYGLOW] Error for {job.key}:")
+            traceback.print_exc()
+            with self._lock:
+                job.state, job.error, job.finished_at = "failed", str(e), time.time()
+                self._inflight.pop(job.key, None)
+                self._stats["failed"] += 1
+            return
+
+        # Locations may still attach until the job leaves _inflight
+        with self._lock:
+            self._inflight.pop(job.key, None)
+            uids = set(job.uids)
+        published = 0
+        for uid in uids:
+            with self._lock:
+                # Checked and written under the lock: a newer submit() cannot slip in between
+                if self._status.get(uid) is not job:
+                    continue
+                try:
+                    self._publish(uid, job.key, job.lat, job.lon, job.elev, job.sqm, horizon)
+                    published += 1
+                except OSError:
+                    traceback.print_exc()
+        print(f"[SKYGLOW] Saved {job.key} for {published} location(s)")
+        with self._lock:
+            job.state, job.finished_at = "done", time.time()
+            self._stats["computed"] += 1
+
+    def location_status(self, uid, lat, lon, elev, sqm, year=None) -> dict:
+        """Status of one location: in-memory job state, else derived from the files on disk."""
+        key = skyglow_result_key(year or skyglow_year(), lat, lon, elev, sqm)
+        with self._lock:
+            job = self._status.get(uid)
+            if job is not None and job.key == key:
+                return job.as_dict()
+        state = "ready" if self._stored_key(self.location_path(uid)) == key else "missing"
+        return {"state": state, "key": key, "error": None}
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [j.state for j in self._inflight.values()]
+            return dict(self._stats, workers=self.max_workers,
+                        queued=states.count("queued"), running=states.count("running"))
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """Block until no job is in flight (tests, CLI)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._inflight:
+                    return True
+            time.sleep(0.01)
+        return False
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_skyglow_service(instance_path) -> SkyglowService:
+    """Process-wide service for an instance directory."""
+    cache_dir = os.path.join(instance_path, "skyglow")
+    with _services_lock:
+        service = _services.get(cache_dir)
+        if service is None:
+            service = _services[cache_dir] = SkyglowService(cache_dir)
+        return service
+
+
+def submit_locations(locations, instance_path) -> dict:
+    """Queue skyglow computation for Location rows; returns {uid: submit() outcome}."""
+    token = os.environ.get("NASA_EARTHDATA_TOKEN")
+    if not token:
+        print("[SKYGLOW] No NASA_EARTHDATA_TOKEN found, skipping skyglow computation")
+        return {}
+    service = get_skyglow_service(instance_path)
+    outcomes = {}
+    for loc in locations:
+        uid = loc.stable_uid or str(loc.id)
+        outcomes[uid] = service.submit(uid, *location_skyglow_params(loc), token=token)
+    return outcomes
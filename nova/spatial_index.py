@@ -0,0 +1,118 @@
+"""
+Nova DSO Tracker - Per-User Spatial Index
+
+Unit-vector KD-tree over a user's objects, used by /api/find_duplicates.
+
+The index is synced against the user's objects list (the cached output of
+load_full_astro_context). Only objects whose coordinates changed since the
+last sync, or that were added/removed, are re-checked for close neighbours;
+the pairs found for untouched objects are kept. When the objects list is the
+very same cached list as last time (no AstroObject write busted the astro
+context cache), sync is a no-op.
+"""
+import math
+import threading
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from nova.config import BoundedCache
+
+DUPLICATE_SEPARATION_ARCMIN = 2.5
+
+
+def _unit_vectors(ra_hours, dec_deg):
+    ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15.0)
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1).reshape(-1, 3)
+
+
+def _chord_to_arcmin(chord):
+    return np.degrees(2.0 * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))) * 60.0
+
+
+class UserSpatialIndex:
+    """Incrementally maintained close-pair index for one user's objects."""
+
+    def __init__(self, seplimit_arcmin: float = DUPLICATE_SEPARATION_ARCMIN):
+        self.seplimit_arcmin = seplimit_arcmin
+        self._chord = 2.0 * math.sin(math.radians(seplimit_arcmin / 60.0) / 2.0)
+        self._source = None
+        self._coords = {}      # name -> (ra_hours, dec_deg)
+        self._names = []
+        self._positions = {}   # name -> row in self._xyz
+        self._xyz = np.empty((0, 3))
+        self._tree = None
+        self._pairs = {}       # (name_a, name_b), name_a < name_b -> separation (arcmin)
+        self._lock = threading.Lock()
+
+    def sync(self, objects_list) -> set:
+        """Bring the index up to date; returns the set of object names that were re-checked."""
+        with self._lock:
+            if objects_list is self._source:
+                return set()
+
+            current = {}
+            for o in objects_list:
+                ra, dec = o.get('RA (hours)'), o.get('DEC (degrees)')
+                if ra is None or dec is None:
+                    continue
+                try:
+                    current[o['Object']] = (float(ra), float(dec))
+                except (TypeError, ValueError):
+                    continue
+
+            changed = {n for n, c in current.items() if self._coords.get(n) != c}
+            removed = self._coords.keys() - current.keys()
+            self._source = objects_list
+            if not changed and not removed:
+                return set()
+
+            full_rebuild = not self._coords
+            self._coords = current
+            self._names = list(current)
+            self._positions = {n: i for i, n in enumerate(self._names)}
+            coords = np.array(list(current.values()), dtype=np.float64).reshape(-1, 2)
+            self._xyz = _unit_vectors(coords[:, 0], coords[:, 1])
+            self._tree = cKDTree(self._xyz) if len(self._names) else None
+
+            dirty = changed | removed
+            if full_rebuild:
+                self._pairs = {}
+                if self._tree is not None:
+                    for i, j in self._tree.query_pairs(self._chord, output_type='ndarray'):
+                        self._add_pair(int(i), int(j))
+            else:
+                self._pairs = {k: v for k, v in self._pairs.items()
+                               if k[0] not in dirty and k[1] not in dirty}
+                if changed:
+                    rows = [self._positions[n] for n in changed]
+                    for i, hits in zip(rows, self._tree.query_ball_point(self._xyz[rows], self._chord)):
+                        for j in hits:
+                            if j != i:
+                                self._add_pair(i, j)
+            return dirty
+
+    def _add_pair(self, i: int, j: int) -> None:
+        a, b = sorted((self._names[i], self._names[j]))
+        chord = np.linalg.norm(self._xyz[i] - self._xyz[j])
+        self._pairs[(a, b)] = round(float(_chord_to_arcmin(chord)), 2)
+
+    def close_pairs(self):
+        """All (name_a, name_b, separation_arcmin) closer than the separation limit."""
+        with self._lock:
+            return [(a, b, sep) for (a, b), sep in self._pairs.items()]
+
+
+_user_indexes = BoundedCache(200)  # keyed by user_id (int)
+_user_indexes_lock = threading.Lock()
+
+
+def get_user_spatial_index(user_id: int) -> UserSpatialIndex:
+    with _user_indexes_lock:
+        index = _user_indexes.get(user_id)
+        if index is None:
+            index = UserSpatialIndex()
+            _user_indexes[user_id] = index
+        return index
@@ -0,0 +1,123 @@
+"""
+Nova DSO Tracker - Per-User Request Context Cache
+
+load_global_request_context() needs the user's DbUser row and parsed UiPref
+blob on every request. Both change rarely, so they are cached in memory,
+keyed by user id, as an immutable UserSnapshot plus the parsed prefs dict.
+
+Invalidation:
+- ORM writes to DbUser / UiPref (add, change, delete, bulk update/delete)
+  are picked up by session events and drop the affected entries on commit.
+- Every invalidation also bumps a small stamp file in CACHE_DIR
+  (nova/cache_stamp.py). Each lookup stats that file, so other gunicorn
+  workers drop their copies on their next request instead of serving stale
+  prefs.
+"""
+import os
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from nova.cache_stamp import bump_stamp, read_stamp
+from nova.config import CACHE_DIR, BoundedCache
+from nova.models import DbUser, UiPref
+
+USER_CONTEXT_STAMP_PATH = os.path.join(CACHE_DIR, "user_context.stamp")
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only stand-in for DbUser as used by g.db_user (id / username / active)."""
+    id: int
+    username: str
+    active: bool = True
+
+
+class UserContextCache:
+    def __init__(self, stamp_path: str = USER_CONTEXT_STAMP_PATH, maxsize: int = 500):
+        self._stamp_path = stamp_path
+        self._entries = BoundedCache(maxsize)  # user_id -> (UserSnapshot, prefs dict)
+        self._ids = {}                         # username -> user_id
+        self._lock = threading.Lock()
+        self._seen_stamp = read_stamp(self._stamp_path)
+
+    def _drop_all(self) -> None:
+        self._entries.clear()
+        self._ids.clear()
+
+    def get(self, username: str):
+        """Return (UserSnapshot, prefs copy) or None on a miss."""
+        with self._lock:
+            stamp = read_stamp(self._stamp_path)
+            if stamp != self._seen_stamp:
+                self._drop_all()
+                self._seen_stamp = stamp
+                return None
+            user_id = self._ids.get(username)
+            entry = self._entries.get(user_id) if user_id is not None else None
+            if entry is None:
+                return None
+            snapshot, prefs = entry
+            # Shallow copy: request code adds top-level keys (objects, locations, ...)
+            return snapshot, dict(prefs)
+
+    def put(self, user, prefs: dict) -> UserSnapshot:
+        snapshot = UserSnapshot(id=user.id, username=user.username, active=bool(user.active))
+        with self._lock:
+            self._entries[user.id] = (snapshot, dict(prefs))
+            self._ids[user.username] = user.id
+        return snapshot
+
+    def invalidate(self, user_ids=None) -> None:
+        """Drop the given user ids (or everything) here and in other worker processes."""
+        with self._lock:
+            if user_ids is None:
+                self._drop_all()
+            else:
+                for uid in user_ids:
+                    self._entries.pop(uid, None)
+                for name in [n for n, uid in self._ids.items() if uid in user_ids]:
+                    del self._ids[name]
+        bump_stamp(self._stamp_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop_all()
+
+
+user_context_cache = UserContextCache()
+
+_PENDING_KEY = "nova_user_context_dirty"
+_ALL = object()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_context_writes(session, flush_context):
+    dirty = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, DbUser):
+            dirty.add(obj.id)
+        elif isinstance(obj, UiPref):
+            dirty.add(obj.user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_user_context_writes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    if any(m.class_ in (DbUser, UiPref) for m in orm_execute_state.all_mappers):
+        orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).add(_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_context_invalidation(session):
+    dirty = session.info.pop(_PENDING_KEY, None)
+    if dirty:
+        user_context_cache.invalidate(None if _ALL in dirty else {uid for uid in dirty if uid is not None})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_context_writes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,284 @@
+"""
+Nova DSO Tracker - Weather Provider Client
+
+Shared HTTP front-end for the forecast providers used by the hybrid weather
+forecast (Open-Meteo for clouds/temperature, 7Timer! ASTRO for seeing and
+transparency):
+
+- One pooled requests.Session (keep-alive) shared by all callers.
+- Conditional fetches: ETag / Last-Modified of the last good response are
+  sent back, and a 304 reuses the stored payload.
+- fetch_many() queries several providers concurrently, so the slowest
+  provider bounds the wait instead of the sum of all of them.
+- A failed fetch returns None immediately; retries with jittered
+  exponential backoff run on a background timer and hand the payload to a
+  callback. Request handlers never sleep on backoff.
+
+Providers are pluggable. NOVA_WEATHER_PROVIDERS=stub (used by the test
+suite) swaps in StubWeatherProvider, which serves synthetic forecasts
+without touching the network.
+"""
+import os
+import random
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nova.config import DEFAULT_HTTP_TIMEOUT, BoundedCache
+
+WEATHER_POOL_SIZE = 8
+WEATHER_FETCH_WORKERS = 4
+WEATHER_RETRIES = 3            # background attempts after the first failure
+WEATHER_RETRY_BASE_S = 5.0     # 5 s, 10 s, 20 s (each with ±50% jitter)
+
+
+class WeatherProvider(ABC):
+    """One forecast endpoint. Subclasses build the request and validate the payload."""
+
+    name = "provider"
+    log_prefix = "[Weather Func]"
+
+    @abstractmethod
+    def request(self, lat, lon):
+        """(url, params) for this location."""
+
+    def validate(self, data) -> bool:
+        return bool(data)
+
+    def fetch(self, client, lat, lon):
+        url, params = self.request(lat, lon)
+        data = client.get_json(url, params, log_prefix=self.log_prefix, lat=lat, lon=lon)
+        if data is not None and not self.validate(data):
+            print(f"{self.log_prefix} ERROR ({self.name}): Invalid data structure received.")
+            return None
+        return data
+
+
+class OpenMeteoProvider(WeatherProvider):
+    name = "open_meteo"
+    log_prefix = "[Weather Fallback]"
+
+    def request(self, lat, lon):
+        # Cloud cover at different levels, temperature and humidity, hourly for the next 7 days (UTC)
+        return "https://api.open-meteo.com/v1/forecast", {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": "temperature_2m,relative_humidity_2m,cloud_cover_low,cloud_cover_mid,cloud_cover_high",
+            "forecast_days": 7,
+            "timezone": "UTC",
+        }
+
+    def validate(self, data) -> bool:
+        return bool(data) and 'hourly' in data and 'time' in data['hourly']
+
+
+class SevenTimerProvider(WeatherProvider):
+    """7Timer! 'astro' (seeing/transparency) or 'meteo' product."""
+
+    def __init__(self, product="astro"):
+        self.product = product
+        self.name = f"7timer_{product}"
+
+    def request(self, lat, lon):
+        if self.product == "astro":
+            # ASTRO product uses astro.php; no separate 'product' parameter in the URL
+            return "http://www.7timer.info/bin/astro.php", {
+                "lon": lon, "lat": lat, "ac": 0, "unit": "metric", "output": "json"}
+        return "http://www.7timer.info/bin/meteo.php", {
+            "lon": lon, "lat": lat, "product": self.product, "ac": 0, "unit": "metric", "output": "json"}
+
+
+class StubWeatherProvider(WeatherProvider):
+    """
+    Local provider for tests and offline development: a fixed, clear-ish
+    forecast shaped like the real provider's payload. `payload_fn(lat, lon)`
+    overrides it; returning None simulates a failed fetch.
+    """
+
+    def __init__(self, name, payload_fn=None):
+        self.name = name
+        self.payload_fn = payload_fn
+        self.calls = 0
+
+    def request(self, lat, lon):
+        return f"stub://{self.name}", {"latitude": lat, "longitude": lon}
+
+    def fetch(self, client, lat, lon):
+        self.calls += 1
+        if self.payload_fn is not None:
+            return self.payload_fn(lat, lon)
+        init = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.name == "open_meteo":
+            times = [(init + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(72)]
+            return {"hourly": {
+                "time": times,
+                "cloud_cover_low": [10] * len(times), "cloud_cover_mid": [0] * len(times),
+                "cloud_cover_high": [0] * len(times),
+                "temperature_2m": [8.0] * len(times), "relative_humidity_2m": [70] * len(times),
+            }}
+        return {"init": init.strftime("%Y%m%d%H"),
+                "dataseries": [{"timepoint": h, "cloudcover": 2, "seeing": 3, "transparency": 3}
+                               for h in range(3, 72, 3)]}
+
+
+def default_providers() -> dict:
+    if os.environ.get("NOVA_WEATHER_PROVIDERS", "").strip().lower() == "stub":
+        return {name: StubWeatherProvider(name) for name in ("open_meteo", "7timer_astro", "7timer_meteo")}
+    return {p.name: p for p in (OpenMeteoProvider(), SevenTimerProvider("astro"), SevenTimerProvider("meteo"))}
+
+
+class WeatherClient:
+    """Pooled session + conditional requests + concurrent fetches + background retries."""
+
+    def __init__(self, providers=None, timeout=DEFAULT_HTTP_TIMEOUT, retries=WEATHER_RETRIES,
+                 retry_base_s=WEATHER_RETRY_BASE_S):
+        self.providers = providers if providers is not None else default_providers()
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_base_s = retry_base_s
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=WEATHER_POOL_SIZE, pool_maxsize=WEATHER_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._validators = BoundedCache(512)  # (url, params) -> (etag, last_modified, data)
+        self._pool = ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS, thread_name_prefix="nova-weather")
+        self._retry_lock = threading.Lock()
+        self._retrying = set()  # (provider, lat, lon) with a retry timer pending
+        self.stats = {"requests": 0, "not_modified": 0, "failures": 0, "retries_scheduled": 0,
+                      "retries_succeeded": 0}
+
+    def get_json(self, url, params=None, log_prefix="[Weather Func]", lat=None, lon=None):
+        """
+        One GET through the pooled session; conditional when a previous
+        response carried validators. Returns parsed JSON or None on any failure.
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        stored = self._validators.get(key)
+        headers = {}
+        if stored:
+            etag, last_modified, _ = stored
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        self.stats["requests"] += 1
+        r = None
+        try:
+            r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            if r.status_code == 304 and stored:
+                self.stats["not_modified"] += 1
+                return stored[2]
+            if r.status_code != 200:
+                print(f"{log_prefix} ERROR: Received non-200 status code {r.status_code} for lat={lat}, lon={lon}")
+                print(f"{log_prefix} Response text (first 200 chars): {r.text[:200]}")
+                self.stats["failures"] += 1
+                return None
+            data = r.json()
+        except requests.exceptions.JSONDecodeError as e:
+            print(f"{log_prefix} ERROR: Failed to decode JSON for lat={lat}, lon={lon}. Error: {e}")
+            response_text = getattr(r, 'text', '<no response object>')
+            print(f"{log_prefix} Response text (first 200 chars): {response_text[:200]}")
+            self.stats["failures"] += 1
+            return None
+        except requests.exceptions.RequestException as e:
+            # Timeouts, DNS errors, connection errors, ...
+            print(f"{log_prefix} ERROR: Request failed for lat={lat}, lon={lon}. Error: {e}")
+            self.stats["failures"] += 1
+            return None
+
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[key] = (etag, last_modified, data)
+        return data
+
+    def fetch(self, provider_name, lat, lon, on_retry=None):
+        """
+        Single attempt for one provider. On failure returns None at once and,
+        if on_retry is given, retries in the background and calls
+        on_retry(provider_name, data) with the first good payload.
+        """
+        provider = self.providers[provider_name]
+        try:
+            data = provider.fetch(self, lat, lon)
+        except Exception as e:
+            print(f"[Weather Func] ERROR: An unexpected error occurred for {provider_name} "
+                  f"lat={lat}, lon={lon}. Error: {e}")
+            data = None
+        if data is None and on_retry is not None:
+            self.retry_in_background(provider_name, lat, lon, on_retry)
+        return data
+
+    def fetch_many(self, provider_names, lat, lon, on_retry=None) -> dict:
+        """Fetch several providers concurrently; returns {provider_name: data or None}."""
+        futures = {name: self._pool.submit(self.fetch, name, lat, lon, on_retry) for name in provider_names}
+        return {name: future.result() for name, future in futures.items()}
+
+    def _retry_delay(self, attempt) -> float:
+        return self.retry_base_s * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def retry_in_background(self, provider_name, lat, lon, callback) -> bool:
+        """Schedule jittered retries unless some are already pending for this provider/location."""
+        key = (provider_name, lat, lon)
+        with self._retry_lock:
+            if key in self._retrying:
+                return False
+            self._retrying.add(key)
+            self.stats["retries_scheduled"] += 1
+        self._schedule_retry(key, 0, callback)
+        return True
+
+    def _schedule_retry(self, key, attempt, callback) -> None:
+        timer = threading.Timer(self._retry_delay(attempt), self._retry, args=(key, attempt, callback))
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self, key, attempt, callback) -> None:
+        provider_name, lat, lon = key
+        data = self.fetch(provider_name, lat, lon)
+        if data is None and attempt + 1 < self.retries:
+            print(f"[Weather Func] WARN: Background retry {attempt + 1} for '{provider_name}' failed "
+                  f"for lat={lat}, lon={lon}.")
+            self._schedule_retry(key, attempt + 1, callback)
+            return
+        try:
+            if data is None:
+                print(f"[Weather Func] ERROR: All background retries ({self.retries}) failed for "
+                      f"'{provider_name}' at lat={lat}, lon={lon}.")
+                return
+            self.stats["retries_succeeded"] += 1
+            callback(provider_name, data)
+        except Exception as e:
+            print(f"[Weather Func] ERROR: Retry callback failed for '{provider_name}': {e}")
+        finally:
+            with self._retry_lock:
+                self._retrying.discard(key)
+
+    def pending_retries(self) -> int:
+        with self._retry_lock:
+            return len(self._retrying)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_weather_client() -> WeatherClient:
+    """Process-wide weather client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WeatherClient()
+        return _client
+
+
+def set_weather_client(client):
+    """Install a client (e.g. with stub providers); returns the previous one."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+        return previous
@@ -0,0 +1,241 @@
+"""
+Nova DSO Tracker - Persistent Weather Forecast Store
+
+Hybrid forecasts are cached per forecast-model grid cell rather than per
+exact coordinate: locations are snapped to a WEATHER_GRID_DEG lattice
+(forecast models resolve ~0.1-0.25°), the providers are queried at the
+cell centre, and every location in the cell - across users - shares the
+result.
+
+Two layers:
+- weather_cache (nova.config, per process) as the hot layer;
+- a SQLite file in CACHE_DIR, shared by all gunicorn workers and kept
+  across restarts.
+
+Entries expire when the providers publish their next model run
+(MODEL_RUN_HOURS_UTC + MODEL_RUN_AVAILABLE_AFTER_H), not after a fixed
+TTL. Expired entries are served immediately (stale-while-revalidate) while
+one background refresh per cell fetches the new run; only a location with
+no usable entry at all waits for a cold fetch.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from nova.config import CACHE_DIR, weather_cache
+
+WEATHER_STORE_PATH = os.path.join(CACHE_DIR, "weather_cache.sqlite")
+WEATHER_GRID_DEG = 0.1
+MODEL_RUN_HOURS_UTC = (0, 6, 12, 18)
+MODEL_RUN_AVAILABLE_AFTER_H = 4     # runs typically reach the public APIs 3-5 h after init time
+WEATHER_STALE_MAX_S = 48 * 3600     # older entries are not served, even as stale
+WEATHER_REFRESH_WORKERS = 2
+
+
+def weather_cell(lat: float, lon: float):
+    """(cell_lat, cell_lon, key) of the forecast grid cell containing lat/lon."""
+    cell_lat = round(math.floor(lat / WEATHER_GRID_DEG + 0.5) * WEATHER_GRID_DEG, 4)
+    cell_lon = round(math.floor(lon / WEATHER_GRID_DEG + 0.5) * WEATHER_GRID_DEG, 4)
+    if cell_lon >= 180.0:
+        cell_lon = round(cell_lon - 360.0, 4)
+    return cell_lat, cell_lon, f"hybrid_{cell_lat}_{cell_lon}"
+
+
+def next_model_update(ts: float) -> float:
+    """Unix time at which the next model run after ts becomes available."""
+    now = datetime.fromtimestamp(ts, timezone.utc)
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for offset_days in (-1, 0, 1):
+        for run_hour in MODEL_RUN_HOURS_UTC:
+            available = day + timedelta(days=offset_days, hours=run_hour + MODEL_RUN_AVAILABLE_AFTER_H)
+            if available > now:
+                return available.timestamp()
+    return (now + timedelta(hours=6)).timestamp()
+
+
+class WeatherStore:
+    """Persistent cell key -> forecast store, safe across threads and processes."""
+
+    def __init__(self, path: str = WEATHER_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS weather_forecast ("
+                " cell TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL, data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit/rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """{'data', 'fetched_at', 'expires_at'} or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, fetched_at, expires_at FROM weather_forecast WHERE cell = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"data": json.loads(row[0]), "fetched_at": row[1], "expires_at": row[2]}
+
+    def put(self, key, lat, lon, data, fetched_at, expires_at) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather_forecast (cell, lat, lon, data, fetched_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, lat, lon, json.dumps(data), fetched_at, expires_at)
+            )
+
+    def prune(self, older_than: float) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM weather_forecast WHERE fetched_at < ?", (older_than,)).rowcount
+
+
+class ForecastCache:
+    """
+    Cell-clustered, two-layer forecast cache with stale-while-revalidate.
+
+    fetch_fn(cell_lat, cell_lon, key, publish) performs the network fetch and
+    returns the forecast (or None); it may call publish(data) later, e.g. when
+    a background provider retry completes.
+    """
+
+    def __init__(self, store: WeatherStore = None, memory=None, clock=time.time):
+        self._store = store
+        self.memory = weather_cache if memory is None else memory
+        self.clock = clock
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=WEATHER_REFRESH_WORKERS, thread_name_prefix="nova-weather-refresh")
+        self.stats = {"fresh": 0, "stale": 0, "cold": 0, "refreshes": 0}
+
+    @property
+    def store(self) -> WeatherStore:
+        if self._store is None:
+            self._store = WeatherStore()
+        return self._store
+
+    def entry(self, key):
+        """
+        Current entry for a cell from memory, else from disk (promoted to memory).
+        An expired memory entry is re-checked against the disk store, which
+        another worker process may have refreshed in the meantime.
+        """
+        entry = self.memory.get(key)
+        if entry is None or "expires_at" not in entry or self.clock() >= entry["expires_at"]:
+            stored = self.store.get(key)
+            if stored is None or (entry and stored["fetched_at"] <= entry.get("fetched_at", 0)):
+                return entry
+            entry = dict(entry or {}, **stored)
+            self.memory[key] = entry
+        return entry
+
+    def publish(self, key, lat, lon, data) -> None:
+        now = self.clock()
+        expires_at = next_model_update(now)
+        entry = self.memory.get(key) or {}
+        self.memory[key] = dict(entry, data=data, fetched_at=now, expires_at=expires_at, last_err_ts=None)
+        self.store.put(key, lat, lon, data, now, expires_at)
+
+    def _fetch(self, cell_lat, cell_lon, key, fetch_fn):
+        data = fetch_fn(cell_lat, cell_lon, key, lambda late: self.publish(key, cell_lat, cell_lon, late))
+        if data:
+            self.publish(key, cell_lat, cell_lon, data)
+        return data
+
+    def _refresh_in_background(self, cell_lat, cell_lon, key, fetch_fn) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.stats["refreshes"] += 1
+
+        def _run():
+            try:
+                self._fetch(cell_lat, cell_lon, key, fetch_fn)
+            except Exception as e:
+                print(f"[Weather Func] ERROR: Background refresh failed for '{key}': {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        self._pool.submit(_run)
+        return True
+
+    def get(self, lat, lon, fetch_fn):
+        """Forecast for lat/lon: fresh, stale (with a background refresh) or cold-fetched."""
+        cell_lat, cell_lon, key = weather_cell(lat, lon)
+        entry = self.entry(key)
+        now = self.clock()
+        if entry and entry.get("data") is not None and "expires_at" in entry:
+            if now < entry["expires_at"]:
+                self.stats["fresh"] += 1
+                return entry["data"]
+            if now - entry["fetched_at"] < WEATHER_STALE_MAX_S:
+                self.stats["stale"] += 1
+                self._refresh_in_background(cell_lat, cell_lon, key, fetch_fn)
+                return entry["data"]
+
+        self.stats["cold"] += 1
+        data = self._fetch(cell_lat, cell_lon, key, fetch_fn)
+        if data:
+            return data
+        # All sources failed. Return last good data if available.
+        print(f"[Weather Func] All sources failed. Returning stale data (if available) for key '{key}'.")
+        return (entry or {}).get("data")
+
+    def refresh(self, lat, lon, fetch_fn, force=False) -> bool:
+        """Synchronously refetch a cell if its entry is expired (or force). Returns True if fetched."""
+        cell_lat, cell_lon, key = weather_cell(lat, lon)
+        entry = self.entry(key)
+        if not force and entry and "expires_at" in entry and self.clock() < entry["expires_at"]:
+            return False  # e.g. already refreshed by another worker process
+        return bool(self._fetch(cell_lat, cell_lon, key, fetch_fn))
+
+    def next_refresh_at(self, cells) -> float:
+        """Earliest expiry among the given cell keys (or the next model update if none are cached)."""
+        times = [e["expires_at"] for e in (self.entry(key) for key in cells) if e and "expires_at" in e]
+        return min(times) if times else next_model_update(self.clock())
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._refreshing:
+                    return True
+            time.sleep(0.01)
+        return False
+
+
+_forecast_cache = None
+_forecast_cache_lock = threading.Lock()
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Process-wide forecast cache."""
+    global _forecast_cache
+    with _forecast_cache_lock:
+        if _forecast_cache is None:
+            _forecast_cache = ForecastCache()
+        return _forecast_cache
+
+
+def set_forecast_cache(cache):
+    """Install a forecast cache (e.g. with a temporary store); returns the previous one."""
+    global _forecast_cache
+    with _forecast_cache_lock:
+        previous, _forecast_cache = _forecast_cache, cache
+        return previous
@@ -1,48 +1,66 @@
+import random
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from nova.models import Location
 from nova.helpers import get_db
 from nova.models import SessionLocal
 
+# Sleep bounds between cycles (the target is the next model-run availability)
+MIN_SLEEP_S = 5 * 60
+MAX_SLEEP_S = 6 * 60 * 60
+REFRESH_WORKERS = 2
+
 
 def weather_cache_worker(app):
-    """Background worker that periodically refreshes weather data for all active locations."""
+    """
+    Background worker that keeps the forecast of every active location's
+    grid cell current. Cells are refreshed only once their entry has expired
+    (a newer model run is available), then the worker sleeps until the next
+    expiry instead of polling on a fixed interval.
+    """
     # Import here to avoid circular imports at module level
     from nova.helpers import get_db
+    from nova.weather_store import get_forecast_cache, weather_cell
 
     while True:
         try:
-            print("[WEATHER WORKER] Starting background refresh cycle...")
-            unique_locations = set()
+            cells = {}
             with app.app_context():
                 # Import route-level function lazily
-                from nova import get_hybrid_weather_forecast
+                from nova.blueprints.api import _fetch_hybrid_forecast
 
                 try:
                     db = get_db()
                     active_locs = db.query(Location).filter_by(active=True).all()
                     for loc in active_locs:
                         if loc.lat is not None and loc.lon is not None:
-                            unique_locations.add((round(loc.lat, 5), round(loc.lon, 5)))
+                            cell_lat, cell_lon, key = weather_cell(loc.lat, loc.lon)
+                            cells[key] = (cell_lat, cell_lon)
                 except Exception as e:
                     print(f"[WEATHER WORKER] CRITICAL: Error querying locations from DB: {e}")
                 finally:
                     db.close()
 
-            print(f"[WEATHER WORKER] Found {len(unique_locations)} unique active locations to refresh.")
-            refreshed_count = 0
-            for lat, lon in unique_locations:
+            cache = get_forecast_cache()
+
+            def _refresh(cell):
+                lat, lon = cell
                 try:
-                    with app.app_context():
-                        get_hybrid_weather_forecast(lat, lon)
-                    refreshed_count += 1
-                    time.sleep(5)
+                    return cache.refresh(lat, lon, _fetch_hybrid_forecast)
                 except Exception as e:
                     print(f"[WEATHER WORKER] ERROR: Failed to fetch for ({lat}, {lon}): {e}")
+                    return False
+
+            with ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="nova-weather-worker") as pool:
+                refreshed_count = sum(pool.map(_refresh, cells.values()))
 
-            print(f"[WEATHER WORKER] Refresh cycle complete ({refreshed_count}/{len(unique_locations)} successful). Sleeping for 2 hours.")
-            time.sleep(2 * 60 * 60)
+            sleep_s = cache.next_refresh_at(cells) - time.time() + random.uniform(0, 120)
+            sleep_s = min(max(sleep_s, MIN_SLEEP_S), MAX_SLEEP_S)
+            print(f"[WEATHER WORKER] Refreshed {refreshed_count}/{len(cells)} forecast cells. "
+                  f"Next cycle in {sleep_s / 60:.0f} min.")
+            time.sleep(sleep_s)
         except Exception as e:
             print(f"[WEATHER WORKER] Unhandled exception, restarting in 60s: {e}")
             traceback.print_exc()
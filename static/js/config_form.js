@@ -361,150 +361,123 @@
             }
         });
     }
-    function fetchSharedItems() {
-        fetch('/api/get_shared_items')
+    // --- Shared catalog: keyset pages from /api/shared_items/<kind>, filtered server-side ---
+    const SHARED_PAGE_SIZE = 50;
+    const SHARED_TABLES = {
+        objects: { kind: 'object', colspan: 8, empty: 'No shared objects found from other users.' },
+        views: { kind: 'view', colspan: 4, empty: 'No shared views found from other users.' },
+        components: { kind: 'component', colspan: 4, empty: 'No shared components found from other users.' }
+    };
+    const sharedNextCursor = {};
+    let sharedFilterTimer = null;
+
+    function sharedMessageRow(colspan, message, color) {
+        return `<tr><td colspan="${colspan}" style="text-align: center; padding: 20px; color: ${color};">${message}</td></tr>`;
+    }
+
+    function sharedActionButton(item, itemType) {
+        if (item.shared_by_user === CURRENT_USERNAME) {
+            return `<button class="owner-button" disabled>Owner</button>`;
+        } else if (item.imported) {
+            return `<button class="imported-button" disabled>Imported</button>`;
+        }
+        return `<button class="action-button import-button" onclick="importSharedItem(${item.id}, '${itemType}', this)">Import</button>`;
+    }
+
+    function renderSharedRow(type, item) {
+        const status = item.imported ? 'imported' : 'unimported';
+
+        if (type === 'objects') {
+            const imgHtml = item.image_url
+                ? `<img src="${item.image_url}" style="width: 34px; height: 34px; object-fit: cover; border-radius: 3px; vertical-align: middle; border: 1px solid ${(window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--border-medium', '#ddd') : '#ddd'};" title="Has image">`
+                : '';
+            // Notes are fetched on demand with the item details
+            const notesHtml = item.has_notes
+                ? `<button class="action-button notes-button" onclick="showSharedObjectNotes(${item.id}, '${item.object_name}')">View</button>`
+                : '-';
+            return `
+                <tr data-id="${item.id}" data-status="${status}">
+                    <td style="text-align: center; padding: 4px;">${imgHtml}</td>
+                    <td><strong>${item.object_name}</strong></td>
+                    <td>${item.common_name || ''}</td>
+                    <td>${item.type || 'N/A'}</td>
+                    <td>${item.constellation || 'N/A'}</td>
+                    <td>${item.shared_by_user}</td>
+                    <td class="notes-cell">${notesHtml}</td>
+                    <td class="action-cell">${sharedActionButton(item, 'object')}</td>
+                </tr>`;
+        }
+        if (type === 'components') {
+            return `
+                <tr data-id="${item.id}" data-status="${status}">
+                    <td><strong>${item.name}</strong></td>
+                    <td>${item.kind}</td>
+                    <td>${item.shared_by_user}</td>
+                    <td class="action-cell">${sharedActionButton(item, 'component')}</td>
+                </tr>`;
+        }
+        return `
+            <tr data-id="${item.id}" data-status="${status}">
+                <td><strong>${item.name}</strong></td>
+                <td>${item.description || '-'}</td>
+                <td>${item.shared_by_user}</td>
+                <td class="action-cell">${sharedActionButton(item, 'view')}</td>
+            </tr>`;
+    }
+
+    function loadSharedPage(type, append) {
+        const spec = SHARED_TABLES[type];
+        const table = document.getElementById(`shared-${type}-table`);
+        const body = document.getElementById(`shared-${type}-body`);
+        if (!spec || !table || !body) return;
+
+        // Filter inputs are named after the query parameters (q, type, constellation, kind, owner, status)
+        const params = new URLSearchParams({ limit: SHARED_PAGE_SIZE });
+        table.querySelectorAll('.filter-row [data-col]').forEach(input => {
+            const value = input.value.trim();
+            if (value && value !== 'all') params.set(input.dataset.col, value);
+        });
+        if (append && sharedNextCursor[type]) params.set('cursor', sharedNextCursor[type]);
+
+        fetch(`/api/shared_items/${spec.kind}?${params}`)
             .then(response => response.json())
             .then(data => {
-                const objectsBody = document.getElementById('shared-objects-body');
-                const componentsBody = document.getElementById('shared-components-body');
-                const viewsBody = document.getElementById('shared-views-body');
-
-                const importedObjectIds = new Set(data.imported_object_ids || []);
-                const importedComponentIds = new Set(data.imported_component_ids || []);
-                const importedViewIds = new Set(data.imported_view_ids || []);
-
-                // --- Render Shared Objects ---
-                if (data.objects && data.objects.length > 0) {
-                    objectsBody.innerHTML = data.objects.map(obj => {
-                        const isImported = importedObjectIds.has(obj.id);
-                        const isOwner = (obj.shared_by_user === CURRENT_USERNAME);
-                        const status = isImported ? 'imported' : 'unimported';
-
-                        let actionButton = '';
-                        if (isOwner) {
-                            actionButton = `<button class="owner-button" disabled>Owner</button>`;
-                        } else if (isImported) {
-                            actionButton = `<button class="imported-button" disabled>Imported</button>`;
-                        } else {
-                            actionButton = `<button class="action-button import-button" onclick="importSharedItem(${obj.id}, 'object', this)">Import</button>`;
-                        }
-
-                        const dataAttrs = `
-                            data-id="${obj.id}"
-                            data-status="${status}"
-                            data-object_name="${obj.object_name}"
-                            data-common_name="${obj.common_name}"
-                            data-type="${obj.type || ''}"
-                            data-constellation="${obj.constellation || ''}"
-                            data-shared_by_user="${obj.shared_by_user}"
-                        `;
-
-                        const imgHtml = obj.image_url
-                            ? `<img src="${obj.image_url}" style="width: 34px; height: 34px; object-fit: cover; border-radius: 3px; vertical-align: middle; border: 1px solid ${(window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--border-medium', '#ddd') : '#ddd'};" title="Has image">`
-                            : '';
-
-                        return `
-                        <tr ${dataAttrs}>
-                            <td style="text-align: center; padding: 4px;">${imgHtml}</td>
-                            <td><strong>${obj.object_name}</strong></td>
-                            <td>${obj.common_name}</td>
-                            <td>${obj.type || 'N/A'}</td>
-                            <td>${obj.constellation || 'N/A'}</td>
-                            <td>${obj.shared_by_user}</td>
-                            <td class="notes-cell">
-                                <button class="action-button notes-button"
-                                        data-notes="${(obj.shared_notes || '').replace(/"/g, '&quot;')}"
-                                        onclick="showSharedNotes('${obj.object_name}', this.dataset.notes)">
-                                    View
-                                </button>
-                            </td>
-                            <td class="action-cell">${actionButton}</td>
-                        </tr>`;
-                    }).join('');
-                } else {
-                    objectsBody.innerHTML = '<tr><td colspan="8" style="text-align: center; padding: 20px; color: ' + ((window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--text-secondary', '#555') : '#555') + ';">No shared objects found from other users.</td></tr>';
-                }
+                if (data.error) throw new Error(data.error);
+                const loadMoreRow = body.querySelector('tr.load-more-row');
+                if (loadMoreRow) loadMoreRow.remove();
 
-                // --- Render Shared Components ---
-                if (data.components && data.components.length > 0) {
-                    componentsBody.innerHTML = data.components.map(comp => {
-                        const isImported = importedComponentIds.has(comp.id);
-                        const isOwner = (comp.shared_by_user === CURRENT_USERNAME);
-                        const status = isImported ? 'imported' : 'unimported';
-
-                        let actionButton = '';
-                        if (isOwner) {
-                            actionButton = `<button class="owner-button" disabled>Owner</button>`;
-                        } else if (isImported) {
-                            actionButton = `<button class="imported-button" disabled>Imported</button>`;
-                        } else {
-                            actionButton = `<button class="action-button import-button" onclick="importSharedItem(${comp.id}, 'component', this)">Import</button>`;
-                        }
-
-                        const dataAttrs = `
-                            data-id="${comp.id}"
-                            data-status="${status}"
-                            data-name="${comp.name}"
-                            data-kind="${comp.kind}"
-                            data-shared_by_user="${comp.shared_by_user}"
-                        `;
-
-                        return `
-                        <tr ${dataAttrs}>
-                            <td><strong>${comp.name}</strong></td>
-                            <td>${comp.kind}</td>
-                            <td>${comp.shared_by_user}</td>
-                            <td class="action-cell">${actionButton}</td>
-                        </tr>`;
-                    }).join('');
+                const rowsHtml = data.items.map(item => renderSharedRow(type, item)).join('');
+                if (append) {
+                    body.insertAdjacentHTML('beforeend', rowsHtml);
                 } else {
-                    componentsBody.innerHTML = '<tr><td colspan="4" style="text-align: center; padding: 20px; color: ' + ((window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--text-secondary', '#555') : '#555') + ';">No shared components found from other users.</td></tr>';
+                    body.innerHTML = rowsHtml || sharedMessageRow(spec.colspan, spec.empty, (window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--text-secondary', '#555') : '#555');
                 }
 
-                // --- Render Shared Views ---
-                if (data.views && data.views.length > 0) {
-                    viewsBody.innerHTML = data.views.map(view => {
-                        const isImported = importedViewIds.has(view.id);
-                        const isOwner = (view.shared_by_user === CURRENT_USERNAME);
-                        const status = isImported ? 'imported' : 'unimported';
-
-                        let actionButton = '';
-                        if (isOwner) {
-                            actionButton = `<button class="owner-button" disabled>Owner</button>`;
-                        } else if (isImported) {
-                            actionButton = `<button class="imported-button" disabled>Imported</button>`;
-                        } else {
-                            actionButton = `<button class="action-button import-button" onclick="importSharedItem(${view.id}, 'view', this)">Import</button>`;
-                        }
-
-                        const dataAttrs = `
-                            data-id="${view.id}"
-                            data-status="${status}"
-                            data-name="${view.name}"
-                            data-description="${view.description || ''}"
-                            data-shared_by_user="${view.shared_by_user}"
-                        `;
-
-                        return `
-                        <tr ${dataAttrs}>
-                            <td><strong>${view.name}</strong></td>
-                            <td>${view.description || '-'}</td>
-                            <td>${view.shared_by_user}</td>
-                            <td class="action-cell">${actionButton}</td>
-                        </tr>`;
-                    }).join('');
-                } else {
-                    viewsBody.innerHTML = '<tr><td colspan="4" style="text-align: center; padding: 20px; color: ' + ((window.stylingUtils && window.stylingUtils.getColor) ? window.stylingUtils.getColor('--text-secondary', '#555') : '#555') + ';">No shared views found from other users.</td></tr>';
+                sharedNextCursor[type] = data.next_cursor;
+                if (data.next_cursor) {
+                    body.insertAdjacentHTML('beforeend', `
+                        <tr class="load-more-row"><td colspan="${spec.colspan}" style="text-align: center; padding: 10px;">
+                            <button class="action-button" data-action="load-more-shared" data-table="${type}">Load more</button>
+                        </td></tr>`);
                 }
             })
             .catch(error => {
-                console.error("Error fetching shared items:", error);
-                document.getElementById('shared-objects-body').innerHTML = '<tr><td colspan="8" style="text-align: center; color: ' + ((window.stylingUtils && window.stylingUtils.getDangerColor) ? window.stylingUtils.getDangerColor() : 'red') + ';">' + window.t('error_loading_shared') + '</td></tr>';
-                document.getElementById('shared-components-body').innerHTML = '<tr><td colspan="4" style="text-align: center; color: ' + ((window.stylingUtils && window.stylingUtils.getDangerColor) ? window.stylingUtils.getDangerColor() : 'red') + ';">' + window.t('error_loading_shared') + '</td></tr>';
-                document.getElementById('shared-views-body').innerHTML = '<tr><td colspan="4" style="text-align: center; color: ' + ((window.stylingUtils && window.stylingUtils.getDangerColor) ? window.stylingUtils.getDangerColor() : 'red') + ';">' + window.t('error_loading_shared') + '</td></tr>';
+                console.error(`Error fetching shared ${type}:`, error);
+                body.innerHTML = sharedMessageRow(spec.colspan, window.t('error_loading_shared'), (window.stylingUtils && window.stylingUtils.getDangerColor) ? window.stylingUtils.getDangerColor() : 'red');
             });
     }
 
+    function fetchSharedItems() {
+        Object.keys(SHARED_TABLES).forEach(type => loadSharedPage(type, false));
+    }
+
+    function showSharedObjectNotes(objectId, objectName) {
+        fetch(`/api/shared_items/object/${objectId}`)
+            .then(response => response.json())
+            .then(data => showSharedNotes(objectName, data.shared_notes || ''))
+            .catch(error => console.error('Error fetching shared notes:', error));
+    }
+
     function importSharedItem(itemId, itemType, button) {
         if (!confirm(`Are you sure you want to import this ${itemType}?`)) {
             return;
@@ -552,45 +525,13 @@
         document.getElementById('notes-modal').classList.remove('is-visible');
     }
 
-    function filterSharedTables() {
-        ['objects', 'components', 'views'].forEach(type => {
-            const tableId = `shared-${type}-table`;
-            const bodyId = `shared-${type}-body`;
-            const table = document.getElementById(tableId);
-            const body = document.getElementById(bodyId);
-            if (!table || !body) return;
-
-            // 1. Get all filter values from the header
-            const filters = {};
-            table.querySelectorAll('.filter-row [data-col]').forEach(input => {
-                filters[input.dataset.col] = input.value.toLowerCase();
-            });
-
-            // 2. Loop through all data rows in the body
-            body.querySelectorAll('tr[data-id]').forEach(row => {
-                let show = true;
-
-                // Check each filter against the row's data
-                for (const col in filters) {
-                    const filterVal = filters[col];
-                    if (filterVal === 'all') continue; // Skip 'all' dropdowns
-
-                    const rowVal = (row.dataset[col] || '').toLowerCase();
-
-                    if (col === 'status') {
-                        if (filterVal === 'imported' && rowVal !== 'imported') show = false;
-                        if (filterVal === 'unimported' && rowVal !== 'unimported') show = false;
-                    } else {
-                        if (!rowVal.includes(filterVal)) {
-                            show = false;
-                        }
-                    }
-                    if (!show) break; // Stop checking if one filter fails
-                }
-
-                row.style.display = show ? '' : 'none';
-            });
-        });
+    function filterSharedTables(type) {
+        // Filters run server-side: reload the first page once typing pauses
+        clearTimeout(sharedFilterTimer);
+        sharedFilterTimer = setTimeout(() => {
+            if (type) loadSharedPage(type, false);
+            else fetchSharedItems();
+        }, 300);
     }
 
     function confirmAndFetchDetails(formElement) {
@@ -1056,6 +997,10 @@
                         target
                     );
                     break;
+                case 'load-more-shared':
+                    target.disabled = true;
+                    loadSharedPage(target.dataset.table, true);
+                    break;
                 case 'view-shared':
                     console.log('[CONFIG_FORM] view-shared:', target.dataset.url);
                     if (target.dataset.url) {
@@ -185,7 +185,9 @@
         };
     
         // --- Journal Table Configuration ---
-        const allJournalSessions = window.NOVA_INDEX.journalSessions;
+        // Filled on first use from /api/journal/sessions (keyset-paginated, lean projection)
+        let allJournalSessions = null;
+        let journalSessionsRequest = null;
         let currentJournalSort = { columnKey: 'date_utc', ascending: false };
         const journalColumnConfig = {
             'object_name': {
@@ -1468,7 +1470,7 @@
         `;
 
         try {
-            console.log('[Nova] Sending to AI:', filteredObjects.length, 'objects');
+            console.log('[Nova] Asking AI; candidates are built server-side from', filteredObjects.length, 'visible objects');
 
             // Abort any previous Ask Nova request
             if (askNovaController) {
@@ -1491,7 +1493,6 @@
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    object_list: filteredObjects,
                     location_name: locationName,
                     sim_date: effectiveDate
                 }),
@@ -2710,9 +2711,38 @@
             return row;
         }
 
+    function loadJournalSessions() {
+            if (!journalSessionsRequest) {
+                journalSessionsRequest = (async () => {
+                    const rows = [];
+                    let cursor = null;
+                    do {
+                        const params = new URLSearchParams({ limit: 500 });
+                        if (cursor) params.set('cursor', cursor);
+                        const resp = await fetch(`/api/journal/sessions?${params}`);
+                        if (!resp.ok) break;
+                        const page = await resp.json();
+                        rows.push(...page.sessions);
+                        cursor = page.next_cursor;
+                    } while (cursor);
+                    allJournalSessions = rows;
+                    return rows;
+                })().catch(err => {
+                    console.error('[JOURNAL] Failed to load sessions:', err);
+                    allJournalSessions = [];
+                    return allJournalSessions;
+                });
+            }
+            return journalSessionsRequest;
+        }
+
     function populateJournalTable() {
             const tableBody = document.getElementById('journal-data-body');
-            if (!tableBody || !allJournalSessions) return;
+            if (!tableBody) return;
+            if (!allJournalSessions) {
+                loadJournalSessions().then(populateJournalTable);
+                return;
+            }
     
             let sessionsToDisplay = [...allJournalSessions];
     
@@ -598,6 +598,10 @@
                         icsUrl.searchParams.append('date', opp.date);
                         icsUrl.searchParams.append('from_time', opp.from_time);
                         icsUrl.searchParams.append('to_time', opp.to_time);
+                        if (opp.from_iso && opp.to_iso) {
+                            icsUrl.searchParams.append('from_iso', opp.from_iso);
+                            icsUrl.searchParams.append('to_iso', opp.to_iso);
+                        }
                         icsUrl.searchParams.append('max_alt', opp.max_alt);
                         icsUrl.searchParams.append('moon_illum', opp.moon_illumination);
                         icsUrl.searchParams.append('obs_dur', opp.obs_minutes);
@@ -1,5 +1,5 @@
 /* mobile_up_now.js — Up Now page logic (mobile view) */
-/* Depends on i18n object and window.mobileDataChunkUrl / window.mobileStatusUrl */
+/* Depends on i18n object and window.mobileUpNowUrl / window.mobileStatusUrl */
 /* rendered by the inline script in mobile_up_now.html. */
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -280,7 +280,7 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     // --- Chunked Data Fetching & Caching ---
-    const CHUNK_SIZE = 25;
+    const PAGE_SIZE = 200;
 
     const activeLoc = sessionStorage.getItem('nova_mobile_location') || 'default';
     const CACHE_KEY = `nova_mobile_cache_${activeLoc}`;
@@ -322,32 +322,35 @@ document.addEventListener('DOMContentLoaded', () => {
             } catch (e) { console.warn("Cache parse failed, fetching fresh."); }
         }
 
-        let offset = 0;
-        let total = 1;
+        let cursor = null;
+        let loaded = 0;
         let gatheredData = [];
 
         loadingContainer.style.display = 'block';
         list.style.display = 'none';
 
         try {
-            while (offset < total) {
-                const response = await fetch(window.mobileDataChunkUrl + '?offset=' + offset + '&limit=' + CHUNK_SIZE);
+            do {
+                let url = window.mobileUpNowUrl + '?limit=' + PAGE_SIZE;
+                if (cursor) url += '&cursor=' + encodeURIComponent(cursor);
+                const response = await fetch(url);
                 const json = await response.json();
 
                 if (!json.data) break;
 
-                total = json.total;
+                const total = json.total;
+                cursor = json.next_cursor;
 
                 json.data.forEach(obj => {
                     createListItem(obj);
                     gatheredData.push(obj);
                 });
 
-                offset += CHUNK_SIZE;
-                const percentage = Math.min(100, Math.round((offset / total) * 100));
+                loaded += json.data.length;
+                const percentage = total ? Math.min(100, Math.round((loaded / total) * 100)) : 100;
                 progressFill.style.width = percentage + '%';
-                loadingText.textContent = i18n.calculatedOf.replace('%(count)d', Math.min(offset, total)).replace('%(total)d', total);
-            }
+                loadingText.textContent = i18n.calculatedOf.replace('%(count)d', Math.min(loaded, total)).replace('%(total)d', total);
+            } while (cursor);
 
             try {
                 sessionStorage.setItem(CACHE_KEY, JSON.stringify({
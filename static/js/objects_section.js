@@ -980,7 +980,7 @@
 
     function confirmCatalogImport(form) {
         const packName = form.getAttribute('data-pack-name') || 'Catalog';
-        return confirm(
+        const confirmed = confirm(
             "Importing '" + packName + "'...\n\n" +
             "This will update your library with data from the server:\n" +
             "• New objects from this pack will be added.\n" +
@@ -988,6 +988,73 @@
             "• Your personal Project Notes, Status, and Framings remain safe.\n\n" +
             "Do you want to proceed?"
         );
+        if (!confirmed) return false;
+
+        const streamUrl = form.getAttribute('data-stream-url');
+        const modal = document.getElementById('fetch-progress-modal');
+        if (!streamUrl || !window.EventSource || !modal) {
+            return true; // Fall back to the plain form POST
+        }
+        streamCatalogImport(form, streamUrl, packName, modal);
+        return false;
+    }
+
+    function streamCatalogImport(form, streamUrl, packName, modal) {
+        const button = form.querySelector('button[type="submit"]');
+        const title = document.getElementById('fetch-progress-title');
+        const bar = document.getElementById('fetch-progress-bar');
+        const text = document.getElementById('fetch-progress-text');
+
+        if (button) button.disabled = true;
+        if (title) title.innerText = "Importing '" + packName + "'...";
+        if (text) { text.innerText = 'Connecting...'; text.style.color = ''; }
+        if (bar) {
+            bar.style.width = '0%';
+            bar.classList.add('active');
+            bar.style.animation = 'progress-stripes 1s linear infinite';
+        }
+        modal.style.display = 'flex';
+
+        const evtSource = new EventSource(streamUrl);
+
+        evtSource.onmessage = function(e) {
+            try {
+                const data = JSON.parse(e.data);
+
+                if (data.error) {
+                    evtSource.close();
+                    if (text) { text.innerText = "Error: " + data.error; text.style.color = "red"; }
+                    if (button) button.disabled = false;
+                    setTimeout(() => { modal.style.display = 'none'; }, 3000);
+                    return;
+                }
+
+                if (data.progress !== undefined && bar) {
+                    bar.style.width = data.progress + '%';
+                }
+                if (data.message && text) {
+                    text.innerText = data.message;
+                }
+
+                if (data.done) {
+                    evtSource.close();
+                    if (text) {
+                        text.innerText = "Catalog '" + data.pack + "': " + data.created + " new, " +
+                            data.enriched + " enriched (updated), " + data.skipped + " skipped.";
+                    }
+                    setTimeout(() => window.location.reload(), 1500);
+                }
+            } catch (err) {
+                console.error("Stream parse error:", err);
+            }
+        };
+
+        evtSource.onerror = function(err) {
+            console.error("EventSource failed:", err);
+            evtSource.close();
+            if (text) text.innerText = "Connection lost. Refreshing page...";
+            setTimeout(() => window.location.reload(), 2000);
+        };
     }
 
     // Expose functions needed by HTML inline event handlers
@@ -1,7 +1,68 @@
 // Nova DSO Tracker - Minimal Service Worker
-// PWA compliance only - network-first strategy for real-time data
+// PWA compliance only - network-first strategy for real-time data.
+// GET responses that carry an ETag (computed plot / sun / outlook data) are
+// also kept in a data cache: the browser revalidates them with If-None-Match,
+// and the last copy is served when the network is unavailable.
+// Those responses are user-specific (Cache-Control: private), so the data
+// cache is keyed per user (the page posts the signed-in user), capped at
+// DATA_CACHE_MAX_ENTRIES, and deleted on logout or when the user changes.
 
 const CACHE_NAME = 'nova-mobile-v1';
+const DATA_CACHE_PREFIX = 'nova-data-v2:';
+const DATA_CACHE_MAX_ENTRIES = 100;
+const LOGOUT_PATH = '/logout';
+
+// Data cache of the signed-in user; null = unknown (nothing is cached)
+let dataCacheName = null;
+
+function deleteDataCaches(keepName) {
+    return caches.keys().then((cacheNames) => Promise.all(
+        cacheNames
+            .filter((name) => name.startsWith(DATA_CACHE_PREFIX) && name !== keepName)
+            .map((name) => caches.delete(name))
+    ));
+}
+
+function useDataCacheFor(user) {
+    dataCacheName = user ? DATA_CACHE_PREFIX + user : null;
+    return deleteDataCaches(dataCacheName);
+}
+
+// After a worker restart the in-memory name is gone; the one remaining data
+// cache (others are deleted on every user change) belongs to the current user.
+function currentDataCacheName() {
+    if (dataCacheName) return Promise.resolve(dataCacheName);
+    return caches.keys().then((cacheNames) => {
+        const own = cacheNames.filter((name) => name.startsWith(DATA_CACHE_PREFIX));
+        dataCacheName = own.length === 1 ? own[0] : null;
+        return dataCacheName;
+    });
+}
+
+function storeData(request, response) {
+    return currentDataCacheName().then((name) => {
+        if (!name) return;
+        return caches.open(name).then((cache) => cache.put(request, response).then(() => cache.keys()).then((keys) => {
+            // keys() is in insertion order and put() re-appends, so the oldest writes go first
+            const excess = keys.length - DATA_CACHE_MAX_ENTRIES;
+            return excess > 0 ? Promise.all(keys.slice(0, excess).map((key) => cache.delete(key))) : undefined;
+        }));
+    });
+}
+
+function isCacheableData(request, response) {
+    if (request.method !== 'GET' || !response.ok || !response.headers.get('ETag')) return false;
+    const cacheControl = (response.headers.get('Cache-Control') || '').toLowerCase();
+    return !cacheControl.includes('no-store');
+}
+
+// Pages announce the signed-in user ('' when logged out)
+self.addEventListener('message', (event) => {
+    const data = event.data || {};
+    if (data.type === 'nova-user') {
+        event.waitUntil(useDataCacheFor(data.user || ''));
+    }
+});
 
 // App shell URLs to cache on install
 const APP_SHELL = [
@@ -30,7 +91,7 @@ self.addEventListener('activate', (event) => {
         caches.keys().then((cacheNames) => {
             return Promise.all(
                 cacheNames.map((cacheName) => {
-                    if (cacheName !== CACHE_NAME) {
+                    if (cacheName !== CACHE_NAME && !cacheName.startsWith(DATA_CACHE_PREFIX)) {
                         return caches.delete(cacheName);
                     }
                 })
@@ -43,11 +104,20 @@ self.addEventListener('activate', (event) => {
 
 // Fetch event - network-first strategy
 self.addEventListener('fetch', (event) => {
+    // Logging out drops the user's cached data before the request goes out
+    if (new URL(event.request.url).pathname === LOGOUT_PATH) {
+        event.respondWith(useDataCacheFor('').then(() => fetch(event.request)));
+        return;
+    }
+
     // Network-first for all requests
     event.respondWith(
         fetch(event.request)
             .then((response) => {
-                // If network succeeds, return the response
+                // If network succeeds, keep a copy of validator-backed data and return it
+                if (isCacheableData(event.request, response)) {
+                    event.waitUntil(storeData(event.request, response.clone()));
+                }
                 return response;
             })
             .catch(() => {
@@ -60,8 +130,12 @@ self.addEventListener('fetch', (event) => {
                         });
                     });
                 }
-                // For non-navigation requests, fail silently
-                return new Response(null, { status: 503, statusText: 'Service Unavailable' });
+                // For non-navigation requests, fall back to the user's last validated copy
+                return currentDataCacheName()
+                    .then((name) => (name ? caches.match(event.request, { cacheName: name }) : undefined))
+                    .then((cachedResponse) => {
+                        return cachedResponse || new Response(null, { status: 503, statusText: 'Service Unavailable' });
+                    });
             })
     );
 });
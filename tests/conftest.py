@@ -13,6 +13,9 @@ from sqlalchemy.orm import sessionmaker, scoped_session
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Serve weather from the local stub provider: no network calls or retry timers in tests
+os.environ.setdefault("NOVA_WEATHER_PROVIDERS", "stub")
+
 
 from nova import (
     app,
@@ -31,6 +34,9 @@ from nova import (
 from nova.config import (
     observable_objects_cache, nightly_curves_cache, astro_context_cache
 )
+from nova.shared_catalog import shared_catalog_cache
+from nova.user_context import user_context_cache
+from nova.mobile_feed import mobile_feed_cache
 
 
 # --- MOCK COLUMN CLASSES (The definitive fix is here) ---
@@ -73,6 +79,15 @@ class MockAuthDbUser(User):
 # --- END MOCK CLASSES ---
 
 
+@pytest.fixture(autouse=True)
+def cache_stamps(tmp_path, monkeypatch):
+    """Keep the caches' cross-worker invalidation stamps out of the real instance/cache."""
+    monkeypatch.setattr(user_context_cache, "_stamp_path", str(tmp_path / "stamps" / "user_context.stamp"))
+    monkeypatch.setattr(user_context_cache, "_seen_stamp", None)
+    monkeypatch.setattr(shared_catalog_cache, "_stamp_path", str(tmp_path / "stamps" / "shared_catalog.stamp"))
+    monkeypatch.setattr(shared_catalog_cache, "_seen_stamp", None)
+
+
 @pytest.fixture(scope="function")
 def db_session(monkeypatch):
     # ... (content remains unchanged) ...
@@ -89,6 +104,7 @@ def db_session(monkeypatch):
 
     monkeypatch.setattr('nova.SessionLocal', TestSessionLocal)
     monkeypatch.setattr('nova.helpers.SessionLocal', TestSessionLocal)
+    monkeypatch.setattr('nova.models.SessionLocal', TestSessionLocal)  # db_writer jobs
     monkeypatch.setattr('nova.get_db', TestSessionLocal)
     monkeypatch.setattr(TestSessionLocal, 'remove', lambda: None)
 
@@ -104,6 +120,8 @@ def db_session(monkeypatch):
         observable_objects_cache.clear()
         nightly_curves_cache.clear()
         astro_context_cache.clear()
+        user_context_cache.clear()
+        mobile_feed_cache.clear()
         # Explicitly rollback any pending changes before cleanup
         try:
             session.rollback()
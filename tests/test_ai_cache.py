@@ -0,0 +1,92 @@
+"""
+Tests for the AI response cache (nova/ai/cache.py) against the local stub
+provider: content-hash hits, streamed replays, TTL expiry, per-user quotas,
+and the token-budget stage of the best-objects prompt.
+"""
+import time
+
+import pytest
+
+from nova import app
+from nova.ai import service
+from nova.ai.cache import (AIQuotaExceeded, AIResponseCache, ai_cache_key, get_cached_ai_response,
+                           set_ai_cache)
+from nova.ai.routes import budget_objects_for_prompt, compress_objects_for_prompt, estimate_tokens
+
+
+@pytest.fixture
+def stub_ai(tmp_path, monkeypatch):
+    """Stub provider + a cache on a temporary file; yields the list of provider calls."""
+    calls = []
+    real_call = service._call_stub
+    monkeypatch.setattr(service, "_call_stub", lambda prompt, system=None: calls.append(prompt) or real_call(prompt))
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite"))
+    previous = set_ai_cache(cache)
+    overrides = {"AI_PROVIDER": "stub", "AI_MODEL": "stub-1", "AI_STUB_RESPONSE": "line one\nline two\n",
+                 "AI_CACHE_TTL_HOURS": 1, "AI_DAILY_QUOTA": 0}
+    saved = {k: app.config.get(k) for k in overrides}
+    app.config.update(overrides)
+    with app.app_context():
+        yield calls
+    app.config.update(saved)
+    set_ai_cache(previous)
+
+
+def test_identical_requests_are_served_from_cache(stub_ai):
+    first = get_cached_ai_response("Tell me about M42", system="sys", locale="en", username="alice")
+    again = get_cached_ai_response("Tell me about M42", system="sys", locale="en", username="bob")
+    assert first == again == "line one\nline two\n"
+    assert len(stub_ai) == 1
+
+    # Any part of the key changes the entry
+    get_cached_ai_response("Tell me about M42", system="sys", locale="de", username="alice")
+    get_cached_ai_response("Tell me about M42", system="other", locale="en", username="alice")
+    assert len(stub_ai) == 3
+    assert ai_cache_key("stub", "a", "s", "p", "en", 10) != ai_cache_key("stub", "b", "s", "p", "en", 10)
+
+
+def test_streams_are_recorded_and_replayed(stub_ai):
+    live = list(get_cached_ai_response("summary", stream=True, locale="en", username="alice"))
+    assert live == ["line one\n", "line two\n"]
+    replay = list(get_cached_ai_response("summary", stream=True, locale="en", username="alice"))
+    assert replay == live and len(stub_ai) == 1
+    # A non-streamed request for the same prompt shares the entry
+    assert get_cached_ai_response("summary", locale="en") == "line one\nline two\n" and len(stub_ai) == 1
+
+
+def test_entries_expire(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite"))
+    now = time.time()
+    cache.put("k", "answer", ttl_s=60, now=now)
+    assert cache.get("k", now=now + 30) == "answer"
+    assert cache.get("k", now=now + 61) is None
+    assert cache.prune(now=now + 61) == 1
+
+
+def test_daily_quota_counts_provider_calls_only(stub_ai):
+    app.config["AI_DAILY_QUOTA"] = 2
+    get_cached_ai_response("q1", username="alice")
+    get_cached_ai_response("q1", username="alice")  # cache hit, free
+    get_cached_ai_response("q2", username="alice")
+    with pytest.raises(AIQuotaExceeded):
+        get_cached_ai_response("q3", username="alice")
+    assert get_cached_ai_response("q3", username="bob")  # separate quota
+    assert len(stub_ai) == 3
+
+
+def _obj(name, obs, alt, moon=90.0):
+    return {"Object": name, "Type": "Galaxy", "Observable Duration (min)": obs, "Max Altitude (°)": alt,
+            "Angular Separation (°)": moon, "Magnitude": 9.0, "Size": 10.0}
+
+
+def test_token_budget_keeps_best_ranked_objects():
+    objects = [_obj(f"NGC {i}", obs=i * 10, alt=40.0) for i in range(1, 101)]
+    line_cost = estimate_tokens(compress_objects_for_prompt([objects[-1]])) + 1
+
+    kept = budget_objects_for_prompt(objects, token_budget=line_cost * 10)
+    assert [o["Object"] for o in kept[:3]] == ["NGC 100", "NGC 99", "NGC 98"]
+    assert 9 <= len(kept) <= 10
+    assert estimate_tokens(compress_objects_for_prompt(kept)) <= line_cost * 10
+
+    ties = budget_objects_for_prompt([_obj("B", 60, 30.0), _obj("A", 60, 50.0)], token_budget=0)
+    assert [o["Object"] for o in ties] == ["A", "B"]
@@ -0,0 +1,102 @@
+"""
+Tests for server-side best-objects candidates (nova/ai/candidates.py): the
+numeric magnitude/size columns, the vectorized pre-filter stages and
+top-K ranking over the user's catalog.
+"""
+import numpy as np
+import pytest
+
+from nova import AstroObject, DbUser, Location
+from nova.ai.candidates import build_best_object_candidates, filter_and_rank
+from nova.ai.routes import budget_objects_for_prompt
+from nova.models import parse_magnitude, parse_size_arcmin
+
+SETTINGS = {"min_observable_minutes": 60, "min_max_altitude": 30}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("8.4", 8.4), (6, 6.0), (" 12.1 ", 12.1), ("99", None), ("", None), ("N/A", None), (None, None),
+])
+def test_parse_magnitude(value, expected):
+    assert parse_magnitude(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10'", 10.0), ("10x5'", 7.5), ("0.5°", 30.0), ("3.2", 3.2), ("0", None), ("Not Found", None), (None, None),
+])
+def test_parse_size_arcmin(value, expected):
+    assert parse_size_arcmin(value) == expected
+
+
+def test_numeric_columns_follow_edits(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    obj = AstroObject(user_id=user.id, object_name="NGC 891", ra_hours=2.375, dec_deg=42.35,
+                      magnitude="9.9", size="13.5x2.5'")
+    db_session.add(obj)
+    db_session.commit()
+    assert obj.magnitude_num == 9.9 and obj.size_arcmin == 8.0
+
+    obj.magnitude = "unknown"
+    obj.size = "0.25°"
+    db_session.commit()
+    assert obj.magnitude_num is None and obj.size_arcmin == 15.0
+
+
+def test_vectorized_filter_stages_and_ranking():
+    nan = np.nan
+    # name:        A      B      C      D      E      F      G      H      I
+    enabled = np.array([True, False, True, True, True, True, True, True, True])
+    minutes = np.array([200, 300, 30, 120, 120, 120, 150, 90, 200])
+    max_alts = np.array([60.0, 70.0, 80.0, 20.0, 50.0, 50.0, 50.0, 40.0, 60.0])
+    moon = np.array([90.0, 90.0, 90.0, 90.0, 20.0, 90.0, nan, 40.0, 120.0])
+    sizes = np.array([10.0, 10.0, 10.0, 10.0, 10.0, 1.5, nan, 5.0, 10.0])
+    mags = np.array([8.0, 8.0, 8.0, 8.0, 8.0, 8.0, nan, 12.0, 13.0])
+    names = list("ABCDEFGHI")
+
+    # Moon 60 % -> separation >= 33 deg; 80 mm -> limiting magnitude ~11.6
+    ranked, counts = filter_and_rank(enabled, minutes, max_alts, moon, sizes, mags, SETTINGS, 60.0, 80)
+    assert counts == {"total_in": 9, "enabled_count": 8, "after_obs": 7, "after_alt": 6, "after_moon": 5,
+                      "after_size": 4, "after_magnitude": 2, "total_out": 2}
+    assert [names[k] for k in ranked] == ["A", "G"]
+
+    # Without an aperture the magnitude stage is skipped; ties on duration rank by altitude, moon, order
+    ranked, counts = filter_and_rank(enabled, minutes, max_alts, moon, sizes, mags, SETTINGS, 60.0)
+    assert counts["after_magnitude"] == counts["after_size"] == 4
+    assert [names[k] for k in ranked] == ["I", "A", "G", "H"]
+
+    objects = [{"Object": names[k], "Observable Duration (min)": int(minutes[k]), "Max Altitude (°)": max_alts[k],
+                "Angular Separation (°)": None if np.isnan(moon[k]) else moon[k]} for k in ranked]
+    assert [o["Object"] for o in budget_objects_for_prompt(objects, token_budget=0)] == ["I", "A", "G", "H"]
+
+    top, _ = filter_and_rank(enabled, minutes, max_alts, moon, sizes, mags, SETTINGS, 60.0, top_k=2)
+    assert [names[k] for k in top] == ["I", "A"]
+
+
+def test_candidates_built_from_catalog(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    location = db_session.query(Location).filter_by(user_id=user.id, name="Default Test Loc").one()
+    db_session.add_all([
+        AstroObject(user_id=user.id, object_name="M31", ra_hours=0.712, dec_deg=41.27, magnitude="3.4",
+                    size="190x60'", type="Galaxy"),
+        AstroObject(user_id=user.id, object_name="NGC 7662", ra_hours=23.43, dec_deg=42.54, magnitude="8.6",
+                    size="0.5'"),  # too small
+        AstroObject(user_id=user.id, object_name="M33", ra_hours=1.564, dec_deg=30.66, magnitude="5.7",
+                    size="70x40'", enabled=False),
+    ])
+    db_session.commit()
+
+    candidates, counts = build_best_object_candidates(
+        db_session, user.id, location, {}, {"min_observable_minutes": 0, "min_max_altitude": 0}, 0,
+        local_date="2025-10-15")
+    names = [c["Object"] for c in candidates]
+    assert "M31" in names and "NGC 7662" not in names and "M33" not in names
+    assert counts["total_out"] == len(candidates) and counts["enabled_count"] == counts["total_in"] - 1
+
+    m31 = candidates[names.index("M31")]
+    assert m31["Magnitude"] == 3.4 and m31["Size"] == 125.0 and m31["Type"] == "Galaxy"
+    assert m31["Observable Duration (min)"] > 0 and m31["Angular Separation (°)"] is not None
+
+    top, _ = build_best_object_candidates(
+        db_session, user.id, location, {}, {"min_observable_minutes": 0, "min_max_altitude": 0}, 0,
+        local_date="2025-10-15", top_k=1)
+    assert [c["Object"] for c in top] == names[:1]
@@ -0,0 +1,80 @@
+"""
+Tests for the write-behind analytics counters (nova/analytics.py).
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+import nova.models
+from nova import app, analytics
+from nova.models import AnalyticsEvent, AnalyticsLogin, Base
+
+
+@pytest.fixture
+def analytics_db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_local = scoped_session(sessionmaker(bind=engine))
+    monkeypatch.setattr(nova.models, "SessionLocal", session_local)
+    monkeypatch.setattr(analytics, "_ensure_flusher", lambda: None)
+    analytics._event_buffer.clear()
+    analytics._login_buffer.clear()
+    yield session_local
+    analytics._event_buffer.clear()
+    analytics._login_buffer.clear()
+    session_local.remove()
+
+
+def test_counts_are_buffered_and_upserted(analytics_db):
+    today = date.today()
+    with app.test_request_context('/'):
+        for _ in range(3):
+            analytics.record_event('dashboard_load')
+        analytics.record_login()
+
+    session = analytics_db()
+    assert session.query(AnalyticsEvent).count() == 0  # nothing written on the hot path
+    assert analytics.event_counts_since(session, today) == {('dashboard_load', today): 3}
+    assert analytics.login_counts_since(session, today) == {today: 1}
+
+    assert analytics.flush_analytics() == 2
+    assert session.get(AnalyticsEvent, ('dashboard_load', today)).count == 3
+
+    # Second flush adds onto the existing row instead of overwriting it
+    with app.test_request_context('/'):
+        analytics.record_event('dashboard_load')
+        analytics.record_login()
+    analytics.flush_analytics()
+    session.expire_all()
+    assert session.get(AnalyticsEvent, ('dashboard_load', today)).count == 4
+    assert session.get(AnalyticsLogin, today).login_count == 2
+    assert analytics.flush_analytics() == 0
+
+
+def test_readers_merge_buffered_and_persisted(analytics_db):
+    today = date.today()
+    session = analytics_db()
+    session.add(AnalyticsEvent(event_name='journal_open', date=today, count=5))
+    session.add(AnalyticsEvent(event_name='journal_open', date=today - timedelta(days=200), count=9))
+    session.commit()
+    with app.test_request_context('/'):
+        analytics.record_event('journal_open')
+    counts = analytics.event_counts_since(session, today - timedelta(days=90))
+    assert counts == {('journal_open', today): 6}
+
+
+def test_failed_flush_keeps_counts(analytics_db, monkeypatch):
+    with app.test_request_context('/'):
+        analytics.record_event('dashboard_load')
+
+    class _Broken:
+        @staticmethod
+        def session_factory():
+            raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(nova.models, "SessionLocal", _Broken)
+    assert analytics.flush_analytics() == 0
+    assert analytics._event_buffer[('dashboard_load', date.today())] == 1
@@ -13,7 +13,8 @@ from modules.astro_calculations import (
     calculate_observable_duration_vectorized,
     hms_to_hours,
     get_common_time_arrays,  # <-- Added this
-    interpolate_horizon  # <-- Added this
+    interpolate_horizon,  # <-- Added this
+    calculate_night_series,
 )
 
 
@@ -471,4 +472,43 @@ def test_dec_edge_cases_parse_correctly(dec_str, expected):
 
 def test_dec_bad_inputs_never_crash_and_return_zero():
     for bad in ["abc", "abc:def", "++--", "12:xx:yy", ""]:
-        assert dms_to_degrees(bad) == 0.0
\ No newline at end of file
+        assert dms_to_degrees(bad) == 0.0
+
+# --- Night series (one transform over a date range) ---
+def test_night_series_matches_per_night_calculation():
+    """Per-night reductions of the continuous series equal the single-night helper."""
+    ra, dec, lat, lon, tz = 5.58, -5.4, 47.0, 8.0, 'Europe/Zurich'
+    mask = [[90, 30], [180, 40]]
+    dates = [(datetime(2025, 1, 1) + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(0, 60, 6)]
+
+    nights = calculate_night_series(ra, dec, lat, lon, tz, dates, 20, 15, horizon_mask=mask)
+
+    assert [n["date"] for n in nights] == dates
+    for night in nights:
+        duration, max_alt, obs_from, obs_to = calculate_observable_duration_vectorized(
+            ra, dec, lat, lon, night["date"], tz, 20, 15, horizon_mask=mask)
+        assert night["observable_minutes"] == int(duration.total_seconds() / 60)
+        assert night["max_altitude"] == pytest.approx(max_alt)
+        assert night["observable_from"] == obs_from
+        assert night["observable_to"] == obs_to
+        assert 0 <= night["moon_separation"] <= 180
+
+
+def test_night_series_midnight_values_and_polar_day():
+    from astropy.coordinates import AltAz, EarthLocation, SkyCoord, get_body
+    from astropy.time import Time
+    import astropy.units as u
+
+    nights = calculate_night_series(10.0, 60.0, 50.0, 10.0, 'UTC', ['2025-03-01', '2025-03-02'], 20, 30)
+    loc = EarthLocation(lat=50 * u.deg, lon=10 * u.deg)
+    t = Time(datetime(2025, 3, 2, tzinfo=pytz.utc))
+    frame = AltAz(obstime=t, location=loc)
+    obj_alt = SkyCoord(ra=10.0 * u.hourangle, dec=60.0 * u.deg).transform_to(frame).alt.deg
+    moon_alt = get_body('moon', t, loc).transform_to(frame).alt.deg
+    assert nights[1]["midnight_altitude"] == pytest.approx(obj_alt, abs=0.01)
+    assert nights[1]["midnight_moon_altitude"] == pytest.approx(moon_alt, abs=0.01)
+
+    # Midsummer above the arctic circle: no dark window at all
+    polar = calculate_night_series(10.0, 60.0, 78.0, 15.0, 'UTC', ['2025-06-21'], 20, 30)
+    assert polar[0]["observable_minutes"] == 0 and polar[0]["observable_from"] is None
+    assert calculate_night_series(10.0, 60.0, 50.0, 10.0, 'UTC', [], 20, 30) == []
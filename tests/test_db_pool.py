@@ -0,0 +1,73 @@
+"""
+Tests for the SQLite connection layer (nova/db_pool.py): per-connection
+pragmas, the serialized background writer and its metrics.
+"""
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from nova.db_pool import DbWriter, configure_sqlite_engine, db_stats
+
+
+def test_pragmas_applied_to_every_pooled_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    configure_sqlite_engine(engine)
+    configure_sqlite_engine(engine)  # idempotent
+
+    conns = [engine.connect() for _ in range(3)]  # three distinct pooled connections
+    try:
+        for conn in conns:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1   # NORMAL
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2    # MEMORY
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -20000
+    finally:
+        for conn in conns:
+            conn.close()
+
+    stats = db_stats(engine)
+    assert stats["pool"]["class"] == "QueuePool"
+    assert stats["engine"]["connects"] >= 3
+
+
+def test_writer_retries_while_database_is_locked(tmp_path):
+    path = tmp_path / "w.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 0.05})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (v INTEGER)"))
+    writer = DbWriter(sessionmaker(bind=engine), retry_delay=0.05)
+
+    blocker = sqlite3.connect(path, check_same_thread=False)
+    blocker.execute("BEGIN EXCLUSIVE")
+    threading.Timer(0.3, blocker.rollback).start()
+
+    writer.run(lambda s: s.execute(text("INSERT INTO t VALUES (1)")), timeout=10)
+    blocker.close()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM t")).scalar() == 1
+    stats = writer.stats()
+    assert stats["jobs_done"] == 1 and stats["lock_retries"] >= 1
+    assert stats["lock_wait_max_s"] > 0
+
+
+def test_writer_runs_jobs_in_order_and_reports_failures(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'o.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (v INTEGER)"))
+    writer = DbWriter(sessionmaker(bind=engine))
+
+    for i in range(20):
+        writer.submit(lambda s, i=i: s.execute(text("INSERT INTO t VALUES (:v)"), {"v": i}))
+    with pytest.raises(ZeroDivisionError):
+        writer.run(lambda s: (s.execute(text("INSERT INTO t VALUES (99)")), 1 / 0))
+    assert writer.flush(timeout=5)
+
+    with engine.connect() as conn:
+        values = [r[0] for r in conn.execute(text("SELECT v FROM t ORDER BY rowid"))]
+    assert values == list(range(20))  # failed job rolled back, order kept
+    stats = writer.stats()
+    assert stats["jobs_done"] == 20 and stats["jobs_failed"] == 1 and stats["queue_depth"] == 0
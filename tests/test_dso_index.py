@@ -0,0 +1,94 @@
+"""
+Tests for the bundled offline DSO coordinate index (nova/dso_index.py) and
+its use by get_ra_dec() ahead of SIMBAD.
+"""
+import sys, os
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from nova.dso_index import DsoIndex, build_dso_index, entries_from_openngc_csv, get_dso_index
+from nova.helpers import get_ra_dec
+
+OPENNGC_SAMPLE = (
+    "Name;Type;RA;Dec;Const;MajAx;MinAx;PosAng;B-Mag;V-Mag;M;NGC;IC;Identifiers;Common names\n"
+    "NGC1976;Cl+N;05:35:16.48;-05:23:22.8;Ori;90.00;60.00;;4.00;;042;;;LBN 974;Great Orion Nebula,Orion Nebula\n"
+    "NGC1982;Cl+N;05:35:31.35;-05:16:02.9;Ori;20.00;15.00;;9.00;;043;;;LBN 974;De Mairan's Nebula\n"
+    "NGC7000;HII;20:59:17.14;+44:31:43.6;Cyg;120.00;100.00;;4.00;;;;;C 020,LBN 373;North America Nebula\n"
+    "NGC0001;G;00:07:15.84;+27:42:29.1;Peg;1.57;1.07;112;13.69;12.93;;;;UGC 00057;\n"
+    "NGC9999;Dup;00:00:00.00;+00:00:00.0;;;;;;;;;;;\n"
+)
+
+
+@pytest.fixture
+def small_index(tmp_path):
+    csv_path = tmp_path / "NGC.csv"
+    csv_path.write_text(OPENNGC_SAMPLE, encoding="utf-8")
+    count = build_dso_index(entries_from_openngc_csv(str(csv_path)), index_dir=str(tmp_path / "idx"))
+    assert count == 4  # "Dup" rows are skipped
+    return DsoIndex(str(tmp_path / "idx"))
+
+
+def test_lookup_by_name_and_aliases(small_index):
+    by_ngc = small_index.lookup("NGC1976")
+    assert by_ngc["ra_hours"] == pytest.approx(5.5879, abs=1e-3)
+    assert by_ngc["dec_deg"] == pytest.approx(-5.3897, abs=1e-3)
+    assert by_ngc["constellation"] == "Ori"
+    assert by_ngc["magnitude"] == 4.0  # B-Mag used when V-Mag is blank
+    # Messier number, spelling variants and common name resolve to the same row
+    for alias in ("M42", "m 42", "ngc 1976", "Great Orion Nebula"):
+        assert small_index.lookup(alias)["name"] == by_ngc["name"]
+    assert small_index.lookup("NGC0001")["magnitude"] == pytest.approx(12.93)
+    assert small_index.lookup("NGC 12345") is None
+
+    # Catalog-number padding and the prefix space do not matter; Caldwell numbers resolve
+    ngc1 = small_index.lookup("NGC 1")
+    assert ngc1["name"] == "NGC 1" and ngc1["type"] == "G" and small_index.lookup("ngc1")["name"] == "NGC 1"
+    for alias in ("C20", "C 20", "Caldwell 20"):
+        assert small_index.lookup(alias)["name"] == "NGC 7000"
+    assert small_index.lookup("NGC 7000")["type"] == "HII"
+
+
+def test_cone_search_orders_by_separation(small_index):
+    hits = small_index.cone_search(5.5879, -5.39, radius_deg=1.0)
+    assert [h["name"] for h in hits] == ["NGC 1976", "NGC 1982"]
+    assert hits[0]["separation_deg"] < hits[1]["separation_deg"] < 1.0
+    assert small_index.cone_search(5.5879, -5.39, radius_deg=1.0, limit=1)[0]["name"] == "NGC 1976"
+    assert small_index.cone_search(12.0, 60.0, radius_deg=2.0) == []
+
+
+def test_bundled_index_covers_the_catalogs():
+    index = get_dso_index()
+    assert index is not None and len(index) > 13000  # OpenNGC: NGC, IC and addendum
+    assert index.lookup("M 31")["common_name"] == "Andromeda Galaxy"
+    assert all(index.lookup(f"M{n}") for n in range(1, 111) if n != 102)  # M102 is ambiguous
+    assert all(index.lookup(f"Caldwell {n}") for n in range(1, 110))
+    assert index.lookup("IC 434")["common_name"] == "Flame Nebula"
+    assert index.lookup("Sh2-106")["common_name"] == "Celestial Snow Angel"  # seeded, not in OpenNGC
+
+
+def test_get_ra_dec_uses_local_index_before_simbad(monkeypatch):
+    class SimbadStub:
+        queried = []
+
+        def add_votable_fields(self, *fields):
+            pass
+
+        def query_object(self, name):
+            self.queried.append(name)
+            raise ConnectionError("SIMBAD unreachable")
+
+    monkeypatch.setattr("nova.helpers.Simbad", SimbadStub)
+    data = get_ra_dec("m31", objects_map={})
+    assert SimbadStub.queried == []  # answered offline, no network round trip
+    assert data["Object"] == "m31"
+    assert data["RA (hours)"] == pytest.approx(0.712, abs=1e-2)
+    assert data["Constellation"] == "And"
+    assert data["Project"] == "none"
+
+    # Only names missing from the index go to SIMBAD
+    miss = get_ra_dec("Totally Unknown 123", objects_map={})
+    assert SimbadStub.queried == ["Totally Unknown 123"]
+    assert miss["RA (hours)"] is None
+    assert miss["Common Name"].startswith("Error: SIMBAD lookup failed")
@@ -0,0 +1,73 @@
+"""
+Tests for conditional GETs on the computed JSON endpoints (nova/http_cache.py):
+ETag + private max-age on 200, 304 on If-None-Match without recomputing.
+"""
+from datetime import datetime
+
+import pytz
+
+from nova.http_cache import HTTP_CACHE_MAX_AGE, seconds_until_noon
+
+PLOT_QUERY = {'plot_loc_name': 'Default Test Loc', 'plot_lat': 50, 'plot_lon': 10, 'plot_tz': 'UTC',
+              'day': 15, 'month': 1, 'year': 2025}
+
+
+def _max_age(response):
+    directives = dict(d.strip().partition('=')[::2] for d in response.headers['Cache-Control'].split(','))
+    assert 'private' in directives
+    return int(directives['max-age'])
+
+
+def test_seconds_until_noon_rollover():
+    utc = pytz.utc
+    assert seconds_until_noon('UTC', utc.localize(datetime(2025, 1, 15, 10, 0))) == 2 * 3600
+    assert seconds_until_noon('UTC', utc.localize(datetime(2025, 1, 15, 13, 0))) == 23 * 3600
+    # 20:00 UTC is 21:00 in Zurich; next local noon is 11:00 UTC
+    assert seconds_until_noon('Europe/Zurich', utc.localize(datetime(2025, 1, 15, 20, 0))) == 15 * 3600
+
+
+def test_plot_data_revalidates_without_recomputing(client, monkeypatch):
+    first = client.get('/api/get_plot_data/M42', query_string=PLOT_QUERY)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert 0 <= _max_age(first) <= HTTP_CACHE_MAX_AGE
+
+    def _boom(*args, **kwargs):
+        raise AssertionError("plot data recomputed for a matching If-None-Match")
+    monkeypatch.setattr('nova.blueprints.api.get_common_time_arrays', _boom)
+
+    second = client.get('/api/get_plot_data/M42', query_string=PLOT_QUERY, headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+    assert second.data == b''
+
+    monkeypatch.undo()
+    other_day = client.get('/api/get_plot_data/M42', query_string=dict(PLOT_QUERY, day=16),
+                           headers={'If-None-Match': etag})
+    assert other_day.status_code == 200
+    assert other_day.headers['ETag'] != etag
+
+
+def test_monthly_plot_and_sun_events_honour_if_none_match(client):
+    url = '/api/get_monthly_plot_data/M42'
+    query = {'year': 2025, 'month': 2, 'plot_lat': 50, 'plot_lon': 10, 'plot_tz': 'UTC'}
+    first = client.get(url, query_string=query)
+    assert first.status_code == 200 and len(first.get_json()['dates']) == 28
+    assert client.get(url, query_string=query,
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    sun = client.get('/sun_events', query_string={'location': 'Default Test Loc'})
+    assert sun.status_code == 200 and _max_age(sun) <= 60
+    repeat = client.get('/sun_events', query_string={'location': 'Default Test Loc'},
+                        headers={'If-None-Match': sun.headers['ETag']})
+    # A minute boundary between the two requests legitimately changes the payload
+    assert repeat.status_code in (200, 304)
+    if repeat.status_code == 200:
+        assert repeat.get_json()['time'] != sun.get_json()['time']
+
+
+def test_json_without_validator_stays_no_store(client):
+    response = client.get('/api/get_object_data/M42')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert response.headers['Cache-Control'] == 'no-store'
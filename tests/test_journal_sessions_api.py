@@ -0,0 +1,94 @@
+"""
+Tests for the lean, keyset-paginated journal list (/api/journal/sessions)
+and the deferred raw-log columns on JournalSession.
+"""
+from datetime import date
+
+from sqlalchemy import event, inspect as sa_inspect
+
+from nova import DbUser, JournalSession, Project
+
+
+def _add_sessions(db_session, user_id, count=25):
+    project = Project(id="proj-1", user_id=user_id, name="Orion Deep", target_object_name="M42")
+    db_session.add(project)
+    for i in range(count):
+        db_session.add(JournalSession(
+            user_id=user_id,
+            object_name="M42" if i % 2 else "M31",
+            date_utc=date(2025, 1, 1 + (i % 5)),  # repeated dates exercise the id tie-breaker
+            project_id="proj-1" if i % 3 == 0 else None,
+            calculated_integration_time_minutes=None if i % 4 == 0 else float(i * 10),
+            asiair_log_content="x" * 10_000,
+            phd2_log_content="y" * 10_000,
+        ))
+    db_session.commit()
+
+
+def _collect(client, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get('/api/journal/sessions', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(body["sessions"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_keyset_pages_cover_all_sessions_in_order(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    _add_sessions(db_session, user.id)
+
+    rows = _collect(client, limit=4)
+    assert len(rows) == 25
+    assert len({r["id"] for r in rows}) == 25
+    keys = [(r["date_utc"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+    first = next(r for r in rows if r["project_id"] == "proj-1")
+    assert first["project_name"] == "Orion Deep"
+    m42 = next(r for r in rows if r["object_name"] == "M42")
+    assert m42["target_common_name"] == "Orion Nebula"
+    assert "asiair_log_content" not in m42
+
+    # Ascending sort on a nullable column: NULLs first, no gaps or repeats across pages
+    asc = _collect(client, limit=3, sort="calculated_integration_time_minutes", order="asc")
+    values = [r["calculated_integration_time_minutes"] or -1 for r in asc]
+    assert len(asc) == 25 and values == sorted(values)
+
+
+def test_journal_list_rejects_bad_parameters(client):
+    assert client.get('/api/journal/sessions?sort=notes').status_code == 400
+    assert client.get('/api/journal/sessions?cursor=not-a-cursor').status_code == 400
+
+
+def test_raw_log_columns_are_deferred(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    _add_sessions(db_session, user.id, count=1)
+    db_session.expire_all()
+
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        s = db_session.query(JournalSession).filter_by(user_id=user.id).one()
+        assert "asiair_log_content" not in statements[-1]
+        assert "asiair_log_content" in sa_inspect(s).unloaded
+        # Touching one log column loads the whole group in a single query
+        assert len(s.asiair_log_content) == 10_000
+        assert "phd2_log_content" not in sa_inspect(s).unloaded
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_dashboard_no_longer_inlines_journal(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    _add_sessions(db_session, user.id, count=3)
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b"journalSessions" not in response.data
+    assert b"xxxxxxxxxx" not in response.data
@@ -0,0 +1,117 @@
+"""
+Tests for multi-session log analytics (nova/log_analytics.py) and the
+/api/log-analytics endpoint.
+
+The endpoint must only aggregate the parse-once log_analysis_cache and
+never re-parse raw logs.
+"""
+import json
+import sys, os
+from datetime import date
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from nova import DbUser, JournalSession, Project
+from nova.log_analytics import (
+    extract_session_metrics, aggregate_session_metrics, load_cached_metrics
+)
+
+
+def _cache(rms, settles, af, exposure_sec=3000, total_min=60):
+    return {
+        'has_logs': True,
+        'asiair': {
+            'session_start': '2025-01-01T20:00:00',
+            'af_runs': [{'temp': t, 'focus_pos': p} for t, p in af],
+            'dithers': [],
+            'stats': {'total_exposure_time_sec': exposure_sec, 'total_time_min': total_min},
+        },
+        'phd2': {
+            'session_start': '2025-01-01T20:00:00',
+            'settle': [{'h': 0.1, 'dur': d, 'ok': d is not None} for d in settles],
+            'stats': {'total_frames': 500, 'total_rms_as': rms + 0.2,
+                      'imaging': {'total_rms_as': rms, 'ra_rms_as': rms / 2, 'dec_rms_as': rms / 2}},
+        },
+        'nina': None,
+    }
+
+
+def test_extract_session_metrics_prefers_imaging_rms():
+    m = extract_session_metrics(_cache(0.8, [10.0, 12.0, None], [(10.0, 5000)]))
+    assert m['rms_total_as'] == 0.8
+    assert m['settle_durations'] == [10.0, 12.0]
+    assert m['settle_timeouts'] == 1
+    assert m['efficiency'] == pytest.approx(3000 / 3600, rel=1e-3)
+    assert m['af_points'] == [[10.0, 5000.0]]
+
+
+def test_load_cached_metrics_handles_corrupt_and_empty():
+    assert load_cached_metrics(None) is None
+    assert load_cached_metrics("{not json") is None
+    assert load_cached_metrics(json.dumps({'has_logs': False})) is None
+
+
+def test_aggregate_session_metrics_trends():
+    rows = [
+        extract_session_metrics(_cache(1.2, [8.0, 20.0], [(15.0, 5000)])),
+        extract_session_metrics(_cache(1.0, [9.0], [(10.0, 5050)])),
+        extract_session_metrics(_cache(0.8, [11.0, None], [(5.0, 5100)])),
+    ]
+    summary = aggregate_session_metrics(rows)
+
+    assert summary['session_count'] == 3
+    assert summary['rms']['best_as'] == 0.8
+    assert summary['rms']['trend_as_per_session'] == pytest.approx(-0.2)
+    # 10 steps of focuser travel per degree of cooling
+    assert summary['autofocus']['slope_steps_per_c'] == pytest.approx(-10.0)
+    assert summary['dither_settle']['count'] == 4
+    assert summary['dither_settle']['timeouts'] == 1
+    assert summary['dither_settle']['p50_sec'] == pytest.approx(10.0)
+    assert sum(b['count'] for b in summary['dither_settle']['histogram']) == 4
+    assert summary['efficiency']['total_exposure_hours'] == 2.5
+
+
+def test_aggregate_session_metrics_empty():
+    summary = aggregate_session_metrics([])
+    assert summary['session_count'] == 0
+    assert summary['rms']['mean_as'] is None
+
+
+def test_log_analytics_api_paginates_and_skips_uncached(client, db_session, monkeypatch):
+    import nova.log_parser as log_parser
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("raw logs must not be re-parsed")
+
+    monkeypatch.setattr(log_parser, 'parse_phd2_log', _fail)
+    monkeypatch.setattr(log_parser, 'parse_asiair_log', _fail)
+
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    project = Project(id="proj-analytics", user_id=user.id, name="Analytics Project")
+    db_session.add(project)
+    for day in range(1, 6):
+        db_session.add(JournalSession(
+            user_id=user.id, project_id=project.id, date_utc=date(2025, 1, day),
+            object_name="M42", log_analysis_cache=json.dumps(_cache(1.0 + day / 10, [10.0], []))
+        ))
+    uncached = JournalSession(user_id=user.id, project_id=project.id, date_utc=date(2025, 1, 9),
+                              object_name="M42", phd2_log_content="raw phd2 log")
+    db_session.add(uncached)
+    db_session.commit()
+
+    resp = client.get('/api/log-analytics?project_id=proj-analytics&per_page=2&page=2')
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data['total'] == 5
+    assert data['summary']['session_count'] == 5
+    assert [s['date'] for s in data['sessions']] == ['2025-01-03', '2025-01-04']
+    assert data['has_more'] is True
+    assert data['uncached_session_ids'] == [uncached.id]
+
+    resp = client.get('/api/log-analytics?start=2025-01-04&end=2025-01-05')
+    assert resp.get_json()['total'] == 2
+
+    assert client.get('/api/log-analytics?project_id=missing').status_code == 404
+    assert client.get('/api/log-analytics?start=not-a-date').status_code == 400
@@ -0,0 +1,190 @@
+"""
+Tests for the parallel, rate-limited object metadata fetcher (nova/metadata_fetcher.py).
+
+A local stub HTTP server stands in for the catalog providers so the worker
+pool, the persistent cache and negative-result caching are exercised
+without touching SIMBAD/VizieR.
+"""
+import json
+import sys, os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.nova_data_fetcher as nova_data_fetcher
+import nova
+from nova import AstroObject, DbUser
+from nova.metadata_fetcher import MetadataCache, MetadataFetcher, TokenBucket
+
+STUB_CATALOG = {
+    "M42": {"object_type": "HII", "magnitude": 4.0, "size_arcmin": 65.0, "surface_brightness": 12.9},
+    "NGC 7000": {"object_type": "HII", "magnitude": 4.0, "size_arcmin": 120.0, "surface_brightness": 14.2},
+}
+
+
+@pytest.fixture
+def stub_server():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name = parse_qs(urlparse(self.path).query)["name"][0]
+            hits.append(name)
+            body = json.dumps(STUB_CATALOG.get(name, {})).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/lookup"
+    try:
+        yield url, hits
+    finally:
+        server.shutdown()
+
+
+@pytest.fixture
+def stub_fetcher(stub_server, tmp_path):
+    url, hits = stub_server
+
+    def fetch_fn(name):
+        return requests.get(url, params={"name": name}, timeout=5).json()
+
+    fetcher = MetadataFetcher(fetch_fn=fetch_fn, cache=MetadataCache(str(tmp_path / "meta.sqlite")),
+                              max_workers=3)
+    return fetcher, hits
+
+
+def test_token_bucket_enforces_rate():
+    now = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=fake_sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    # Burst exhausted: the third token needs half a second at 2 req/s
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert sum(sleeps) == pytest.approx(0.5)
+
+
+def test_iter_fetch_uses_pool_and_persistent_cache(stub_fetcher):
+    fetcher, hits = stub_fetcher
+
+    results = {name: (data, err) for name, data, err in fetcher.iter_fetch(["M42", "NGC 7000", "Unknown 1"])}
+    assert results["M42"][0]["magnitude"] == 4.0
+    assert results["Unknown 1"][0]["object_type"] is None
+    assert all(err is None for _, err in results.values())
+    assert sorted(hits) == ["M42", "NGC 7000", "Unknown 1"]
+
+    # Second run (different spelling) is served entirely from the cache, negatives included
+    hits.clear()
+    again = {name: data for name, data, _ in fetcher.iter_fetch(["m 42", "ngc7000", "Unknown 1"])}
+    assert hits == []
+    assert again["m 42"]["cached"] is True
+    assert again["ngc7000"]["size_arcmin"] == 120.0
+
+
+def test_negative_results_expire_sooner(tmp_path, monkeypatch):
+    cache = MetadataCache(str(tmp_path / "meta.sqlite"), positive_ttl=1000, negative_ttl=10)
+    clock = [1_000_000.0]
+    monkeypatch.setattr("nova.metadata_fetcher.time.time", lambda: clock[0])
+
+    cache.put("M42", {"object_type": "HII", "magnitude": 4.0, "size_arcmin": None})
+    cache.put("NOWHERE", {"object_type": None, "magnitude": None, "size_arcmin": None})
+    clock[0] += 100
+    assert cache.get("M42") is not None
+    assert cache.get("NOWHERE") is None
+
+
+def test_iter_fetch_reports_errors_without_aborting(tmp_path):
+    def fetch_fn(name):
+        if name == "BAD":
+            raise RuntimeError("provider down")
+        return {"object_type": "G"}
+
+    fetcher = MetadataFetcher(fetch_fn=fetch_fn, cache=MetadataCache(str(tmp_path / "meta.sqlite")))
+    results = {name: (data, err) for name, data, err in fetcher.iter_fetch(["GOOD", "BAD"])}
+    assert results["GOOD"][0]["object_type"] == "G"
+    assert isinstance(results["BAD"][1], RuntimeError)
+
+
+def test_failed_lookups_are_not_cached(tmp_path, monkeypatch):
+    down = [True]
+    queries = []
+
+    class FakeService:
+        TIMEOUT = ROW_LIMIT = None
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def add_votable_fields(self, *fields):
+            pass
+
+        def query_object(self, name):
+            queries.append(name)
+            if down[0]:
+                raise TimeoutError("read timed out")
+            return None
+
+    monkeypatch.setattr(nova_data_fetcher, "Simbad", FakeService)
+    monkeypatch.setattr(nova_data_fetcher, "Vizier", FakeService)
+    monkeypatch.setattr(nova_data_fetcher, "get_stellarium_data", lambda *args: None)
+    fetcher = MetadataFetcher(cache=MetadataCache(str(tmp_path / "meta.sqlite")))
+
+    failed = fetcher.fetch("M42")
+    assert failed["object_type"] is None and failed["errors"] and failed["cached"] is False
+
+    # The outage is not remembered as "not found": the next call asks again
+    down[0] = False
+    queries.clear()
+    clean = fetcher.fetch("M42")
+    assert queries and clean["errors"] == [] and clean["cached"] is False
+    assert fetcher.fetch("M42")["cached"] is True
+
+
+def test_bulk_fetch_details_uses_fetcher(client, db_session, stub_fetcher, monkeypatch):
+    fetcher, hits = stub_fetcher
+    monkeypatch.setattr("nova.blueprints.api.get_metadata_fetcher", lambda: fetcher)
+
+    response = client.post('/api/bulk_fetch_details', json={"object_ids": ["M42"]})
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 1
+    assert hits == ["M42"]
+
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    m42 = db_session.query(AstroObject).filter_by(user_id=user.id, object_name="M42").one()
+    assert m42.type == "HII"
+    assert m42.size == "65.0"
+
+
+def test_stream_fetch_details_counts_each_object_once(client, db_session, stub_fetcher, monkeypatch):
+    fetcher, hits = stub_fetcher
+    monkeypatch.setattr("nova.blueprints.core.get_metadata_fetcher", lambda: fetcher)
+    monkeypatch.setattr("nova.blueprints.core.SessionLocal", nova.SessionLocal)  # the test database
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    db_session.query(AstroObject).filter_by(user_id=user.id).delete()
+    db_session.add(AstroObject(user_id=user.id, object_name="NGC 7000", ra_hours=20.98, dec_deg=44.33))
+    db_session.commit()
+
+    # NGC 7000 gets both its constellation and its catalog data filled in, and counts once
+    body = client.get('/stream_fetch_details').get_data(as_text=True)
+    events = [json.loads(line[len('data: '):]) for line in body.splitlines() if line.startswith('data: ')]
+    assert hits == ["NGC 7000"]
+    assert events[-1]["done"] is True and events[-1]["modified"] == 1
@@ -0,0 +1,90 @@
+"""
+Tests for the batched mobile Up Now feed (nova/mobile_feed.py) and its
+keyset-paginated endpoint /api/mobile/up_now.
+"""
+from types import SimpleNamespace
+
+import astropy.units as u
+import numpy as np
+import pytest
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+from astropy.time import Time
+
+from nova import AstroObject, DbUser
+from nova.helpers import bust_astro_context_cache
+from nova.mobile_feed import build_mobile_feed, mobile_feed_cache
+
+
+def _obj(name, ra, dec):
+    return SimpleNamespace(object_name=name, common_name=None, ra_hours=ra, dec_deg=dec,
+                           type="Galaxy", constellation="Ori", active_project=False)
+
+
+def test_snapshot_positions_match_direct_transform():
+    objects = [_obj("M31", 0.712, 41.27), _obj("M42", 5.58, -5.4), _obj("NO_COORDS", None, None)]
+    snap = build_mobile_feed(objects, {"M42"}, 47.0, 8.0, "Europe/Zurich", "2025-01-15", 20, 15, [])
+    assert snap.names == ["M31", "M42"]
+    assert snap.altitudes.dtype == np.float32
+    assert snap.rows[1]["has_framing"] and not snap.rows[0]["has_framing"]
+
+    # On a grid sample the stored curve matches a direct transform
+    ts = snap.t0 + 20 * snap.interval_s
+    alt, az, trend = snap.positions_at(ts)
+    frame = AltAz(obstime=Time(ts, format='unix'), location=EarthLocation(lat=47 * u.deg, lon=8 * u.deg))
+    for k, (ra, dec) in enumerate([(0.712, 41.27), (5.58, -5.4)]):
+        direct = SkyCoord(ra=ra * u.hourangle, dec=dec * u.deg).transform_to(frame)
+        assert alt[k] == pytest.approx(direct.alt.deg, abs=0.01)
+        assert az[k] == pytest.approx(direct.az.deg, abs=0.01)
+
+    # Between two samples the position is interpolated, not snapped to the nearest one
+    mid_alt, _, _ = snap.positions_at(ts + 0.25 * snap.interval_s)
+    expected = snap.altitudes[:, 20] + 0.25 * (snap.altitudes[:, 21] - snap.altitudes[:, 20])
+    assert np.allclose(mid_alt, expected, atol=1e-4)
+    assert set(trend) <= {'↑', '↓', '–'}
+
+
+def test_azimuth_interpolation_wraps_through_north():
+    snap = build_mobile_feed([_obj("POLARIS", 2.53, 89.26)], set(), 47.0, 8.0, "UTC", "2025-01-15", 20, 15, [])
+    snap.azimuths[0, :2] = [359.0, 1.0]
+    _, az, _ = snap.positions_at(snap.t0 + 0.5 * snap.interval_s)
+    assert az[0] == pytest.approx(0.0, abs=1e-3) or az[0] == pytest.approx(360.0, abs=1e-3)
+
+
+def test_up_now_feed_pages_with_cursor_and_etag(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    for i in range(5):
+        db_session.add(AstroObject(user_id=user.id, object_name=f"NGC {100 + i}", ra_hours=1.0 + i, dec_deg=10.0))
+    db_session.commit()
+    bust_astro_context_cache(user.id)
+
+    names, cursor = [], None
+    while True:
+        response = client.get('/api/mobile/up_now', query_string={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["total"] == 6
+        names += [row["Object"] for row in body["data"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert names == sorted(names) and len(set(names)) == 6 and "M42" in names
+    assert "Altitude Current" in body["data"][0]
+
+    first = client.get('/api/mobile/up_now?limit=2')
+    assert first.headers["ETag"] and "private" in first.headers["Cache-Control"]
+    again = client.get('/api/mobile/up_now?limit=2', headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code in (200, 304)  # 200 only if the minute bucket rolled over in between
+    if again.status_code == 304:
+        assert again.data == b""
+
+    # Snapshot is reused until the object set changes
+    snapshot = next(iter(mobile_feed_cache.values()))
+    client.get('/api/mobile/up_now')
+    assert next(iter(mobile_feed_cache.values())) is snapshot
+    db_session.add(AstroObject(user_id=user.id, object_name="NGC 999", ra_hours=3.0, dec_deg=0.0))
+    db_session.commit()
+    assert client.get('/api/mobile/up_now').get_json()["total"] == 7
+
+
+def test_up_now_feed_rejects_bad_cursor(client):
+    assert client.get('/api/mobile/up_now?cursor=%%%').status_code == 400
@@ -0,0 +1,111 @@
+"""
+Tests for the nightly-curve position helpers (nova/nightly_curves.py):
+grid index arithmetic, interpolation, the compact cache record with its
+shared time axis and the vectorized moon separation.
+"""
+from datetime import datetime, timedelta
+
+import astropy.units as u
+import numpy as np
+import pytest
+import pytz
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord, get_body
+from astropy.time import Time
+
+from nova.config import BoundedCache
+from nova.nightly_curves import (
+    NightlyCurve, angular_separation_deg, curve_cache_stats, curve_time_axis, interpolate_position,
+    moon_separations, shared_time_axis,
+)
+
+T0 = 1_700_000_000.0
+STEP = 900.0  # 15 minutes
+
+
+def test_interpolation_on_and_between_samples():
+    alts = np.array([10.0, 20.0, 30.0, 25.0])
+    azs = np.array([350.0, 10.0, 30.0, 50.0])
+
+    alt, az, nxt = interpolate_position(alts, azs, T0, STEP, T0 + 2 * STEP)
+    assert (alt, az, nxt) == (30.0, 30.0, 25.0)
+
+    alt, az, _ = interpolate_position(alts, azs, T0, STEP, T0 + 1.5 * STEP)
+    assert alt == pytest.approx(25.0) and az == pytest.approx(20.0)
+
+    # Azimuth wraps through north instead of sweeping back across the sky
+    _, az, _ = interpolate_position(alts, azs, T0, STEP, T0 + 0.5 * STEP)
+    assert az == pytest.approx(0.0)
+
+    # Outside the grid clamps to its ends
+    assert interpolate_position(alts, azs, T0, STEP, T0 - 10 * STEP)[0] == 10.0
+    assert interpolate_position(alts, azs, T0, STEP, T0 + 10 * STEP)[0] == 25.0
+
+    with pytest.raises(ValueError):
+        interpolate_position(np.array([]), np.array([]), T0, STEP, T0)
+
+
+def test_batch_interpolation_matches_rows():
+    rng = np.random.default_rng(1)
+    alts = rng.uniform(-30, 80, size=(5, 96))
+    azs = rng.uniform(0, 360, size=(5, 96))
+    ts = T0 + 37.3 * STEP
+    batch_alt, batch_az, _ = interpolate_position(alts, azs, T0, STEP, ts)
+    for k in range(5):
+        alt, az, _ = interpolate_position(alts[k], azs[k], T0, STEP, ts)
+        assert batch_alt[k] == pytest.approx(alt) and batch_az[k] == pytest.approx(az)
+
+
+def test_compact_curve_shares_time_axis_and_reports_memory():
+    tz = pytz.timezone("Europe/Zurich")
+    times_local = [tz.localize(datetime(2025, 1, 10, 12)) + timedelta(minutes=15 * i) for i in range(96)]
+    times_utc = Time([t.astimezone(pytz.utc) for t in times_local])
+    t0, interval_s = curve_time_axis(times_utc, 15)
+    assert t0 == pytest.approx(times_local[0].timestamp()) and interval_s == 900.0
+
+    axis = shared_time_axis("Europe/Zurich", "2025-01-10", 15, times_utc)
+    assert shared_time_axis("Europe/Zurich", "2025-01-10", 15, times_utc) is axis
+    assert axis.times_local() == times_local
+
+    alts = np.linspace(10.0, 40.0, 96)
+    curves = [NightlyCurve(axis, alts, np.full(96, 180.0), transit_time="23:10", obs_duration_minutes=300,
+                           max_altitude=40.0, alt_11pm="30.00", az_11pm="180.00") for _ in range(3)]
+    assert all(c.axis is axis for c in curves)
+    assert curves[0].altitudes.dtype == np.float32
+
+    alt, az, trend = curves[0].position_at(times_local[4].timestamp() + 450)
+    assert alt == pytest.approx((alts[4] + alts[5]) / 2, abs=1e-4) and az == pytest.approx(180.0)
+    assert trend == '↑'
+
+    impossible = NightlyCurve.impossible(12.5)
+    assert impossible.is_geometrically_impossible and impossible.max_altitude == 12.5
+    with pytest.raises(ValueError):
+        impossible.position_at(t0)
+
+    cache = BoundedCache(10)
+    for k, curve in enumerate(curves + [impossible]):
+        cache[k] = curve
+    stats = curve_cache_stats(cache)
+    assert stats["entries"] == 4 and stats["max_entries"] == 10
+    assert stats["bytes_total"] == sum(c.nbytes() for c in cache.values())
+    assert 2 * 96 * 4 < curves[0].nbytes() < 2 * 96 * 8  # float32 samples, no per-entry datetimes
+    assert stats["time_axes"] >= 1
+
+
+def test_vectorized_moon_separation_matches_astropy():
+    lat, lon = 47.0, 8.0
+    ts = datetime(2025, 3, 1, 21, tzinfo=pytz.utc).timestamp()
+    ras = np.array([0.0, 5.58, 12.5, 18.6])
+    decs = np.array([0.0, -5.4, 30.0, 38.8])
+
+    seps = moon_separations(ras, decs, lat, lon, ts)
+
+    when = Time(ts, format="unix")
+    loc = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    frame = AltAz(obstime=when, location=loc)
+    moon = get_body("moon", when, loc).transform_to(frame)
+    for k in range(len(ras)):
+        ref = SkyCoord(ra=ras[k] * u.hourangle, dec=decs[k] * u.deg).transform_to(frame).separation(moon).deg
+        assert abs(seps[k] - ref) <= 1.0
+
+    assert angular_separation_deg(10.0, 20.0, 10.0, 20.0) == pytest.approx(0.0)
+    assert angular_separation_deg(0.0, 90.0, 0.0, -90.0) == pytest.approx(180.0)
@@ -0,0 +1,59 @@
+"""
+Tests for the shared nightly visibility snapshot (nova/nightly_snapshot.py):
+parity of the batched pass with the per-object calculation, and caching /
+invalidation on object and location edits.
+"""
+import pytest
+
+from modules.astro_calculations import calculate_observable_duration_vectorized
+from nova import AstroObject, DbUser
+from nova.config import observable_objects_cache
+from nova.nightly_snapshot import compute_nightly_snapshot, get_nightly_snapshot
+
+OBJECTS = [("M31", 0.712, 41.27), ("M42", 5.58, -5.4), ("SGR A*", 17.76, -29.0), ("NO_COORDS", None, None)]
+MASK = [[90.0, 35.0], [180.0, 30.0], [270.0, 15.0]]
+
+
+@pytest.mark.parametrize("horizon_mask", [None, MASK])
+def test_snapshot_matches_per_object_calculation(horizon_mask):
+    snap = compute_nightly_snapshot(OBJECTS, 47.0, 8.0, "Europe/Zurich", "2025-01-15", 20, 15, horizon_mask)
+    assert snap.names == ["M31", "M42", "SGR A*"]
+    assert "NO_COORDS" not in snap and snap.get("NO_COORDS") is None
+
+    for name, ra, dec in OBJECTS[:3]:
+        duration, max_alt, obs_from, obs_to = calculate_observable_duration_vectorized(
+            ra, dec, 47.0, 8.0, "2025-01-15", "Europe/Zurich", 20, 15, horizon_mask)
+        night = snap.get(name)
+        assert night["observable_minutes"] == int(duration.total_seconds() / 60)
+        assert night["max_altitude"] == pytest.approx(max_alt, abs=1e-6)
+        assert night["observable_from"] == obs_from and night["observable_to"] == obs_to
+
+    minutes, max_alts = snap.take(["M42", "UNKNOWN"])
+    assert minutes[0] == snap.get("M42")["observable_minutes"] and minutes[1] == 0 and max_alts[1] == 0.0
+
+
+def test_snapshot_is_cached_and_rebuilt_on_edits(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    args = (50.0, 10.0, "UTC", "2025-01-15", 20, 15, [])
+
+    first = get_nightly_snapshot(db_session, user.id, *args)
+    assert "M42" in first
+    assert get_nightly_snapshot(db_session, user.id, *args) is first
+
+    # Object edits change the version
+    db_session.add(AstroObject(user_id=user.id, object_name="M31", ra_hours=0.712, dec_deg=41.27))
+    db_session.commit()
+    second = get_nightly_snapshot(db_session, user.id, *args)
+    assert second is not first and "M31" in second
+
+    m31 = db_session.query(AstroObject).filter_by(user_id=user.id, object_name="M31").one()
+    m31.dec_deg = -60.0
+    db_session.commit()
+    third = get_nightly_snapshot(db_session, user.id, *args)
+    assert third.get("M31")["max_altitude"] < second.get("M31")["max_altitude"]
+
+    # Location settings (threshold, horizon mask) are part of the key
+    masked = get_nightly_snapshot(db_session, user.id, 50.0, 10.0, "UTC", "2025-01-15", 20, 15, MASK)
+    assert masked is not third
+    assert get_nightly_snapshot(db_session, user.id, *args) is third
+    assert len(observable_objects_cache) == 2
@@ -969,4 +969,21 @@ def test_api_scan_frame_timeout(client, db_session, monkeypatch):
     payload = {'ra': 10.0, 'dec': 20.0, 'fov_w': 1.0, 'fov_h': 1.0}
     response = client.post('/api/scan_frame', json=payload)
     assert response.status_code == 200
-    assert response.get_json()['status'] == 'error'
\ No newline at end of file
+    assert response.get_json()['status'] == 'error'
+
+def test_imaging_opportunities_feed_ics_window(client):
+    """Opportunities come from the night series and carry full timestamps the ICS export reuses."""
+    response = client.get('/get_imaging_opportunities/M42',
+                          query_string={'plot_lat': 50, 'plot_lon': 10, 'plot_tz': 'UTC'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'success'
+    for r in body['results']:
+        assert r['from_iso'] and r['to_iso'] and r['from_iso'] <= r['to_iso']
+
+    ics = client.get('/generate_ics/M42', query_string={
+        'date': '2025-01-15', 'tz': 'UTC', 'lat': 50, 'lon': 10, 'from_time': '23:30', 'to_time': '01:15',
+        'from_iso': '2025-01-15T23:30:00+00:00', 'to_iso': '2025-01-16T01:15:00+00:00'})
+    assert ics.status_code == 200
+    text = ics.data.decode()
+    assert 'DTSTART:20250115T233000Z' in text and 'DTEND:20250116T011500Z' in text
@@ -578,6 +578,75 @@ def test_import_catalog_pack(client, monkeypatch):
     assert count == 1
 
 
+def test_import_catalog_pack_bulk_pipeline(db_session):
+    """
+    Tests the set-based catalog import: in-pack duplicates collapse, existing
+    objects are enriched fill-only, missing constellations are resolved in
+    bulk and progress is reported.
+    """
+    from nova.migration import import_catalog_pack_for_user
+
+    user = DbUser(username="bulk_importer")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(AstroObject(user_id=user.id, object_name="M31", ra_hours=0.71, dec_deg=41.27,
+                               image_url="https://example.org/mine.jpg", catalog_sources="old_pack"))
+    db_session.commit()
+
+    catalog = {'objects': [
+        {'Object': 'M31', 'RA': 0.71, 'DEC': 41.27, 'image_url': 'https://example.org/pack.jpg',
+         'description_text': 'Andromeda'},
+        {'Object': 'ngc7000', 'RA': 20.98, 'DEC': 44.33},
+        {'Object': 'NGC 7000', 'RA': 20.98, 'DEC': 44.33},  # duplicate after normalization
+        {'Object': 'M 42', 'RA': 5.59, 'DEC': -5.39, 'Constellation': 'Ori', 'Magnitude': 4.0},
+        {'Object': 'NO_COORDS'},
+        {'Common Name': 'nameless'},
+    ]}
+    progress = []
+    created, enriched, skipped = import_catalog_pack_for_user(
+        db_session, user, catalog, "bulk_pack",
+        progress_callback=lambda done, total, msg: progress.append((done, total))
+    )
+    db_session.commit()
+
+    assert (created, enriched, skipped) == (2, 1, 3)
+    assert progress and progress[-1][0] == 3  # 2 inserts + 1 update
+
+    m31 = db_session.query(AstroObject).filter_by(user_id=user.id, object_name="M31").one()
+    assert m31.image_url == "https://example.org/mine.jpg"  # never overwritten
+    assert m31.description_text == "Andromeda"  # filled because it was empty
+    assert m31.catalog_sources == "bulk_pack,old_pack"
+
+    ngc = db_session.query(AstroObject).filter_by(user_id=user.id, object_name="NGC 7000").one()
+    assert ngc.constellation == "Cygnus"
+    assert ngc.enabled is True and ngc.active_project is False
+
+    m42 = db_session.query(AstroObject).filter_by(user_id=user.id, object_name="M42").one()
+    assert m42.constellation == "Ori"
+    assert m42.magnitude == "4.0"
+
+
+def test_import_catalog_pack_stream_reports_progress(client, monkeypatch):
+    """Tests the SSE catalog import endpoint streams progress and a final summary."""
+    mock_load = MagicMock(return_value=({'objects': [{'Object': 'CAT_SSE_1', 'RA': 1.0, 'DEC': 2.0}]},
+                                        {'id': 'sse_pack', 'name': 'SSE Pack'}))
+    monkeypatch.setattr('nova.blueprints.tools.load_catalog_pack', mock_load)
+
+    response = client.get('/import_catalog/sse_pack/stream')
+    assert response.mimetype == 'text/event-stream'
+    events = [json.loads(line[len('data: '):]) for line in response.get_data(as_text=True).splitlines()
+              if line.startswith('data: ')]
+    assert events[-1]['done'] is True
+    assert events[-1]['created'] == 1
+    # The percentage counts written rows against rows to write
+    assert [e['progress'] for e in events if e.get('message', '').startswith('Saved')] == [99]
+    assert all(e['progress'] == 0 for e in events[:-1] if not e.get('message', '').startswith('Saved'))
+
+    db = get_db()
+    user = db.query(DbUser).filter_by(username="default").one()
+    assert db.query(AstroObject).filter_by(user_id=user.id, object_name="CAT_SSE_1").count() == 1
+
+
 def test_migrate_journal_rewrites_image_links(db_session):
     """
     Tests that the _migrate_journal function (used by importers)
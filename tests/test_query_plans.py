@@ -0,0 +1,108 @@
+"""
+Query-plan regression tests for the hot per-user lookups.
+
+Builds a schema the way startup does (create_all + _run_schema_patches),
+seeds 20k astro_objects spread over many users and checks with
+EXPLAIN QUERY PLAN that each hot query seeks an index instead of scanning
+the shared tables.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import and_, create_engine, func, insert, or_
+from sqlalchemy.orm import Session
+
+from nova import HOT_QUERY_INDEXES, _run_schema_patches
+from nova.models import AstroObject, Base, DbUser, JournalSession, SavedFraming
+
+USERS = 40
+OBJECTS_PER_USER = 500  # 20k objects in total
+
+
+@pytest.fixture(scope="module")
+def seeded_engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _run_schema_patches(conn)
+        conn.execute(insert(DbUser), [{"id": u, "username": f"user{u}"} for u in range(1, USERS + 1)])
+        conn.execute(insert(AstroObject), [
+            {"user_id": u, "object_name": f"NGC {i}", "ra_hours": (i % 24) * 1.0, "dec_deg": 0.0,
+             "enabled": i % 7 != 0, "active_project": i % 50 == 0}
+            for u in range(1, USERS + 1) for i in range(OBJECTS_PER_USER)
+        ])
+        conn.execute(insert(JournalSession), [
+            {"user_id": u, "object_name": f"NGC {i % 40}", "date_utc": date(2024, 1, 1) + timedelta(days=i)}
+            for u in range(1, USERS + 1) for i in range(100)
+        ])
+        conn.execute(insert(SavedFraming), [
+            {"user_id": u, "object_name": f"NGC {i}"} for u in range(1, USERS + 1) for i in range(50)
+        ])
+    return engine
+
+
+def _plan(engine, query) -> str:
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return "\n".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+
+
+def _assert_no_table_scan(plan: str, table: str) -> None:
+    for line in plan.splitlines():
+        if line.startswith(f"SCAN {table}"):
+            assert "INDEX" in line, f"full scan of {table}:\n{plan}"
+
+
+def test_indexes_created_by_schema_patch(seeded_engine):
+    with seeded_engine.connect() as conn:
+        names = {r[1] for t in ("astro_objects", "journal_sessions", "saved_framings", "components", "saved_views")
+                 for r in conn.exec_driver_sql(f"PRAGMA index_list({t})")}
+    for idx_name, table, columns in HOT_QUERY_INDEXES:
+        # saved_framings(user_id, object_name) is already covered by its UNIQUE constraint
+        assert idx_name in names or table == "saved_framings"
+
+
+def test_hot_query_plans_use_indexes(seeded_engine):
+    names = [f"NGC {i}" for i in range(20)]
+    with Session(seeded_engine) as db:
+        # Dashboard batch: enabled objects in name order -- no scan, no temp sort
+        plan = _plan(seeded_engine, db.query(AstroObject).filter_by(user_id=7, enabled=True)
+                     .order_by(AstroObject.object_name).offset(40).limit(20))
+        assert "ix_astro_objects_user_enabled_name" in plan
+        assert "TEMP B-TREE" not in plan
+        _assert_no_table_scan(plan, "astro_objects")
+
+        # Outlook worker: active projects
+        plan = _plan(seeded_engine, db.query(AstroObject).filter_by(user_id=7, active_project=True))
+        assert "ix_astro_objects_user_active_project" in plan
+        _assert_no_table_scan(plan, "astro_objects")
+
+        # Session counts per object, grouped
+        plan = _plan(seeded_engine, db.query(JournalSession.object_name, func.count(JournalSession.id))
+                     .filter(JournalSession.user_id == 7, JournalSession.object_name.in_(names))
+                     .group_by(JournalSession.object_name))
+        assert "ix_journal_user_object" in plan
+        _assert_no_table_scan(plan, "journal_sessions")
+
+        # Journal list ordered by date
+        plan = _plan(seeded_engine, db.query(JournalSession.id).filter(JournalSession.user_id == 7)
+                     .order_by(JournalSession.date_utc.desc()))
+        assert "idx_journal_user_date" in plan
+        _assert_no_table_scan(plan, "journal_sessions")
+
+        # Framing lookup for a batch of objects
+        plan = _plan(seeded_engine, db.query(SavedFraming.object_name, SavedFraming.rig_name)
+                     .filter(SavedFraming.user_id == 7, SavedFraming.object_name.in_(names)))
+        assert "USING INDEX" in plan
+        _assert_no_table_scan(plan, "saved_framings")
+
+        # Shared catalog keyset page: seek past the cursor in (is_shared, name, id) order, no sort
+        plan = _plan(seeded_engine, db.query(AstroObject.id, AstroObject.object_name, DbUser.username)
+                     .join(DbUser, AstroObject.user_id == DbUser.id)
+                     .filter(AstroObject.is_shared == True, AstroObject.object_name >= "NGC 40",
+                             or_(AstroObject.object_name > "NGC 40",
+                                 and_(AstroObject.object_name == "NGC 40", AstroObject.id > 123)))
+                     .order_by(AstroObject.object_name, AstroObject.id).limit(51))
+        assert "ix_astro_objects_shared_name" in plan
+        assert "TEMP B-TREE" not in plan
+        _assert_no_table_scan(plan, "astro_objects")
@@ -543,3 +543,30 @@ class TestGetObservableObjects:
             f"Results should differ when querying from different locations. " \
             f"North view: {data_north.get('objects', [])}, " \
             f"South view: {data_south.get('objects', [])}"
+
+    def test_observable_objects_use_dashboard_sampling_interval(self, client, db_session, setup_objects,
+                                                                monkeypatch):
+        """The dropdown reads the same nightly snapshot as the dashboard (user's sampling interval)."""
+        import json
+        from nova.models import DbUser, UiPref
+        import nova.blueprints.api as api
+
+        user = db_session.query(DbUser).filter_by(username="default").one()
+        prefs = db_session.query(UiPref).filter_by(user_id=user.id).first()
+        if prefs is None:
+            prefs = UiPref(user_id=user.id)
+            db_session.add(prefs)
+        prefs.json_blob = json.dumps({"sampling_interval_minutes": 10})
+        db_session.commit()
+
+        intervals = []
+        real_snapshot = api.get_nightly_snapshot
+
+        def spy(db, user_id, lat, lon, tz_name, local_date, altitude_threshold, sampling_interval, *args):
+            intervals.append(sampling_interval)
+            return real_snapshot(db, user_id, lat, lon, tz_name, local_date, altitude_threshold,
+                                 sampling_interval, *args)
+
+        monkeypatch.setattr(api, "get_nightly_snapshot", spy)
+        assert client.get('/api/get_observable_objects').status_code == 200
+        assert intervals == [10]
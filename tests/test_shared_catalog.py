@@ -0,0 +1,118 @@
+"""
+Tests for the shared catalog service (nova/shared_catalog.py): keyset pages,
+server-side filters, on-demand details and the cached summary's
+invalidation when sharing changes.
+"""
+import pytest
+
+from nova import AstroObject, Component, DbUser, SavedView, shared_catalog
+from nova.shared_catalog import (SharedCatalogCache, decode_cursor, get_shared_item, list_shared_items,
+                                 shared_catalog_cache)
+
+
+@pytest.fixture
+def catalog(client, db_session, monkeypatch):
+    """User "sharer" shares 25 objects (every 5th a galaxy in Andromeda), a telescope and a view."""
+    monkeypatch.setattr('nova.blueprints.api.SINGLE_USER_MODE', False)
+    sharer = DbUser(username="sharer")
+    db_session.add(sharer)
+    db_session.flush()
+    db_session.add_all([
+        AstroObject(user_id=sharer.id, object_name=f"NGC {100 + i}", ra_hours=1, dec_deg=1, is_shared=True,
+                    type="Galaxy" if i % 5 == 0 else "Nebula", constellation="And" if i % 5 == 0 else "Ori",
+                    shared_notes="<p>notes</p>" if i == 0 else None, description_text="long text " * 200)
+        for i in range(25)
+    ] + [
+        AstroObject(user_id=sharer.id, object_name="PRIVATE", ra_hours=1, dec_deg=1, is_shared=False),
+        Component(user_id=sharer.id, kind="telescope", name="Shared Scope", is_shared=True),
+        SavedView(user_id=sharer.id, name="Galaxy season", settings_json="{}", is_shared=True),
+    ])
+    db_session.commit()
+    shared_catalog_cache.clear()
+    return client, db_session.query(DbUser).filter_by(username="default").one().id
+
+
+def test_keyset_pages_cover_catalog_once(catalog, db_session):
+    _, user_id = catalog
+    names, cursor = [], None
+    while True:
+        page = list_shared_items(db_session, "object", user_id, cursor=cursor, limit=10)
+        names += [item["object_name"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert names == sorted(f"NGC {100 + i}" for i in range(25))
+    first = list_shared_items(db_session, "object", user_id, limit=10)["items"][0]
+    assert "description_text" not in first and "shared_notes" not in first and first["has_notes"] is True
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_filters_and_details_over_http(catalog):
+    client, user_id = catalog
+    data = client.get('/api/shared_items/object?type=galaxy&constellation=AND&owner=SHAR').get_json()
+    assert [o["object_name"] for o in data["items"]] == ["NGC 100", "NGC 105", "NGC 110", "NGC 115", "NGC 120"]
+    assert client.get('/api/shared_items/object?q=ngc 12').get_json()["items"][0]["object_name"] == "NGC 120"
+    assert client.get('/api/shared_items/component?kind=camera').get_json()["items"] == []
+    assert client.get('/api/shared_items/planet').status_code == 400
+    assert client.get('/api/shared_items/object?cursor=bogus').status_code == 400
+
+    obj_id = data["items"][0]["id"]
+    details = client.get(f'/api/shared_items/object/{obj_id}').get_json()
+    assert details["shared_notes"] == "<p>notes</p>" and details["description_text"].startswith("long text")
+
+    client.post('/api/import_item', json={'id': obj_id, 'type': 'object'})
+    imported = client.get('/api/shared_items/object?status=imported').get_json()["items"]
+    assert [o["id"] for o in imported] == [obj_id] and imported[0]["imported"] is True
+    assert len(client.get('/api/shared_items/object?status=unimported&limit=100').get_json()["items"]) == 24
+
+
+def test_summary_is_cached_until_sharing_changes(catalog, db_session):
+    client, user_id = catalog
+    summary = client.get('/api/shared_items/summary').get_json()
+    assert summary["object"]["count"] == 25 and summary["object"]["types"] == ["Galaxy", "Nebula"]
+    assert summary["component"]["kinds"] == {"telescope": 1} and summary["view"]["owners"] == ["sharer"]
+
+    builds = shared_catalog_cache.stats["builds"]
+    client.get('/api/shared_items/summary')
+    assert shared_catalog_cache.stats["builds"] == builds
+
+    # Editing a private item leaves the summary alone; sharing it rebuilds
+    private = db_session.query(AstroObject).filter_by(object_name="PRIVATE").one()
+    private.common_name = "Still private"
+    db_session.commit()
+    assert client.get('/api/shared_items/summary').get_json()["object"]["count"] == 25
+    private.is_shared = True
+    db_session.commit()
+    assert client.get('/api/shared_items/summary').get_json()["object"]["count"] == 26
+    assert shared_catalog_cache.stats["builds"] == builds + 1
+
+    assert get_shared_item(db_session, "object", private.id, user_id)["common_name"] == "Still private"
+    private.is_shared = False
+    db_session.commit()
+    assert get_shared_item(db_session, "object", private.id, user_id) is None
+
+
+def test_invalidation_reaches_other_workers(tmp_path, db_session):
+    stamp = str(tmp_path / "shared.stamp")
+    worker_a, worker_b = SharedCatalogCache(stamp), SharedCatalogCache(stamp)
+    worker_b.summary(db_session)
+    worker_a.invalidate()
+    worker_b.summary(db_session)
+    assert worker_b.stats["builds"] == 2
+
+
+def test_build_racing_an_invalidation_is_not_cached(tmp_path, db_session, monkeypatch):
+    cache = SharedCatalogCache(str(tmp_path / "shared.stamp"))
+    real_build = shared_catalog.build_shared_catalog_summary
+
+    def build_then_invalidate(db):
+        summary = real_build(db)
+        cache.invalidate()  # a commit lands while the (now outdated) summary was being built
+        return summary
+
+    monkeypatch.setattr(shared_catalog, "build_shared_catalog_summary", build_then_invalidate)
+    cache.summary(db_session)
+    monkeypatch.setattr(shared_catalog, "build_shared_catalog_summary", real_build)
+    cache.summary(db_session)
+    assert cache.stats["builds"] == 2 and cache.stats["hits"] == 0
@@ -12,7 +12,9 @@ def mock_app_context():
             mock_get_db.return_value = mock_db_session
             mock_db_session.query.return_value.filter_by.return_value.one_or_none.return_value = None
 
-            with patch('nova.helpers.get_constellation', return_value="Cas"):
+            # These tests exercise SIMBAD parsing, so keep the bundled index from answering first
+            with patch('nova.helpers.get_constellation', return_value="Cas"), \
+                    patch('nova.dso_index.get_dso_index', return_value=None):
                 yield
 
 
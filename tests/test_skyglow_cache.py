@@ -0,0 +1,129 @@
+"""
+Tests for windowed VIIRS tile reads (tools/skyglow/cache.py): hyperslab
+crop parity with a full read, mosaicking across a tile boundary, skipping
+of non-existent neighbour tiles and the in-memory window LRU. Tiles are small synthetic HDF5 files on the real
+tile lattice at a coarser resolution.
+"""
+import h5py
+import numpy as np
+import pytest
+
+from tools.skyglow import cache
+
+TILE_PX = 240  # 10° / 240 px = 2.5' pixels
+
+
+def _global_radiance(rows, cols):
+    """Radiance as a smooth function of the global pixel index, so seams are detectable."""
+    return (rows[:, None] * 1000 + cols[None, :]).astype(np.float32)
+
+
+def _write_tile(h, v, year, negative_fill=False):
+    rows = v * TILE_PX + np.arange(TILE_PX)
+    cols = h * TILE_PX + np.arange(TILE_PX)
+    data = _global_radiance(rows, cols)
+    if negative_fill:
+        data[0, :] = -999.9
+    with h5py.File(cache.cache_path(h, v, year), "w") as f:
+        f[cache.DATASET_PATH] = data
+        f[cache.LAT_PATH] = 90.0 - (rows + 0.5) * cache.PIXEL_DEG
+        f[cache.LON_PATH] = -180.0 + (cols + 0.5) * cache.PIXEL_DEG
+    return data
+
+
+@pytest.fixture
+def tile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "PIXEL_DEG", 10.0 / TILE_PX)
+    monkeypatch.setattr(cache, "is_cached", lambda h, v, year: cache.cache_path(h, v, year).exists())
+    monkeypatch.setattr(cache, "_window_cache", cache.OrderedDict())
+    monkeypatch.setattr(cache, "_missing_tiles", set())
+    return tmp_path
+
+
+def test_hyperslab_matches_full_read_crop(tile_dir):
+    full = _write_tile(19, 4, 2024, negative_fill=True)  # lon 10..20, lat 50..40
+    lat, lon, radius = 45.0, 15.0, 150.0
+
+    data, lats_g, lons_g = cache.load_tile_data(19, 4, 2024, lat, lon, radius)
+
+    lat_min, lat_max, lon_min, lon_max = cache.window_bounds(lat, lon, radius)
+    with h5py.File(cache.cache_path(19, 4, 2024), "r") as f:
+        lats_1d, lons_1d = f[cache.LAT_PATH][:], f[cache.LON_PATH][:]
+    rows = np.where((lats_1d >= lat_min) & (lats_1d <= lat_max))[0]
+    cols = np.where((lons_1d >= lon_min) & (lons_1d <= lon_max))[0]
+    expected = np.where(full < 0, 0, full)[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    assert data.dtype == np.float32
+    np.testing.assert_array_equal(data, expected)
+    assert lats_g.shape == lons_g.shape == data.shape
+    assert lats_g[0, 0] == lats_1d[rows[0]] and lons_g[0, -1] == lons_1d[cols[-1]]
+
+    with pytest.raises(RuntimeError):
+        cache.load_tile_data(19, 4, 2024, 10.0, 100.0, radius)
+
+
+def test_window_is_mosaicked_across_tile_boundary(tile_dir):
+    _write_tile(19, 4, 2024)
+    _write_tile(20, 4, 2024)  # lon 20..30
+    lat, lon, radius = 45.0, 19.5, 150.0
+    assert {(19, 4), (20, 4)} <= set(cache.tiles_for_radius(lat, lon, radius))
+
+    data, lats_g, lons_g = cache.load_window(lat, lon, 2024, radius)
+
+    lat_min, lat_max, lon_min, lon_max = cache.window_bounds(lat, lon, radius)
+    assert lons_g.min() < 20.0 < lons_g.max()
+    assert lons_g.min() >= lon_min and lons_g.max() <= lon_max
+    assert lats_g.min() >= lat_min and lats_g.max() <= lat_max
+    # Continuous across the seam: values follow the global pixel lattice
+    rows = np.rint((90.0 - lats_g[:, 0]) / cache.PIXEL_DEG - 0.5).astype(int)
+    cols = np.rint((lons_g[0, :] + 180.0) / cache.PIXEL_DEG - 0.5).astype(int)
+    np.testing.assert_array_equal(data, _global_radiance(rows, cols))
+
+
+def test_missing_neighbour_tile_leaves_dark_pixels(tile_dir):
+    _write_tile(19, 4, 2024)
+    data, _, lons_g = cache.load_window(45.0, 19.5, 2024, 150.0)
+    assert lons_g.max() < 20.0  # only the cached tile contributes
+    assert (data > 0).all()
+
+
+def test_nonexistent_neighbour_tile_is_skipped_and_remembered(tile_dir, monkeypatch):
+    _write_tile(19, 4, 2024)
+    searches = []
+    monkeypatch.setattr(cache, "resolve_filename", lambda h, v, year: searches.append((h, v)))
+
+    for _ in range(2):
+        data, _, lons_g = cache.get_or_download_tile(45.0, 19.5, 2024, token="t")
+        assert lons_g.max() < 20.0
+    assert searches == [(20, 4)]  # CMR asked once; the missing tile is memoized
+
+
+def test_cmr_network_error_is_not_treated_as_missing_tile(tile_dir, monkeypatch):
+    _write_tile(19, 4, 2024)
+
+    def cmr_down(h, v, year):
+        raise RuntimeError("CMR search failed: timed out")
+
+    monkeypatch.setattr(cache, "resolve_filename", cmr_down)
+    with pytest.raises(RuntimeError, match="CMR search failed"):
+        cache.get_or_download_tile(45.0, 19.5, 2024, token="t")
+    assert not cache._missing_tiles
+
+
+def test_recent_windows_are_served_from_lru(tile_dir, monkeypatch):
+    _write_tile(19, 4, 2024)
+    monkeypatch.setattr(cache, "WINDOW_CACHE_SIZE", 2)
+    first = cache.load_window(45.0, 15.0, 2024)
+    assert not first[0].flags.writeable
+
+    def _boom(*args, **kwargs):
+        raise AssertionError("window re-read from disk")
+    with monkeypatch.context() as m:
+        m.setattr(cache, "_read_window", _boom)
+        assert cache.load_window(45.0, 15.0, 2024) is first
+
+    cache.load_window(44.0, 15.0, 2024)
+    cache.load_window(46.0, 15.0, 2024)
+    assert len(cache._window_cache) == 2
+    assert cache.load_window(45.0, 15.0, 2024) is not first  # evicted, reloaded
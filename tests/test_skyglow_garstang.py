@@ -0,0 +1,73 @@
+"""
+Tests for the Garstang skyglow model (tools/skyglow/garstang.py): the
+per-sector bincount integration against a direct per-(sector, altitude)
+sum, and arbitrary sector/altitude resolutions.
+"""
+import json
+import math
+
+import numpy as np
+import pytest
+
+from tools.skyglow.garstang import (
+    NATURAL_SKY_MCD, compute_skyglow_horizon, compute_skyglow_profile, haversine_dist_az, scattering_weight,
+)
+
+LAT, LON, ELEV = 47.8, 16.2, 300.0
+
+
+@pytest.fixture
+def radiance():
+    rng = np.random.default_rng(0)
+    lats = np.linspace(LAT + 1.4, LAT - 1.4, 168)
+    lons = np.linspace(LON - 2.0, LON + 2.0, 240)
+    lons_g, lats_g = np.meshgrid(lons, lats)
+    data = (rng.random(lats_g.shape) ** 8 * 50).astype(np.float32)
+    data[lons_g < LON] = 0  # dark west: empty sectors fall back to the zenith value
+    return data, lats_g, lons_g
+
+
+def _reference_sqm(data, lats_g, lons_g, n_sectors, alt_steps, sqm_zenith, k=0.35, radius_km=150):
+    """Direct evaluation: mask each sector and weight every pixel per altitude."""
+    dist, az = haversine_dist_az(LAT, LON, lats_g, lons_g)
+    mask = (data > 0) & (dist > 0.5) & (dist <= radius_km)
+    d, a, rad = dist[mask], az[mask], data[mask]
+    sec = (a / (360.0 / n_sectors)).astype(int) % n_sectors
+    total = float(np.sum(rad * scattering_weight(d, 90.0, ELEV, k)))
+    scale = (108_000_000 * 10 ** (-0.4 * sqm_zenith) - NATURAL_SKY_MCD) / total
+    out = np.full((n_sectors, len(alt_steps)), sqm_zenith)
+    for s in range(n_sectors):
+        if not (sec == s).any():
+            continue
+        for j, alt in enumerate(alt_steps):
+            art = float(np.sum(rad[sec == s] * scattering_weight(d[sec == s], alt, ELEV, k))) * scale * n_sectors
+            total_m = max(art + NATURAL_SKY_MCD, NATURAL_SKY_MCD * 1.001)
+            out[s, j] = math.log10(total_m / 108_000_000) / -0.4
+    return out
+
+
+def test_bincount_profile_matches_direct_sum(radiance):
+    data, lats_g, lons_g = radiance
+    profile = compute_skyglow_profile(LAT, LON, ELEV, data, lats_g, lons_g, sqm_zenith=20.5)
+
+    expected = _reference_sqm(data, lats_g, lons_g, 16, profile["alt_steps"], 20.5)
+    got = np.array([s["sqm_by_alt"] for s in profile["sectors"]])
+    np.testing.assert_allclose(got, expected, atol=1e-3)
+    assert any(s["sqm_by_alt"] == [20.5] * 13 for s in profile["sectors"])
+    assert profile["sqm_horizon_mean"] == pytest.approx(got[:, 0].mean(), abs=1e-3)
+
+
+def test_fine_resolution_profile(radiance):
+    data, lats_g, lons_g = radiance
+    profile = compute_skyglow_profile(LAT, LON, ELEV, data, lats_g, lons_g, sqm_zenith=20.5,
+                                      n_sectors=72, alt_steps=np.arange(0, 91))
+
+    assert len(profile["sectors"]) == 72 and profile["alt_steps"] == list(range(91))
+    assert profile["sectors"][1]["az_deg"] == 5.0
+    expected = _reference_sqm(data, lats_g, lons_g, 72, [0, 10, 45, 90], 20.5)
+    got = np.array([[s["sqm_by_alt"][a] for a in (0, 10, 45, 90)] for s in profile["sectors"]])
+    np.testing.assert_allclose(got, expected, atol=1e-3)
+
+    horizon = compute_skyglow_horizon(profile)
+    assert len(horizon["skyglow_horizon"]) == 72
+    json.dumps(horizon)  # stored as the location's skyglow JSON
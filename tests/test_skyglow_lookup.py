@@ -0,0 +1,77 @@
+"""
+Tests for the compiled skyglow horizon lookup (nova/skyglow_lookup.py):
+one-degree table with circular interpolation, mtime-validated reloads and
+the vectorized floor checks used by the dashboard batch and plot endpoints.
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from nova import Location, app
+from nova.skyglow_lookup import SkyglowHorizon, below_floor, load_skyglow_horizon, skyglow_path
+
+# 4 sectors starting at 0/90/180/270 -> centres at 45/135/225/315
+SECTORS = [{"az_deg": 0.0, "min_alt_deg": 10.0}, {"az_deg": 90.0, "min_alt_deg": 20.0},
+           {"az_deg": 180.0, "min_alt_deg": 30.0}, {"az_deg": 270.0, "min_alt_deg": 20.0}]
+
+
+def _write(path, sectors):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"skyglow_horizon": sectors}, f)
+
+
+def test_table_interpolates_between_sector_centres():
+    horizon = SkyglowHorizon.from_sectors(SECTORS)
+    assert horizon.table.shape == (360,) and horizon.table.dtype == np.float32
+    assert horizon.floor_at(45.0) == pytest.approx(10.0)
+    assert horizon.floor_at(90.0) == pytest.approx(15.0)
+    assert horizon.floor_at(225.0) == pytest.approx(30.0)
+    # Wraps through north between the 315° and 45° centres
+    np.testing.assert_allclose(horizon.floor_at([0.0, 360.0, -45.0, 359.5]), [15.0, 15.0, 20.0, 15.0 + 0.5 * 10 / 90],
+                               atol=1e-4)
+
+    flags = below_floor(horizon, [5.0, 25.0, np.nan, 29.0], [45.0, 135.0, 10.0, 225.0])
+    assert flags.tolist() == [True, False, False, True]
+    assert not below_floor(None, [0.0], [0.0]).any()
+
+
+def test_loaded_horizon_is_cached_until_file_changes(tmp_path):
+    path = str(tmp_path / "skyglow" / "7.json")
+    assert load_skyglow_horizon(path) is None
+
+    _write(path, SECTORS)
+    first = load_skyglow_horizon(path)
+    assert load_skyglow_horizon(path) is first
+
+    _write(path, [dict(s, min_alt_deg=s["min_alt_deg"] + 5) for s in SECTORS])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    reloaded = load_skyglow_horizon(path)
+    assert reloaded is not first and reloaded.floor_at(45.0) == pytest.approx(15.0)
+
+    _write(path, [])
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000))
+    assert load_skyglow_horizon(path) is None
+
+
+def test_dashboard_and_plot_use_skyglow_floor(client, db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "instance_path", str(tmp_path))
+    monkeypatch.setenv("NASA_EARTHDATA_TOKEN", "test-token")
+    loc = db_session.query(Location).filter_by(name="Default Test Loc").first()
+    # Floor at 90° everywhere: every object above the threshold is below it
+    _write(skyglow_path(str(tmp_path), loc.id), [dict(s, min_alt_deg=90.0) for s in SECTORS])
+
+    batch = client.get('/api/get_desktop_data_batch?offset=0&limit=50&location=Default Test Loc').get_json()
+    m42 = next(item for item in batch['results'] if item['Object'] == 'M42')
+    assert m42['below_skyglow_floor'] is (not m42['is_obstructed_now'])
+    assert m42['below_skyglow_floor_11pm'] is (not m42['is_obstructed_at_11pm'])
+
+    plot = client.get('/api/get_plot_data/M42', query_string={
+        'plot_loc_name': 'Default Test Loc', 'plot_lat': 50, 'plot_lon': 10, 'plot_tz': 'UTC',
+        'day': 15, 'month': 1, 'year': 2025}).get_json()
+    floors = plot['skyglow_alt']
+    assert floors[0] is None and floors[-1] is None
+    assert all(v == 90.0 for v in floors[1:-1])
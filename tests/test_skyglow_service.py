@@ -0,0 +1,139 @@
+"""
+Tests for the skyglow computation service (nova/skyglow_service.py):
+content-addressed results shared across locations, in-flight dedup, the
+bounded pool and the status API. The VIIRS/Garstang computation is faked.
+"""
+import json
+import os
+import threading
+import types
+
+import pytest
+
+from nova.skyglow_service import SkyglowService, location_skyglow_params, skyglow_result_key, submit_locations
+
+SITE = (47.828, 16.170, 281.0, 20.5)
+
+
+class FakeCompute:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, lat, lon, elev, sqm, year, token):
+        self.calls.append((lat, lon, elev, sqm, year))
+        assert self.release.wait(5)
+        return {"sqm_zenith": sqm, "skyglow_horizon": [{"az_deg": 0.0, "min_alt_deg": 12.0}]}
+
+
+@pytest.fixture
+def service(tmp_path):
+    compute = FakeCompute()
+    return SkyglowService(str(tmp_path / "skyglow"), max_workers=2, compute_fn=compute), compute
+
+
+def _load(service, uid):
+    with open(service.location_path(uid)) as f:
+        return json.load(f)
+
+
+def test_result_key_quantizes_site_parameters():
+    key = skyglow_result_key(2024, *SITE)
+    assert skyglow_result_key(2024, 47.82801, 16.16999, 281.2, 20.501) == key
+    assert skyglow_result_key(2024, 47.838, 16.170, 281.0, 20.5) != key
+    assert skyglow_result_key(2023, *SITE) != key
+
+
+def test_identical_sites_share_one_computation(service):
+    service, compute = service
+    compute.release.clear()
+
+    assert service.submit("loc-a", *SITE, year=2024) == "queued"
+    assert service.submit("loc-b", *SITE, year=2024) == "attached"
+    assert service.location_status("loc-b", *SITE, year=2024)["state"] in ("queued", "running")
+    compute.release.set()
+    assert service.wait_idle()
+
+    assert len(compute.calls) == 1
+    a, b = _load(service, "loc-a"), _load(service, "loc-b")
+    assert a["skyglow_horizon"] == b["skyglow_horizon"]
+    assert a["_meta"]["key"] == skyglow_result_key(2024, *SITE)
+    assert service.location_status("loc-a", *SITE, year=2024)["state"] == "done"
+
+    # Another user's location at the same site is published from the stored result
+    assert service.submit("loc-c", *SITE, year=2024) == "cached"
+    assert service.submit("loc-a", *SITE, year=2024) == "current"
+    assert len(compute.calls) == 1
+    assert os.path.exists(service.location_path("loc-c"))
+
+    # Changed parameters compute a new result
+    assert service.submit("loc-a", 47.828, 16.170, 281.0, 21.0, year=2024) == "queued"
+    assert service.wait_idle()
+    assert len(compute.calls) == 2 and _load(service, "loc-a")["_meta"]["sqm_zenith"] == 21.0
+    assert service.stats()["computed"] == 2 and service.stats()["deduplicated"] == 1
+
+
+def test_resubmitted_location_keeps_latest_parameters(tmp_path):
+    gates = {20.5: threading.Event(), 21.0: threading.Event()}
+
+    def compute(lat, lon, elev, sqm, year, token):
+        assert gates[sqm].wait(5)
+        return {"sqm_zenith": sqm, "skyglow_horizon": []}
+
+    service = SkyglowService(str(tmp_path / "skyglow"), max_workers=2, compute_fn=compute)
+    assert service.submit("loc-a", *SITE, year=2024) == "queued"
+    assert service.submit("loc-a", 47.828, 16.170, 281.0, 21.0, year=2024) == "queued"
+
+    # The newer job finishes first; the older one must not overwrite it afterwards
+    gates[21.0].set()
+    while not os.path.exists(service.location_path("loc-a")):
+        threading.Event().wait(0.01)
+    gates[20.5].set()
+    assert service.wait_idle()
+    assert _load(service, "loc-a")["_meta"]["sqm_zenith"] == 21.0
+    assert os.path.exists(service.result_path(skyglow_result_key(2024, *SITE)))  # still shared
+
+
+def test_failed_job_reports_error(service):
+    service, compute = service
+
+    def _fail(*args):
+        raise RuntimeError("tile not available")
+    service._compute_fn = _fail
+    service.submit("loc-a", *SITE, year=2024)
+    assert service.wait_idle()
+    status = service.location_status("loc-a", *SITE, year=2024)
+    assert status["state"] == "failed" and "tile not available" in status["error"]
+    assert not os.path.exists(service.location_path("loc-a"))
+
+
+def test_bulk_import_runs_on_bounded_pool(service):
+    service, compute = service
+    compute.release.clear()
+    for k in range(10):
+        service.submit(f"loc-{k}", 40.0 + k, 10.0, 0.0, 20.0, year=2024)
+    assert len(service._executor()._threads) <= 2
+    assert service.stats()["queued"] + service.stats()["running"] == 10
+    compute.release.set()
+    assert service.wait_idle()
+    assert len(compute.calls) == 10
+
+
+def test_submit_locations_needs_token(monkeypatch, tmp_path):
+    monkeypatch.delenv("NASA_EARTHDATA_TOKEN", raising=False)
+    loc = types.SimpleNamespace(id=1, stable_uid=None, lat=47.8, lon=16.2, elevation=None,
+                                sqm_zenith=None, bortle_scale=4)
+    assert location_skyglow_params(loc) == (47.8, 16.2, 0.0, 20.8)
+    assert submit_locations([loc], str(tmp_path)) == {}
+
+
+def test_status_api_lists_user_locations(client):
+    response = client.get('/api/skyglow/status')
+    assert response.status_code == 200
+    body = response.get_json()
+    names = [loc["name"] for loc in body["locations"]]
+    assert "Default Test Loc" in names
+    assert all(loc["state"] in ("missing", "ready", "queued", "running", "done", "failed")
+               for loc in body["locations"])
+    assert body["service"]["workers"] >= 1
@@ -0,0 +1,111 @@
+"""
+Tests for the per-user spatial index (nova/spatial_index.py) behind
+/api/find_duplicates, and /api/scan_frame answering from the local catalog index.
+"""
+import sys, os
+import types
+
+import numpy as np
+import pytest
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from nova import AstroObject, DbUser
+from nova.helpers import bust_astro_context_cache
+from nova.spatial_index import UserSpatialIndex
+
+
+def _obj(name, ra_hours, dec_deg):
+    return {'Object': name, 'RA (hours)': ra_hours, 'DEC (degrees)': dec_deg}
+
+
+def _brute_force_pairs(objects, limit_arcmin=2.5):
+    pairs = set()
+    for i, a in enumerate(objects):
+        for b in objects[i + 1:]:
+            ra1, d1 = np.radians(a['RA (hours)'] * 15), np.radians(a['DEC (degrees)'])
+            ra2, d2 = np.radians(b['RA (hours)'] * 15), np.radians(b['DEC (degrees)'])
+            cos_sep = np.sin(d1) * np.sin(d2) + np.cos(d1) * np.cos(d2) * np.cos(ra1 - ra2)
+            if np.degrees(np.arccos(np.clip(cos_sep, -1, 1))) * 60 < limit_arcmin:
+                pairs.add(tuple(sorted((a['Object'], b['Object']))))
+    return pairs
+
+
+def test_incremental_sync_matches_brute_force():
+    rng = np.random.default_rng(7)
+    objects = [_obj(f"OBJ{i}", float(ra), float(dec))
+               for i, (ra, dec) in enumerate(zip(rng.uniform(5.0, 5.2, 300), rng.uniform(-6.0, -5.0, 300)))]
+    index = UserSpatialIndex()
+    assert len(index.sync(objects)) == 300
+    assert {(a, b) for a, b, _ in index.close_pairs()} == _brute_force_pairs(objects)
+
+    # Same cached list again: nothing is re-checked
+    assert index.sync(objects) == set()
+
+    # Move one object onto another, delete one, add one: only those are re-checked
+    moved = list(objects)
+    moved[10] = _obj("OBJ10", objects[20]['RA (hours)'], objects[20]['DEC (degrees)'] + 0.01)
+    del moved[50]
+    moved.append(_obj("NEW1", objects[30]['RA (hours)'], objects[30]['DEC (degrees)']))
+    assert index.sync(moved) == {"OBJ10", "OBJ50", "NEW1"}
+    pairs = {(a, b) for a, b, _ in index.close_pairs()}
+    assert pairs == _brute_force_pairs(moved)
+    assert ("NEW1", "OBJ30") in pairs and ("OBJ10", "OBJ20") in pairs
+
+
+def test_find_duplicates_route(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    db_session.add(AstroObject(user_id=user.id, object_name="NGC 1976", common_name="Orion Nebula",
+                               ra_hours=5.5801, dec_deg=-5.401))
+    db_session.add(AstroObject(user_id=user.id, object_name="M31", common_name="Andromeda Galaxy",
+                               ra_hours=0.712, dec_deg=41.27))
+    db_session.commit()
+    bust_astro_context_cache(user.id)
+
+    response = client.get('/api/find_duplicates')
+    assert response.status_code == 200
+    dups = response.get_json()["duplicates"]
+    assert len(dups) == 1
+    assert {dups[0]["object_a"]["Object"], dups[0]["object_b"]["Object"]} == {"M42", "NGC 1976"}
+    assert 0 < dups[0]["separation_arcmin"] < 2.5
+
+
+def test_scan_frame_answers_from_local_index(client, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("frames the index covers must not query SIMBAD")
+
+    monkeypatch.setattr("requests.post", no_network)
+    body = client.post('/api/scan_frame', json={'ra': 83.82, 'dec': -5.39, 'fov_w': 1.0, 'fov_h': 1.0}).get_json()
+    assert body['status'] == 'success' and body['source'] == 'local'
+    assert [o['name'] for o in body['objects']] == ['NGC 1976', 'NGC 1982']  # M42, M43
+    m42 = body['objects'][0]
+    assert m42['ra'] == pytest.approx(83.82, abs=0.05) and m42['mag'] == 4.0
+
+    # The magnitude limit applies to index hits as well
+    body = client.post('/api/scan_frame', json={'ra': 83.82, 'dec': -5.39, 'fov_w': 1.0, 'fov_h': 1.0,
+                                                'mag_limit': 6.0}).get_json()
+    assert [o['name'] for o in body['objects']] == ['NGC 1976']
+
+
+def test_scan_frame_queries_simbad_on_local_miss(client, monkeypatch):
+    simbad_csv = "main_id,ra,dec,otype,galdim_majaxis\nPGC 12345,300.01,5.02,G,0.8\n"
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(kwargs)
+        return types.SimpleNamespace(text=simbad_csv)
+
+    monkeypatch.setattr("requests.post", fake_post)
+    frame = {'ra': 300.0, 'dec': 5.0, 'fov_w': 0.5, 'fov_h': 0.5}  # no index objects here
+    body = client.post('/api/scan_frame', json=frame).get_json()
+    assert len(calls) == 1
+    assert body['status'] == 'success' and body['source'] == 'simbad'
+    assert [o['name'] for o in body['objects']] == ['PGC 12345']
+
+    def simbad_down(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("offline")
+
+    monkeypatch.setattr("requests.post", simbad_down)
+    body = client.post('/api/scan_frame', json={**frame, 'ra': 10.0, 'dec': -85.0}).get_json()
+    assert body['status'] == 'error'
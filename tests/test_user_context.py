@@ -0,0 +1,74 @@
+"""
+Tests for the per-user request context cache (nova/user_context.py).
+"""
+import json
+
+from sqlalchemy import event
+
+from nova import DbUser, UiPref
+from nova.user_context import UserContextCache, user_context_cache
+
+
+def _count_statements(engine, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+
+def test_repeat_requests_skip_user_and_prefs_queries(client, db_session):
+    client.get('/api/journal/sessions')  # warm the cache
+    statements = _count_statements(db_session.get_bind(), lambda: client.get('/api/journal/sessions'))
+    assert not any("FROM users" in s for s in statements)
+    assert not any("FROM ui_prefs" in s for s in statements)
+    assert any("FROM journal_sessions" in s for s in statements)
+
+
+def test_prefs_write_invalidates_cached_context(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    user_context_cache.put(user, {"sampling_interval_minutes": 15})
+    assert user_context_cache.get("default")[1]["sampling_interval_minutes"] == 15
+
+    prefs = db_session.query(UiPref).filter_by(user_id=user.id).first()
+    if prefs is None:
+        prefs = UiPref(user_id=user.id)
+        db_session.add(prefs)
+    prefs.json_blob = json.dumps({"sampling_interval_minutes": 5})
+    db_session.commit()
+    assert user_context_cache.get("default") is None
+
+    # Bulk deletes are caught as well
+    user_context_cache.put(user, {})
+    db_session.query(UiPref).filter_by(user_id=user.id).delete()
+    db_session.commit()
+    assert user_context_cache.get("default") is None
+
+
+def test_rolled_back_writes_keep_cache(client, db_session):
+    user = db_session.query(DbUser).filter_by(username="default").one()
+    user_context_cache.put(user, {"a": 1})
+    user.active = False
+    db_session.flush()
+    db_session.rollback()
+    assert user_context_cache.get("default")[1] == {"a": 1}
+
+
+def test_invalidation_reaches_other_processes(tmp_path):
+    stamp = str(tmp_path / "user_context.stamp")
+    worker_a, worker_b = UserContextCache(stamp_path=stamp), UserContextCache(stamp_path=stamp)
+
+    class _User:
+        id, username, active = 7, "alice", True
+
+    worker_b.put(_User, {"lang": "de"})
+    snapshot, prefs = worker_b.get("alice")
+    assert snapshot.id == 7 and prefs == {"lang": "de"}
+    prefs["objects"] = []  # request-local additions do not leak into the cache
+    assert worker_b.get("alice")[1] == {"lang": "de"}
+
+    worker_a.invalidate({7})
+    assert worker_b.get("alice") is None
@@ -0,0 +1,130 @@
+"""
+Tests for the shared weather client (nova/weather_client.py): conditional
+requests on the pooled session, concurrent provider fetches, background
+retries and the hybrid forecast built from stub providers.
+"""
+import threading
+import time
+
+import pytest
+
+from nova.weather_client import StubWeatherProvider, WeatherClient, set_weather_client
+from nova.weather_store import ForecastCache, WeatherStore, set_forecast_cache
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def _stub_client(**payload_fns):
+    providers = {name: StubWeatherProvider(name, payload_fns.get(name))
+                 for name in ("open_meteo", "7timer_astro")}
+    return WeatherClient(providers=providers, retry_base_s=0.01)
+
+
+@pytest.fixture
+def stub_client():
+    clients = []
+
+    def install(**payload_fns):
+        client = _stub_client(**payload_fns)
+        clients.append(set_weather_client(client))
+        return client
+    yield install
+    for previous in reversed(clients):
+        set_weather_client(previous)
+
+
+def test_conditional_get_reuses_payload_on_304():
+    client = WeatherClient(providers={})
+    client.session = FakeSession([
+        FakeResponse(200, {"v": 1}, {"ETag": '"abc"', "Last-Modified": "Tue, 01 Jul 2025 00:00:00 GMT"}),
+        FakeResponse(304),
+    ])
+    assert client.get_json("http://example/forecast", {"lat": 1}) == {"v": 1}
+    assert client.get_json("http://example/forecast", {"lat": 1}) == {"v": 1}
+    assert client.session.sent_headers[0] == {}
+    assert client.session.sent_headers[1] == {"If-None-Match": '"abc"',
+                                              "If-Modified-Since": "Tue, 01 Jul 2025 00:00:00 GMT"}
+    assert client.stats["not_modified"] == 1
+
+
+def test_providers_are_fetched_concurrently():
+    barrier = threading.Barrier(2, timeout=2)
+
+    def _meet(lat, lon):
+        barrier.wait()  # only returns if both providers are in flight at once
+        return {"ok": True}
+    client = _stub_client(open_meteo=_meet, **{"7timer_astro": _meet})
+    assert client.fetch_many(["open_meteo", "7timer_astro"], 1.0, 2.0) == {
+        "open_meteo": {"ok": True}, "7timer_astro": {"ok": True}}
+
+
+def test_failed_fetch_returns_immediately_and_retries_in_background():
+    attempts = []
+
+    def _flaky(lat, lon):
+        attempts.append(time.monotonic())
+        return {"ok": True} if len(attempts) >= 3 else None
+    client = _stub_client(**{"7timer_astro": _flaky})
+    recovered = threading.Event()
+    got = {}
+
+    def _on_retry(name, data):
+        got[name] = data
+        recovered.set()
+
+    assert client.fetch("7timer_astro", 1.0, 2.0, on_retry=_on_retry) is None
+    assert len(attempts) == 1
+    # A second failure while retries are pending does not stack another retry chain
+    assert client.retry_in_background("7timer_astro", 1.0, 2.0, _on_retry) is False
+    assert recovered.wait(5)
+    assert got == {"7timer_astro": {"ok": True}} and len(attempts) == 3
+    assert client.pending_retries() == 0 and client.stats["retries_succeeded"] == 1
+
+
+@pytest.fixture
+def forecast_cache(tmp_path):
+    cache = ForecastCache(WeatherStore(str(tmp_path / "weather.sqlite")), memory={})
+    previous = set_forecast_cache(cache)
+    yield cache
+    set_forecast_cache(previous)
+
+
+def test_hybrid_forecast_from_stubs_fills_in_seeing_after_retry(stub_client, forecast_cache):
+    from nova.blueprints.api import get_hybrid_weather_forecast
+
+    astro_up = threading.Event()
+    stub = StubWeatherProvider("7timer_astro")
+    client = stub_client(**{"7timer_astro": lambda lat, lon: stub.fetch(None, lat, lon) if astro_up.is_set() else None})
+
+    forecast = get_hybrid_weather_forecast(12.5, -3.25)
+    assert forecast and all(b["seeing"] == -9999 for b in forecast["dataseries"])  # Open-Meteo only
+
+    astro_up.set()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        merged = forecast_cache.memory["hybrid_12.5_-3.2"]["data"]
+        if any(b["seeing"] == 3 for b in merged["dataseries"]):
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("background retry never merged the 7Timer! data")
+    assert get_hybrid_weather_forecast(12.5, -3.25) is merged  # served from cache
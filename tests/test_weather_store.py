@@ -0,0 +1,126 @@
+"""
+Tests for the persistent forecast store (nova/weather_store.py): grid-cell
+clustering, model-run expiry, stale-while-revalidate and persistence across
+processes (a fresh ForecastCache on the same SQLite file).
+"""
+import threading
+from datetime import datetime, timezone
+
+from nova.weather_store import (ForecastCache, WeatherStore, next_model_update,
+                                weather_cell)
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(tmp_path, clock):
+    return ForecastCache(WeatherStore(str(tmp_path / "weather.sqlite")), memory={}, clock=clock)
+
+
+def test_nearby_locations_share_a_cell():
+    a = weather_cell(50.012, 10.038)
+    b = weather_cell(49.981, 9.962)
+    assert a == b == (50.0, 10.0, "hybrid_50.0_10.0")
+    assert weather_cell(50.06, 10.0)[2] != a[2]
+    assert weather_cell(-33.87, 179.98)[:2] == (-33.9, -180.0)
+
+
+def test_expiry_follows_model_run_availability():
+    # 00Z run is usable from 04Z, 06Z from 10Z, ... 18Z from 22Z
+    assert next_model_update(_ts(2026, 3, 1, 3, 0)) == _ts(2026, 3, 1, 4, 0)
+    assert next_model_update(_ts(2026, 3, 1, 4, 0)) == _ts(2026, 3, 1, 10, 0)
+    assert next_model_update(_ts(2026, 3, 1, 23, 30)) == _ts(2026, 3, 2, 4, 0)
+    assert next_model_update(_ts(2026, 3, 1, 1, 0)) == _ts(2026, 3, 1, 4, 0)
+
+
+def test_fresh_hit_skips_fetch_and_cold_miss_fetches_once(tmp_path):
+    clock = Clock(_ts(2026, 3, 1, 5, 0))
+    cache = _cache(tmp_path, clock)
+    calls = []
+
+    def fetch(lat, lon, key, publish):
+        calls.append((lat, lon, key))
+        return {"n": len(calls)}
+
+    assert cache.get(50.01, 10.02, fetch) == {"n": 1}
+    assert cache.get(49.98, 9.99, fetch) == {"n": 1}  # same cell, still fresh
+    assert calls == [(50.0, 10.0, "hybrid_50.0_10.0")]
+    assert cache.stats["cold"] == 1 and cache.stats["fresh"] == 1
+
+
+def test_stale_entry_is_served_while_refreshing(tmp_path):
+    clock = Clock(_ts(2026, 3, 1, 5, 0))
+    cache = _cache(tmp_path, clock)
+    cache.get(50.0, 10.0, lambda *a: {"run": "00Z"})
+
+    clock.now = _ts(2026, 3, 1, 10, 30)  # 06Z run now available
+    release = threading.Event()
+
+    def slow_fetch(lat, lon, key, publish):
+        release.wait(5)
+        return {"run": "06Z"}
+
+    assert cache.get(50.0, 10.0, slow_fetch) == {"run": "00Z"}  # no waiting on the network
+    assert cache.get(50.0, 10.0, slow_fetch) == {"run": "00Z"}
+    assert cache.stats["stale"] == 2 and cache.stats["refreshes"] == 1  # one refresh per cell
+    release.set()
+    assert cache.wait_idle()
+    assert cache.get(50.0, 10.0, slow_fetch) == {"run": "06Z"}
+
+
+def test_entries_persist_across_cache_instances(tmp_path):
+    clock = Clock(_ts(2026, 3, 1, 5, 0))
+    _cache(tmp_path, clock).get(50.0, 10.0, lambda *a: {"run": "00Z"})
+
+    def unexpected(*a):
+        raise AssertionError("refetched a fresh cell")
+    other = _cache(tmp_path, clock)
+    assert other.get(50.0, 10.0, unexpected) == {"run": "00Z"}
+    assert other.refresh(50.0, 10.0, unexpected) is False
+    assert other.next_refresh_at(["hybrid_50.0_10.0"]) == _ts(2026, 3, 1, 10, 0)
+
+
+def test_expired_memory_entry_picks_up_other_workers_refresh(tmp_path):
+    clock = Clock(_ts(2026, 3, 1, 5, 0))
+    worker_a, worker_b = _cache(tmp_path, clock), _cache(tmp_path, clock)
+    fetched = {"A": 0, "B": 0}
+
+    def fetch_as(name):
+        def fetch(lat, lon, key, publish):
+            fetched[name] += 1
+            return {"run": "06Z" if clock.now > _ts(2026, 3, 1, 10, 0) else "00Z"}
+        return fetch
+
+    worker_a.get(50.0, 10.0, fetch_as("A"))
+    assert worker_b.get(50.0, 10.0, fetch_as("B")) == {"run": "00Z"}  # both now hold 00Z in memory
+
+    clock.now = _ts(2026, 3, 1, 10, 30)
+    assert worker_a.refresh(50.0, 10.0, fetch_as("A")) is True
+    # Worker B's memory copy is stale, but the store already has the 06Z run
+    assert worker_b.refresh(50.0, 10.0, fetch_as("B")) is False
+    assert worker_b.get(50.0, 10.0, fetch_as("B")) == {"run": "06Z"}
+    assert fetched == {"A": 2, "B": 0}
+    assert worker_b.stats["stale"] == 0
+
+
+def test_late_provider_data_is_published(tmp_path):
+    clock = Clock(_ts(2026, 3, 1, 5, 0))
+    cache = _cache(tmp_path, clock)
+    late = {}
+
+    def fetch(lat, lon, key, publish):
+        late["publish"] = publish
+        return {"partial": True}
+
+    assert cache.get(50.0, 10.0, fetch) == {"partial": True}
+    late["publish"]({"partial": False})
+    assert cache.store.get("hybrid_50.0_10.0")["data"] == {"partial": False}
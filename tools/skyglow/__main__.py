@@ -11,6 +11,7 @@ import argparse
 import json
 import os
 import sys
+import numpy as np
 from pathlib import Path
 
 
@@ -48,6 +49,9 @@ def main():
                     help="Integration radius in km (default: 150)")
     ap.add_argument("--sectors", type=int,  default=16,
                     help="Azimuth sectors (default: 16)")
+    ap.add_argument("--alt-step", type=float, default=None,
+                    help="Uniform altitude step in degrees, e.g. 1 "
+                         "(default: 0,5,...,40,50,60,75,90)")
     ap.add_argument("--year",   type=int,   default=2024,
                     help="VIIRS year (default: 2024)")
     ap.add_argument("--k",      type=float, default=0.35,
@@ -87,29 +91,30 @@ def main():
 
     # ── 1. Tile cache ──────────────────────────────────────────────────────
     from tools.skyglow.cache import (
-        tiles_for_radius, is_cached, download_tile, load_tile_data, cache_path
+        tiles_for_radius, tile_for_location, is_cached, download_tile, load_window, cache_path,
+        TileNotFoundError
     )
 
     print(f"\n[1/4] Resolving VIIRS tile(s)...")
     tiles = tiles_for_radius(args.lat, args.lon, args.radius)
     print(f"  Tiles needed: {['h{:02d}v{:02d}'.format(h,v) for h,v in tiles]}")
 
-    # For now pilot handles single-tile case (150km radius fits in one tile
-    # for most European locations). Multi-tile mosaic is a future enhancement.
-    if len(tiles) > 1:
-        print(f"  Note: {len(tiles)} tiles span this radius. "
-              f"Using primary tile only for pilot.")
-    h, v = tiles[0]
-
-    if args.refresh and is_cached(h, v, args.year):
-        cache_path(h, v, args.year).unlink()
+    if args.refresh:
+        for h, v in tiles:
+            if is_cached(h, v, args.year):
+                cache_path(h, v, args.year).unlink()
         print(f"  Cache cleared (--refresh)")
 
-    print(f"\n[2/4] Loading VIIRS data (h{h:02d}v{v:02d} {args.year})...")
-    download_tile(h, v, args.year, token, progress=True)
-    data, lats_g, lons_g = load_tile_data(
-        h, v, args.year, args.lat, args.lon, args.radius
-    )
+    print(f"\n[2/4] Loading VIIRS data ({len(tiles)} tile(s), {args.year})...")
+    home = tile_for_location(args.lat, args.lon)
+    for h, v in tiles:
+        try:
+            download_tile(h, v, args.year, token, progress=True)
+        except TileNotFoundError as e:
+            if (h, v) == home:
+                raise
+            print(f"  Skipping h{h:02d}v{v:02d}: {e}")
+    data, lats_g, lons_g = load_window(args.lat, args.lon, args.year, args.radius)
     print(f"  Window: {data.shape[1]}×{data.shape[0]} px, "
           f"{int((data > 0).sum()):,} lit pixels")
 
@@ -124,6 +129,7 @@ def main():
         data=data, lats_g=lats_g, lons_g=lons_g,
         radius_km=args.radius, n_sectors=args.sectors,
         k=args.k, sqm_zenith=args.sqm_zenith,
+        **({"alt_steps": np.arange(0, 90 + 1e-9, args.alt_step)} if args.alt_step else {}),
     )
 
     profile = compute_skyglow_horizon(
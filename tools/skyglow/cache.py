@@ -4,15 +4,21 @@ tools/skyglow/cache.py
 VIIRS tile download and local cache management.
 Tiles are HDF5 files (~150MB each, 10x10 degree grid) from NASA LAADS DAAC.
 A tile is shared by all locations that fall within its bounding box.
+
+Only the hyperslab around the observer is read from each tile; when the
+radius crosses a tile boundary the neighbouring tiles' windows are stitched
+into one mosaic.
 """
 
 import json
 import math
 import os
 import ssl
+import threading
 import certifi
 import urllib.request
 import urllib.error
+from collections import OrderedDict
 from pathlib import Path
 
 # macOS python.org installer: system certs are not available by default.
@@ -36,6 +42,26 @@ DATASET_PATH = "HDFEOS/GRIDS/VIIRS_Grid_DNB_2d/Data Fields/AllAngle_Composite_Sn
 LAT_PATH     = "HDFEOS/GRIDS/VIIRS_Grid_DNB_2d/Data Fields/lat"
 LON_PATH     = "HDFEOS/GRIDS/VIIRS_Grid_DNB_2d/Data Fields/lon"
 
+# 10° tiles of 2400 px: every tile sits on the same 15 arc-second lattice
+PIXEL_DEG = 10.0 / 2400
+
+# Recently loaded radiance windows (key -> (data, lats_g, lons_g)), LRU order
+WINDOW_CACHE_SIZE = int(os.environ.get("SKYGLOW_WINDOW_CACHE_SIZE", 8))
+_window_cache: OrderedDict = OrderedDict()
+_window_lock = threading.Lock()
+
+# One lock per (h, v, year) so concurrent jobs never download the same tile twice
+_download_locks: dict = {}
+_download_locks_guard = threading.Lock()
+
+# (h, v, year) tiles CMR reported as non-existent (ocean-only), so neighbouring
+# tiles are not searched for again on every job in this process
+_missing_tiles: set = set()
+
+
+class TileNotFoundError(RuntimeError):
+    """NASA CMR has no VNP46A4 granule for the tile / year (ocean-only or not yet published)."""
+
 
 def tile_for_location(lat: float, lon: float) -> tuple[int, int]:
     """
@@ -49,19 +75,25 @@ def tile_for_location(lat: float, lon: float) -> tuple[int, int]:
     return h, v
 
 
+def window_bounds(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) of the box enclosing radius_km around lat/lon."""
+    R = 6371.0
+    dlat = math.degrees(radius_km / R)
+    dlon = math.degrees(radius_km / (R * math.cos(math.radians(lat))))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
 def tiles_for_radius(lat: float, lon: float, radius_km: float = 150) -> list[tuple[int, int]]:
     """
     Return all unique tile (h, v) pairs that intersect a circle of
     radius_km around lat/lon. For most European locations this is just
-    one tile; occasionally two at tile boundaries.
+    one tile; up to four near tile corners.
     """
-    R = 6371.0
-    dlat = math.degrees(radius_km / R)
-    dlon = math.degrees(radius_km / (R * math.cos(math.radians(lat))))
+    lat_min, lat_max, lon_min, lon_max = window_bounds(lat, lon, radius_km)
 
     tiles = set()
-    for la in [lat - dlat, lat, lat + dlat]:
-        for lo in [lon - dlon, lon, lon + dlon]:
+    for la in [lat_min, lat, lat_max]:
+        for lo in [lon_min, lon, lon_max]:
             tiles.add(tile_for_location(la, lo))
     return list(tiles)
 
@@ -116,8 +148,16 @@ def download_tile(h: int, v: int, year: int, token: str,
     """
     Download a VIIRS tile from NASA Earthdata Cloud.
     Returns path to the cached HDF5 file.
-    Skips download if already cached.
+    Skips download if already cached. Concurrent callers for the same tile
+    wait for the first download instead of fetching it again.
     """
+    with _download_locks_guard:
+        lock = _download_locks.setdefault((h, v, year), threading.Lock())
+    with lock:
+        return _download_tile(h, v, year, token, progress)
+
+
+def _download_tile(h: int, v: int, year: int, token: str, progress: bool) -> Path:
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
     dest = cache_path(h, v, year)
 
@@ -126,10 +166,14 @@ def download_tile(h: int, v: int, year: int, token: str,
             print(f"  Cache hit: {dest.name}")
         return dest
 
+    if (h, v, year) in _missing_tiles:
+        raise TileNotFoundError(f"VNP46A4 tile h{h:02d}v{v:02d} for {year} does not exist (cached CMR answer).")
+
     print(f"  Resolving filename for h{h:02d}v{v:02d} {year} via CMR...")
     filename = resolve_filename(h, v, year)
     if filename is None:
-        raise RuntimeError(
+        _missing_tiles.add((h, v, year))
+        raise TileNotFoundError(
             f"Could not find VNP46A4 tile h{h:02d}v{v:02d} for {year} in NASA CMR. "
             f"The tile may not exist (ocean-only) or the year is not yet available."
         )
@@ -172,6 +216,40 @@ def download_tile(h: int, v: int, year: int, token: str,
     return dest
 
 
+def _index_range(coords, lo: float, hi: float):
+    """[start, stop) of the entries of a monotonic 1-D coordinate array within [lo, hi], or None."""
+    import numpy as np
+
+    idx = np.flatnonzero((coords >= lo) & (coords <= hi))
+    if len(idx) == 0:
+        return None
+    return int(idx[0]), int(idx[-1]) + 1
+
+
+def _read_window(h: int, v: int, year: int, bounds):
+    """
+    Read only the hyperslab of a cached tile that falls inside bounds.
+    Returns (data, lats_1d, lons_1d) or None if the tile does not overlap.
+    """
+    import h5py
+    import numpy as np
+
+    lat_min, lat_max, lon_min, lon_max = bounds
+    with h5py.File(cache_path(h, v, year), "r") as f:
+        lats_1d = f[LAT_PATH][:]   # shape (2400,), a few KB
+        lons_1d = f[LON_PATH][:]
+        rows = _index_range(lats_1d, lat_min, lat_max)
+        cols = _index_range(lons_1d, lon_min, lon_max)
+        if rows is None or cols is None:
+            return None
+        (r0, r1), (c0, c1) = rows, cols
+        data = f[DATASET_PATH][r0:r1, c0:c1].astype(np.float32)
+
+    # Replace fill values with 0
+    np.maximum(data, 0, out=data)
+    return data, lats_1d[r0:r1], lons_1d[c0:c1]
+
+
 def load_tile_data(h: int, v: int, year: int,
                    lat: float, lon: float, radius_km: float):
     """
@@ -179,45 +257,19 @@ def load_tile_data(h: int, v: int, year: int,
     Returns (data_2d, lats_grid, lons_grid) cropped to the bounding box.
     data_2d values are in nW/cm²/sr.
     """
-    import h5py
     import numpy as np
 
     path = cache_path(h, v, year)
     if not is_cached(h, v, year):
         raise RuntimeError(f"Tile {path.name} not in cache — call download_tile first.")
 
-    R = 6371.0
-    dlat = math.degrees(radius_km / R)
-    dlon = math.degrees(radius_km / (R * math.cos(math.radians(lat))))
-    lat_min, lat_max = lat - dlat, lat + dlat
-    lon_min, lon_max = lon - dlon, lon + dlon
-
-    with h5py.File(path, "r") as f:
-        lats_1d = f[LAT_PATH][:]   # shape (2400,)
-        lons_1d = f[LON_PATH][:]   # shape (2400,)
-        data_full = f[DATASET_PATH][:]  # shape (2400, 2400)
-
-    # Crop to bounding box
-    row_mask = (lats_1d >= lat_min) & (lats_1d <= lat_max)
-    col_mask = (lons_1d >= lon_min) & (lons_1d <= lon_max)
-    rows = np.where(row_mask)[0]
-    cols = np.where(col_mask)[0]
-
-    if len(rows) == 0 or len(cols) == 0:
+    window = _read_window(h, v, year, window_bounds(lat, lon, radius_km))
+    if window is None:
         raise RuntimeError(
             f"Location ({lat}, {lon}) with radius {radius_km}km "
             f"does not overlap tile h{h:02d}v{v:02d}."
         )
-
-    r0, r1 = rows[0], rows[-1] + 1
-    c0, c1 = cols[0], cols[-1] + 1
-
-    data_crop = data_full[r0:r1, c0:c1].astype(np.float32)
-    lats_crop = lats_1d[r0:r1]
-    lons_crop = lons_1d[c0:c1]
-
-    # Replace fill values with 0
-    data_crop = np.where(data_crop < 0, 0, data_crop)
+    data_crop, lats_crop, lons_crop = window
 
     # Build 2D coordinate grids
     lons_g, lats_g = np.meshgrid(lons_crop, lats_crop)
@@ -225,9 +277,89 @@ def load_tile_data(h: int, v: int, year: int,
     return data_crop, lats_g, lons_g
 
 
-def get_or_download_tile(lat: float, lon: float, year: int, token: str):
-    """Download tile if not cached, then load and return (data, lats_grid, lons_grid)."""
-    h, v = tile_for_location(lat, lon)
-    if not is_cached(h, v, year):
-        download_tile(h, v, year, token, progress=False)
-    return load_tile_data(h, v, year, lat, lon, radius_km=150.0)
+def _mosaic(windows):
+    """
+    Stitch per-tile windows onto one grid. All tiles share the global
+    PIXEL_DEG lattice, so each window is placed by its pixel offset;
+    pixels not covered by any cached tile (ocean tiles) stay 0.
+    """
+    import numpy as np
+
+    placed = []
+    for data, lats_1d, lons_1d in windows:
+        r0 = int(round((90.0 - float(lats_1d[0])) / PIXEL_DEG - 0.5))
+        c0 = int(round((float(lons_1d[0]) + 180.0) / PIXEL_DEG - 0.5))
+        placed.append((r0, c0, data))
+
+    row_min = min(r0 for r0, _, _ in placed)
+    col_min = min(c0 for _, c0, _ in placed)
+    row_max = max(r0 + d.shape[0] for r0, _, d in placed)
+    col_max = max(c0 + d.shape[1] for _, c0, d in placed)
+
+    mosaic = np.zeros((row_max - row_min, col_max - col_min), dtype=np.float32)
+    for r0, c0, data in placed:
+        mosaic[r0 - row_min:r0 - row_min + data.shape[0], c0 - col_min:c0 - col_min + data.shape[1]] = data
+
+    lats_1d = 90.0 - (np.arange(row_min, row_max) + 0.5) * PIXEL_DEG
+    lons_1d = -180.0 + (np.arange(col_min, col_max) + 0.5) * PIXEL_DEG
+    return mosaic, lats_1d, lons_1d
+
+
+def load_window(lat: float, lon: float, year: int, radius_km: float = 150.0):
+    """
+    Radiance window around lat/lon, mosaicked from every cached tile the
+    radius touches. Returns (data, lats_grid, lons_grid) like load_tile_data.
+    Recently used windows are served from an in-memory LRU; the returned
+    arrays are shared and read-only.
+    """
+    import numpy as np
+
+    tiles = sorted(t for t in tiles_for_radius(lat, lon, radius_km) if is_cached(*t, year))
+    if not tiles:
+        h, v = tile_for_location(lat, lon)
+        raise RuntimeError(f"Tile {cache_path(h, v, year).name} not in cache — call download_tile first.")
+
+    key = (round(lat, 5), round(lon, 5), float(radius_km), year,
+           tuple((h, v, cache_path(h, v, year).stat().st_mtime_ns) for h, v in tiles))
+    with _window_lock:
+        hit = _window_cache.get(key)
+        if hit is not None:
+            _window_cache.move_to_end(key)
+            return hit
+
+    bounds = window_bounds(lat, lon, radius_km)
+    windows = [w for w in (_read_window(h, v, year, bounds) for h, v in tiles) if w is not None]
+    if not windows:
+        raise RuntimeError(f"Location ({lat}, {lon}) with radius {radius_km}km does not overlap any cached tile.")
+    data, lats_1d, lons_1d = windows[0] if len(windows) == 1 else _mosaic(windows)
+
+    lons_g, lats_g = np.meshgrid(lons_1d, lats_1d)
+    result = (data, lats_g, lons_g)
+    for arr in result:
+        arr.flags.writeable = False
+
+    with _window_lock:
+        _window_cache[key] = result
+        while len(_window_cache) > WINDOW_CACHE_SIZE:
+            _window_cache.popitem(last=False)
+    return result
+
+
+def get_or_download_tile(lat: float, lon: float, year: int, token: str, radius_km: float = 150.0):
+    """
+    Download every tile the radius touches if not cached, then load and
+    return the mosaicked (data, lats_grid, lons_grid). Neighbouring tiles
+    that do not exist (ocean-only) are skipped; the observer's own tile is
+    required. Network and download errors always propagate.
+    """
+    home = tile_for_location(lat, lon)
+    for h, v in tiles_for_radius(lat, lon, radius_km):
+        if is_cached(h, v, year):
+            continue
+        try:
+            download_tile(h, v, year, token, progress=False)
+        except TileNotFoundError:
+            if (h, v) == home:
+                raise
+            print(f"  Skipping neighbouring tile h{h:02d}v{v:02d} {year} (not available)")
+    return load_window(lat, lon, year, radius_km)
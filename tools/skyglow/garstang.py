@@ -86,6 +86,30 @@ def haversine_dist_az(lat_obs: float, lon_obs: float,
 
 # ── Garstang scattering weight ─────────────────────────────────────────────────
 
+def airmass(alt_deg) -> np.ndarray:
+    """
+    Air mass factor 1/sin(alt) for one or more sky altitudes (degrees),
+    capped at 1/sin(5°)≈11.5 to avoid divergence near the horizon.
+    """
+    alt = np.maximum(np.asarray(alt_deg, dtype=float), 1.0)
+    sin_alt = np.maximum(np.sin(np.radians(alt)), math.sin(math.radians(5.0)))
+    return 1.0 / sin_alt
+
+
+def base_weight(dist_km: np.ndarray, elev_obs_m: float, k: float) -> np.ndarray:
+    """
+    Altitude-independent part of the Garstang weight: exp(-k*d)/d², with
+    the extinction scaled down by the observer's height above the aerosol layer.
+    """
+    # Observer elevation correction
+    elev_km = elev_obs_m / 1000.0
+    elev_factor = math.exp(-elev_km / SCALE_HT_AER_KM)
+
+    # Base weight: exp(-k*d)/d² (horizontal extinction, same as working pilot)
+    d_safe = np.maximum(dist_km, 0.5)
+    return np.exp(-k * elev_factor * d_safe) / d_safe ** 2
+
+
 def scattering_weight(dist_km: np.ndarray, alt_deg: float,
                       elev_obs_m: float, k: float) -> np.ndarray:
     """
@@ -115,22 +139,11 @@ def scattering_weight(dist_km: np.ndarray, alt_deg: float,
 
     Observer elevation: scales base weight by exp(-elev/scale_height)
       - Higher observer → above more of the aerosol layer → less scattering
-    """
-    # Air mass: 1/sin(alt), capped at 1/sin(5°)≈11.5 to avoid divergence
-    sin_alt = max(math.sin(math.radians(max(alt_deg, 1.0))),
-                  math.sin(math.radians(5.0)))
-    airmass = 1.0 / sin_alt
 
-    # Observer elevation correction
-    elev_km = elev_obs_m / 1000.0
-    elev_factor = math.exp(-elev_km / SCALE_HT_AER_KM)
-
-    # Base weight: exp(-k*d)/d² (horizontal extinction, same as working pilot)
-    d_safe = np.maximum(dist_km, 0.5)
-    base_weight = np.exp(-k * elev_factor * d_safe) / d_safe ** 2
-
-    # Altitude scaling: airmass multiplies the integrated path contribution
-    return base_weight * airmass
+    The altitude enters only as a scalar factor, which compute_skyglow_profile
+    exploits: it sums base weights per sector once and scales by airmass(alt).
+    """
+    return base_weight(dist_km, elev_obs_m, k) * float(airmass(alt_deg))
 
 
 # ── Main model ─────────────────────────────────────────────────────────────────
@@ -168,7 +181,15 @@ def compute_skyglow_profile(
       alt_steps        : list of altitude angles evaluated
       sectors          : list of dicts, one per azimuth sector:
           az_deg, az_label, sqm_by_alt (list matching alt_steps)
+
+    Notes
+    -----
+    Cost is one pass over the pixels (distance, weight, per-sector bincount)
+    plus an n_sectors × len(alt_steps) outer product, so fine resolutions
+    such as 72 sectors × 1° steps cost about the same as the default 16 × 13.
     """
+    alt_steps = np.asarray(alt_steps).tolist()  # plain numbers, JSON-serialisable
+
     # Pre-compute distances and azimuths
     dist_km, az_deg = haversine_dist_az(lat_obs, lon_obs, lats_g, lons_g)
 
@@ -183,13 +204,18 @@ def compute_skyglow_profile(
     sw       = 360.0 / n_sectors
     sec_idx  = (az_flat / sw).astype(int) % n_sectors
 
+    # One pass over the pixels: the altitude dependence is a scalar airmass
+    # factor, so per-sector sums of radiance × exp(-k·d)/d² are all we need.
+    weighted   = rad_flat * base_weight(d_flat, elev_obs_m, k)
+    sector_sum = np.bincount(sec_idx, weights=weighted, minlength=n_sectors)
+    sector_n   = np.bincount(sec_idx, minlength=n_sectors)
+
     # ── Calibration: derive zenith SQM from VIIRS data ─────────────────────
     # Compute total (zenith-equivalent) Garstang sum, then convert to SQM
     # using the lightpollutionmap.info documented formula.
     # This makes the pilot fully self-contained — no external API needed.
 
-    w_zenith     = scattering_weight(d_flat, 90.0, elev_obs_m, k)
-    total_sum    = float(np.sum(rad_flat * w_zenith))
+    total_sum    = float(sector_sum.sum() * airmass(90.0))
 
     if sqm_zenith is None:
         # Bortle→SQM lookup as fallback (conservative mid-range values)
@@ -211,29 +237,21 @@ def compute_skyglow_profile(
     target_art_mcd   = target_total_mcd - NATURAL_SKY_MCD
     scale            = target_art_mcd / total_sum if total_sum > 0 else 1.0
 
-    # ── Compute SQM per (sector, altitude) ────────────────────────────────
+    # ── SQM per (sector, altitude) as an outer product ────────────────────
+    # Scale and normalise: multiply by n_sectors (each sector = 1/n annulus)
+    art_mcd = np.outer(sector_sum, airmass(alt_steps)) * (scale * n_sectors)
+    total_m = np.maximum(art_mcd + NATURAL_SKY_MCD, NATURAL_SKY_MCD * 1.001)
+    sqm     = np.round(np.log10(total_m / 108_000_000) / -0.4, 3)
+
     results = []
     sector_width = 360.0 / n_sectors
 
     for s in range(n_sectors):
-        sec_mask = (sec_idx == s)
-        d_s   = d_flat[sec_mask]
-        rad_s = rad_flat[sec_mask]
-        az_s  = s * sector_width
-
-        sqm_by_alt = []
-        for alt in alt_steps:
-            if len(d_s) == 0:
-                sqm_by_alt.append(sqm_zenith)
-                continue
-            w       = scattering_weight(d_s, float(alt), elev_obs_m, k)
-            sec_sum = float(np.sum(rad_s * w))
-            # Scale and normalise: multiply by n_sectors (each sector = 1/n annulus)
-            art_mcd = sec_sum * scale * n_sectors
-            total_m = art_mcd + NATURAL_SKY_MCD
-            total_m = max(total_m, NATURAL_SKY_MCD * 1.001)
-            sqm     = math.log10(total_m / 108_000_000) / -0.4
-            sqm_by_alt.append(round(sqm, 3))
+        az_s = s * sector_width
+        if sector_n[s] == 0:
+            sqm_by_alt = [sqm_zenith] * len(alt_steps)
+        else:
+            sqm_by_alt = sqm[s].tolist()
 
         results.append({
             "az_deg":    round(az_s, 1),